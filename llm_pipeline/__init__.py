@@ -10,21 +10,76 @@ This package provides three building blocks:
 
 2. executor.call_endpoint(row_yaml, base_url, **kwargs)
    Internal helper used by the generated callables to perform an HTTP
-   request given the function arguments.
+   request given the function arguments.  ``executor.call_endpoints``
+   runs a whole batch of tool calls concurrently under per-host
+   concurrency and token-bucket rate limits, preserving input order.
 
-3. smoke_test (module with CLI)
+3. http_session.get_session(base_url)
+   Process-wide pool of keep-alive ``requests.Session`` objects (one per
+   base URL) with retry/backoff for idempotent methods.  Shared by all
+   generated callables so tool calls reuse TCP/TLS connections.
+
+4. async_executor.call_endpoint_async(spec, base_url, **kwargs)
+   Asyncio/httpx twin of ``call_endpoint``; the coroutines returned by
+   ``converter.load_function_specs_async`` use it so a turn's tool calls
+   can be awaited concurrently with ``asyncio.gather``.
+
+5. response_cache.MemoryCache / SQLiteCache
+   TTL + LRU (by byte size) cache for endpoint responses keyed on the
+   canonical request; pass it as ``cache=`` to the loaders/executors.
+
+6. registry.load_registry(db_path)
+   Precompiled JSON artefact of all tool schemas, path regexes and
+   argument routing tables; rebuilt only when the SectionStore changes.
+
+7. shaping.shape_result(result, spec)
+   Compacts tool results using the stored response schema: field
+   projection, row limits with "… N more" markers, float rounding and a
+   token budget.  Applied by the executors unless ``shape=None``.
+
+8. smoke_test (module with CLI)
    A minimal repeatable test that walks through all SectionStore rows,
    fills in dummy values for parameters and verifies that the endpoint is
    reachable (HTTP status < 500).
 
 The code purposefully stays dependency-light; the only external modules
-are `requests` (ubiquitous) and the optional `PyYAML` for richer YAML
-parsing.
+are `requests` (ubiquitous), the optional `PyYAML` for richer YAML
+parsing and the optional `httpx` for the asyncio execution path.
+
+Importing the package is cheap: submodules listed in ``__all__`` are
+loaded on first attribute access (``llm_pipeline.converter``), and heavy
+third-party modules (`requests`, `httpx`, `PyYAML`, `pydantic`, `openai`)
+only when first needed.  ``python -m llm_pipeline.startup_bench`` tracks
+import and CLI start-up times over time.
 """
 
 from __future__ import annotations
 
 __all__ = [
+    "async_executor",
+    "async_extract",
+    "batch_api",
+    "blueprint_parser",
+    "cassette",
     "converter",
     "executor",
+    "http_session",
+    "mcp_server",
+    "pagination",
+    "ratelimit",
+    "registry",
+    "response_cache",
+    "shaping",
+    "singleflight",
+    "tool_index",
+    "tracing",
+    "validation",
 ]
+
+
+def __getattr__(name: str):  # noqa: D401 – PEP 562 lazy submodules
+    if name in __all__:
+        import importlib
+
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,154 @@
+"""Asyncio twin of :mod:`llm_pipeline.executor` backed by ``httpx``.
+
+A chat turn frequently contains several independent tool calls.  With the
+synchronous executor they run one after another; with this module an
+orchestrator can simply do::
+
+    results = await asyncio.gather(
+        *(callables[c.name](**c.args) for c in tool_calls)
+    )
+
+All coroutines share **one** ``httpx.AsyncClient`` per event loop, so a
+single server process can multiplex hundreds of concurrent conversations
+over a small set of keep-alive connections.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from importlib.util import find_spec
+from typing import Any, Dict, Mapping, Optional
+
+# Imported on first use – ``httpx`` is heavy and absent in sync-only setups,
+# and ``asyncio`` alone adds ~50 ms to start-up.
+_HTTPX = find_spec("httpx") is not None
+
+from .executor import _cache_lookup, _cache_store, _to_result, prepare_request, request_key
+from .response_cache import ResponseCache
+from .shaping import DEFAULT_SHAPE_CONFIG, ShapeConfig, shape_result
+from .singleflight import DEFAULT_ASYNC_GROUP, AsyncSingleFlight
+from .tracing import span
+
+
+# Connection limits for the shared client.  The defaults comfortably cover
+# a few hundred concurrent tool calls against a single upstream host.
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 32
+
+
+# One client per event loop: ``httpx`` clients are bound to the loop they
+# were first used on.  The client's connections reference their loop, so
+# weak keys alone never expire – entries of closed loops are pruned on the
+# next lookup so their clients (and sockets) can be collected.  Call
+# :func:`aclose` before a loop ends to close its client cleanly.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_async_client() -> "httpx.AsyncClient":  # noqa: D401
+    """Return the shared ``httpx.AsyncClient`` for the running event loop.
+
+    Each loop gets its own client, so successive ``asyncio.run``
+    invocations in a CLI and loops running in other threads all work.
+    Clients of loops that have been closed are dropped.
+    """
+
+    if not _HTTPX:
+        raise RuntimeError("`httpx` package not available – async executor cannot run.")
+
+    import asyncio
+
+    import httpx  # type: ignore
+
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _prune()
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = _clients[loop] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                headers={"User-Agent": "llm-pipeline/1.0"},
+            )
+        return client
+
+
+def _prune() -> None:  # noqa: D401 – caller holds _lock
+    for loop in [lp for lp in _clients if lp.is_closed()]:
+        del _clients[loop]
+
+
+async def aclose() -> None:  # noqa: D401
+    """Close the running loop's shared client (call on server or CLI shutdown)."""
+
+    import asyncio
+
+    with _lock:
+        _prune()
+        client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+async def call_endpoint_async(
+    spec: Dict[str, Any],
+    *,
+    base_url: str = "https://api.usaspending.gov",
+    timeout: float = 10.0,
+    client: "httpx.AsyncClient | None" = None,
+    cache: Optional[ResponseCache] = None,
+    routing: Optional[Mapping[str, str]] = None,
+    shape: Optional[ShapeConfig] = DEFAULT_SHAPE_CONFIG,
+    coalesce: Optional[AsyncSingleFlight] = DEFAULT_ASYNC_GROUP,
+    **kwargs,
+) -> Dict[str, Any]:  # noqa: D401
+    """Async counterpart of :func:`llm_pipeline.executor.call_endpoint`.
+
+    Returns the same ``{status_code, headers, body}`` dict and honours the
+    same optional response *cache*, result *shape* and request
+    coalescing (*coalesce*), and emits the same tracing spans.
+    """
+
+    attrs = {"http.request.method": spec.get("method", "GET").upper(), "url.template": spec.get("path", "/")}
+    with span("executor.call", **attrs) as call_span:
+        with span("executor.prepare"):
+            req = prepare_request(spec, base_url=base_url, routing=routing, **kwargs)
+
+        with span("executor.cache") as cache_span:
+            key, hit = _cache_lookup(cache, req)
+            cache_span.set_attribute("cache.hit", hit is not None)
+        if hit is None:
+            if client is None:
+                client = get_async_client()
+
+            async def _fetch() -> Dict[str, Any]:  # noqa: D401
+                with span("executor.upstream", **{"url.full": req.url}) as up:
+                    rsp = await client.request(
+                        req.method,
+                        req.url,
+                        params=req.params,
+                        json=req.body,
+                        headers=req.headers,
+                        timeout=timeout,
+                    )
+                    up.set_attribute("http.response.status_code", rsp.status_code)
+                with span("executor.decode"):
+                    result = _to_result(rsp)
+                _cache_store(cache, spec, key, result)
+                return result
+
+            if coalesce is not None and coalesce.coalesces(req.method):
+                result, shared = await coalesce.do(key or request_key(req), _fetch)
+                call_span.set_attribute("coalesce.shared", shared)
+                if shared:
+                    result = dict(result)
+            else:
+                result = await _fetch()
+        else:
+            result = hit
+
+        with span("executor.shape"):
+            return shape_result(result, spec, shape)
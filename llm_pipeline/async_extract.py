@@ -0,0 +1,319 @@
+"""Asyncio extraction engine with adaptive RPM / TPM budgeting.
+
+The thread-pool path in :mod:`llm_pipeline.batch_extract` creates one
+OpenAI client per file and retries with a fixed one-second wait, so it
+either under-uses the account's rate limits or trips them and stalls.
+This engine instead
+
+* shares **one** ``openai.AsyncOpenAI`` client across all tasks,
+* admits each request only when both the requests-per-minute and the
+  tokens-per-minute budget have room (tokens are *estimated* from the
+  document size up front and corrected with the real ``usage`` afterwards),
+* on HTTP 429 pauses *all* tasks for the server-advertised
+  ``retry-after`` / ``x-ratelimit-reset-*`` delay and multiplicatively
+  lowers the admitted rate, which then recovers additively on success
+  (AIMD),
+* splits Blueprint files into per-endpoint sections extracted
+  concurrently (see :mod:`llm_pipeline.chunking`), and
+* writes results through a single :class:`SectionWriter`.
+
+Example::
+
+    python -m llm_pipeline.batch_extract sections.db --async --rpm 500 --tpm 200000
+
+Point ``OPENAI_BASE_URL`` at a local stand-in server to exercise the
+engine without touching the real API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional
+
+from .chunking import split_document
+from .llm_extractor import build_messages, merge_specs, parse_completion, spec_rows
+from .section_store import SectionWriter
+
+if TYPE_CHECKING:  # pragma: no cover – pydantic is imported on first parse
+    from .models import ExtractedSpec
+
+
+# Rough, deliberately pessimistic chars-per-token ratio for English/Markdown.
+_CHARS_PER_TOKEN = 3.5
+# Prompt scaffolding (system prompt etc.) and expected completion size.
+_PROMPT_OVERHEAD_TOKENS = 700
+_COMPLETION_TOKENS = 1200
+
+
+def estimate_tokens(text: str) -> int:  # noqa: D401
+    """Upper-bound estimate of prompt + completion tokens for *text*."""
+
+    return int(len(text) / _CHARS_PER_TOKEN) + _PROMPT_OVERHEAD_TOKENS + _COMPLETION_TOKENS
+
+
+_DURATION_RE = re.compile(r"(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+)ms)?$")
+
+
+def _parse_duration(value: str) -> Optional[float]:  # noqa: D401
+    """Parse ``"20"``, ``"1.5s"``, ``"6m0s"`` or ``"250ms"`` into seconds."""
+
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    m = _DURATION_RE.match(value)
+    if not m or not any(m.groups()):
+        return None
+    h, mnt, sec, ms = (float(g) if g else 0.0 for g in m.groups())
+    return h * 3600 + mnt * 60 + sec + ms / 1000
+
+
+def retry_after_seconds(headers: Mapping[str, str] | None) -> Optional[float]:  # noqa: D401
+    """Extract the server's suggested back-off delay from 429 headers."""
+
+    if not headers:
+        return None
+    lower = {k.lower(): v for k, v in headers.items()}
+    if "retry-after-ms" in lower:
+        try:
+            return float(lower["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if "retry-after" in lower:
+        secs = _parse_duration(lower["retry-after"])
+        if secs is not None:
+            return secs
+    resets = [
+        _parse_duration(lower[k])
+        for k in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if k in lower
+    ]
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+
+class RateBudget:
+    """Asyncio RPM + TPM budget with AIMD adaptation.
+
+    Both budgets are token buckets refilled continuously; their capacity is
+    one minute's worth so short bursts are allowed.  ``scale`` multiplies
+    the refill rates and is lowered on every 429 (multiplicative decrease)
+    and nudged back towards 1.0 on every success (additive increase).
+    """
+
+    def __init__(
+        self,
+        rpm: float,
+        tpm: float,
+        *,
+        min_scale: float = 0.1,
+        decrease: float = 0.5,
+        increase: float = 0.02,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:  # noqa: D401
+        self.rpm = float(rpm)
+        self.tpm = float(tpm)
+        self.scale = 1.0
+        self.min_scale = min_scale
+        self.decrease = decrease
+        self.increase = increase
+        self._clock = clock
+        self._req = self.rpm
+        self._tok = self.tpm
+        self._last = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:  # noqa: D401
+        dt = now - self._last
+        self._last = now
+        self._req = min(self.rpm, self._req + dt * self.rpm * self.scale / 60)
+        self._tok = min(self.tpm, self._tok + dt * self.tpm * self.scale / 60)
+
+    async def acquire(self, tokens: int) -> None:  # noqa: D401
+        """Wait until one request and *tokens* tokens fit into the budget."""
+
+        # A single document larger than the whole TPM budget could never be
+        # admitted; clamp so it waits for a full bucket instead.
+        tokens = min(tokens, int(self.tpm))
+        while True:
+            async with self._lock:
+                now = self._clock()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._req >= 1 and self._tok >= tokens:
+                        self._req -= 1
+                        self._tok -= tokens
+                        return
+                    wait = max(
+                        (1 - self._req) * 60 / (self.rpm * self.scale),
+                        (tokens - self._tok) * 60 / (self.tpm * self.scale),
+                    )
+            await asyncio.sleep(max(wait, 0.01))
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:  # noqa: D401
+        """Correct the token bucket once the real usage is known."""
+
+        if actual is not None:
+            self._tok = min(self.tpm, self._tok + estimated - actual)
+
+    def on_success(self) -> None:  # noqa: D401
+        self.scale = min(1.0, self.scale + self.increase)
+
+    def on_rate_limited(self, retry_after: Optional[float]) -> None:  # noqa: D401
+        self.scale = max(self.min_scale, self.scale * self.decrease)
+        pause = retry_after if retry_after is not None else 60 / max(self.rpm * self.scale, 1)
+        self._paused_until = max(self._paused_until, self._clock() + pause)
+
+
+def _status_of(exc: BaseException) -> Optional[int]:  # noqa: D401
+    status = getattr(exc, "status_code", None)
+    if status is None and getattr(exc, "response", None) is not None:
+        status = getattr(exc.response, "status_code", None)
+    return status
+
+
+def _headers_of(exc: BaseException) -> Optional[Mapping[str, str]]:  # noqa: D401
+    rsp = getattr(exc, "response", None)
+    return getattr(rsp, "headers", None) if rsp is not None else None
+
+
+async def _gather_or_cancel(coros: List[Any]) -> List[Any]:  # noqa: D401
+    """``asyncio.gather`` that cancels the remaining tasks once one fails.
+
+    A document is only written when every section succeeds, so there is no
+    point spending budget on its other sections after the first error.
+    """
+
+    tasks = [asyncio.ensure_future(c) for c in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class AsyncExtractor:
+    """Extract many documents concurrently within RPM / TPM budgets."""
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.0,
+        rpm: float = 500,
+        tpm: float = 200_000,
+        concurrency: int = 32,
+        max_attempts: int = 6,
+        client: Any = None,
+    ) -> None:  # noqa: D401
+        self.db_path = db_path
+        self.model = model
+        self.temperature = temperature
+        self.budget = RateBudget(rpm, tpm)
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max_attempts
+        self._client = client
+        self._owns_client = client is None
+
+    def _get_client(self):  # noqa: D401
+        if self._client is None:
+            import openai  # type: ignore
+
+            # Retries are handled here (with budget awareness), not by the SDK.
+            self._client = openai.AsyncOpenAI(max_retries=0)
+        return self._client
+
+    async def _complete(self, text: str) -> ExtractedSpec:  # noqa: D401
+        """Extract one prompt-sized *text* within the shared budget."""
+
+        messages = build_messages(text)
+        estimate = estimate_tokens(text)
+        client = self._get_client()
+
+        last_exc: Optional[BaseException] = None
+        for attempt in range(1, self.max_attempts + 1):
+            await self.budget.acquire(estimate)
+            try:
+                rsp = await client.chat.completions.create(
+                    model=self.model,
+                    temperature=self.temperature,
+                    messages=messages,
+                )
+            except Exception as exc:  # noqa: BLE001
+                last_exc = exc
+                status = _status_of(exc)
+                if status == 429:
+                    self.budget.on_rate_limited(retry_after_seconds(_headers_of(exc)))
+                    continue
+                if status is not None and status < 500:
+                    raise  # client error – retrying will not help
+                await asyncio.sleep(min(2 ** attempt, 30))
+                continue
+
+            usage = getattr(rsp, "usage", None)
+            self.budget.settle(estimate, getattr(usage, "total_tokens", None))
+            self.budget.on_success()
+            try:
+                return parse_completion(rsp.choices[0].message.content or "")
+            except ValueError as exc:
+                last_exc = exc  # malformed output – ask again
+
+        assert last_exc is not None
+        raise last_exc
+
+    async def _extract_one(self, path: Path, writer: SectionWriter) -> None:  # noqa: D401
+        raw = path.read_bytes()
+        text = raw.decode("utf-8", errors="replace")
+        sections = split_document(path.name, text)
+        specs = await _gather_or_cancel([self._complete(sec.text) for sec in sections])
+        rows = spec_rows(path, raw, merge_specs(specs, sections), self.model)
+        writer.replace_source(str(path), rows)
+
+    async def run(
+        self,
+        paths: List[Path],
+        *,
+        on_done: Optional[Callable[[Path, Optional[BaseException]], None]] = None,
+    ) -> Dict[Path, Optional[BaseException]]:  # noqa: D401
+        """Extract *paths*; return ``{path: None | exception}``.
+
+        Raises :class:`EnvironmentError` before scheduling anything when no
+        client was injected and ``OPENAI_API_KEY`` is not set.
+        """
+
+        if self._client is None and not os.getenv("OPENAI_API_KEY"):
+            raise EnvironmentError("OPENAI_API_KEY environment variable not set – online extraction cannot run.")
+
+        results: Dict[Path, Optional[BaseException]] = {}
+        sem = asyncio.Semaphore(self.concurrency)
+
+        with SectionWriter(self.db_path) as writer:
+
+            async def _task(path: Path) -> None:  # noqa: D401
+                async with sem:
+                    try:
+                        await self._extract_one(path, writer)
+                        err: Optional[BaseException] = None
+                    except Exception as exc:  # noqa: BLE001
+                        err = exc
+                results[path] = err
+                if on_done is not None:
+                    on_done(path, err)
+
+            try:
+                await asyncio.gather(*(_task(p) for p in paths))
+            finally:
+                if self._owns_client and self._client is not None:
+                    await self._client.close()
+                    self._client = None
+        return results
@@ -0,0 +1,274 @@
+"""Offline extraction through the OpenAI *Batch API*.
+
+For full rebuilds of ``sections.db`` one synchronous chat completion per
+file is the slowest and most expensive path.  The Batch API accepts a
+JSONL file with all requests at once, processes it asynchronously at a
+discount and returns a JSONL result file.  This module covers the whole
+round trip:
+
+1. :func:`write_batch_file` – one ``/v1/chat/completions`` request per
+   document section (see :mod:`llm_pipeline.chunking`), ``custom_id`` =
+   ``"<source path>#<section index>"``.  A sidecar *manifest*
+   (``requests.manifest.json`` next to ``requests.jsonl``) records each
+   submitted source's content hash and section count.
+2. :func:`submit_batch` / :func:`wait_for_batch` – upload and poll.
+3. :func:`download_results` – fetch the output (and error) files.
+4. :func:`ingest_results` – validate every line against
+   :class:`~llm_pipeline.models.ExtractedSpec` and write all good rows
+   with a single :meth:`SectionStore.replace_sources` transaction.  A
+   document is only written when all of its sections succeeded and the
+   file is unchanged since submission (the batch may run for up to 24h);
+   failed source paths – including submitted ones with no result lines at
+   all – are returned so the caller can re-queue them.
+
+Steps 1 and 4 are pure file/SQLite operations and can be exercised
+against local JSONL fixtures without network access.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .chunking import split_document
+from .section_store import SectionStore
+
+_ENDPOINT = "/v1/chat/completions"
+
+# Terminal states reported by ``client.batches.retrieve``.
+_DONE_STATES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class IngestReport:
+    written: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)  # source path -> reason
+
+
+def _custom_id(path: Path, index: int) -> str:  # noqa: D401
+    return f"{path}#{index}"
+
+
+def _split_custom_id(custom_id: str) -> Tuple[str, int]:  # noqa: D401
+    source, _, index = custom_id.rpartition("#")
+    if not source or not index.isdigit():
+        return custom_id, 0
+    return source, int(index)
+
+
+def manifest_path(batch_file: str | Path) -> Path:  # noqa: D401
+    """Sidecar manifest written next to *batch_file* by :func:`write_batch_file`."""
+
+    return Path(batch_file).with_suffix(".manifest.json")
+
+
+def load_manifest(path: str | Path) -> Dict[str, Dict[str, Any]]:  # noqa: D401
+    """Return ``{source path: {"source_hash": …, "sections": n}}``."""
+
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"{path}: unsupported manifest version {data.get('version')!r}")
+    return data["sources"]
+
+
+def write_batch_file(
+    doc_files: Iterable[Path],
+    out_path: str | Path,
+    *,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.0,
+) -> Path:  # noqa: D401
+    """Write one Batch API request line per document section to *out_path*.
+
+    Also writes :func:`manifest_path` (*out_path*), which
+    :func:`ingest_results` needs to verify the results.
+    """
+
+    from .llm_extractor import build_messages
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    sources: Dict[str, Dict[str, Any]] = {}
+    with out_path.open("w", encoding="utf-8") as fp:
+        for path in doc_files:
+            path = Path(path)
+            raw = path.read_bytes()
+            sections = split_document(path.name, raw.decode("utf-8", errors="replace"))
+            sources[str(path)] = {
+                "source_hash": hashlib.sha256(raw).hexdigest(),
+                "sections": len(sections),
+            }
+            for i, section in enumerate(sections):
+                line = {
+                    "custom_id": _custom_id(path, i),
+                    "method": "POST",
+                    "url": _ENDPOINT,
+                    "body": {
+                        "model": model,
+                        "temperature": temperature,
+                        "messages": build_messages(section.text),
+                    },
+                }
+                fp.write(json.dumps(line, ensure_ascii=False) + "\n")
+    manifest_path(out_path).write_text(
+        json.dumps({"version": MANIFEST_VERSION, "sources": sources}, indent=1),
+        encoding="utf-8",
+    )
+    return out_path
+
+
+def submit_batch(batch_file: str | Path, *, client=None) -> str:  # noqa: D401
+    """Upload *batch_file* and create the batch job; return its id."""
+
+    client = client or _client()
+    with open(batch_file, "rb") as fp:
+        uploaded = client.files.create(file=fp, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=_ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def wait_for_batch(
+    batch_id: str,
+    *,
+    client=None,
+    interval: float = 30.0,
+    timeout: Optional[float] = None,
+    on_poll=None,
+):  # noqa: D401
+    """Poll until the batch reaches a terminal state and return it."""
+
+    client = client or _client()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if on_poll is not None:
+            on_poll(batch)
+        if batch.status in _DONE_STATES:
+            return batch
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"batch {batch_id} still {batch.status} after {timeout}s")
+        time.sleep(interval)
+
+
+def download_results(batch, out_dir: str | Path, *, client=None) -> List[Path]:  # noqa: D401
+    """Save the batch's output and error files; return the written paths."""
+
+    client = client or _client()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written: List[Path] = []
+    for kind in ("output_file_id", "error_file_id"):
+        file_id = getattr(batch, kind, None)
+        if not file_id:
+            continue
+        target = out_dir / f"{batch.id}.{kind.split('_')[0]}.jsonl"
+        target.write_bytes(client.files.content(file_id).read())
+        written.append(target)
+    return written
+
+
+def _parse_line(line: Dict[str, Any]) -> Tuple[str, Optional[str], Optional[str]]:  # noqa: D401
+    """Return *(custom_id, completion_content, error_reason)* for one line."""
+
+    custom_id = line.get("custom_id", "")
+    if line.get("error"):
+        return custom_id, None, f"batch error: {line['error']}"
+    rsp = line.get("response") or {}
+    if rsp.get("status_code") != 200:
+        return custom_id, None, f"HTTP {rsp.get('status_code')}: {rsp.get('body')}"
+    try:
+        content = rsp["body"]["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return custom_id, None, "response without message content"
+    return custom_id, content, None
+
+
+def ingest_results(
+    result_files: Iterable[str | Path],
+    db_path: str | Path,
+    manifest: str | Path | Dict[str, Dict[str, Any]],
+    *,
+    model: str = "gpt-4o-mini",
+) -> IngestReport:  # noqa: D401
+    """Validate all result lines and bulk-write the complete documents.
+
+    *manifest* (a path or the :func:`load_manifest` mapping) lists what
+    was submitted.  A source is rejected when it returned no lines or not
+    all of its sections, or when the file changed after submission –
+    merging an old extraction with new sections and storing it under the
+    new hash would make incremental runs skip the file for good.
+    """
+
+    from .llm_extractor import merge_specs, parse_completion, spec_rows
+
+    submitted = load_manifest(manifest) if not isinstance(manifest, dict) else manifest
+    report = IngestReport()
+    by_source: Dict[str, Dict[int, Any]] = {}
+
+    for result_file in result_files:
+        with open(result_file, encoding="utf-8") as fp:
+            for raw_line in fp:
+                if not raw_line.strip():
+                    continue
+                try:
+                    line = json.loads(raw_line)
+                except json.JSONDecodeError as exc:
+                    report.failures[f"<unparseable line in {result_file}>"] = str(exc)
+                    continue
+                custom_id, content, error = _parse_line(line)
+                source, index = _split_custom_id(custom_id)
+                if source not in submitted:
+                    report.failures[source] = "not part of this batch"
+                    continue
+                if error is None:
+                    try:
+                        by_source.setdefault(source, {})[index] = parse_completion(content or "")
+                        continue
+                    except ValueError as exc:
+                        error = str(exc)
+                report.failures[source] = f"section {index}: {error}"
+
+    rows_by_source: Dict[str, List[Dict[str, Any]]] = {}
+    for source, expected in submitted.items():
+        if source in report.failures:
+            continue  # incomplete document – keep the previous rows
+        specs = by_source.get(source)
+        if not specs:
+            report.failures[source] = "no results returned"
+            continue
+        missing = [i for i in range(expected["sections"]) if i not in specs]
+        if missing:
+            report.failures[source] = f"missing section result(s): {missing}"
+            continue
+        path = Path(source)
+        try:
+            raw = path.read_bytes()
+        except OSError as exc:
+            report.failures[source] = str(exc)
+            continue
+        if hashlib.sha256(raw).hexdigest() != expected["source_hash"]:
+            report.failures[source] = "source changed since submission"
+            continue
+        sections = split_document(path.name, raw.decode("utf-8", errors="replace"))
+        ordered = [specs[i] for i in range(len(sections))]
+        rows_by_source[source] = spec_rows(path, raw, merge_specs(ordered, sections), model)
+
+    with SectionStore(db_path) as store:
+        report.written = store.replace_sources(rows_by_source)
+    return report
+
+
+def _client():  # noqa: D401
+    import openai  # type: ignore
+
+    return openai.OpenAI()
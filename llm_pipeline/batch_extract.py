@@ -8,10 +8,25 @@ The script walks the *root_dir* recursively and feeds every ``*.md``,
 ``*.yaml`` and ``*.yml`` file to the LLM extractor, accumulating the
 results into the shared SQLite DB (default ``sections.db``).
 
+Runs are incremental: files whose content hash and extractor version match
+the stored row are skipped, and rows whose source file was deleted are
+pruned.  Pass ``--force`` to re-extract everything.
+
+API Blueprint contracts are first run through the deterministic
+:mod:`llm_pipeline.blueprint_parser`; only files it cannot handle
+confidently go to the LLM (``--parser auto``, the default).  ``--parser
+local`` never calls the LLM and works fully offline; ``--parser llm``
+restores the LLM-only behaviour.
+
+``--batch-api`` routes a full rebuild through the cheaper OpenAI Batch API
+(see :mod:`llm_pipeline.batch_api`); ``--ingest RESULTS.jsonl`` loads an
+already downloaded result file, checked against the batch's manifest
+(``--manifest``).
+
 Environment
 -----------
-Requires ``OPENAI_API_KEY`` to be set and the ``openai`` package to be
-installed.
+The LLM fallback requires ``OPENAI_API_KEY`` to be set and the ``openai``
+package to be installed.
 """
 
 # The import above already brings in *annotations* future once; remove duplicate
@@ -29,18 +44,19 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from llm_pipeline.config import get_output_root  # type: ignore
-from typing import List
+from typing import Collection, Dict, List, Optional, Set, Tuple
 
 # ---------------------------------------------------------------------------
 # ---------------------------------------------------------------------------
 # Extraction backend – always use the built-in llm_extractor -----------------
 # ---------------------------------------------------------------------------
 
-# The project relies solely on the bundled ``llm_extractor``.  Import errors
-# (for example when the ``openai`` package or API key is missing) are
+# The LLM backend is the bundled ``llm_extractor``.  It is imported only when
+# a file actually needs the LLM so ``--parser local`` runs without the
+# ``openai`` package or an API key; import errors on the LLM path are still
 # propagated so the caller is immediately aware of the mis-configuration.
 
-from .llm_extractor import run_extraction  # type: ignore
+from .section_store import SectionStore, SectionWriter, source_hash
 
 
 _DEFAULT_EXTS = (".md", ".yaml", ".yml")
@@ -48,69 +64,19 @@ _DEFAULT_EXTS = (".md", ".yaml", ".yml")
 # rate limit – each worker may produce up to ~3 RPM (depends on the size of
 # the chunk and retry behaviour inside ``run_extraction``).
 _DEFAULT_JOBS = 8
+_DEFAULT_MODEL = "gpt-4o-mini"
 
 
 def _walk_files(root: Path, exts=_DEFAULT_EXTS) -> List[Path]:  # noqa: D401
     return sorted(p for p in root.rglob("*") if p.suffix.lower() in exts)
 
 
-def _main(argv):  # noqa: D401 – mini CLI
-    if len(argv) < 2:
-        print(
-            (
-                "Usage: python -m llm_pipeline.batch_extract <db_path> [root_dir …]\n"
-                "Default root: usaspending-api/usaspending_api/api_contracts/contracts"
-            ),
-            file=sys.stderr,
-        )
-        raise SystemExit(1)
-
-    db_path = Path(argv[1])
-    # Default to the authoritative API-Blueprint sources only.
-    root_dirs = [
-        Path(p)
-        for p in (
-            argv[2:]
-            or [Path("usaspending-api/usaspending_api/api_contracts/contracts")]
-        )
-    ]
-
-    doc_files = []
-    for rd in root_dirs:
-        doc_files.extend(_walk_files(rd))
-    if not doc_files:
-        print(f"No documentation files found under {root_dir}")
-        raise SystemExit(1)
-
-    print(f"Found {len(doc_files)} files -> extracting into {db_path}\n")
-
-    t0 = time.time()
-    for i, f in enumerate(doc_files, 1):
-        # try to print path relative to the first matching root for readability
-        rel = None
-        for rd in root_dirs:
-            try:
-                rel = f.relative_to(rd)
-                break
-            except ValueError:
-                continue
-        rel = rel or f
-        print(f"[{i}/{len(doc_files)}] {rel}", end=" ... ")
-        try:
-            run_extraction(f, db_path)
-            print("done")
-        except Exception as exc:
-            print(f"ERROR: {exc}")
-
-    print(f"\nCompleted in {time.time() - t0:.1f}s – DB at {db_path}")
-
-
 # ---------------------------------------------------------------------------
-# Parallel variant (preferred) ------------------------------------------------
+# CLI -----------------------------------------------------------------------
 # ---------------------------------------------------------------------------
 
 
-def _main(argv):  # noqa: D401 – parallel CLI replacing the sequential version
+def _main(argv):  # noqa: D401 – parallel CLI
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -135,6 +101,63 @@ def _main(argv):  # noqa: D401 – parallel CLI replacing the sequential version
     parser.add_argument(
         "-j", "--jobs", type=int, default=_DEFAULT_JOBS, help="Parallel workers"
     )
+    parser.add_argument("--model", default=_DEFAULT_MODEL, help="OpenAI model")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-extract every file even if its content hash is unchanged",
+    )
+    engine = parser.add_mutually_exclusive_group()
+    engine.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Use the asyncio engine with adaptive RPM/TPM budgeting",
+    )
+    engine.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="Submit all prompts as one OpenAI Batch API job and ingest the results",
+    )
+    parser.add_argument(
+        "--rpm", type=float, default=500, help="Requests-per-minute budget (--async)"
+    )
+    parser.add_argument(
+        "--tpm", type=float, default=200_000, help="Tokens-per-minute budget (--async)"
+    )
+    parser.add_argument(
+        "--batch-rounds",
+        type=int,
+        default=2,
+        help="Max Batch API submissions (failed ids are re-queued each round)",
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=30.0, help="Batch API poll interval (s)"
+    )
+    parser.add_argument(
+        "--ingest",
+        nargs="+",
+        type=Path,
+        metavar="RESULTS_JSONL",
+        help="Only ingest existing Batch API result file(s) into the DB and exit",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="Batch manifest for --ingest (default: <batch id>.manifest.json beside the results)",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=("auto", "local", "llm"),
+        default="auto",
+        help="auto: Blueprint parser with LLM fallback; local: parser only; llm: LLM only",
+    )
+    parser.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="Keep rows whose source file no longer exists under the roots",
+    )
 
     args = parser.parse_args(argv[1:])
 
@@ -152,6 +175,10 @@ def _main(argv):  # noqa: D401 – parallel CLI replacing the sequential version
         ]
     jobs = max(1, args.jobs)
 
+    if args.ingest:
+        _ingest_only(args.ingest, db_path, args.model, args.manifest)
+        return
+
     doc_files: List[Path] = []
     for rt in roots:
         doc_files.extend(_walk_files(rt))
@@ -160,20 +187,61 @@ def _main(argv):  # noqa: D401 – parallel CLI replacing the sequential version
         print("No documentation files found – aborting", file=sys.stderr)
         raise SystemExit(1)
 
+    t0 = time.time()
+
+    # Incremental run: only files whose content hash or extractor version
+    # differs from what is stored are processed again.
+    with SectionStore(db_path) as store:
+        todo, stale = _plan_incremental(
+            doc_files, roots, store.source_index(), _accepted_versions(args), args.force
+        )
+        pruned = 0 if args.no_prune else store.delete_sources(stale)
+
     print(
-        f"Found {len(doc_files)} files – extracting with {jobs} worker(s) into {db_path}\n"
+        f"Found {len(doc_files)} files – {len(doc_files) - len(todo)} unchanged, "
+        f"{pruned} deleted source(s) pruned – {len(todo)} to extract into {db_path}"
     )
+    doc_files = todo
 
-    t0 = time.time()
+    if args.parser != "llm":
+        doc_files = _run_local(doc_files, db_path)
+        if args.parser == "local":
+            for p in doc_files:
+                print(f"  not parsed locally: {_relative_to_any(p, roots)}")
+            print(f"\nCompleted in {time.time() - t0:.1f}s – DB at {db_path}")
+            return
+        print(f"LLM fallback for {len(doc_files)} file(s) with {jobs} worker(s)\n")
+
+    if not doc_files:
+        print(f"\nCompleted in {time.time() - t0:.1f}s – DB at {db_path}")
+        return
+
+    if args.batch_api:
+        _run_batch_api(doc_files, db_path, args)
+        print(f"\nCompleted in {time.time() - t0:.1f}s – DB at {db_path}")
+        return
+
+    if args.use_async:
+        _run_async(doc_files, roots, db_path, args, jobs)
+        print(f"\nCompleted in {time.time() - t0:.1f}s – DB at {db_path}")
+        return
+
+    from .llm_extractor import _openai_client, run_extraction
+
+    _openai_client()  # fail fast on a missing package/key, not once per file
+
+    # All workers hand their rows to one background writer which batches
+    # them into group commits – no per-worker connections, no lock fights.
+    writer = SectionWriter(db_path)
 
     def _worker(path: Path):  # noqa: D401 – helper for pool
         try:
-            run_extraction(path, db_path)
+            run_extraction(path, db_path, model=args.model, store=writer)
             return None
         except Exception as exc:  # noqa: BLE001
             return exc
 
-    with ThreadPoolExecutor(max_workers=jobs) as pool:
+    with writer, ThreadPoolExecutor(max_workers=jobs) as pool:
         futures = {pool.submit(_worker, p): p for p in doc_files}
         for i, fut in enumerate(as_completed(futures), 1):
             path = futures[fut]
@@ -187,6 +255,168 @@ def _main(argv):  # noqa: D401 – parallel CLI replacing the sequential version
     print(f"\nCompleted in {time.time() - t0:.1f}s – DB at {db_path}")
 
 
+def _run_async(doc_files: List[Path], roots: List[Path], db_path: Path, args, jobs: int) -> None:  # noqa: D401
+    import asyncio
+
+    from .async_extract import AsyncExtractor
+
+    # With budget-driven admission the worker count only bounds in-flight
+    # requests, so allow more of them than threads in the sync path.
+    extractor = AsyncExtractor(
+        db_path, model=args.model, rpm=args.rpm, tpm=args.tpm, concurrency=jobs * 4
+    )
+    done = 0
+
+    def _report(path: Path, err) -> None:  # noqa: D401
+        nonlocal done
+        done += 1
+        rel = _relative_to_any(path, roots)
+        status = "done" if err is None else f"ERROR: {err}"
+        print(f"[{done}/{len(doc_files)}] {rel} … {status}")
+
+    asyncio.run(extractor.run(doc_files, on_done=_report))
+
+
+def _ingest_only(
+    result_files: List[Path], db_path: Path, model: str, manifest: Optional[Path]
+) -> None:  # noqa: D401
+    from .batch_api import ingest_results
+
+    if manifest is None:
+        # download_results names files "<batch id>.output.jsonl"; the
+        # submit step leaves "<batch id>.manifest.json" beside them.
+        first = result_files[0]
+        manifest = first.with_name(f"{first.name.split('.', 1)[0]}.manifest.json")
+    if not manifest.exists():
+        print(f"Batch manifest {manifest} not found – pass --manifest", file=sys.stderr)
+        raise SystemExit(1)
+
+    report = ingest_results(result_files, db_path, manifest, model=model)
+    print(f"Ingested {report.written} row(s) into {db_path}")
+    for source, reason in sorted(report.failures.items()):
+        print(f"  FAILED {source}: {reason}")
+    if report.failures:
+        raise SystemExit(1)
+
+
+def _run_batch_api(doc_files: List[Path], db_path: Path, args) -> None:  # noqa: D401
+    from .batch_api import (
+        download_results,
+        ingest_results,
+        manifest_path,
+        submit_batch,
+        wait_for_batch,
+        write_batch_file,
+    )
+
+    work_dir = get_output_root() / "batches"
+    pending = list(doc_files)
+
+    for round_no in range(1, max(1, args.batch_rounds) + 1):
+        if not pending:
+            break
+        batch_file = work_dir / f"requests_{int(time.time())}_r{round_no}.jsonl"
+        write_batch_file(pending, batch_file, model=args.model)
+        batch_id = submit_batch(batch_file)
+        print(f"Round {round_no}: submitted {len(pending)} request(s) as batch {batch_id}")
+        # Keyed by batch id so a later `--ingest <batch id>.output.jsonl` finds it.
+        manifest = manifest_path(batch_file).replace(work_dir / f"{batch_id}.manifest.json")
+
+        batch = wait_for_batch(
+            batch_id,
+            interval=args.poll_interval,
+            on_poll=lambda b: print(f"  … {b.status} {getattr(b, 'request_counts', '')}"),
+        )
+        if batch.status != "completed":
+            print(f"Batch {batch_id} ended as {batch.status}", file=sys.stderr)
+            break
+
+        report = ingest_results(download_results(batch, work_dir), db_path, manifest, model=args.model)
+        print(f"  ingested {report.written} row(s), {len(report.failures)} failure(s)")
+
+        # Re-queue failed documents; keys we never submitted (e.g.
+        # unparseable lines) cannot be retried.
+        submitted = {str(p): p for p in pending}
+        pending = [submitted[src] for src in report.failures if src in submitted]
+
+    for p in pending:
+        print(f"  giving up on {p}", file=sys.stderr)
+
+
+def _run_local(doc_files: List[Path], db_path: Path) -> List[Path]:  # noqa: D401
+    """Parse what the Blueprint parser can handle; return the remaining files."""
+
+    from .blueprint_parser import document_rows
+
+    rows_by_source: Dict[str, List[Dict]] = {}
+    remaining: List[Path] = []
+    for path in doc_files:
+        rows = document_rows(path, path.read_bytes())
+        if rows is None:
+            remaining.append(path)
+            continue
+        rows_by_source[str(path)] = rows
+
+    # One transaction for the whole local pass.
+    with SectionStore(db_path) as store:
+        written = store.replace_sources(rows_by_source)
+    print(f"Parsed {len(rows_by_source)} file(s) locally ({written} row(s))")
+    return remaining
+
+
+def _accepted_versions(args) -> Set[str]:  # noqa: D401
+    """Extractor versions that count as up to date for the chosen ``--parser``."""
+
+    versions: Set[str] = set()
+    if args.parser != "llm":
+        from .blueprint_parser import PARSER_VERSION
+
+        versions.add(PARSER_VERSION)
+    if args.parser != "local":
+        from .llm_extractor import extractor_version
+
+        versions.add(extractor_version(args.model))
+    return versions
+
+
+def _plan_incremental(
+    doc_files: List[Path],
+    roots: List[Path],
+    index: Dict[str, Tuple[Optional[str], Optional[str]]],
+    versions: Collection[str],
+    force: bool = False,
+) -> Tuple[List[Path], List[str]]:  # noqa: D401
+    """Return *(files_to_extract, stale_source_paths)*.
+
+    A file is skipped when the stored ``source_hash`` matches and its
+    ``extractor_version`` is one of *versions*.  Stored sources located
+    under one of *roots* that no longer exist on disk are reported as stale.
+    """
+
+    current = {str(p) for p in doc_files}
+    todo = []
+    for p in doc_files:
+        stored_hash, stored_version = index.get(str(p), (None, None))
+        if force or stored_hash != source_hash(p) or stored_version not in versions:
+            todo.append(p)
+    stale = [
+        src
+        for src in index
+        if src not in current
+        and any(_is_under(Path(src), rt) for rt in roots)
+        and not Path(src).exists()
+    ]
+    return todo, stale
+
+
+def _is_under(p: Path, root: Path) -> bool:  # noqa: D401
+    try:
+        p.relative_to(root)
+        return True
+    except ValueError:
+        return False
+
+
 def _relative_to_any(p: Path, roots: List[Path]) -> Path:  # noqa: D401
     for rd in roots:
         try:
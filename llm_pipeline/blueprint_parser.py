@@ -0,0 +1,492 @@
+"""Deterministic API Blueprint / MSON parser – the offline fast path.
+
+Almost every contract under ``api_contracts/contracts`` follows the same
+rigid layout::
+
+    # Title [/api/v2/thing/{id}/{?page,limit}]
+    ## POST
+    + Request (application/json)
+        + Parameters / + Attributes (object)
+            + `name`: example (required, enum[string])
+                Description
+                + Members
+                    + `a`
+        + Body
+    + Response 200 (application/json)
+        + Attributes (object)
+        + Body
+    # Data Structures
+    ## Filter (object)
+    + `def_codes` (required, array[DEFC], fixed-type)
+
+:func:`parse_section` turns one such action (see
+:mod:`llm_pipeline.chunking`) straight into an
+:class:`~llm_pipeline.models.ExtractedSpec` in well under a millisecond.
+Whenever the structure deviates from what the parser understands it
+returns ``None`` instead of guessing, and callers fall back to the LLM
+extractor for that file.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import textwrap
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .chunking import _ACTION_RE, _DATA_STRUCTURES_RE, _RESOURCE_RE, Section, split_document
+from .llm_extractor import merge_specs
+from .section_store import section_rows
+
+if TYPE_CHECKING:  # pragma: no cover – pydantic is imported on first parse
+    from .models import ExtractedSpec
+
+# Bump whenever parsing rules change so incremental runs re-parse files.
+PARSER_VERSION = "blueprint:2"
+
+_MAX_DEPTH = 4  # nested data-structure expansion limit
+
+_PRIMITIVES = {
+    "string": "string",
+    "number": "number",
+    "integer": "integer",
+    "boolean": "boolean",
+    "object": "object",
+    "array": "array",
+}
+_PARAM_TYPES = {"string", "integer", "number", "boolean"}
+
+# `name`: example (required, type, fixed-type) - description
+_ATTR_RE = re.compile(
+    r"^(?:`(?P<quoted>[\w.\-]+)`|(?P<name>[A-Za-z_][\w.\-]*))"
+    r"(?:\s*:\s*(?P<example>`[^`]*`|[^(]*))?"
+    r"\s*(?:\((?P<spec>[^)]*)\))?"
+    r"\s*(?:[-;]\s*)?(?P<desc>.*)$"
+)
+_TYPED_RE = re.compile(r"^(?P<base>\w+)\[(?P<inner>[^\]]*)\]$")
+_STRUCT_HEADER_RE = re.compile(r"^#{2,3}\s+(?P<name>[A-Za-z_]\w*)\s+\((?P<type>[^)]*)\)\s*$")
+_MEMBERS_HEADER_RE = re.compile(r"^#{3,4}\s+Members\s*$")
+_RESPONSE_RE = re.compile(r"^Response\s+(?P<code>\d{3})")
+_QUERY_TEMPLATE_RE = re.compile(r"^#.*\[[^\]]*\{\?(?P<names>[^}]*)\}[^\]]*\]\s*$", re.M)
+_KEYWORDS = {"Members", "Default", "Sample", "Properties", "Items", "Schema", "Body", "Headers"}
+
+
+class _NotConfident(Exception):
+    """Raised internally when the section does not match the expected shape."""
+
+
+class _Node:
+    __slots__ = ("indent", "text", "children", "raw")
+
+    def __init__(self, indent: int, text: str) -> None:  # noqa: D401
+        self.indent = indent
+        self.text = text
+        self.children: List["_Node"] = []
+        self.raw: List[str] = []  # non-bullet lines (descriptions, JSON bodies)
+
+    @property
+    def keyword(self) -> str:  # noqa: D401
+        head = self.text.split(":", 1)[0].split("(", 1)[0].strip()
+        first = head.split(" ", 1)[0]
+        # "Request A request with a naics id (application/json)"
+        return first if first in ("Request", "Response") else head
+
+    def description(self) -> str:  # noqa: D401
+        return " ".join(line.strip() for line in self.raw if line.strip())
+
+
+def _bullet_tree(lines: List[str]) -> List[_Node]:  # noqa: D401
+    """Group ``+`` bullets by indentation; other lines attach to the bullet above."""
+
+    roots: List[_Node] = []
+    stack: List[_Node] = []
+    for line in lines:
+        stripped = line.lstrip(" ")
+        indent = len(line) - len(stripped)
+        if stripped.startswith("+ ") or stripped == "+":
+            node = _Node(indent, stripped[2:].strip())
+            while stack and stack[-1].indent >= indent:
+                stack.pop()
+            (stack[-1].children if stack else roots).append(node)
+            stack.append(node)
+        elif stack and (stripped.strip() or stack[-1].raw):
+            stack[-1].raw.append(line.rstrip("\n"))
+    return roots
+
+
+# ---------------------------------------------------------------------------
+# Data structures
+# ---------------------------------------------------------------------------
+
+
+def _parse_structures(ds_text: str) -> Dict[str, Tuple[str, List[_Node], List[str]]]:  # noqa: D401
+    """Return ``{name: (type, bullet_roots, member_names)}``."""
+
+    structs: Dict[str, Tuple[str, List[str], List[str]]] = {}
+    current: Optional[str] = None
+    for line in ds_text.splitlines():
+        m = _STRUCT_HEADER_RE.match(line.strip())
+        if m:
+            current = m.group("name")
+            structs[current] = (m.group("type").strip(), [], [])
+            continue
+        if current is not None:
+            structs[current][1].append(line)
+
+    parsed: Dict[str, Tuple[str, List[_Node], List[str]]] = {}
+    for name, (type_str, lines, _) in structs.items():
+        roots = _bullet_tree([ln for ln in lines if not ln.lstrip().startswith("#")])
+        members: List[str] = []
+        if type_str.startswith("enum"):
+            members = [_member_name(n.text) for n in roots]
+            roots = []
+        parsed[name] = (type_str, roots, members)
+    return parsed
+
+
+def _member_name(text: str) -> str:  # noqa: D401
+    return text.split(" - ", 1)[0].strip().strip("`").split(":", 1)[0].strip().strip("`")
+
+
+# ---------------------------------------------------------------------------
+# MSON -> JSON schema
+# ---------------------------------------------------------------------------
+
+
+def _split_spec(spec: str) -> Tuple[str, bool]:  # noqa: D401
+    """Return *(type, required)* from an MSON type spec like ``required, number``."""
+
+    type_str = "string"
+    required = False
+    for token in (t.strip() for t in spec.split(",") if t.strip()):
+        low = token.lower()
+        if low == "required":
+            required = True
+        elif low in ("optional", "fixed-type", "fixed", "nullable", "sample", "default"):
+            continue
+        else:
+            type_str = token
+    return type_str, required
+
+
+def _type_schema(type_str: str, structs, depth: int) -> Dict[str, Any]:  # noqa: D401
+    t = type_str.strip()
+    m = _TYPED_RE.match(t)
+    if m:
+        base, inner = m.group("base"), m.group("inner").strip()
+        if base == "array":
+            return {"type": "array", "items": _type_schema(inner, structs, depth) if inner else {}}
+        if base == "enum":
+            return {"type": _PRIMITIVES.get(inner, "string")}
+    if t in _PRIMITIVES:
+        return {"type": _PRIMITIVES[t]}
+    if t in structs:
+        return _struct_schema(t, structs, depth + 1)
+    # Unknown named type – keep the reference visible to the model.
+    return {"type": "object", "description": f"{t} object"}
+
+
+def _struct_schema(name: str, structs, depth: int) -> Dict[str, Any]:  # noqa: D401
+    type_str, roots, members = structs[name]
+    if type_str.startswith("enum"):
+        schema = _type_schema(type_str, structs, depth)
+        if members:
+            schema["enum"] = members
+        return schema
+    if depth > _MAX_DEPTH:
+        return {"type": "object", "description": f"{name} object"}
+    if type_str.startswith("array"):
+        return {"type": "array"}
+    try:
+        return _object_schema(roots, structs, depth)
+    except _NotConfident:
+        # Appendix structures sometimes use prose ("if `subawards` true …");
+        # keep the reference opaque rather than failing the whole endpoint.
+        return {"type": "object", "description": f"{name} object"}
+
+
+def _object_schema(nodes: List[_Node], structs, depth: int) -> Dict[str, Any]:  # noqa: D401
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+    for node in nodes:
+        if node.text.startswith("Include "):
+            included = node.text[len("Include ") :].strip()
+            if included in structs and depth <= _MAX_DEPTH:
+                sub = _struct_schema(included, structs, depth + 1)
+                properties.update(sub.get("properties", {}))
+                required.extend(sub.get("required", []))
+            continue
+        if node.keyword in _KEYWORDS:
+            continue
+        name, schema, is_required = _attribute_schema(node, structs, depth)
+        properties[name] = schema
+        if is_required:
+            required.append(name)
+    schema: Dict[str, Any] = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = required
+    return schema
+
+
+def _attribute_schema(node: _Node, structs, depth: int) -> Tuple[str, Dict[str, Any], bool]:  # noqa: D401
+    m = _ATTR_RE.match(node.text)
+    # Bare words without a type spec are prose ("if `subawards` true"), not
+    # attributes.
+    if not m or (m.group("quoted") is None and m.group("spec") is None):
+        raise _NotConfident(f"unparseable attribute: {node.text!r}")
+    name = m.group("quoted") or m.group("name")
+    type_str, required = _split_spec(m.group("spec") or "")
+    schema = _type_schema(type_str, structs, depth)
+
+    desc = " ".join(filter(None, [m.group("desc").strip(), node.description()]))
+    if desc:
+        schema["description"] = desc
+
+    nested: List[_Node] = []
+    for child in node.children:
+        kw = child.keyword
+        if kw == "Members":
+            schema["enum"] = [_member_name(c.text) for c in child.children]
+        elif kw == "Default":
+            value = child.text.split(":", 1)[1] if ":" in child.text else (
+                child.children[0].text if child.children else ""
+            )
+            value = value.strip().strip("`")
+            if value:
+                schema["default"] = value
+        elif kw in _KEYWORDS:
+            continue
+        else:
+            nested.append(child)
+
+    if nested and schema.get("type") == "object":
+        sub = _object_schema(nested, structs, depth)
+        schema.setdefault("properties", {}).update(sub["properties"])
+        if sub.get("required"):
+            schema["required"] = sub["required"]
+    return name, schema, required
+
+
+def _param(schema: Dict[str, Any], required: bool, *, path: bool = False) -> Dict[str, Any]:  # noqa: D401
+    """Convert a property schema into a :class:`models.Param` dict.
+
+    *path* parameters are URL segments and always typed ``string`` (or
+    ``enum``): a ``number`` toptier code such as ``086`` must not become 86.
+    """
+
+    if "enum" in schema:
+        ptype = "enum"
+    elif path:
+        ptype = "string"
+    elif schema.get("type") == "array":
+        ptype = "array"
+    elif schema.get("type") in _PARAM_TYPES:
+        ptype = schema["type"]
+    else:
+        ptype = "string"
+    return {
+        "type": ptype,
+        "description": schema.get("description", ""),
+        "required": required,
+        "enum": [str(v) for v in schema["enum"]] if "enum" in schema else None,
+    }
+
+
+def _body_example(node: _Node) -> Any:  # noqa: D401
+    text = textwrap.dedent("\n".join(node.raw)).strip()
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None  # examples with comments/ellipses are common – not fatal
+
+
+# ---------------------------------------------------------------------------
+# Section parser
+# ---------------------------------------------------------------------------
+
+
+def _split_action(text: str) -> Tuple[str, List[str], List[str], str]:  # noqa: D401
+    """Return *(resource_title, description_lines, action_lines, ds_text)*."""
+
+    ds_match = _DATA_STRUCTURES_RE.search(text)
+    body = text[: ds_match.start()] if ds_match else text
+    ds_text = text[ds_match.end() :] if ds_match else ""
+
+    resource_title = ""
+    description: List[str] = []
+    action_lines: List[str] = []
+    in_action = False
+    for line in body.splitlines():
+        stripped = line.strip()
+        if not in_action:
+            if _ACTION_RE.match(stripped):
+                in_action = True
+                continue
+            res = _RESOURCE_RE.match(stripped)
+            if res:
+                resource_title = res.group("title").strip()
+            elif stripped.startswith("# ") and not resource_title:
+                resource_title = stripped[2:].strip()
+            elif stripped and not stripped.startswith(("FORMAT:", "HOST:", "#")):
+                description.append(stripped)
+        else:
+            action_lines.append(line)
+    return resource_title, description, action_lines, ds_text
+
+
+def parse_section(section: Section) -> Optional[ExtractedSpec]:  # noqa: D401
+    """Parse one Blueprint action; ``None`` when not confident."""
+
+    from .models import ExtractedSpec
+
+    try:
+        return ExtractedSpec.model_validate(_parse_section(section))
+    except (_NotConfident, ValueError):
+        return None
+
+
+def _parse_section(section: Section) -> Dict[str, Any]:  # noqa: D401
+    if not section.method or not section.path:
+        raise _NotConfident("section without method/path")
+
+    resource_title, description, action_lines, ds_text = _split_action(section.text)
+    structs = _parse_structures(ds_text)
+
+    # Free text directly below the action header belongs to the description.
+    first_bullet = next(
+        (i for i, ln in enumerate(action_lines) if ln.lstrip().startswith("+")), len(action_lines)
+    )
+    description += [ln.strip() for ln in action_lines[:first_bullet] if ln.strip()]
+    roots = _bullet_tree(action_lines[first_bullet:])
+
+    method = section.method.upper()
+    path = section.path
+    path_vars = set(re.findall(r"{([^}]+)}", path))
+
+    path_params: Dict[str, Any] = {}
+    query_params: Dict[str, Any] = {}
+    request_body: Optional[Dict[str, Any]] = None
+    response: Optional[Dict[str, Any]] = None
+    errors: List[Dict[str, Any]] = []
+    saw_request_attrs = False
+
+    def _params_from(nodes: List[_Node]) -> None:  # noqa: D401
+        for node in nodes:
+            if node.keyword in _KEYWORDS:
+                continue
+            name, schema, required = _attribute_schema(node, structs, 0)
+            if name in path_vars:
+                path_params[name] = _param(schema, True, path=True)
+            else:
+                query_params[name] = _param(schema, required)
+
+    for root in roots:
+        if root.keyword == "Parameters":
+            _params_from(root.children)
+        elif root.keyword == "Request":
+            example = None
+            for child in root.children:
+                if child.keyword == "Parameters":
+                    _params_from(child.children)
+                elif child.keyword == "Attributes":
+                    saw_request_attrs = True
+                    if method in ("GET", "DELETE", "HEAD"):
+                        _params_from(child.children)
+                    else:
+                        request_body = {
+                            "json_schema": _object_schema(child.children, structs, 0),
+                            "example": None,
+                        }
+                elif child.keyword == "Body":
+                    example = _body_example(child)
+            if method not in ("GET", "DELETE", "HEAD") and example is not None:
+                request_body = request_body or {"json_schema": {"type": "object"}}
+                request_body["example"] = example
+        elif _RESPONSE_RE.match(root.text):
+            code = int(_RESPONSE_RE.match(root.text).group("code"))
+            if code >= 400:
+                try:
+                    meaning = HTTPStatus(code).phrase
+                except ValueError:
+                    meaning = root.description() or "Error"
+                errors.append({"code": code, "meaning": meaning})
+                continue
+            schema: Dict[str, Any] = {"type": "object"}
+            examples: List[Any] = []
+            for child in root.children:
+                if child.keyword == "Attributes":
+                    schema = _object_schema(child.children, structs, 0)
+                elif child.keyword == "Body":
+                    ex = _body_example(child)
+                    if ex is not None:
+                        examples.append(ex)
+            if response is None:
+                response = {"json_schema": schema, "examples": examples}
+        elif root.keyword not in _KEYWORDS:
+            raise _NotConfident(f"unexpected top-level bullet: {root.text!r}")
+
+    if response is None:
+        raise _NotConfident("no success response documented")
+    if method in ("POST", "PUT", "PATCH") and request_body is None and not saw_request_attrs:
+        raise _NotConfident("write method without request attributes/body")
+
+    # Placeholders that were not described still need to be routed.
+    for var in path_vars:
+        path_params.setdefault(var, {"type": "string", "description": "", "required": True})
+    template = _QUERY_TEMPLATE_RE.search(section.text)
+    for var in (template.group("names").split(",") if template else []):
+        if var.strip():
+            query_params.setdefault(var.strip(), {"type": "string", "description": "", "required": False})
+
+    body_props = ((request_body or {}).get("json_schema") or {}).get("properties", {})
+    paging = [p for p in ("page", "limit") if p in query_params or p in body_props]
+    pagination = {"style": "offset", "param_names": paging} if "page" in paging else {"style": "none"}
+
+    summary = section.title if section.title and section.title != method else resource_title
+    return {
+        "method": method,
+        "path": path,
+        "summary": summary[:120],
+        "description": " ".join(description),
+        "auth": "none",
+        "path_params": path_params,
+        "query_params": query_params,
+        "request_body": request_body,
+        "response": response,
+        "pagination": pagination,
+        "errors": errors,
+    }
+
+
+def parse_document(doc_path: Path, text: str) -> Optional[List[ExtractedSpec]]:  # noqa: D401
+    """Parse every section of a file; ``None`` if any section is uncertain.
+
+    Sections documenting the same *method + path* are merged exactly like
+    LLM results (see :func:`~llm_pipeline.llm_extractor.merge_specs`), so
+    both extractors produce the same rows for a file.
+    """
+
+    sections = split_document(doc_path.name, text)
+    specs: List[ExtractedSpec] = []
+    for section in sections:
+        spec = parse_section(section)
+        if spec is None:
+            return None
+        specs.append(spec)
+    return merge_specs(specs, sections)
+
+
+def document_rows(doc_path: Path, raw: bytes) -> Optional[List[Dict[str, Any]]]:  # noqa: D401
+    """Return the SectionStore rows for *doc_path*, or ``None`` when the
+    caller should fall back to the LLM extractor."""
+
+    specs = parse_document(doc_path, raw.decode("utf-8", errors="replace"))
+    if not specs:
+        return None
+    return section_rows(
+        doc_path, raw, specs, extractor_version=PARSER_VERSION, source="blueprint_parser"
+    )
@@ -0,0 +1,410 @@
+"""Record/replay HTTP transport ("cassette") for offline load testing.
+
+A :class:`Cassette` quacks like the ``requests.Session`` /
+``httpx.AsyncClient`` objects the executors expect, so it plugs in under
+:func:`llm_pipeline.executor.call_endpoint` via ``session=`` and under
+:func:`llm_pipeline.async_executor.call_endpoint_async` via
+``client=cassette.aclient()``.  Everything above it, including the
+converter callables, pagination, coalescing and result shaping, runs
+unchanged:
+
+* ``mode="record"`` forwards every request to the real API and stores the
+  response;
+* ``mode="replay"`` serves stored responses only and raises
+  :class:`CassetteMiss` for anything unknown;
+* ``mode="auto"`` replays hits and records misses.
+
+Responses live in one SQLite table, one zlib-compressed row per
+interaction, keyed by the canonical request key from
+:func:`llm_pipeline.response_cache.cache_key`.  A replaying cassette
+loads the whole table into memory when it opens, so a lookup is a dict
+access.  *latency* simulates the network: either a fixed number of
+seconds or ``"recorded"`` for the latency observed while recording,
+scaled by *latency_scale* and spread by ±*jitter*.
+
+Record once, then benchmark the gateway with no network::
+
+    python -m llm_pipeline.smoke_test sections.db --cassette c.db --record
+    python -m llm_pipeline.cassette bench c.db sections.db --requests 20000 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from .response_cache import cache_key
+
+MODES = ("record", "replay", "auto")
+
+Latency = Union[None, float, str]
+
+_HOP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+
+class CassetteMiss(LookupError):
+    """Replay mode was asked for a request that was never recorded."""
+
+
+@dataclass
+class CassetteStats:
+    hits: int = 0
+    misses: int = 0
+    recorded: int = 0
+
+
+# ---------------------------------------------------------------------------
+# Response object
+# ---------------------------------------------------------------------------
+
+
+class _Headers(dict):
+    """Lower-cased header dict with case-insensitive ``get``."""
+
+    def __init__(self, items: Mapping[str, str]) -> None:  # noqa: D401
+        super().__init__((k.lower(), v) for k, v in items.items())
+
+    def get(self, key: str, default: Any = None) -> Any:  # noqa: D401
+        return super().get(key.lower(), default)
+
+    def __getitem__(self, key: str) -> Any:  # noqa: D401
+        return super().__getitem__(key.lower())
+
+    def __contains__(self, key: object) -> bool:  # noqa: D401
+        return super().__contains__(str(key).lower())
+
+
+class CassetteResponse:
+    """Just enough of ``requests.Response`` / ``httpx.Response`` for the executors."""
+
+    __slots__ = ("status_code", "headers", "content", "elapsed_s")
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes, elapsed_s: float) -> None:  # noqa: D401
+        self.status_code = status_code
+        self.headers = _Headers(headers)
+        self.content = content
+        self.elapsed_s = elapsed_s
+
+    @property
+    def text(self) -> str:  # noqa: D401
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:  # noqa: D401
+        return json.loads(self.content)
+
+
+_Entry = Tuple[int, str, bytes, float]  # status, headers JSON, zlib body, elapsed
+
+
+# ---------------------------------------------------------------------------
+# Cassette
+# ---------------------------------------------------------------------------
+
+
+class Cassette:
+    """SQLite-backed record/replay transport (thread-safe)."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        mode: str = "replay",
+        latency: Latency = None,
+        latency_scale: float = 1.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+        inner: Any = None,
+    ) -> None:  # noqa: D401
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        if isinstance(latency, str) and latency != "recorded":
+            raise ValueError("latency must be seconds, 'recorded' or None")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.jitter = jitter
+        self.inner = inner  # upstream session for record/auto (default: pooled)
+        self.stats = CassetteStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        if mode != "replay":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        elif not self.path.exists():
+            raise FileNotFoundError(f"cassette {self.path} does not exist – record it first")
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS interactions (
+                key          TEXT PRIMARY KEY,
+                method       TEXT NOT NULL,
+                url          TEXT NOT NULL,
+                status       INTEGER NOT NULL,
+                headers      TEXT NOT NULL,
+                body         BLOB NOT NULL,
+                elapsed      REAL NOT NULL,
+                recorded_at  REAL NOT NULL
+            )
+            """
+        )
+        self._entries: Dict[str, _Entry] = {
+            key: (status, headers, bytes(body), elapsed)
+            for key, status, headers, body, elapsed in self.conn.execute(
+                "SELECT key, status, headers, body, elapsed FROM interactions"
+            )
+        }
+
+    def __len__(self) -> int:  # noqa: D401
+        return len(self._entries)
+
+    # -- sync transport ------------------------------------------------------
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        json: Any = None,  # noqa: A002 – mirrors requests' keyword
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+        **_ignored: Any,
+    ) -> CassetteResponse:  # noqa: D401
+        """``requests.Session.request`` look-alike."""
+
+        key = cache_key(method, url, params, json)
+        entry = self._lookup(key, method, url)
+        if entry is None:
+            t0 = time.perf_counter()
+            rsp = self._upstream(url).request(
+                method, url, params=params, json=json, headers=headers, timeout=timeout
+            )
+            entry = self._record(key, method, url, rsp, time.perf_counter() - t0)
+        else:
+            delay = self._delay(entry[3])
+            if delay:
+                time.sleep(delay)
+        return _response(entry)
+
+    def _upstream(self, url: str):  # noqa: D401
+        if self.inner is None:
+            from .http_session import get_session
+
+            parts = urlsplit(url)
+            self.inner = get_session(f"{parts.scheme}://{parts.netloc}")
+        return self.inner
+
+    # -- async transport -----------------------------------------------------
+
+    def aclient(self, inner: Any = None) -> "AsyncCassetteClient":  # noqa: D401
+        """Return an ``httpx.AsyncClient`` look-alike sharing this store."""
+
+        return AsyncCassetteClient(self, inner)
+
+    # -- storage -------------------------------------------------------------
+
+    def _lookup(self, key: str, method: str, url: str) -> Optional[_Entry]:  # noqa: D401
+        entry = self._entries.get(key) if self.mode != "record" else None
+        with self._lock:
+            if entry is not None:
+                self.stats.hits += 1
+                return entry
+            self.stats.misses += 1
+        if self.mode == "replay":
+            raise CassetteMiss(f"{method.upper()} {url} not in cassette {self.path}")
+        return None
+
+    def _record(self, key: str, method: str, url: str, rsp: Any, elapsed: float) -> _Entry:  # noqa: D401
+        content = rsp.content  # already decoded – drop the transfer headers
+        headers = json.dumps(
+            {k: v for k, v in rsp.headers.items() if k.lower() not in _HOP_HEADERS},
+            separators=(",", ":"),
+        )
+        entry: _Entry = (rsp.status_code, headers, zlib.compress(content, 6), elapsed)
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO interactions(key, method, url, status, headers, body, elapsed, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                  status      = excluded.status,
+                  headers     = excluded.headers,
+                  body        = excluded.body,
+                  elapsed     = excluded.elapsed,
+                  recorded_at = excluded.recorded_at
+                """,
+                (key, method.upper(), url, entry[0], headers, entry[2], elapsed, time.time()),
+            )
+            self._entries[key] = entry
+            self.stats.recorded += 1
+        return entry
+
+    def _delay(self, recorded: float) -> float:  # noqa: D401
+        if self.latency is None:
+            return 0.0
+        base = recorded if self.latency == "recorded" else float(self.latency)
+        base *= self.latency_scale
+        if self.jitter:
+            with self._lock:
+                base *= 1 + self._rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, base)
+
+    def size_bytes(self) -> int:  # noqa: D401
+        with self._lock:
+            return sum(len(e[2]) for e in self._entries.values())
+
+    def close(self) -> None:  # noqa: D401
+        with self._lock:
+            self.conn.close()
+
+    def __enter__(self) -> "Cassette":  # noqa: D401
+        return self
+
+    def __exit__(self, *exc) -> None:  # noqa: D401
+        self.close()
+
+
+class AsyncCassetteClient:
+    """``httpx.AsyncClient`` look-alike backed by a :class:`Cassette`."""
+
+    is_closed = False
+
+    def __init__(self, cassette: Cassette, inner: Any = None) -> None:  # noqa: D401
+        self.cassette = cassette
+        self.inner = inner  # upstream AsyncClient for record/auto (default: shared)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        json: Any = None,  # noqa: A002
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+        **_ignored: Any,
+    ) -> CassetteResponse:  # noqa: D401
+        c = self.cassette
+        key = cache_key(method, url, params, json)
+        entry = c._lookup(key, method, url)
+        if entry is None:
+            if self.inner is None:
+                from .async_executor import get_async_client
+
+                self.inner = get_async_client()
+            t0 = time.perf_counter()
+            rsp = await self.inner.request(
+                method, url, params=params, json=json, headers=headers, timeout=timeout
+            )
+            entry = c._record(key, method, url, rsp, time.perf_counter() - t0)
+        else:
+            delay = c._delay(entry[3])
+            if delay:
+                await asyncio.sleep(delay)
+        return _response(entry)
+
+    async def aclose(self) -> None:  # noqa: D401
+        self.is_closed = True
+
+
+def _response(entry: _Entry) -> CassetteResponse:  # noqa: D401
+    status, headers, body, elapsed = entry
+    return CassetteResponse(status, json.loads(headers), zlib.decompress(body), elapsed)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark CLI
+# ---------------------------------------------------------------------------
+
+
+def _bench(args) -> None:  # noqa: D401
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .converter import load_function_specs
+    from .registry import load_registry
+    from .smoke_test import _dummy_args, percentile
+
+    latency = "recorded" if args.latency == "recorded" else (float(args.latency) / 1000 if args.latency else None)
+    cassette = Cassette(args.cassette, latency=latency, latency_scale=args.latency_scale, jitter=args.jitter, seed=0)
+    _, callables = load_function_specs(args.db_path, base_url=args.base_url, session=cassette, validate=False)
+
+    # Only endpoints the cassette can answer take part.
+    workload = []
+    for entry in load_registry(args.db_path):
+        kwargs = _dummy_args(entry.spec)
+        try:
+            callables[entry.name](**kwargs)
+        except CassetteMiss:
+            continue
+        workload.append((callables[entry.name], kwargs))
+    if not workload:
+        print(f"No endpoint of {args.db_path} is recorded in {args.cassette}", file=sys.stderr)
+        raise SystemExit(1)
+
+    latencies = [0.0] * args.requests
+
+    def _one(i: int) -> None:  # noqa: D401
+        fn, kwargs = workload[i % len(workload)]
+        t0 = time.perf_counter()
+        fn(**kwargs)
+        latencies[i] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        list(pool.map(_one, range(args.requests)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    print(
+        f"{args.requests} calls over {len(workload)} endpoints in {elapsed:.2f}s – "
+        f"{args.requests / elapsed:.0f} req/s, "
+        + ", ".join(f"p{p} {percentile(latencies, p) * 1000:.2f} ms" for p in (50, 90, 99))
+    )
+
+
+def _main(argv) -> None:  # noqa: D401 – mini CLI
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m llm_pipeline.cassette", description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    info = sub.add_parser("info", help="Summarise a cassette")
+    info.add_argument("cassette", type=Path)
+
+    bench = sub.add_parser("bench", help="Replay through converter → executor → shaping")
+    bench.add_argument("cassette", type=Path)
+    bench.add_argument("db_path", type=Path)
+    bench.add_argument("--base-url", default="https://api.usaspending.gov")
+    bench.add_argument("--requests", type=int, default=10000)
+    bench.add_argument("--concurrency", type=int, default=16)
+    bench.add_argument("--latency", default=None, help="Milliseconds per call, or 'recorded'")
+    bench.add_argument("--latency-scale", type=float, default=1.0)
+    bench.add_argument("--jitter", type=float, default=0.0, help="Relative spread, e.g. 0.2")
+
+    args = parser.parse_args(argv[1:])
+    if args.command == "bench":
+        _bench(args)
+        return
+
+    with Cassette(args.cassette) as cassette:
+        rows = cassette.conn.execute(
+            "SELECT method, COUNT(*), AVG(elapsed) FROM interactions GROUP BY method ORDER BY method"
+        ).fetchall()
+        print(f"{cassette.path}: {len(cassette)} interactions, {cassette.size_bytes() / 1024:.1f} KiB compressed")
+        for method, count, avg in rows:
+            print(f"  {method:6} {count:5}  avg recorded latency {avg * 1000:.1f} ms")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _main(sys.argv)
@@ -0,0 +1,166 @@
+"""Split API Blueprint documents into per-endpoint sections.
+
+Contract files under ``api_contracts/contracts`` bundle one or more
+*actions* (``## POST``, ``### List Federal Accounts [POST]``,
+``## Search by Agency [GET /api/v2/…]``) with a shared ``# Data
+Structures`` appendix that is often several times longer than the
+endpoint description itself.  Sending the whole file for every endpoint
+wastes prompt tokens, so :func:`split_blueprint` returns one
+:class:`Section` per action whose text contains
+
+* the document preamble and the enclosing resource header,
+* the action block itself, and
+* only the data structures the action references (transitively).
+
+Each section is capped at :data:`MAX_SECTION_CHARS`: the action block is
+always kept whole, but referenced data structures are appended only
+while they fit and the ones left out are named in a trailing note.
+
+Non-Blueprint input (YAML, free-form Markdown) comes back as a single
+section holding the full text.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+_METHODS = "GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS"
+
+# "# Spending by Award [/api/v2/search/spending_by_award/]"
+_RESOURCE_RE = re.compile(r"^#{1,3}\s+(?P<title>[^\[\n]*?)\s*\[(?P<path>/[^\]\s]*)\]\s*$")
+# "## POST" | "### List Federal Accounts [POST]" | "## Search [GET /api/v2/…]"
+_ACTION_RE = re.compile(
+    rf"^#{{2,4}}\s+(?:(?P<bare>{_METHODS})\s*$|(?P<title>[^\[\n]*?)\s*\[(?P<method>{_METHODS})(?:\s+(?P<path>/[^\]\s]*))?\]\s*$)"
+)
+_DATA_STRUCTURES_RE = re.compile(r"^#{1,2}\s+Data Structures\s*$", re.M)
+# "## Filter (object)" / "### AdvancedFilterObject (object)" / "## DEFC (enum[string])"
+_STRUCT_RE = re.compile(r"^#{2,3}\s+(?P<name>[A-Za-z_][\w]*)\s+\(", re.M)
+_URI_TEMPLATE_QUERY_RE = re.compile(r"\{\?[^}]*\}")
+
+# Roughly 6k prompt tokens; the largest contract (``award_id.md``) is ~49k.
+MAX_SECTION_CHARS = 24_000
+
+
+class Section(NamedTuple):
+    method: Optional[str]
+    path: Optional[str]  # without the ``{?query}`` URI-template suffix
+    title: str
+    text: str
+
+
+def strip_query_template(path: str) -> str:  # noqa: D401
+    """``/api/v2/x/{id}/{?page,limit}`` -> ``/api/v2/x/{id}/``."""
+
+    return _URI_TEMPLATE_QUERY_RE.sub("", path)
+
+
+def _split_structures(ds_text: str) -> Dict[str, str]:  # noqa: D401
+    structs: Dict[str, str] = {}
+    matches = list(_STRUCT_RE.finditer(ds_text))
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(ds_text)
+        structs[m.group("name")] = ds_text[m.start() : end].rstrip() + "\n"
+    return structs
+
+
+def _referenced(text: str, structs: Dict[str, str]) -> List[str]:  # noqa: D401
+    """Names of *structs* reachable from *text*, in document order."""
+
+    seen: set = set()
+    frontier = [text]
+    while frontier:
+        chunk = frontier.pop()
+        for name, body in structs.items():
+            if name not in seen and re.search(rf"\b{re.escape(name)}\b", chunk):
+                seen.add(name)
+                frontier.append(body)
+    return [n for n in structs if n in seen]
+
+
+def _with_structures(own: str, refs: List[str], structs: Dict[str, str], max_chars: Optional[int]) -> str:
+    """Append the *refs* bodies to *own*, skipping those over *max_chars*."""
+
+    text = own.rstrip() + "\n\n# Data Structures\n\n"
+    kept: List[str] = []
+    omitted: List[str] = []
+    size = len(text)
+    for name in refs:
+        body = structs[name]
+        if max_chars is not None and size + len(body) + 1 > max_chars:
+            omitted.append(name)
+            continue
+        kept.append(body)
+        size += len(body) + 1
+    text += "\n".join(kept)
+    if omitted:
+        text += f"\n(omitted to fit the size limit: {', '.join(omitted)})\n"
+    return text
+
+
+def split_blueprint(text: str, *, max_chars: Optional[int] = MAX_SECTION_CHARS) -> List[Section]:  # noqa: D401
+    """Return one :class:`Section` per action found in *text*.
+
+    Referenced data structures are added in document order while the
+    section stays within *max_chars* (``None`` disables the cap).
+    """
+
+    ds_match = _DATA_STRUCTURES_RE.search(text)
+    body = text[: ds_match.start()] if ds_match else text
+    structs = _split_structures(text[ds_match.end() :]) if ds_match else {}
+
+    lines = body.splitlines(keepends=True)
+    preamble: List[str] = []
+    resource_lines: List[str] = []
+    resource_path: Optional[str] = None
+    current: Optional[dict] = None
+    actions: List[dict] = []
+
+    for line in lines:
+        stripped = line.rstrip("\n")
+        action = _ACTION_RE.match(stripped)
+        resource = None if action else _RESOURCE_RE.match(stripped)
+
+        if resource:
+            current = None
+            resource_path = resource.group("path")
+            resource_lines = [line]
+            continue
+        if action:
+            method = action.group("bare") or action.group("method")
+            current = {
+                "method": method,
+                "path": action.group("path") or resource_path,
+                "title": (action.group("title") or "").strip() or method,
+                "header": list(resource_lines),
+                "lines": [line],
+            }
+            actions.append(current)
+            continue
+        if current is not None:
+            current["lines"].append(line)
+        elif resource_lines:
+            resource_lines.append(line)
+        else:
+            preamble.append(line)
+
+    if not actions:
+        return [Section(None, None, "", text)]
+
+    sections: List[Section] = []
+    for a in actions:
+        own = "".join(preamble + a["header"] + a["lines"])
+        refs = _referenced(own, structs)
+        if refs:
+            own = _with_structures(own, refs, structs, max_chars)
+        path = strip_query_template(a["path"]) if a["path"] else None
+        sections.append(Section(a["method"].upper(), path, a["title"], own))
+    return sections
+
+
+def split_document(name: str, text: str, *, max_chars: Optional[int] = MAX_SECTION_CHARS) -> List[Section]:  # noqa: D401
+    """Split Blueprint Markdown; return other formats as a single section."""
+
+    if name.lower().endswith(".md") and text.lstrip().startswith("FORMAT:"):
+        return split_blueprint(text, max_chars=max_chars)
+    return [Section(None, None, "", text)]
@@ -17,18 +17,21 @@ from __future__ import annotations
 import json
 import re
 import types
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-try:
-    import yaml  # type: ignore
+# PyYAML is only imported for blobs that are not plain JSON.
+_YAML_AVAILABLE = find_spec("yaml") is not None
 
-    _YAML_AVAILABLE = True
-except ModuleNotFoundError:  # pragma: no cover – optional dep
-    _YAML_AVAILABLE = False
 
-
-from section_store import SectionStore
+from .http_session import DEFAULT_POOL_CONFIG, PoolConfig, get_session
+from .pagination import PageBudget, is_paginated
+from .registry import ToolEntry, load_registry
+from .response_cache import ResponseCache
+from .shaping import DEFAULT_SHAPE_CONFIG, ShapeConfig
+from .tracing import span
+from .validation import compile_validator
 
 
 # ---------------------------------------------------------------------------
@@ -48,92 +51,232 @@ def _safe_name(s: str) -> str:  # noqa: D401
 
 
 def _parse_yaml(text: str) -> Dict[str, Any]:  # noqa: D401
+    # Extractors store JSON (a YAML subset); the C JSON parser is orders of
+    # magnitude faster than PyYAML's pure-Python loader.
+    if text.lstrip().startswith("{"):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
     if _YAML_AVAILABLE:
+        import yaml  # type: ignore
+
         return yaml.safe_load(text) or {}
 
     # Naïve fallback – assume the blob is JSON-compatible YAML.
     return json.loads(text)
 
 
+def _build_fn_schema(name: str, spec: Dict[str, Any]) -> Dict[str, Any]:  # noqa: D401
+    """Return the ChatCompletion ``tools=[…]`` entry for *spec*."""
+
+    method: str = spec.get("method", "GET").upper()
+    path: str = spec.get("path", "/")
+    summary: str = spec.get("summary", "")
+
+    # Build parameter JSON schema (path + query only for now)
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+
+    for param_set_key in ("path_params", "query_params"):
+        for pname, pdata in (spec.get(param_set_key) or {}).items():
+            properties[pname] = {
+                "type": pdata.get("type", "string"),
+                "description": pdata.get("description", ""),
+            }
+            if pdata.get("required"):
+                required.append(pname)
+
+    if spec.get("request_body"):
+        properties["body"] = {
+            "type": "object",
+            "description": "HTTP request body (JSON)",
+        }
+
+    param_schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": properties,
+        "required": required,
+    }
+
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": summary or f"Call {method} {path}",
+            "parameters": param_schema,
+        },
+    }
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
 
 def load_function_specs(
-    db_path: str | Path = "sections.db", *, base_url: str = "https://api.usaspending.gov"
+    db_path: str | Path = "sections.db",
+    *,
+    base_url: str = "https://api.usaspending.gov",
+    pool_config: PoolConfig = DEFAULT_POOL_CONFIG,
+    cache: Optional[ResponseCache] = None,
+    shape: Optional[ShapeConfig] = DEFAULT_SHAPE_CONFIG,
+    paginate: Optional[PageBudget] = None,
+    validate: bool = True,
+    session: Any = None,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """Return *(function_schema_list, callable_map)* ready for ChatGPT.
 
     Each callable is stored in a dict keyed by **function.name** so an
     orchestrator can do `callable_map[fn_name](**args)` when the model
     emits a tool call.
+
+    All callables share one pooled keep-alive session for *base_url*,
+    created on the first call (so loading needs no ``requests``);
+    *pool_config* tunes its pool size and retry behaviour.  Pass any
+    ``requests.Session``-like *session* (e.g. a
+    :class:`~llm_pipeline.cassette.Cassette`) to replace it.  An optional
+    response *cache* is consulted before every upstream request.  Results
+    are compacted per *shape* (see :mod:`llm_pipeline.shaping`); pass
+    ``shape=None`` to hand raw bodies to the model.
+
+    With a *paginate* budget, callables of paginated endpoints follow the
+    pages themselves (see :mod:`llm_pipeline.pagination`) and return the
+    combined rows.
+
+    With *validate* (default) arguments are checked and coerced against the
+    spec before anything is sent; bad ones raise
+    :class:`~llm_pipeline.validation.ArgumentError` without a round trip.
+
+    Schemas come from the precompiled registry (see
+    :mod:`llm_pipeline.registry`), which is only rebuilt when the
+    SectionStore changed since the last load.
     """
 
-    store = SectionStore(db_path)
     fn_schemas: List[Dict[str, Any]] = []
     callables: Dict[str, Any] = {}
 
-    for row_id in store.list_ids():
-        row = store.get(row_id)
-        if not row:
-            continue
-
-        spec = _parse_yaml(row["content"])
+    def _session():  # noqa: D401
+        # Resolved per call, not here, so schemas load without ``requests``;
+        # get_session() hands every callable the same pooled session.
+        return session if session is not None else get_session(base_url, pool_config)
+
+    # Build the actual Python callable using a closure.
+    def _make_callable(entry: ToolEntry):  # noqa: D401
+        spec, routing = entry.spec, entry.routing
+        check = compile_validator(spec, entry.name) if validate else None
+
+        def _call(**kwargs):  # type: ignore[override]
+            from .executor import call_endpoint  # local import to avoid cycle
+
+            with span("tool.call", **{"tool.name": entry.name}):
+                if check is not None:
+                    with span("tool.validate"):
+                        kwargs = check(kwargs)
+
+                if paginate is not None and is_paginated(spec):
+                    from .pagination import paginate as _paginate
+
+                    return _paginate(
+                        spec,
+                        budget=paginate,
+                        shape=shape,
+                        base_url=base_url,
+                        session=_session(),
+                        cache=cache,
+                        routing=routing,
+                        **kwargs,
+                    )
+
+                return call_endpoint(
+                    spec,
+                    base_url=base_url,
+                    session=_session(),
+                    cache=cache,
+                    routing=routing,
+                    shape=shape,
+                    **kwargs,
+                )
+
+        return _call
+
+    for entry in load_registry(db_path):
+        fn_schemas.append(entry.fn_schema)
+        callables[entry.name] = _named(_make_callable(entry), entry.spec)
 
-        method: str = spec.get("method", "GET").upper()
-        path: str = spec.get("path", "/")
-        summary: str = spec.get("summary", "")
-
-        name = _safe_name(f"{method}_{path}")
-
-        # Build parameter JSON schema (path + query only for now)
-        properties: Dict[str, Any] = {}
-        required: List[str] = []
-
-        for param_set_key in ("path_params", "query_params"):
-            for pname, pdata in (spec.get(param_set_key) or {}).items():
-                properties[pname] = {
-                    "type": pdata.get("type", "string"),
-                    "description": pdata.get("description", ""),
-                }
-                if pdata.get("required"):
-                    required.append(pname)
-
-        if spec.get("request_body"):
-            properties["body"] = {
-                "type": "object",
-                "description": "HTTP request body (JSON)",
-            }
+    return fn_schemas, callables
 
-        param_schema: Dict[str, Any] = {
-            "type": "object",
-            "properties": properties,
-            "required": required,
-        }
 
-        fn_schema = {
-            "type": "function",
-            "function": {
-                "name": name,
-                "description": summary or f"Call {method} {path}",
-                "parameters": param_schema,
-            },
-        }
+def load_function_specs_async(
+    db_path: str | Path = "sections.db",
+    *,
+    base_url: str = "https://api.usaspending.gov",
+    cache: Optional[ResponseCache] = None,
+    shape: Optional[ShapeConfig] = DEFAULT_SHAPE_CONFIG,
+    paginate: Optional[PageBudget] = None,
+    validate: bool = True,
+    client: Any = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Like :func:`load_function_specs` but every callable is a coroutine.
 
-        fn_schemas.append(fn_schema)
+    The coroutines share one ``httpx.AsyncClient`` (see
+    :mod:`llm_pipeline.async_executor`) unless another *client* is given,
+    so an orchestrator can ``asyncio.gather`` all tool calls emitted in a
+    single turn.  Arguments are validated exactly like in the synchronous
+    variant.
+    """
 
-        # Build the actual Python callable using a closure.
-        def _make_callable(m: str, p: str, spec: Dict[str, Any]):  # noqa: D401
-            def _call(**kwargs):  # type: ignore[override]
-                from .executor import call_endpoint  # local import to avoid cycle
+    fn_schemas: List[Dict[str, Any]] = []
+    callables: Dict[str, Any] = {}
 
-                return call_endpoint(spec, base_url=base_url, **kwargs)
+    def _make_callable(entry: ToolEntry):  # noqa: D401
+        spec, routing = entry.spec, entry.routing
+        check = compile_validator(spec, entry.name) if validate else None
+
+        async def _call(**kwargs):  # type: ignore[override]
+            from .async_executor import call_endpoint_async  # lazy – httpx optional
+
+            with span("tool.call", **{"tool.name": entry.name}):
+                if check is not None:
+                    with span("tool.validate"):
+                        kwargs = check(kwargs)
+
+                if paginate is not None and is_paginated(spec):
+                    from .pagination import paginate_async
+
+                    return await paginate_async(
+                        spec,
+                        budget=paginate,
+                        shape=shape,
+                        base_url=base_url,
+                        client=client,
+                        cache=cache,
+                        routing=routing,
+                        **kwargs,
+                    )
+
+                return await call_endpoint_async(
+                    spec,
+                    base_url=base_url,
+                    client=client,
+                    cache=cache,
+                    routing=routing,
+                    shape=shape,
+                    **kwargs,
+                )
+
+        return _call
+
+    for entry in load_registry(db_path):
+        fn_schemas.append(entry.fn_schema)
+        callables[entry.name] = _named(_make_callable(entry), entry.spec)
 
-            _call.__name__ = _safe_name(f"exec_{m}_{p}")
-            _call.__qualname__ = _call.__name__
-            return _call
+    return fn_schemas, callables
 
-        callables[name] = _make_callable(method, path, spec)
 
-    return fn_schemas, callables
+def _named(fn, spec: Dict[str, Any]):  # noqa: D401
+    m = spec.get("method", "GET").upper()
+    p = spec.get("path", "/")
+    fn.__name__ = _safe_name(f"exec_{m}_{p}")
+    fn.__qualname__ = fn.__name__
+    return fn
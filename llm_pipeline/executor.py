@@ -4,14 +4,15 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 
-try:
-    import requests  # type: ignore
-
-    _REQUESTS = True
-except ModuleNotFoundError:  # pragma: no cover – optional dep
-    _REQUESTS = False
+from .http_session import _REQUESTS, get_session
+from .ratelimit import HostLimiter, TokenBucket
+from .response_cache import ResponseCache, cache_key
+from .shaping import DEFAULT_SHAPE_CONFIG, ShapeConfig, shape_result
+from .singleflight import DEFAULT_GROUP, SingleFlight
+from .tracing import span
 
 
 _PATH_VAR_RE = re.compile(r"{([^}]+)}")
@@ -27,16 +28,30 @@ def _fill_path(path_tpl: str, vars: Dict[str, Any]):  # noqa: D401
     return _PATH_VAR_RE.sub(_repl, path_tpl)
 
 
-def call_endpoint(
+class PreparedRequest(NamedTuple):
+    """Transport-agnostic description of a single upstream HTTP request."""
+
+    method: str
+    url: str
+    path: str  # filled path (no base URL) – handy for logging and cache keys
+    params: Dict[str, Any]
+    body: Any
+    headers: Dict[str, str]
+
+
+def prepare_request(
     spec: Dict[str, Any],
     *,
     base_url: str = "https://api.usaspending.gov",
-    timeout: float = 10.0,
+    routing: Optional[Mapping[str, str]] = None,
     **kwargs,
-):  # noqa: D401,E501
-    """Execute the HTTP request described by *spec*.
+) -> PreparedRequest:  # noqa: D401
+    """Map the LLM-provided *kwargs* onto method, URL, query and body.
 
-    kwargs are the arguments provided by the LLM (path/query/body, …).
+    Shared by the synchronous :func:`call_endpoint` and the asyncio variant
+    in :mod:`llm_pipeline.async_executor` so both route arguments the same
+    way.  *routing* (argument -> ``"path"``/``"query"``/``"body"``) skips
+    re-deriving the parameter sets from *spec* on every call.
     """
 
     method: str = spec.get("method", "GET").upper()
@@ -55,19 +70,25 @@ def call_endpoint(
     # expect – we treat every placeholder that appears in *path_tpl* as a path
     # parameter, whether or not it is explicitly declared.
 
-    tpl_placeholders = set(_PATH_VAR_RE.findall(path_tpl))
-    declared_params = set((spec.get("path_params") or {}).keys())
+    if routing is not None:
+        # Precompiled routing table from llm_pipeline.registry.
+        path_params = {k for k, v in routing.items() if v == "path"}
+        query_params = {k for k, v in routing.items() if v == "query"}
+    else:
+        tpl_placeholders = set(_PATH_VAR_RE.findall(path_tpl))
+        declared_params = set((spec.get("path_params") or {}).keys())
 
-    path_params = declared_params | tpl_placeholders
+        path_params = declared_params | tpl_placeholders
 
-    query_params = set((spec.get("query_params") or {}).keys())
+        query_params = set((spec.get("query_params") or {}).keys())
 
     path_values = {k: kwargs.pop(k) for k in list(kwargs.keys()) if k in path_params}
     query_values = {k: kwargs.pop(k) for k in list(kwargs.keys()) if k in query_params}
 
     body = kwargs.get("body")
 
-    url = f"{base_url.rstrip('/')}{_fill_path(path_tpl, path_values)}"
+    path = _fill_path(path_tpl, path_values)
+    url = f"{base_url.rstrip('/')}{path}"
 
     headers: Dict[str, str] = {}
 
@@ -76,17 +97,190 @@ def call_endpoint(
     if auth_type == "apiKey" and (token := kwargs.get("api_key")):
         headers["Authorization"] = token
 
-    if not _REQUESTS:
-        raise RuntimeError("`requests` package not available – executor cannot run.")
+    return PreparedRequest(method, url, path, query_values, body, headers)
+
+
+def call_endpoint(
+    spec: Dict[str, Any],
+    *,
+    base_url: str = "https://api.usaspending.gov",
+    timeout: float = 10.0,
+    session: "requests.Session | None" = None,
+    cache: Optional[ResponseCache] = None,
+    routing: Optional[Mapping[str, str]] = None,
+    shape: Optional[ShapeConfig] = DEFAULT_SHAPE_CONFIG,
+    coalesce: Optional[SingleFlight] = DEFAULT_GROUP,
+    **kwargs,
+):  # noqa: D401,E501
+    """Execute the HTTP request described by *spec*.
+
+    kwargs are the arguments provided by the LLM (path/query/body, …).
+
+    *session* defaults to the pooled keep-alive session for *base_url* (see
+    :mod:`llm_pipeline.http_session`) so repeated calls reuse connections.
+    When a *cache* (see :mod:`llm_pipeline.response_cache`) is given,
+    successful responses are served from / stored into it.
+
+    The body is compacted per *shape* (see :mod:`llm_pipeline.shaping`)
+    after caching; pass ``shape=None`` for the raw response.
+
+    Concurrent identical requests share one upstream call through the
+    *coalesce* group (see :mod:`llm_pipeline.singleflight`) when it
+    coalesces their method – by default GET/HEAD only; pass
+    ``coalesce=None`` to always issue a request of your own.
+
+    Every stage is timed by :mod:`llm_pipeline.tracing` when enabled.
+    """
+
+    attrs = {"http.request.method": spec.get("method", "GET").upper(), "url.template": spec.get("path", "/")}
+    with span("executor.call", **attrs) as call_span:
+        with span("executor.prepare"):
+            req = prepare_request(spec, base_url=base_url, routing=routing, **kwargs)
+
+        with span("executor.cache") as cache_span:
+            key, hit = _cache_lookup(cache, req)
+            cache_span.set_attribute("cache.hit", hit is not None)
+        if hit is None:
+            if session is None:
+                # Raises when ``requests`` is missing; injected sessions (e.g. a
+                # cassette) work without it.
+                session = get_session(base_url)
+
+            def _fetch() -> Dict[str, Any]:  # noqa: D401
+                with span("executor.upstream", **{"url.full": req.url}) as up:
+                    rsp = session.request(
+                        req.method,
+                        req.url,
+                        params=req.params,
+                        json=req.body,
+                        headers=req.headers,
+                        timeout=timeout,
+                    )
+                    up.set_attribute("http.response.status_code", rsp.status_code)
+                with span("executor.decode"):
+                    result = _to_result(rsp)
+                _cache_store(cache, spec, key, result)
+                return result
+
+            if coalesce is not None and coalesce.coalesces(req.method):
+                result, shared = coalesce.do(key or request_key(req), _fetch)
+                call_span.set_attribute("coalesce.shared", shared)
+                if shared:
+                    result = dict(result)
+            else:
+                result = _fetch()
+        else:
+            result = hit
+
+        with span("executor.shape"):
+            return shape_result(result, spec, shape)
+
+
+def request_key(req: PreparedRequest) -> str:  # noqa: D401
+    """Cache and single-flight key: the canonical request, plus headers when any are set.
+
+    Headers carry the caller's credentials (``Authorization``), so two
+    callers with different keys never share a cached or coalesced response.
+    """
+
+    body = [req.body, sorted(req.headers.items())] if req.headers else req.body
+    return cache_key(req.method, req.url, req.params, body)
+
+
+def _cache_lookup(
+    cache: Optional[ResponseCache], req: PreparedRequest
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:  # noqa: D401
+    """Return *(key, cached_result)*; key is ``None`` when not cacheable."""
+
+    if cache is None or not cache.is_cacheable(req.method):
+        return None, None
+    key = request_key(req)
+    return key, cache.get(key)
+
+
+def _cache_store(
+    cache: Optional[ResponseCache],
+    spec: Dict[str, Any],
+    key: Optional[str],
+    result: Dict[str, Any],
+) -> None:  # noqa: D401
+    # Only successful responses are cached – errors are usually transient or
+    # caused by bad arguments the model is about to correct.
+    if cache is None or key is None or not 200 <= result["status_code"] < 300:
+        return
+    cache.set(key, result, cache.ttl_for(spec.get("path", "/")))
+
+
+def call_endpoints(
+    calls: Sequence[Tuple[Dict[str, Any], Dict[str, Any]]],
+    *,
+    base_url: str = "https://api.usaspending.gov",
+    timeout: float = 10.0,
+    session: "requests.Session | None" = None,
+    cache: Optional[ResponseCache] = None,
+    max_workers: int = 8,
+    per_host: int = 4,
+    rate: float = 10.0,
+    burst: Optional[float] = None,
+    limiter: Optional[HostLimiter] = None,
+    bucket: Optional[TokenBucket] = None,
+    shape: Optional[ShapeConfig] = DEFAULT_SHAPE_CONFIG,
+) -> List[Any]:  # noqa: D401
+    """Execute a batch of *(spec, kwargs)* tool calls concurrently.
+
+    Intended for assistant messages that contain several tool calls at
+    once.  Calls are fanned out over a pool of *max_workers* threads while
+
+    * at most *per_host* requests are in flight per upstream host, and
+    * requests start at no more than *rate* per second (token bucket with
+      capacity *burst*).
+
+    Cache hits (see *cache*) still pass through the limiters; keep them
+    cheap by sharing one cache across batches.
+
+    Pass shared *limiter*/*bucket* instances to enforce the limits across
+    batches (e.g. process-wide); otherwise fresh ones are built per call.
+
+    The returned list is in **input order**.  A call that raised is
+    represented by its exception instance instead of a result dict so one
+    bad tool call does not sink the whole batch.
+    """
+
+    if not calls:
+        return []
+
+    limiter = limiter or HostLimiter(per_host)
+    bucket = bucket or TokenBucket(rate, burst)
+    if session is None and _REQUESTS:
+        session = get_session(base_url)
+    host = urlsplit(base_url).netloc
+
+    def _one(spec: Dict[str, Any], kwargs: Dict[str, Any]):  # noqa: D401
+        try:
+            with limiter.slot(host):
+                bucket.acquire()
+                return call_endpoint(
+                    spec,
+                    base_url=base_url,
+                    timeout=timeout,
+                    session=session,
+                    cache=cache,
+                    shape=shape,
+                    **kwargs,
+                )
+        except Exception as exc:  # noqa: BLE001
+            return exc
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = max(1, min(max_workers, len(calls)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_one, spec, dict(kwargs)) for spec, kwargs in calls]
+        return [fut.result() for fut in futures]
+
 
-    rsp = requests.request(
-        method,
-        url,
-        params=query_values,
-        json=body,
-        headers=headers,
-        timeout=timeout,
-    )
+def _to_result(rsp) -> Dict[str, Any]:  # noqa: D401
+    """Normalise a ``requests``/``httpx`` response into the tool result dict."""
 
     return {
         "status_code": rsp.status_code,
@@ -96,10 +290,11 @@ def call_endpoint(
 
 
 def _safe_body(rsp):  # noqa: D401
+    # Full body – size limits are applied later by llm_pipeline.shaping.
     ct = rsp.headers.get("content-type", "")
     if "application/json" in ct.lower():
         try:
             return rsp.json()
         except Exception:  # pragma: no cover – lenient
-            return rsp.text[:1000]
-    return rsp.text[:1000]
+            return rsp.text
+    return rsp.text
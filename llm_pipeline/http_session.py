@@ -0,0 +1,126 @@
+"""Process-wide pool of keep-alive ``requests.Session`` objects.
+
+Every generated tool callable eventually performs an HTTP request against
+the same handful of hosts (usually only ``api.usaspending.gov``).  Opening
+a fresh TCP + TLS connection for each call is by far the most expensive
+part of a tool invocation, so instead we keep **one session per base URL**
+and let urllib3 reuse the underlying connections.
+
+Usage::
+
+    from llm_pipeline.http_session import get_session
+
+    session = get_session("https://api.usaspending.gov")
+    rsp = session.request("GET", url, timeout=10)
+
+Sessions are created lazily and shared by all threads.  ``requests`` is
+thread-safe for concurrent ``Session.request`` calls as long as the
+session itself is not re-configured afterwards, which is why the pool
+never mutates a session once it has been handed out.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import Dict, Tuple
+
+# ``requests`` (plus urllib3 and ssl) costs tens of milliseconds to import;
+# it is only loaded when the first session is built.
+_REQUESTS = find_spec("requests") is not None
+
+
+# Methods that are safe to retry automatically.  POST is deliberately absent –
+# although most USAspending POST endpoints are read-only searches, we cannot
+# know that for every spec in the catalog.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Tunables applied to every session created by :func:`get_session`."""
+
+    pool_connections: int = 10  # number of distinct host pools to cache
+    pool_maxsize: int = 32  # keep-alive connections per host
+    max_retries: int = 3
+    backoff_factor: float = 0.3  # 0.3s, 0.6s, 1.2s, …
+    retry_statuses: Tuple[int, ...] = (429, 502, 503, 504)
+    user_agent: str = "llm-pipeline/1.0"
+
+
+DEFAULT_POOL_CONFIG = PoolConfig()
+
+
+_sessions: Dict[Tuple[str, PoolConfig], "requests.Session"] = {}
+_lock = threading.Lock()
+
+
+def _normalise_base_url(base_url: str) -> str:  # noqa: D401
+    return base_url.rstrip("/").lower()
+
+
+def _build_session(config: PoolConfig) -> "requests.Session":  # noqa: D401
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+    from urllib3.util.retry import Retry  # type: ignore
+
+    retry = Retry(
+        total=config.max_retries,
+        connect=config.max_retries,
+        read=config.max_retries,
+        status=config.max_retries,
+        backoff_factor=config.backoff_factor,
+        status_forcelist=config.retry_statuses,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=config.pool_maxsize,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "User-Agent": config.user_agent,
+            "Connection": "keep-alive",
+        }
+    )
+    return session
+
+
+def get_session(
+    base_url: str, config: PoolConfig = DEFAULT_POOL_CONFIG
+) -> "requests.Session":  # noqa: D401
+    """Return the shared session for *base_url*, creating it on first use."""
+
+    if not _REQUESTS:
+        raise RuntimeError("`requests` package not available – executor cannot run.")
+
+    key = (_normalise_base_url(base_url), config)
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _lock:
+        # Double-checked so concurrent first calls only build one session.
+        session = _sessions.get(key)
+        if session is None:
+            session = _build_session(config)
+            _sessions[key] = session
+    return session
+
+
+def close_all() -> None:  # noqa: D401
+    """Close every pooled session (e.g. on server shutdown or in tests)."""
+
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
@@ -21,8 +21,11 @@ Environment requirements
 • ``OPENAI_API_KEY`` must be set.
 • ``openai`` python package installed.
 
-The extractor **fails fast** if either requirement is missing – no offline
-fallback – so callers immediately know that online access is required.
+:func:`run_extraction` **fails fast** if either requirement is missing – no
+offline fallback – so callers immediately know that online access is
+required.  Importing the module has no such requirement: ``openai``,
+``tenacity`` and ``pydantic`` are loaded on first use, so the prompt
+helpers (and CLIs that merely import them) start quickly and offline.
 """
 
 #
@@ -32,53 +35,44 @@ fallback – so callers immediately know that online access is required.
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from tenacity import retry, stop_after_attempt, wait_fixed
-from pydantic import ValidationError
+from .chunking import Section, split_document
+from .section_store import SectionStore, section_rows
 
-from .section_store import SectionStore
-from .models import ExtractedSpec
+if TYPE_CHECKING:  # pragma: no cover – pydantic is imported on first use
+    from .models import ExtractedSpec
 
 # ---------------------------------------------------------------------------
-# Ensure OpenAI client & key are present at import time
+# Ensure OpenAI client & key are present before the first request
 # ---------------------------------------------------------------------------
 
 
-try:
-    import openai  # type: ignore
-except ModuleNotFoundError as exc:  # pragma: no cover – fail fast
-    raise EnvironmentError("`openai` package is required but missing. Install it via `pip install openai`."
-    ) from exc
+def _openai_client():  # noqa: D401
+    """Return an ``openai.OpenAI`` client; fail fast if it cannot work."""
 
-if not os.getenv("OPENAI_API_KEY"):
-    raise EnvironmentError("OPENAI_API_KEY environment variable not set – online extraction cannot run.")
-# Public API – run_extraction()
-# ---------------------------------------------------------------------------
-
-
-def run_extraction(  # noqa: D401 – external entry point
-    doc_path: Path,
-    db_path: Path | str,
-    *,
-    model: str = "gpt-4o-mini",
-    temperature: float = 0.0,
-) -> None:
-    """Parse *doc_path* via OpenAI and upsert the result into *db_path*.
-
-    If the OpenAI client/key is unavailable, the function routes the call
-    to ``llm_pipeline.simple_extractor.run_extraction`` instead so callers
-    do not need to care about setup.
-    """
+    try:
+        import openai  # type: ignore
+    except ModuleNotFoundError as exc:  # pragma: no cover – fail fast
+        raise EnvironmentError("`openai` package is required but missing. Install it via `pip install openai`."
+        ) from exc
 
+    if not os.getenv("OPENAI_API_KEY"):
+        raise EnvironmentError("OPENAI_API_KEY environment variable not set – online extraction cannot run.")
+    return openai.OpenAI()
 
 
-    text = doc_path.read_text(encoding="utf-8", errors="replace")
+# ---------------------------------------------------------------------------
+# Prompt & versioning
+# ---------------------------------------------------------------------------
 
-    system_prompt = """
+_SYSTEM_PROMPT = """
     You are an assistant that converts human-written REST documentation
     into a MAXIMALLY-RICH machine-readable JSON object.  Follow *exactly*
     the JSON schema below and output ONLY the JSON (no markdown fences).
@@ -141,6 +135,35 @@ def run_extraction(  # noqa: D401 – external entry point
     • Output MUST be valid JSON – no comments.
     """
 
+
+# Bump when the post-processing of the model output changes in a way that
+# should invalidate previously extracted rows.  Prompt edits are picked up
+# automatically through the hash below.
+_EXTRACTOR_REVISION = 2
+
+# Upper bound on concurrent section requests for a single document.
+_SECTION_WORKERS = 4
+
+
+def extractor_version(model: str = "gpt-4o-mini") -> str:  # noqa: D401
+    """Identifier of prompt + model + revision stored with every row.
+
+    ``batch_extract`` compares it with the stored value to decide whether a
+    row produced by an older prompt or model must be re-extracted.
+    """
+
+    digest = hashlib.sha256(_SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+    return f"llm:{model}:{_EXTRACTOR_REVISION}:{digest}"
+
+
+# ---------------------------------------------------------------------------
+# Building blocks shared by the sync, async and batch-API extractors
+# ---------------------------------------------------------------------------
+
+
+def build_messages(text: str) -> List[Dict[str, str]]:  # noqa: D401
+    """Return the chat *messages* for extracting the document *text*."""
+
     user_prompt = textwrap.dedent(
         f"""
         Extract metadata from the following API documentation file.  If a
@@ -153,33 +176,120 @@ def run_extraction(  # noqa: D401 – external entry point
         --- END DOC ---
         """
     )
+    return [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def parse_completion(content: str) -> ExtractedSpec:  # noqa: D401
+    """Validate the raw model output; raises ``ValueError`` when unusable."""
+
+    from pydantic import ValidationError
 
-    client = openai.OpenAI()
+    from .models import ExtractedSpec
+
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.strip("`\n")
+
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON: {exc}\nRAW:\n{content}") from exc
+
+    try:
+        return ExtractedSpec.model_validate(data)
+    except ValidationError as exc:
+        raise ValueError(f"Schema validation failed: {exc}\nRAW:\n{content}") from exc
+
+
+def merge_specs(
+    specs: Iterable[ExtractedSpec], sections: Optional[Sequence[Section]] = None
+) -> List[ExtractedSpec]:  # noqa: D401
+    """Merge per-section results into one spec per *method + path*.
+
+    Missing ``method``/``path`` values are filled from the corresponding
+    section header when *sections* is given.  When several sections yield
+    the same endpoint, parameters are unioned and the first non-empty value
+    wins for every other field.
+    """
+
+    from .models import ExtractedSpec
+
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for i, spec in enumerate(specs):
+        data = spec.model_dump()
+        if sections is not None and i < len(sections):
+            sec = sections[i]
+            if sec.method and not data.get("method"):
+                data["method"] = sec.method
+            if sec.path and not data.get("path"):
+                data["path"] = sec.path
+        key = (str(data.get("method", "")).upper(), data.get("path", ""))
+        if key not in merged:
+            merged[key] = data
+            continue
+        target = merged[key]
+        for field_name, value in data.items():
+            if isinstance(value, dict) and isinstance(target.get(field_name), dict):
+                target[field_name] = {**value, **target[field_name]}
+            elif not target.get(field_name) and value:
+                target[field_name] = value
+    return [ExtractedSpec.model_validate(d) for d in merged.values()]
+
+
+def spec_rows(
+    doc_path: Path, raw: bytes, specs: Sequence[ExtractedSpec], model: str
+) -> List[Dict[str, Any]]:  # noqa: D401
+    """SectionStore rows for LLM-extracted *specs* (see :func:`section_rows`)."""
+
+    return section_rows(
+        doc_path, raw, specs, extractor_version=extractor_version(model), source="llm_extractor"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Public API – run_extraction()
+# ---------------------------------------------------------------------------
+
+
+def run_extraction(  # noqa: D401 – external entry point
+    doc_path: Path,
+    db_path: Path | str,
+    *,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.0,
+    store=None,
+    chunk: bool = True,
+) -> None:
+    """Parse *doc_path* via OpenAI and upsert the result into *db_path*.
+
+    With *chunk* (default) API Blueprint files are split into per-endpoint
+    sections (see :mod:`llm_pipeline.chunking`) that are extracted
+    concurrently with smaller prompts and merged by method + path.
+
+    *store* may be any object exposing ``replace_source(source_path, rows)``
+    – typically a shared :class:`~llm_pipeline.section_store.SectionWriter`
+    so parallel workers do not each open their own SQLite connection.
+    """
+
+    raw = doc_path.read_bytes()
+    text = raw.decode("utf-8", errors="replace")
+    sections = split_document(doc_path.name, text) if chunk else [Section(None, None, "", text)]
+
+    from tenacity import RetryError, retry, stop_after_attempt, wait_fixed
+
+    client = _openai_client()
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
-    def _call_llm() -> ExtractedSpec:  # noqa: D401 – inner helper
+    def _call_llm(messages) -> ExtractedSpec:  # noqa: D401 – inner helper
         rsp = client.chat.completions.create(
             model=model,
             temperature=temperature,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+            messages=messages,
         )
-
-        content = rsp.choices[0].message.content.strip()
-        if content.startswith("```"):
-            content = content.strip("`\n")
-
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError as exc:
-            raise ValueError(f"Invalid JSON: {exc}\nRAW:\n{content}") from exc
-
-        try:
-            return ExtractedSpec.model_validate(data)
-        except ValidationError as exc:
-            raise ValueError(f"Schema validation failed: {exc}\nRAW:\n{content}") from exc
+        return parse_completion(rsp.choices[0].message.content)
 
     # ``@retry`` wraps *all* failures into :class:`tenacity.RetryError` once the
     # maximum number of attempts is exhausted.  That container is hard to read
@@ -188,20 +298,24 @@ def run_extraction(  # noqa: D401 – external entry point
     # behaviour intuitive we unwrap the error and re-raise the original
     # exception instead.
 
-    from tenacity import RetryError  # local import to avoid polluting exports
-
-    try:
-        spec = _call_llm()
-    except RetryError as exc:  # pragma: no cover – network dependent
-        underlying = exc.last_attempt.exception() if exc.last_attempt else None
-        raise underlying or exc  # fall back to wrapper if nothing captured
-
-    with SectionStore(db_path) as store:
-        store.upsert(
-            id=str(doc_path),
-            # pydantic v2's `model_dump_json` no longer supports the
-            # `ensure_ascii` keyword, so we simply omit it. The default
-            # behaviour already avoids escaping non-ASCII characters.
-            content=spec.model_dump_json(indent=2),
-            meta={"source": "llm_extractor"},
-        )
+    def _extract(section: Section) -> ExtractedSpec:  # noqa: D401
+        try:
+            return _call_llm(build_messages(section.text))
+        except RetryError as exc:  # pragma: no cover – network dependent
+            underlying = exc.last_attempt.exception() if exc.last_attempt else None
+            raise underlying or exc  # fall back to wrapper if nothing captured
+
+    if len(sections) == 1:
+        specs = [_extract(sections[0])]
+    else:
+        # Sections are independent – extract them concurrently.
+        with ThreadPoolExecutor(max_workers=min(len(sections), _SECTION_WORKERS)) as pool:
+            specs = list(pool.map(_extract, sections))
+
+    rows = spec_rows(doc_path, raw, merge_specs(specs, sections), model)
+    if store is not None:
+        store.replace_source(str(doc_path), rows)
+        return
+
+    with SectionStore(db_path) as own_store:
+        own_store.replace_source(str(doc_path), rows)
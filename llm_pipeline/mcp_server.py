@@ -0,0 +1,746 @@
+"""Long-running MCP (Model Context Protocol) server over the tool registry.
+
+The registry is loaded **once** at start-up; ``tools/list`` is then served
+from memory and every ``tools/call`` runs as its own asyncio task, so a
+slow upstream request never blocks other calls on the same connection.
+Two transports share one :class:`ToolServer`:
+
+* **stdio** – newline-delimited JSON-RPC on stdin/stdout (one implicit
+  session), the mode desktop MCP clients spawn::
+
+      python -m llm_pipeline.mcp_server sections.db
+
+* **HTTP** – one process serving many front-ends::
+
+      python -m llm_pipeline.mcp_server sections.db --transport http --port 8765
+
+  - ``POST /mcp`` (*streamable HTTP*): ``initialize`` returns an
+    ``Mcp-Session-Id`` header which later requests must echo.  With
+    ``Accept: text/event-stream`` the responses of a batch are streamed as
+    SSE events in completion order, otherwise returned as JSON.
+    ``DELETE /mcp`` ends the session.
+  - ``GET /sse`` + ``POST /messages?session_id=…`` (legacy HTTP+SSE):
+    responses are pushed over the long-lived event stream.
+
+Large results are written in ``_CHUNK_SIZE`` slices (chunked transfer
+encoding on HTTP) and each slice waits for ``drain()``, so a multi-MB
+payload neither stalls other writers nor balloons the socket buffers.
+
+Only the standard library is required; tool calls use the shared
+``httpx`` client from :mod:`llm_pipeline.async_executor` when available
+and fall back to the pooled ``requests`` executor in a worker thread.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# ``asyncio`` is imported inside the functions that need it: it adds ~50 ms
+# to start-up, and ``--help`` or importing ``ToolServer`` for its schema
+# should not pay for it.
+
+from .pagination import PageBudget, is_paginated
+from .registry import Registry, load_registry
+from .response_cache import ResponseCache
+from .shaping import DEFAULT_SHAPE_CONFIG, ShapeConfig
+from .tracing import span
+from .validation import ArgumentError, compile_validator
+
+SERVER_NAME = "gov-gpt"
+SERVER_VERSION = "0.1.0"
+PROTOCOL_VERSION = "2025-03-26"
+SUPPORTED_PROTOCOL_VERSIONS = ("2024-11-05", "2025-03-26", "2025-06-18")
+
+# JSON-RPC 2.0 error codes.
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+_CHUNK_SIZE = 64 * 1024
+_MAX_BODY_BYTES = 4 * 1024 * 1024
+_SSE_KEEPALIVE = 15.0
+
+
+class JsonRpcError(Exception):
+    """Protocol-level failure reported as a JSON-RPC ``error`` object."""
+
+    def __init__(self, code: int, message: str, data: Any = None) -> None:  # noqa: D401
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_json(self) -> Dict[str, Any]:  # noqa: D401
+        err: Dict[str, Any] = {"code": self.code, "message": self.message}
+        if self.data is not None:
+            err["data"] = self.data
+        return err
+
+
+@dataclass
+class Session:
+    """Per-client state; stdio has exactly one, HTTP one per ``initialize``."""
+
+    id: str
+    created: float = field(default_factory=time.monotonic)
+    last_seen: float = field(default_factory=time.monotonic)
+    protocol_version: str = PROTOCOL_VERSION
+    client_info: Dict[str, Any] = field(default_factory=dict)
+    inflight: Dict[Any, "asyncio.Task"] = field(default_factory=dict)
+    # Legacy SSE transport: responses are queued here for the event stream.
+    outbox: Optional["asyncio.Queue"] = None
+
+
+def encode_message(message: Any) -> bytes:  # noqa: D401
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Protocol handling
+# ---------------------------------------------------------------------------
+
+
+class ToolServer:
+    """Transport-independent MCP request handler."""
+
+    def __init__(
+        self,
+        registry: Registry,
+        *,
+        base_url: str = "https://api.usaspending.gov",
+        cache: Optional[ResponseCache] = None,
+        max_concurrency: int = 64,
+        call_timeout: float = 30.0,
+        shape: Optional[ShapeConfig] = DEFAULT_SHAPE_CONFIG,
+        paginate: Optional[PageBudget] = None,
+        client: Any = None,
+    ) -> None:  # noqa: D401
+        self.registry = registry
+        # Upstream ``httpx.AsyncClient``-like transport; ``None`` = shared
+        # client (a Cassette's ``aclient()`` serves recorded responses).
+        self.client = client
+        self.shape = shape
+        self.paginate = paginate
+        self.base_url = base_url
+        self.cache = cache
+        self.call_timeout = call_timeout
+        import asyncio
+
+        self._sem = asyncio.Semaphore(max(1, max_concurrency))
+        self._validators = {e.name: compile_validator(e.spec, e.name) for e in registry}
+        # Built once – tools/list never touches the registry again.
+        self.tools: List[Dict[str, Any]] = [
+            {
+                "name": e.name,
+                "description": e.fn_schema["function"].get("description", ""),
+                "inputSchema": e.fn_schema["function"].get("parameters", {"type": "object"}),
+            }
+            for e in registry
+        ]
+
+    @classmethod
+    def from_db(cls, db_path: str | Path, **kwargs) -> "ToolServer":  # noqa: D401
+        return cls(load_registry(db_path), **kwargs)
+
+    async def handle_payload(self, payload: Any, session: Session) -> Any:  # noqa: D401
+        """Handle a single message or a JSON-RPC batch; ``None`` if nothing to send."""
+
+        import asyncio
+
+        if isinstance(payload, list):
+            if not payload:
+                return _error(None, JsonRpcError(INVALID_REQUEST, "Empty batch"))
+            replies = await asyncio.gather(*(self.handle(m, session) for m in payload))
+            replies = [r for r in replies if r is not None]
+            return replies or None
+        return await self.handle(payload, session)
+
+    async def handle(self, message: Any, session: Session) -> Optional[Dict[str, Any]]:  # noqa: D401
+        """Handle one JSON-RPC message; notifications return ``None``."""
+
+        import asyncio
+
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0":
+            return _error(None, JsonRpcError(INVALID_REQUEST, "Invalid Request"))
+        if "method" not in message:
+            return None  # a response to a server request – we never send any
+
+        msg_id = message.get("id")
+        is_notification = "id" not in message
+        session.last_seen = time.monotonic()
+
+        # Each request runs in its own task so notifications/cancelled can
+        # stop it without touching the connection or sibling batch entries.
+        task = asyncio.ensure_future(
+            self._dispatch(message["method"], message.get("params") or {}, session)
+        )
+        tracked = not is_notification and isinstance(msg_id, (str, int))
+        if tracked:
+            session.inflight[msg_id] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            # notifications/cancelled removes the id before cancelling; the
+            # client expects no reply then.  Anything else propagates.
+            if tracked and msg_id not in session.inflight:
+                return None
+            raise
+        except JsonRpcError as exc:
+            return None if is_notification else _error(msg_id, exc)
+        except Exception as exc:  # noqa: BLE001
+            return None if is_notification else _error(msg_id, JsonRpcError(INTERNAL_ERROR, str(exc)))
+        finally:
+            if tracked:
+                session.inflight.pop(msg_id, None)
+
+        if is_notification:
+            return None
+        return {"jsonrpc": "2.0", "id": msg_id, "result": result}
+
+    async def _dispatch(self, method: str, params: Dict[str, Any], session: Session) -> Any:  # noqa: D401
+        if method == "initialize":
+            requested = params.get("protocolVersion")
+            session.protocol_version = (
+                requested if requested in SUPPORTED_PROTOCOL_VERSIONS else PROTOCOL_VERSION
+            )
+            session.client_info = params.get("clientInfo") or {}
+            return {
+                "protocolVersion": session.protocol_version,
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION},
+            }
+        if method == "ping":
+            return {}
+        if method == "tools/list":
+            return {"tools": self.tools}
+        if method == "tools/call":
+            return await self._call_tool(params)
+        if method == "notifications/cancelled":
+            task = session.inflight.pop(params.get("requestId"), None)
+            if task is not None:
+                task.cancel()
+            return None
+        if method.startswith("notifications/"):
+            return None  # initialized, progress, … – nothing to do
+        raise JsonRpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+    async def _call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:  # noqa: D401
+        import asyncio
+
+        name = params.get("name")
+        entry = self.registry.by_name.get(name) if isinstance(name, str) else None
+        if entry is None:
+            raise JsonRpcError(INVALID_PARAMS, f"Unknown tool: {name}")
+        arguments = params.get("arguments") or {}
+        if not isinstance(arguments, dict):
+            raise JsonRpcError(INVALID_PARAMS, "arguments must be an object")
+        with span("tool.call", **{"tool.name": name}) as call_span:
+            try:
+                with span("tool.validate"):
+                    arguments = self._validators[name](arguments)
+            except ArgumentError as exc:
+                # A tool-level error: the model sees it and can retry right away.
+                call_span.set_attribute("tool.invalid_arguments", True)
+                return _tool_error(str(exc))
+
+            async with self._sem:
+                try:
+                    result = await asyncio.wait_for(
+                        self._execute(entry.spec, entry.routing, arguments), self.call_timeout
+                    )
+                except asyncio.TimeoutError:
+                    call_span.set_attribute("tool.timeout", True)
+                    return _tool_error(f"{name} timed out after {self.call_timeout:.0f}s")
+                except Exception as exc:  # noqa: BLE001 – surfaced to the model, not the client
+                    call_span.set_attribute("tool.error", f"{type(exc).__name__}: {exc}")
+                    return _tool_error(f"{type(exc).__name__}: {exc}")
+
+            with span("tool.encode"):
+                text = json.dumps(result, ensure_ascii=False)
+        return {
+            "content": [{"type": "text", "text": text}],
+            "isError": result.get("status_code", 200) >= 400,
+        }
+
+    async def _execute(self, spec, routing, arguments: Dict[str, Any]) -> Dict[str, Any]:  # noqa: D401
+        import asyncio
+
+        from . import async_executor
+
+        paged = self.paginate is not None and is_paginated(spec)
+        if self.client is not None or async_executor._HTTPX:
+            if paged:
+                from .pagination import paginate_async
+
+                return await paginate_async(
+                    spec,
+                    budget=self.paginate,
+                    shape=self.shape,
+                    base_url=self.base_url,
+                    client=self.client,
+                    cache=self.cache,
+                    routing=routing,
+                    **arguments,
+                )
+            return await async_executor.call_endpoint_async(
+                spec,
+                base_url=self.base_url,
+                client=self.client,
+                cache=self.cache,
+                routing=routing,
+                shape=self.shape,
+                **arguments,
+            )
+
+        from .executor import call_endpoint
+        from .http_session import get_session
+        from .pagination import paginate
+
+        extra = {"budget": self.paginate} if paged else {}
+        return await asyncio.to_thread(
+            paginate if paged else call_endpoint,
+            spec,
+            base_url=self.base_url,
+            session=get_session(self.base_url),
+            cache=self.cache,
+            routing=routing,
+            shape=self.shape,
+            **extra,
+            **arguments,
+        )
+
+    async def aclose(self) -> None:  # noqa: D401
+        from . import async_executor
+
+        if async_executor._HTTPX:
+            await async_executor.aclose()
+
+
+def _error(msg_id: Any, exc: JsonRpcError) -> Dict[str, Any]:  # noqa: D401
+    return {"jsonrpc": "2.0", "id": msg_id, "error": exc.to_json()}
+
+
+def _tool_error(text: str) -> Dict[str, Any]:  # noqa: D401
+    return {"content": [{"type": "text", "text": text}], "isError": True}
+
+
+async def _write_chunked(writer: asyncio.StreamWriter, data: bytes, *, http_chunks: bool = False) -> None:  # noqa: D401
+    """Write *data* in ``_CHUNK_SIZE`` slices, draining between them."""
+
+    for start in range(0, len(data), _CHUNK_SIZE):
+        piece = data[start : start + _CHUNK_SIZE]
+        if http_chunks:
+            writer.write(b"%x\r\n" % len(piece) + piece + b"\r\n")
+        else:
+            writer.write(piece)
+        await writer.drain()
+
+
+# ---------------------------------------------------------------------------
+# stdio transport
+# ---------------------------------------------------------------------------
+
+
+async def serve_stdio(server: ToolServer) -> None:  # noqa: D401
+    """Serve newline-delimited JSON-RPC on stdin/stdout until EOF."""
+
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=_MAX_BODY_BYTES)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+    writer = asyncio.StreamWriter(transport, protocol, None, loop)
+
+    session = Session(id="stdio")
+    write_lock = asyncio.Lock()
+    pending: set = set()
+
+    async def _process(line: bytes) -> None:  # noqa: D401
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            reply: Any = _error(None, JsonRpcError(PARSE_ERROR, "Parse error"))
+        else:
+            reply = await server.handle_payload(payload, session)
+        if reply is not None:
+            # One message per line; the lock keeps concurrent replies whole.
+            async with write_lock:
+                await _write_chunked(writer, encode_message(reply) + b"\n")
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(_process(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        await server.aclose()
+
+
+# ---------------------------------------------------------------------------
+# HTTP transport (streamable HTTP + legacy SSE)
+# ---------------------------------------------------------------------------
+
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+}
+
+
+class HttpTransport:
+    """Minimal asyncio HTTP/1.1 server multiplexing MCP sessions."""
+
+    def __init__(
+        self,
+        server: ToolServer,
+        *,
+        session_ttl: float = 1800.0,
+        max_sessions: int = 10_000,
+    ) -> None:  # noqa: D401
+        self.server = server
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, Session] = {}
+
+    def _new_session(self) -> Session:  # noqa: D401
+        if len(self.sessions) >= self.max_sessions:
+            oldest = min(self.sessions.values(), key=lambda s: s.last_seen)
+            self._drop(oldest.id)
+        session = Session(id=uuid.uuid4().hex)
+        self.sessions[session.id] = session
+        return session
+
+    def _drop(self, session_id: str) -> bool:  # noqa: D401
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        for task in list(session.inflight.values()):
+            task.cancel()
+        if session.outbox is not None:
+            session.outbox.put_nowait(None)  # ends the SSE stream
+        return True
+
+    async def _reap(self) -> None:  # noqa: D401
+        import asyncio
+
+        while True:
+            await asyncio.sleep(min(60.0, self.session_ttl))
+            cutoff = time.monotonic() - self.session_ttl
+            for sid in [s.id for s in self.sessions.values() if s.last_seen < cutoff]:
+                self._drop(sid)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:  # noqa: D401
+        import asyncio
+
+        reaper = asyncio.create_task(self._reap())
+        srv = await asyncio.start_server(self._connection, host, port, limit=_MAX_BODY_BYTES)
+        print(f"MCP server listening on http://{host}:{port}/mcp", file=sys.stderr)
+        try:
+            async with srv:
+                await srv.serve_forever()
+        finally:
+            reaper.cancel()
+            await self.server.aclose()
+
+    # -- HTTP plumbing -------------------------------------------------------
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:  # noqa: D401
+        import asyncio
+
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                if isinstance(request, int):
+                    await _respond(writer, request, b"", close=True)
+                    break
+                keep_alive = await self._route(writer, *request)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, writer, method: str, target: str, headers: Dict[str, str], body: bytes) -> bool:  # noqa: D401
+        url = urlsplit(target)
+        keep_alive = headers.get("connection", "").lower() != "close"
+
+        if url.path == "/mcp" and method == "POST":
+            await self._post_mcp(writer, headers, body)
+        elif url.path == "/mcp" and method == "DELETE":
+            found = self._drop(headers.get("mcp-session-id", ""))
+            await _respond(writer, 200 if found else 404, b"")
+        elif url.path == "/mcp":
+            await _respond(writer, 405, b"", extra={"Allow": "POST, DELETE"})
+        elif url.path == "/sse" and method == "GET":
+            await self._sse_stream(writer)
+            return False
+        elif url.path == "/messages" and method == "POST":
+            sid = (parse_qs(url.query).get("session_id") or [""])[0]
+            await self._post_legacy(writer, sid, body)
+        elif url.path == "/health":
+            await _respond(writer, 200, encode_message({"tools": len(self.server.tools)}), ctype="application/json")
+        else:
+            await _respond(writer, 404, b"")
+        return keep_alive
+
+    # -- streamable HTTP -----------------------------------------------------
+
+    async def _post_mcp(self, writer, headers: Dict[str, str], body: bytes) -> None:  # noqa: D401
+        import asyncio
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            err = _error(None, JsonRpcError(PARSE_ERROR, "Parse error"))
+            await _respond(writer, 400, encode_message(err), ctype="application/json")
+            return
+
+        messages = payload if isinstance(payload, list) else [payload]
+        extra: Dict[str, str] = {}
+        if any(isinstance(m, dict) and m.get("method") == "initialize" for m in messages):
+            session = self._new_session()
+            extra["Mcp-Session-Id"] = session.id
+        else:
+            sid = headers.get("mcp-session-id")
+            if not sid:
+                err = _error(None, JsonRpcError(INVALID_REQUEST, "Missing Mcp-Session-Id header"))
+                await _respond(writer, 400, encode_message(err), ctype="application/json")
+                return
+            session = self.sessions.get(sid)
+            if session is None:
+                await _respond(writer, 404, b"")  # client must re-initialize
+                return
+
+        expects_reply = [m for m in messages if not (isinstance(m, dict) and "id" not in m)]
+        if not expects_reply:
+            await asyncio.gather(*(self.server.handle(m, session) for m in messages))
+            await _respond(writer, 202, b"", extra=extra)
+            return
+
+        if "text/event-stream" in headers.get("accept", ""):
+            # Stream each reply as soon as its call finishes.
+            await _start_chunked(writer, 200, "text/event-stream", extra)
+            tasks = [asyncio.create_task(self.server.handle(m, session)) for m in messages]
+            for fut in asyncio.as_completed(tasks):
+                reply = await fut
+                if reply is not None:
+                    event = b"event: message\ndata: " + encode_message(reply) + b"\n\n"
+                    await _write_chunked(writer, event, http_chunks=True)
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+            return
+
+        reply = await self.server.handle_payload(payload, session)
+        await _start_chunked(writer, 200, "application/json", extra)
+        await _write_chunked(writer, encode_message(reply), http_chunks=True)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    # -- legacy HTTP+SSE -----------------------------------------------------
+
+    async def _sse_stream(self, writer) -> None:  # noqa: D401
+        import asyncio
+
+        session = self._new_session()
+        session.outbox = asyncio.Queue()
+        await _start_chunked(writer, 200, "text/event-stream", {"Cache-Control": "no-cache"})
+        endpoint = f"event: endpoint\ndata: /messages?session_id={session.id}\n\n".encode()
+        await _write_chunked(writer, endpoint, http_chunks=True)
+        try:
+            while True:
+                try:
+                    reply = await asyncio.wait_for(session.outbox.get(), _SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    await _write_chunked(writer, b": keepalive\n\n", http_chunks=True)
+                    continue
+                if reply is None:
+                    break
+                event = b"event: message\ndata: " + encode_message(reply) + b"\n\n"
+                await _write_chunked(writer, event, http_chunks=True)
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            self._drop(session.id)
+
+    async def _post_legacy(self, writer, session_id: str, body: bytes) -> None:  # noqa: D401
+        import asyncio
+
+        session = self.sessions.get(session_id)
+        if session is None or session.outbox is None:
+            await _respond(writer, 404, b"")
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            session.outbox.put_nowait(_error(None, JsonRpcError(PARSE_ERROR, "Parse error")))
+            await _respond(writer, 202, b"")
+            return
+
+        async def _run() -> None:  # noqa: D401
+            reply = await self.server.handle_payload(payload, session)
+            if reply is not None and session.outbox is not None:
+                session.outbox.put_nowait(reply)
+
+        asyncio.create_task(_run())
+        await _respond(writer, 202, b"")
+
+
+async def _read_request(reader: asyncio.StreamReader):  # noqa: D401
+    """Return *(method, target, headers, body)*, an error status, or ``None`` on EOF."""
+
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        return 400
+    headers: Dict[str, str] = {}
+    while True:
+        raw = await reader.readline()
+        if raw in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = raw.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        return 400
+    if length < 0:
+        return 400
+    if length > _MAX_BODY_BYTES:
+        return 413
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:  # noqa: D401
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}"]
+    lines += [f"{k}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _respond(
+    writer,
+    status: int,
+    body: bytes,
+    *,
+    ctype: str = "text/plain",
+    extra: Optional[Dict[str, str]] = None,
+    close: bool = False,
+) -> None:  # noqa: D401
+    headers = {"Content-Type": ctype, "Content-Length": str(len(body))}
+    if close:
+        headers["Connection"] = "close"
+    headers.update(extra or {})
+    writer.write(_head(status, headers) + body)
+    await writer.drain()
+
+
+async def _start_chunked(writer, status: int, ctype: str, extra: Optional[Dict[str, str]] = None) -> None:  # noqa: D401
+    headers = {"Content-Type": ctype, "Transfer-Encoding": "chunked"}
+    headers.update(extra or {})
+    writer.write(_head(status, headers))
+    await writer.drain()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _main(argv):  # noqa: D401 – mini CLI
+    import argparse
+    import asyncio
+
+    from .config import get_output_root
+
+    parser = argparse.ArgumentParser(
+        prog="python -m llm_pipeline.mcp_server",
+        description="Serve the SectionStore tools over MCP (stdio or HTTP)",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("db_path", nargs="?", type=Path, default=get_output_root() / "sections.db")
+    parser.add_argument("--transport", choices=("stdio", "http"), default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--base-url", default="https://api.usaspending.gov")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Concurrent tool calls")
+    parser.add_argument("--call-timeout", type=float, default=30.0, help="Per tool call (s)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the in-memory response cache")
+    parser.add_argument(
+        "--token-budget", type=int, default=DEFAULT_SHAPE_CONFIG.token_budget,
+        help="Approx. tokens per tool result (0 = no budget)",
+    )
+    parser.add_argument("--raw", action="store_true", help="Return unshaped response bodies")
+    parser.add_argument(
+        "--max-pages", type=int, default=0,
+        help="Follow pagination up to N pages per call (0 = single page)",
+    )
+    parser.add_argument("--cassette", type=Path, default=None, help="Replay upstream responses from a cassette")
+    parser.add_argument(
+        "--cassette-latency", default=None,
+        help="Simulated upstream latency in ms, or 'recorded' (with --cassette)",
+    )
+    args = parser.parse_args(argv[1:])
+
+    async def _run() -> None:  # noqa: D401
+        from .response_cache import MemoryCache
+
+        client = None
+        if args.cassette:
+            from .cassette import Cassette
+
+            lat = args.cassette_latency
+            latency = lat if lat == "recorded" else (float(lat) / 1000 if lat else None)
+            client = Cassette(args.cassette, latency=latency).aclient()
+
+        server = ToolServer.from_db(
+            args.db_path,
+            base_url=args.base_url,
+            cache=None if args.no_cache else MemoryCache(),
+            max_concurrency=args.max_concurrency,
+            call_timeout=args.call_timeout,
+            shape=None if args.raw else ShapeConfig(token_budget=args.token_budget),
+            paginate=PageBudget(max_pages=args.max_pages) if args.max_pages else None,
+            client=client,
+        )
+        # stdout belongs to the protocol in stdio mode – log to stderr.
+        print(f"Loaded {len(server.tools)} tools from {args.db_path}", file=sys.stderr)
+        if args.transport == "stdio":
+            await serve_stdio(server)
+        else:
+            await HttpTransport(server).serve(args.host, args.port)
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _main(sys.argv)
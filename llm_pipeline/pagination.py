@@ -0,0 +1,408 @@
+"""Follow paginated endpoints lazily, with prefetch and row/byte budgets.
+
+``models.Pagination`` records a ``style`` and the ``param_names`` for every
+endpoint, but a plain tool call only ever fetches the page the model asked
+for.  :func:`iter_pages` turns one tool call into a generator of
+:class:`Page` objects:
+
+* ``offset`` – ``page``/``limit`` (USAspending's POST bodies) or
+  ``offset``/``limit`` parameters, advanced after every page;
+* ``cursor`` – the next cursor is read from the response
+  (``page_metadata.next_cursor``, ``last_record_unique_id``, …);
+* ``link`` – ``Link: <…>; rel="next"`` headers or a ``next`` field holding
+  a URL (its query string is applied) or a page number.
+
+As soon as page *n* arrives the request for page *n + 1* is started in the
+background, so the network round-trip overlaps with the consumer's work.
+Iteration stops when the endpoint reports no further pages
+(``page_metadata.hasNext``, an empty/short page) or when the
+:class:`PageBudget` is used up; at most two pages are held in memory.
+
+:func:`paginate` collects the pages into a single result dict whose rows
+are concatenated, ready for :mod:`llm_pipeline.shaping`.  With shaping on,
+no more rows are fetched than ``ShapeConfig.max_rows`` would keep.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from .shaping import DEFAULT_SHAPE_CONFIG, ShapeConfig, shape_result
+
+_ROW_KEYS = ("results", "data", "items", "rows")
+_META_KEYS = ("page_metadata", "pagination", "meta")
+_HAS_NEXT_KEYS = ("hasNext", "has_next", "hasMore", "has_more")
+_CURSOR_KEYS = ("next_cursor", "nextCursor", "cursor", "next_page_token", "nextPageToken")
+_LIMIT_NAMES = ("limit", "per_page", "page_size", "pageSize", "size")
+_LINK_NEXT_RE = re.compile(r'<([^>]+)>\s*;\s*rel="?next"?')
+_PAGINATED_STYLES = ("offset", "cursor", "link")
+
+
+@dataclass(frozen=True)
+class PageBudget:
+    """Upper bounds for one paginated call; ``0`` disables a limit."""
+
+    max_pages: int = 10
+    max_rows: int = 1000
+    max_bytes: int = 2 * 1024 * 1024
+
+
+DEFAULT_PAGE_BUDGET = PageBudget()
+
+
+class Page(NamedTuple):
+    number: int  # 1-based position within this iteration
+    rows: List[Any]
+    result: Dict[str, Any]  # raw executor result of this page
+    nbytes: int
+    more: bool  # the endpoint has data beyond this page (budget aside)
+
+
+def is_paginated(spec: Dict[str, Any]) -> bool:  # noqa: D401
+    return ((spec.get("pagination") or {}).get("style") or "none") in _PAGINATED_STYLES
+
+
+# ---------------------------------------------------------------------------
+# Response inspection
+# ---------------------------------------------------------------------------
+
+
+def _rows_key(body: Any) -> Optional[str]:  # noqa: D401
+    if not isinstance(body, dict):
+        return None
+    for key in _ROW_KEYS:
+        if isinstance(body.get(key), list):
+            return key
+    return next((k for k, v in body.items() if isinstance(v, list)), None)
+
+
+def extract_rows(body: Any) -> List[Any]:  # noqa: D401
+    """Return the list of records in *body* (``results``, ``data``, … or the body itself)."""
+
+    if isinstance(body, list):
+        return body
+    key = _rows_key(body)
+    return body[key] if key else []
+
+
+def _meta(body: Any) -> Dict[str, Any]:  # noqa: D401
+    if not isinstance(body, dict):
+        return {}
+    for key in _META_KEYS:
+        if isinstance(body.get(key), dict):
+            return body[key]
+    return body
+
+
+def _lookup(body: Any, keys) -> Any:  # noqa: D401
+    meta = _meta(body)
+    for source in (meta, body if isinstance(body, dict) else {}):
+        for key in keys:
+            if source.get(key) not in (None, ""):
+                return source[key]
+    return None
+
+
+def _page_bytes(result: Dict[str, Any]) -> int:  # noqa: D401
+    headers = result.get("headers") or {}
+    length = headers.get("content-length") or headers.get("Content-Length")
+    if length and str(length).isdigit():
+        return int(length)
+    body = result.get("body")
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    return len(json.dumps(body, separators=(",", ":"), default=str))
+
+
+# ---------------------------------------------------------------------------
+# Request planning
+# ---------------------------------------------------------------------------
+
+
+class _Plan(NamedTuple):
+    style: str
+    page: Optional[str]
+    offset: Optional[str]
+    limit: Optional[str]
+    cursor: Tuple[str, ...]  # e.g. ("last_record_unique_id", "last_record_sort_value")
+    locations: Dict[str, str]  # param -> "query" | "body"
+
+
+def _plan(spec: Dict[str, Any], routing: Optional[Mapping[str, str]]) -> _Plan:  # noqa: D401
+    pagination = spec.get("pagination") or {}
+    style = pagination.get("style") or "none"
+    names = list(pagination.get("param_names") or [])
+    if style in ("offset", "link") and not names:
+        names = ["page", "limit"]
+
+    page = "page" if "page" in names else None
+    offset = next((n for n in names if n in ("offset", "start", "skip")), None)
+    limit = next((n for n in names if n in _LIMIT_NAMES), None)
+    cursor: Tuple[str, ...] = ()
+    if style == "cursor":
+        cursor = tuple(n for n in names if n not in (page, offset, limit)) or ("cursor",)
+
+    if routing is None:
+        from .registry import _routing  # shared routing rules
+
+        routing = _routing(spec)
+    has_body = bool(spec.get("request_body"))
+    locations = {
+        n: ("query" if routing.get(n) in ("query", "path") or not has_body else "body")
+        for n in (page, offset, limit) + cursor
+        if n
+    }
+    return _Plan(style, page, offset, limit, cursor, locations)
+
+
+def _get_arg(kwargs: Dict[str, Any], name: str, location: str) -> Any:  # noqa: D401
+    if location == "body":
+        return (kwargs.get("body") or {}).get(name)
+    return kwargs.get(name)
+
+
+def _set_arg(kwargs: Dict[str, Any], name: str, value: Any, location: str) -> None:  # noqa: D401
+    if location == "body":
+        kwargs["body"] = {**(kwargs.get("body") or {}), name: value}
+    else:
+        kwargs[name] = value
+
+
+def _next_kwargs(plan: _Plan, kwargs: Dict[str, Any], result: Dict[str, Any], rows: List[Any]) -> Optional[Dict[str, Any]]:  # noqa: D401
+    """Arguments for the page after *result*, or ``None`` when done."""
+
+    body = result.get("body")
+    if not 200 <= result.get("status_code", 0) < 300 or not rows:
+        return None
+
+    flag = _lookup(body, _HAS_NEXT_KEYS)
+    if flag is not None and not flag:
+        return None
+    limit = _get_arg(kwargs, plan.limit, plan.locations[plan.limit]) if plan.limit else None
+    if flag is None and isinstance(limit, int) and len(rows) < limit:
+        return None  # short page – nothing after it
+
+    nxt = dict(kwargs)
+    if plan.style == "offset":
+        if plan.page:
+            loc = plan.locations[plan.page]
+            _set_arg(nxt, plan.page, int(_get_arg(kwargs, plan.page, loc) or 1) + 1, loc)
+        elif plan.offset:
+            loc = plan.locations[plan.offset]
+            _set_arg(nxt, plan.offset, int(_get_arg(kwargs, plan.offset, loc) or 0) + len(rows), loc)
+        else:
+            return None
+        return nxt
+
+    if plan.style == "cursor":
+        # Every cursor parameter is echoed back by name; a single one may
+        # also come back under a generic key such as ``next_cursor``.
+        tokens = {n: _lookup(body, (n,)) for n in plan.cursor}
+        if len(plan.cursor) == 1 and tokens[plan.cursor[0]] is None:
+            tokens[plan.cursor[0]] = _lookup(body, _CURSOR_KEYS)
+        if any(v is None for v in tokens.values()):
+            return None
+        if all(v == _get_arg(kwargs, n, plan.locations[n]) for n, v in tokens.items()):
+            return None  # cursor did not move – avoid looping forever
+        for name, value in tokens.items():
+            _set_arg(nxt, name, value, plan.locations[name])
+        return nxt
+
+    # link style
+    headers = result.get("headers") or {}
+    link = _LINK_NEXT_RE.search(headers.get("link") or headers.get("Link") or "")
+    target = link.group(1) if link else _lookup(body, ("next",))
+    if target is None or isinstance(target, bool):
+        return None
+    if isinstance(target, int):
+        if not plan.page:
+            return None
+        _set_arg(nxt, plan.page, target, plan.locations[plan.page])
+        return nxt
+    query = dict(parse_qsl(urlsplit(str(target)).query))
+    if not query:
+        return None
+    nxt.update(query)
+    return nxt
+
+
+# ---------------------------------------------------------------------------
+# Iteration
+# ---------------------------------------------------------------------------
+
+
+def _within(budget: PageBudget, pages: int, rows: int, nbytes: int) -> bool:  # noqa: D401
+    return not (
+        (budget.max_pages and pages >= budget.max_pages)
+        or (budget.max_rows and rows >= budget.max_rows)
+        or (budget.max_bytes and nbytes >= budget.max_bytes)
+    )
+
+
+def iter_pages(
+    spec: Dict[str, Any],
+    *,
+    budget: PageBudget = DEFAULT_PAGE_BUDGET,
+    routing: Optional[Mapping[str, str]] = None,
+    call: Optional[Callable[..., Dict[str, Any]]] = None,
+    prefetch: bool = True,
+    **kwargs,
+) -> Iterator[Page]:  # noqa: D401
+    """Yield pages of *spec* lazily; *kwargs* go to :func:`executor.call_endpoint`.
+
+    *call* defaults to the synchronous executor with shaping disabled (each
+    page must be inspected in full).  Rows beyond ``budget.max_rows`` are
+    cut from the last page.
+    """
+
+    if call is None:
+        from .executor import call_endpoint
+
+        call = call_endpoint
+    plan = _plan(spec, routing)
+
+    def _fetch(args: Dict[str, Any]) -> Dict[str, Any]:  # noqa: D401
+        return call(spec, routing=routing, shape=None, **args)
+
+    pool = None
+    if prefetch:
+        from concurrent.futures import ThreadPoolExecutor
+
+        pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        args: Optional[Dict[str, Any]] = dict(kwargs)
+        pending = None
+        number = total_rows = total_bytes = 0
+        while args is not None:
+            result = pending.result() if pending is not None else _fetch(args)
+            pending = None
+            number += 1
+            all_rows = extract_rows(result.get("body"))
+            rows = all_rows[: budget.max_rows - total_rows] if budget.max_rows else all_rows
+            nbytes = _page_bytes(result)
+            total_rows += len(rows)
+            total_bytes += nbytes
+
+            nxt = _next_kwargs(plan, args, result, all_rows) if plan.style in _PAGINATED_STYLES else None
+            more = nxt is not None or len(rows) < len(all_rows)
+            if nxt is not None and not _within(budget, number, total_rows, total_bytes):
+                nxt = None
+            if nxt is not None and pool is not None:
+                pending = pool.submit(_fetch, nxt)  # overlaps with the consumer
+            yield Page(number, rows, result, nbytes, more)
+            args = nxt
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_pages(
+    spec: Dict[str, Any],
+    *,
+    budget: PageBudget = DEFAULT_PAGE_BUDGET,
+    routing: Optional[Mapping[str, str]] = None,
+    call=None,
+    prefetch: bool = True,
+    **kwargs,
+) -> AsyncIterator[Page]:  # noqa: D401
+    """Asyncio twin of :func:`iter_pages` backed by ``call_endpoint_async``."""
+
+    import asyncio
+
+    if call is None:
+        from .async_executor import call_endpoint_async
+
+        call = call_endpoint_async
+    plan = _plan(spec, routing)
+
+    async def _fetch(args: Dict[str, Any]) -> Dict[str, Any]:  # noqa: D401
+        return await call(spec, routing=routing, shape=None, **args)
+
+    args: Optional[Dict[str, Any]] = dict(kwargs)
+    pending: Optional[asyncio.Task] = None
+    number = total_rows = total_bytes = 0
+    try:
+        while args is not None:
+            result = await (pending if pending is not None else _fetch(args))
+            pending = None
+            number += 1
+            all_rows = extract_rows(result.get("body"))
+            rows = all_rows[: budget.max_rows - total_rows] if budget.max_rows else all_rows
+            nbytes = _page_bytes(result)
+            total_rows += len(rows)
+            total_bytes += nbytes
+
+            nxt = _next_kwargs(plan, args, result, all_rows) if plan.style in _PAGINATED_STYLES else None
+            more = nxt is not None or len(rows) < len(all_rows)
+            if nxt is not None and not _within(budget, number, total_rows, total_bytes):
+                nxt = None
+            if nxt is not None and prefetch:
+                pending = asyncio.ensure_future(_fetch(nxt))
+            yield Page(number, rows, result, nbytes, more)
+            args = nxt
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def _combine(pages: List[Page]) -> Dict[str, Any]:  # noqa: D401
+    first, last = pages[0].result, pages[-1].result
+    rows = [row for page in pages for row in page.rows]
+    body = first.get("body")
+    if isinstance(body, dict) and _rows_key(body):
+        body = dict(body)
+        body[_rows_key(body)] = rows
+        for key in _META_KEYS:
+            if isinstance((last.get("body") or {}).get(key), dict):
+                body[key] = last["body"][key]
+    elif isinstance(body, list):
+        body = rows
+    return {
+        "status_code": last.get("status_code", first.get("status_code")),
+        "headers": last.get("headers", {}),
+        "body": body,
+        "pages": len(pages),
+        "has_more": pages[-1].more,
+    }
+
+
+def _shaped_budget(budget: PageBudget, shape: Optional[ShapeConfig]) -> PageBudget:  # noqa: D401
+    """Cap *budget* at the rows *shape* keeps – fetching more is wasted work."""
+
+    if shape is None or not shape.max_rows:
+        return budget
+    if budget.max_rows and budget.max_rows <= shape.max_rows:
+        return budget
+    return replace(budget, max_rows=shape.max_rows)
+
+
+def paginate(
+    spec: Dict[str, Any],
+    *,
+    budget: PageBudget = DEFAULT_PAGE_BUDGET,
+    shape: Optional[ShapeConfig] = DEFAULT_SHAPE_CONFIG,
+    **kwargs,
+) -> Dict[str, Any]:  # noqa: D401
+    """Fetch up to *budget* pages and return one combined, shaped result.
+
+    With *shape* set, iteration also stops once ``shape.max_rows`` rows
+    are collected (``has_more`` then reports the rest).
+    """
+
+    pages = list(iter_pages(spec, budget=_shaped_budget(budget, shape), **kwargs))
+    return shape_result(_combine(pages), spec, shape)
+
+
+async def paginate_async(
+    spec: Dict[str, Any],
+    *,
+    budget: PageBudget = DEFAULT_PAGE_BUDGET,
+    shape: Optional[ShapeConfig] = DEFAULT_SHAPE_CONFIG,
+    **kwargs,
+) -> Dict[str, Any]:  # noqa: D401
+    pages = [page async for page in aiter_pages(spec, budget=_shaped_budget(budget, shape), **kwargs)]
+    return shape_result(_combine(pages), spec, shape)
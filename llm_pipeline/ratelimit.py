@@ -0,0 +1,91 @@
+"""Thread-safe rate limiting primitives shared by the executors.
+
+* :class:`TokenBucket` – classic token bucket: *rate* tokens are added per
+  second up to *burst*; each request consumes one token and blocks until
+  one is available.  *clock* and *sleep* default to ``time.monotonic`` and
+  ``time.sleep``; tests inject fakes.
+* :class:`HostLimiter` – caps the number of in-flight requests per host
+  so a large batch of tool calls never opens more than *N* concurrent
+  connections to the same upstream.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+
+class TokenBucket:
+    """Blocking token bucket (``rate`` tokens/second, ``burst`` capacity)."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:  # noqa: D401
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:  # noqa: D401
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:  # noqa: D401
+        """Take *tokens* if available and return 0, else the seconds to wait."""
+
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:  # noqa: D401
+        """Block until *tokens* could be taken from the bucket."""
+
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+
+class HostLimiter:
+    """Per-host concurrency cap backed by one semaphore per host."""
+
+    def __init__(self, per_host: int) -> None:  # noqa: D401
+        if per_host < 1:
+            raise ValueError("per_host must be >= 1")
+        self.per_host = per_host
+        self._sems: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _sem(self, host: str) -> threading.BoundedSemaphore:  # noqa: D401
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = self._sems[host] = threading.BoundedSemaphore(self.per_host)
+            return sem
+
+    @contextmanager
+    def slot(self, host: str) -> Iterator[None]:  # noqa: D401
+        """Context manager holding one of *host*'s concurrency slots."""
+
+        sem = self._sem(host)
+        sem.acquire()
+        try:
+            yield
+        finally:
+            sem.release()
@@ -0,0 +1,272 @@
+"""Precompiled tool registry built once from ``sections.db``.
+
+Parsing every YAML blob and rebuilding every function schema on each
+start-up is the dominant cost of :func:`converter.load_function_specs`.
+This module does that work once and stores the result in a JSON artefact
+next to the database (``sections.registry.json`` for ``sections.db``)::
+
+    {
+      "version": 1,
+      "fingerprint": "<SectionStore.fingerprint()>",
+      "entries": [
+        {"name": …, "row_id": …, "spec": {…}, "fn_schema": {…},
+         "path_regex": "^/api/v2/…$", "routing": {"param": "path|query|body"}},
+        …
+      ]
+    }
+
+On load the artefact is reused as long as its *fingerprint* still matches
+the store; any upsert changes the fingerprint and triggers a transparent
+rebuild.  JSON (rather than pickle) keeps the artefact inspectable and safe
+to load.
+
+Pre-build the artefact (e.g. at deploy time) with::
+
+    python -m llm_pipeline.registry sections.db
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Pattern
+
+from section_store import SectionStore
+
+from .tracing import span
+
+
+# Bump whenever the artefact layout or the schema-building rules change so
+# stale artefacts are rebuilt automatically.
+REGISTRY_VERSION = 1
+
+_PATH_VAR_RE = re.compile(r"{([^}]+)}")
+
+
+@dataclass
+class ToolEntry:
+    """One compiled catalog row."""
+
+    name: str
+    row_id: str
+    spec: Dict[str, Any]
+    fn_schema: Dict[str, Any]
+    path_regex: str
+    routing: Dict[str, str]  # argument name -> "path" | "query" | "body"
+    _compiled: Optional[Pattern[str]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def method(self) -> str:  # noqa: D401
+        return self.spec.get("method", "GET").upper()
+
+    @property
+    def path(self) -> str:  # noqa: D401
+        return self.spec.get("path", "/")
+
+    def match(self, path: str) -> Optional[Dict[str, str]]:  # noqa: D401
+        """Return the path variables if *path* matches this entry's template."""
+
+        if self._compiled is None:
+            self._compiled = re.compile(self.path_regex)
+        m = self._compiled.match(path)
+        return m.groupdict() if m else None
+
+    def to_json(self) -> Dict[str, Any]:  # noqa: D401
+        data = asdict(self)
+        data.pop("_compiled", None)
+        return data
+
+
+class Registry:
+    """In-memory view over the compiled entries with name lookup."""
+
+    def __init__(self, entries: List[ToolEntry], fingerprint: str = "") -> None:  # noqa: D401
+        self.entries = entries
+        self.fingerprint = fingerprint
+        self.by_name: Dict[str, ToolEntry] = {e.name: e for e in entries}
+
+    def __iter__(self) -> Iterator[ToolEntry]:  # noqa: D401
+        return iter(self.entries)
+
+    def __len__(self) -> int:  # noqa: D401
+        return len(self.entries)
+
+    @property
+    def fn_schemas(self) -> List[Dict[str, Any]]:  # noqa: D401
+        return [e.fn_schema for e in self.entries]
+
+    def match(self, method: str, path: str) -> Optional[ToolEntry]:  # noqa: D401
+        """Find the entry serving *method* + concrete *path* (reverse routing)."""
+
+        method = method.upper()
+        for entry in self.entries:
+            if entry.method == method and entry.match(path) is not None:
+                return entry
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+
+def _path_regex(path_tpl: str) -> str:  # noqa: D401
+    parts: List[str] = []
+    pos = 0
+    for m in _PATH_VAR_RE.finditer(path_tpl):
+        parts.append(re.escape(path_tpl[pos : m.start()]))
+        var = re.sub(r"\W", "_", m.group(1))
+        parts.append(f"(?P<{var}>[^/]+)")
+        pos = m.end()
+    parts.append(re.escape(path_tpl[pos:]))
+    return "^" + "".join(parts) + "$"
+
+
+def _routing(spec: Dict[str, Any]) -> Dict[str, str]:  # noqa: D401
+    # Mirrors executor.prepare_request: template placeholders count as path
+    # params even when the spec forgot to declare them.
+    routing: Dict[str, str] = {}
+    for name in (spec.get("query_params") or {}):
+        routing[name] = "query"
+    for name in set(_PATH_VAR_RE.findall(spec.get("path", "/"))) | set(
+        (spec.get("path_params") or {}).keys()
+    ):
+        routing[name] = "path"
+    if spec.get("request_body"):
+        routing["body"] = "body"
+    return routing
+
+
+def compile_registry(db_path: str | Path) -> Registry:  # noqa: D401
+    """Build a :class:`Registry` straight from the SectionStore."""
+
+    # Imported here to avoid a converter <-> registry import cycle.
+    from .converter import _build_fn_schema, _parse_yaml, _safe_name
+
+    store = _open_store(db_path)
+    fingerprint = store.fingerprint()
+    entries: List[ToolEntry] = []
+
+    # One streamed statement for the whole catalog instead of list_ids() +
+    # get() per row.
+    for row in store.iter_rows():
+        row_id = row["id"]
+        spec = _parse_yaml(row["content"])
+        method: str = spec.get("method", "GET").upper()
+        path: str = spec.get("path", "/")
+        name = _safe_name(f"{method}_{path}")
+        entries.append(
+            ToolEntry(
+                name=name,
+                row_id=row_id,
+                spec=spec,
+                fn_schema=_build_fn_schema(name, spec),
+                path_regex=_path_regex(path),
+                routing=_routing(spec),
+            )
+        )
+
+    store.close()
+    return Registry(entries, fingerprint)
+
+
+def _open_store(db_path: str | Path) -> SectionStore:  # noqa: D401
+    """Open *db_path* read-only; fall back to a writable store if that fails.
+
+    Loading never writes, so read-only files and mounts work.  The fallback
+    covers a missing database or one written before revisions were tracked
+    (no ``store_state``), which the writable open creates or upgrades.
+    """
+
+    store = SectionStore(db_path, read_only=True)
+    try:
+        store.revision()
+    except sqlite3.OperationalError:
+        store.close()
+        return SectionStore(db_path)
+    return store
+
+
+def default_artifact_path(db_path: str | Path) -> Path:  # noqa: D401
+    p = Path(str(db_path)[10:] if str(db_path).startswith("sqlite:///") else db_path)
+    return p.with_suffix(".registry.json")
+
+
+def save_registry(registry: Registry, artifact_path: str | Path) -> None:  # noqa: D401
+    """Write *registry* atomically so concurrent readers never see a torn file."""
+
+    artifact_path = Path(artifact_path)
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "version": REGISTRY_VERSION,
+        "fingerprint": registry.fingerprint,
+        "entries": [e.to_json() for e in registry.entries],
+    }
+    tmp = artifact_path.with_name(f".{artifact_path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, artifact_path)
+
+
+def _read_artifact(artifact_path: Path) -> Optional[Dict[str, Any]]:  # noqa: D401
+    try:
+        data = json.loads(artifact_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != REGISTRY_VERSION:
+        return None
+    return data
+
+
+def load_registry(
+    db_path: str | Path = "sections.db",
+    *,
+    artifact_path: str | Path | None = None,
+    rebuild: bool = False,
+) -> Registry:  # noqa: D401
+    """Return the compiled registry, rebuilding the artefact when stale."""
+
+    artifact = Path(artifact_path) if artifact_path else default_artifact_path(db_path)
+
+    with span("registry.load", **{"db.path": str(db_path)}) as load_span:
+        if not rebuild:
+            with _open_store(db_path) as store:
+                current = store.fingerprint()
+            data = _read_artifact(artifact)
+            if data is not None and data.get("fingerprint") == current:
+                load_span.set_attribute("registry.rebuilt", False)
+                return Registry(
+                    [ToolEntry(**e) for e in data.get("entries", [])], current
+                )
+
+        load_span.set_attribute("registry.rebuilt", True)
+        registry = compile_registry(db_path)
+        try:
+            save_registry(registry, artifact)
+        except OSError:  # pragma: no cover – read-only deployments still work
+            pass
+        return registry
+
+
+def _main(argv):  # noqa: D401 – mini CLI
+    if len(argv) < 2:
+        print(
+            "Usage: python -m llm_pipeline.registry <db_path> [artifact_path]",
+            file=sys.stderr,
+        )
+        raise SystemExit(1)
+
+    t0 = time.time()
+    artifact = argv[2] if len(argv) > 2 else None
+    registry = load_registry(argv[1], artifact_path=artifact, rebuild=True)
+    out = artifact or default_artifact_path(argv[1])
+    print(f"Compiled {len(registry)} tools into {out} in {time.time() - t0:.2f}s")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _main(sys.argv)
@@ -0,0 +1,284 @@
+"""TTL + LRU cache for upstream endpoint responses.
+
+Many conversations issue byte-for-byte identical requests (the agency
+list, the same ``spending_by_category`` body, …).  Putting a cache in
+front of :func:`llm_pipeline.executor.call_endpoint` answers those from
+memory instead of going back to the live API.
+
+Keys are derived from the *canonical* request – method, filled URL,
+sorted query params and the body serialised with sorted keys – so
+argument order produced by the model does not matter.
+
+Two backends share the same interface:
+
+* :class:`MemoryCache` – in-process ``OrderedDict``; fastest, lost on exit.
+* :class:`SQLiteCache` – on-disk table that survives restarts and can be
+  shared by several worker processes on the same host.
+
+Both evict least-recently-used entries once the stored payload exceeds
+*max_bytes*, honour per-endpoint TTLs and keep hit/miss counters.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+
+# USAspending exposes its read-only searches as POST endpoints, so POST is
+# cacheable by default.  Narrow this via ``cacheable_methods`` for APIs
+# where POST has side effects.
+DEFAULT_CACHEABLE_METHODS = frozenset({"GET", "HEAD", "POST"})
+
+
+def cache_key(method: str, url: str, params: Mapping[str, Any] | None, body: Any) -> str:  # noqa: D401
+    """Return a stable hex digest identifying the request."""
+
+    canonical = json.dumps(
+        [
+            method.upper(),
+            url,
+            sorted((str(k), v) for k, v in (params or {}).items()),
+            body,
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:  # noqa: D401
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    """Base class: TTL resolution, (de)serialisation and hit/miss counters.
+
+    Concrete backends only implement the raw byte-level storage hooks.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: float = 300.0,
+        ttls: Optional[Mapping[str, float]] = None,
+        cacheable_methods: Iterable[str] = DEFAULT_CACHEABLE_METHODS,
+    ) -> None:  # noqa: D401
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # Per-endpoint TTLs keyed by the *spec* path template (e.g.
+        # "/api/v2/references/toptier_agencies/").  A key ending in "*"
+        # acts as a prefix match; the longest matching prefix wins.
+        self.ttls: Dict[str, float] = dict(ttls or {})
+        self.cacheable_methods = frozenset(m.upper() for m in cacheable_methods)
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Policy helpers
+    # ------------------------------------------------------------------
+
+    def is_cacheable(self, method: str) -> bool:  # noqa: D401
+        return method.upper() in self.cacheable_methods
+
+    def ttl_for(self, path_tpl: str) -> float:  # noqa: D401
+        if path_tpl in self.ttls:
+            return self.ttls[path_tpl]
+        best: Tuple[int, float] | None = None
+        for pattern, ttl in self.ttls.items():
+            if pattern.endswith("*") and path_tpl.startswith(pattern[:-1]):
+                if best is None or len(pattern) > best[0]:
+                    best = (len(pattern), ttl)
+        return best[1] if best else self.default_ttl
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:  # noqa: D401
+        raw = self._get_raw(key, time.time())
+        with self._lock:
+            if raw is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:  # noqa: D401
+        if ttl <= 0:
+            return
+        raw = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+        if len(raw) > self.max_bytes:
+            return  # would evict everything else – not worth it
+        self._set_raw(key, raw, time.time() + ttl)
+        with self._lock:
+            self.stats.stores += 1
+
+    # Backend hooks -----------------------------------------------------
+
+    def _get_raw(self, key: str, now: float) -> Optional[bytes]:  # pragma: no cover
+        raise NotImplementedError
+
+    def _set_raw(self, key: str, raw: bytes, expires_at: float) -> None:  # pragma: no cover
+        raise NotImplementedError
+
+    def clear(self) -> None:  # pragma: no cover
+        raise NotImplementedError
+
+
+class MemoryCache(ResponseCache):
+    """In-process LRU cache bounded by total payload size."""
+
+    def __init__(self, **kwargs) -> None:  # noqa: D401
+        super().__init__(**kwargs)
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:  # noqa: D401
+        return self._bytes
+
+    def _get_raw(self, key: str, now: float) -> Optional[bytes]:  # noqa: D401
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at <= now:
+                del self._data[key]
+                self._bytes -= len(raw)
+                return None
+            self._data.move_to_end(key)
+            return raw
+
+    def _set_raw(self, key: str, raw: bytes, expires_at: float) -> None:  # noqa: D401
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._data[key] = (expires_at, raw)
+            self._bytes += len(raw)
+            while self._bytes > self.max_bytes and self._data:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:  # noqa: D401
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+class SQLiteCache(ResponseCache):
+    """On-disk cache stored in a single SQLite table.
+
+    Recency is tracked via an ``accessed_at`` column; eviction deletes the
+    oldest-accessed rows until the total payload fits into *max_bytes*.
+    """
+
+    def __init__(self, path: str | Path, **kwargs) -> None:  # noqa: D401
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key          TEXT PRIMARY KEY,
+                value        BLOB NOT NULL,
+                size         INTEGER NOT NULL,
+                expires_at   REAL NOT NULL,
+                accessed_at  REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS response_cache_accessed ON response_cache(accessed_at)"
+        )
+
+    @property
+    def size_bytes(self) -> int:  # noqa: D401
+        with self._lock:
+            row = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()
+        return int(row[0])
+
+    def _get_raw(self, key: str, now: float) -> Optional[bytes]:  # noqa: D401
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self.conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            self.conn.execute(
+                "UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return bytes(row[0])
+
+    def _set_raw(self, key: str, raw: bytes, expires_at: float) -> None:  # noqa: D401
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    """
+                    INSERT INTO response_cache(key, value, size, expires_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                      value       = excluded.value,
+                      size        = excluded.size,
+                      expires_at  = excluded.expires_at,
+                      accessed_at = excluded.accessed_at
+                    """,
+                    (key, raw, len(raw), expires_at, now),
+                )
+                self._evict(now)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, now: float) -> None:  # noqa: D401 – caller holds lock + txn
+        self.conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM response_cache ORDER BY accessed_at"
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self.conn.executemany("DELETE FROM response_cache WHERE key = ?", victims)
+        self.stats.evictions += len(victims)
+
+    def clear(self) -> None:  # noqa: D401
+        with self._lock:
+            self.conn.execute("DELETE FROM response_cache")
+
+    def close(self) -> None:  # noqa: D401
+        self.conn.close()
@@ -2,43 +2,290 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import queue
 import sqlite3
+import threading
 import time
+import uuid
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
 
 ISO_FMT = "%Y-%m-%dT%H:%M:%SZ"
 
+_UPSERT_SQL = """
+    INSERT INTO sections(
+        id, content, meta, created_at, updated_at,
+        source_path, source_hash, extractor_version
+    )
+    VALUES (
+        :id, :content, :meta, :now, :now,
+        :source_path, :source_hash, :extractor_version
+    )
+    ON CONFLICT(id) DO UPDATE SET
+      content           = excluded.content,
+      meta              = excluded.meta,
+      updated_at        = excluded.updated_at,
+      source_path       = excluded.source_path,
+      source_hash       = excluded.source_hash,
+      extractor_version = excluded.extractor_version
+"""
+
+# Provenance columns added after the initial schema; created on demand for
+# databases written by older versions.
+_PROVENANCE_COLUMNS = ("source_path", "source_hash", "extractor_version")
+
+# Stay below SQLite's default host-parameter limit (999).
+_MAX_VARS = 900
+
+# Every insert/update/delete bumps the store-wide ``store_state.rev``
+# counter and stamps changed rows with the new value (``sections.rev``).
+# Unlike ``updated_at`` (whole seconds) this orders and detects every write,
+# including ones made by other processes or older code paths.
+_REV_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS sections_rev_insert AFTER INSERT ON sections
+    BEGIN
+        UPDATE store_state SET rev = rev + 1;
+        UPDATE sections SET rev = (SELECT rev FROM store_state) WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sections_rev_update
+    AFTER UPDATE OF id, content, meta, updated_at, source_path, source_hash, extractor_version
+    ON sections
+    BEGIN
+        UPDATE store_state SET rev = rev + 1;
+        UPDATE sections SET rev = (SELECT rev FROM store_state) WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sections_rev_delete AFTER DELETE ON sections
+    BEGIN
+        UPDATE store_state SET rev = rev + 1;
+    END
+    """,
+)
+
 
 def _utcnow() -> str:  # pragma: no cover – trivial
     return time.strftime(ISO_FMT, time.gmtime())
 
 
+def source_hash(path: str | Path) -> str:  # noqa: D401
+    """SHA-256 of the file at *path* – used to detect unchanged sources."""
+
+    h = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def section_rows(
+    doc_path: str | Path,
+    raw: bytes,
+    specs: Sequence[Any],
+    *,
+    extractor_version: str,
+    source: str,
+) -> List[Dict[str, Any]]:  # noqa: D401
+    """Build store rows (incl. provenance) for the specs extracted from a file.
+
+    *specs* are :class:`~llm_pipeline.models.ExtractedSpec` instances.  A
+    document yielding a single endpoint keeps its path as row id; with
+    several endpoints each row id is suffixed with ``#METHOD /path``.
+    """
+
+    digest = hashlib.sha256(raw).hexdigest()
+    rows = []
+    for spec in specs:
+        row_id = str(doc_path)
+        if len(specs) > 1:
+            row_id = f"{doc_path}#{spec.method.upper()} {spec.path}"
+        rows.append(
+            dict(
+                id=row_id,
+                # pydantic v2's `model_dump_json` no longer supports the
+                # `ensure_ascii` keyword, so we simply omit it. The default
+                # behaviour already avoids escaping non-ASCII characters.
+                content=spec.model_dump_json(indent=2),
+                meta={"source": source},
+                source_path=str(doc_path),
+                source_hash=digest,
+                extractor_version=extractor_version,
+            )
+        )
+    return rows
+
+
+def _row_params(row: Mapping[str, Any], now: str) -> Dict[str, Any]:  # noqa: D401
+    return {
+        "id": row["id"],
+        "content": row["content"],
+        "meta": json.dumps(row.get("meta") or {}),
+        "now": now,
+        "source_path": row.get("source_path"),
+        "source_hash": row.get("source_hash"),
+        "extractor_version": row.get("extractor_version"),
+    }
+
+
+# Applied to every connection.  WAL lets readers proceed while a writer
+# commits; synchronous=NORMAL is durable across application crashes in WAL
+# mode and avoids an fsync per transaction.
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # KiB (negative) -> 64 MiB page cache
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 10000,  # ms to wait on a locked DB instead of failing
+}
+
+
+class _Replace(NamedTuple):
+    source_path: str
+    rows: List[Mapping[str, Any]]
+
+
 class SectionStore:
-    def __init__(self, db_url: str | Path = "store.db") -> None:  # noqa: D401
+    """SQLite-backed catalog of extracted endpoint specs.
+
+    Each thread transparently gets its own connection (``self.conn``), so
+    one store instance may be shared by a thread pool.  Heavy concurrent
+    writers should go through :class:`SectionWriter` instead of calling
+    :meth:`upsert` from many threads.
+
+    With *read_only* the database must already exist; it is opened with
+    ``mode=ro`` and neither the schema nor the journal mode is touched, so
+    read-only files and mounts work.
+    """
+
+    def __init__(
+        self,
+        db_url: str | Path = "store.db",
+        *,
+        pragmas: Optional[Mapping[str, Any]] = None,
+        read_only: bool = False,
+    ) -> None:  # noqa: D401
         if str(db_url).startswith("sqlite:///"):
             db_url = str(db_url)[10:]
 
         self.path = Path(db_url)
-        self.conn = sqlite3.connect(self.path)
-        self.conn.row_factory = sqlite3.Row
-        self._ensure_schema()
+        self.read_only = read_only
+        self.pragmas: Dict[str, Any] = dict(DEFAULT_PRAGMAS)
+        self.pragmas.update(pragmas or {})
+        if read_only:
+            self.pragmas.pop("journal_mode", None)
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        if not read_only:
+            self._ensure_schema()
+
+    @property
+    def conn(self) -> sqlite3.Connection:  # noqa: D401
+        """Connection owned by the calling thread (opened on first use)."""
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only so close() may run on any thread;
+            # each connection is otherwise used by its owning thread alone.
+            if self.read_only:
+                uri = f"{self.path.resolve().as_uri()}?mode=ro"
+                conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            else:
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for key, val in self.pragmas.items():
+                conn.execute(f"PRAGMA {key}={val}")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def close(self) -> None:  # noqa: D401
+        """Close the connections of *all* threads."""
+
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+    def upsert(
+        self,
+        *,
+        id: str,
+        content: str,
+        meta: dict | None = None,
+        source_path: str | None = None,
+        source_hash: str | None = None,
+        extractor_version: str | None = None,
+    ) -> None:
+        row = {
+            "id": id,
+            "content": content,
+            "meta": meta,
+            "source_path": source_path,
+            "source_hash": source_hash,
+            "extractor_version": extractor_version,
+        }
+        self.bulk_upsert([row])
+
+    def bulk_upsert(self, rows: Iterable[Mapping[str, Any]]) -> int:  # noqa: D401
+        """Upsert many ``{id, content, meta, …}`` rows in a single transaction.
+
+        Rows may carry the optional provenance keys accepted by
+        :meth:`upsert`.  Returns the number of rows written.
+        """
+
+        return self._apply(list(rows))
+
+    def replace_source(
+        self, source_path: str, rows: Iterable[Mapping[str, Any]]
+    ) -> int:  # noqa: D401
+        """Atomically replace every row extracted from *source_path*.
+
+        Used when one source document yields several endpoint rows so rows
+        for endpoints that disappeared from the document do not linger.
+        """
+
+        return self._apply([_Replace(source_path, list(rows))])
+
+    def replace_sources(self, rows_by_source: Mapping[str, Iterable[Mapping[str, Any]]]) -> int:  # noqa: D401
+        """:meth:`replace_source` for many sources in a single transaction."""
+
+        return self._apply([_Replace(src, list(rows)) for src, rows in rows_by_source.items()])
+
+    def _apply(self, items: List[Any]) -> int:  # noqa: D401
+        """Write a mix of plain rows and :class:`_Replace` ops in one txn."""
 
-    def upsert(self, *, id: str, content: str, meta: dict | None = None) -> None:
         now = _utcnow()
-        meta_json = json.dumps(meta or {})
+        written = 0
         with self.conn:
-            self.conn.execute(
-                """
-                INSERT INTO sections(id, content, meta, created_at, updated_at)
-                VALUES (:id, :content, :meta, :now, :now)
-                ON CONFLICT(id) DO UPDATE SET
-                  content    = excluded.content,
-                  meta       = excluded.meta,
-                  updated_at = excluded.updated_at
-                """,
-                {"id": id, "content": content, "meta": meta_json, "now": now},
-            )
+            pending: List[Dict[str, Any]] = []
+            for item in items:
+                if isinstance(item, _Replace):
+                    if pending:
+                        self.conn.executemany(_UPSERT_SQL, pending)
+                        written += len(pending)
+                        pending = []
+                    self.conn.execute(
+                        "DELETE FROM sections WHERE COALESCE(source_path, id) = ?",
+                        (item.source_path,),
+                    )
+                    params = [_row_params(r, now) for r in item.rows]
+                    self.conn.executemany(_UPSERT_SQL, params)
+                    written += len(params)
+                else:
+                    pending.append(_row_params(item, now))
+            if pending:
+                self.conn.executemany(_UPSERT_SQL, pending)
+                written += len(pending)
+        return written
 
     def get(self, id: str):  # noqa: D401
         cur = self.conn.execute("SELECT * FROM sections WHERE id = ?", (id,))
@@ -49,6 +296,76 @@ class SectionStore:
         cur = self.conn.execute("SELECT id FROM sections ORDER BY id")
         return [r[0] for r in cur.fetchall()]
 
+    def iter_rows(self, *, batch_size: int = 500, after_rev: Optional[int] = None) -> Iterator[dict]:  # noqa: D401
+        """Stream rows ordered by id, fetching *batch_size* at a time.
+
+        With *after_rev* (a :meth:`revision`) only rows written after that
+        revision are returned.  Memory use is bounded by *batch_size*
+        regardless of catalog size.
+        """
+
+        if after_rev is None:
+            cur = self.conn.execute("SELECT * FROM sections ORDER BY id")
+        else:
+            cur = self.conn.execute(
+                "SELECT * FROM sections WHERE rev > ? ORDER BY id", (after_rev,)
+            )
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                break
+            for row in batch:
+                yield dict(row)
+
+    def source_index(self) -> Dict[str, Tuple[Optional[str], Optional[str]]]:  # noqa: D401
+        """Return ``{source_path: (source_hash, extractor_version)}``.
+
+        Rows written before provenance was tracked fall back to their id as
+        source path and report ``(None, None)`` so they are re-extracted once.
+        """
+
+        cur = self.conn.execute(
+            "SELECT COALESCE(source_path, id), source_hash, extractor_version FROM sections"
+        )
+        return {r[0]: (r[1], r[2]) for r in cur}
+
+    def delete_sources(self, source_paths: Iterable[str]) -> int:  # noqa: D401
+        """Delete every row extracted from one of *source_paths*."""
+
+        paths = list(source_paths)
+        deleted = 0
+        with self.conn:
+            for i in range(0, len(paths), _MAX_VARS):
+                chunk = paths[i : i + _MAX_VARS]
+                marks = ",".join("?" * len(chunk))
+                cur = self.conn.execute(
+                    f"DELETE FROM sections WHERE COALESCE(source_path, id) IN ({marks})",
+                    chunk,
+                )
+                deleted += cur.rowcount
+        return deleted
+
+    def identity(self) -> str:  # noqa: D401
+        """Random id fixed when the database was created (revisions are per identity)."""
+
+        return self.conn.execute("SELECT uid FROM store_state").fetchone()[0]
+
+    def revision(self) -> int:  # noqa: D401
+        """Store-wide change counter; grows with every row written or deleted."""
+
+        return self.conn.execute("SELECT rev FROM store_state").fetchone()[0]
+
+    def fingerprint(self) -> str:  # noqa: D401
+        """Cheap digest that changes whenever any row is added/updated/removed.
+
+        Combines the store's random identity with :meth:`revision`, so it is
+        a single-row read however large the catalog is, and catches writes
+        within the same second that keep the content length.
+        """
+
+        uid, rev = self.conn.execute("SELECT uid, rev FROM store_state").fetchone()
+        return hashlib.sha256(f"{uid}\x1f{rev}".encode("utf-8")).hexdigest()
+
     def _ensure_schema(self) -> None:  # noqa: D401
         self.conn.execute(
             """
@@ -61,11 +378,142 @@ class SectionStore:
             )
             """
         )
+        existing = {r[1] for r in self.conn.execute("PRAGMA table_info(sections)")}
+        for col in _PROVENANCE_COLUMNS:
+            if col not in existing:
+                self.conn.execute(f"ALTER TABLE sections ADD COLUMN {col} TEXT")
+        if "rev" not in existing:
+            self.conn.execute("ALTER TABLE sections ADD COLUMN rev INTEGER")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS store_state (
+                id   INTEGER PRIMARY KEY CHECK (id = 0),
+                uid  TEXT NOT NULL,
+                rev  INTEGER NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "INSERT OR IGNORE INTO store_state(id, uid, rev) VALUES (0, ?, 0)",
+            (uuid.uuid4().hex,),
+        )
+        for trigger in _REV_TRIGGERS:
+            self.conn.execute(trigger)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS sections_updated_at ON sections(updated_at)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS sections_source_path ON sections(source_path)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sections_rev ON sections(rev)")
         self.conn.commit()
 
     def __enter__(self):  # noqa: D401
         return self
 
     def __exit__(self, exc_type, exc, tb):  # noqa: D401
-        self.conn.close()
+        self.close()
+
+
+class SectionWriter:
+    """Background single-writer queue with group commits.
+
+    Many extraction threads calling :meth:`SectionStore.upsert` at once
+    fight over SQLite's write lock.  Instead they call :meth:`upsert` on a
+    shared writer, which only enqueues the row; one dedicated thread drains
+    the queue and writes up to *max_batch* queued items per transaction::
+
+        with SectionWriter("sections.db") as writer:
+            pool.map(lambda p: run_extraction(p, db, store=writer), files)
+
+    ``upsert`` has the same signature as the store's, so the writer can be
+    passed wherever a store is expected for writing.  Exceptions raised by
+    the writer thread are re-raised from :meth:`flush` / :meth:`close`.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        store: "SectionStore | str | Path",
+        *,
+        max_batch: int = 256,
+        max_delay: float = 0.05,
+    ) -> None:  # noqa: D401
+        self._owns_store = not isinstance(store, SectionStore)
+        self.store = SectionStore(store) if self._owns_store else store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, name="SectionWriter", daemon=True
+        )
+        self._thread.start()
+
+    def upsert(self, *, id: str, content: str, meta: dict | None = None, **provenance) -> None:  # noqa: D401
+        self._raise_pending()
+        self._queue.put({"id": id, "content": content, "meta": meta, **provenance})
+
+    def replace_source(self, source_path: str, rows: Iterable[Mapping[str, Any]]) -> None:  # noqa: D401
+        """Queue :meth:`SectionStore.replace_source` (applied atomically)."""
+
+        self._raise_pending()
+        self._queue.put(_Replace(source_path, list(rows)))
+
+    def flush(self) -> None:  # noqa: D401
+        """Block until every queued row has been committed."""
+
+        self._queue.join()
+        self._raise_pending()
+
+    def close(self) -> None:  # noqa: D401
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        if self._owns_store:
+            self.store.close()
+        self._raise_pending()
+
+    def _raise_pending(self) -> None:  # noqa: D401
+        if self._error is not None:
+            err, self._error = self._error, None
+            raise err
+
+    def _run(self) -> None:  # noqa: D401 – writer thread
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch: List[Any] = []
+            taken = 1
+            if item is self._STOP:
+                stop = True
+            else:
+                batch.append(item)
+                # Group commit: collect whatever arrives within max_delay.
+                deadline = time.monotonic() + self.max_delay
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if item is self._STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+            try:
+                if batch:
+                    self.store._apply(batch)
+            except BaseException as exc:  # noqa: BLE001 – surfaced via flush()
+                self._error = exc
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def __enter__(self):  # noqa: D401
+        return self
+
+    def __exit__(self, exc_type, exc, tb):  # noqa: D401
+        self.close()
 
@@ -0,0 +1,149 @@
+"""Shape raw endpoint responses into compact, token-budgeted tool results.
+
+Endpoints such as ``spending_by_award`` or ``spending_over_time`` happily
+return tens of thousands of tokens of JSON.  Handing that verbatim to the
+model is slow and expensive, so :func:`shape_result` post-processes every
+tool result using the ``response.json_schema`` stored in the spec:
+
+1. **projection** – object keys not declared in the schema are dropped
+   (objects without declared properties are kept as-is);
+2. **row limits** – lists longer than ``max_rows`` are cut and end with a
+   ``"… N more"`` marker so the model knows data was omitted;
+3. **rounding** – floats are rounded to ``float_digits`` decimals and long
+   strings are clipped to ``max_string`` characters;
+4. **token budget** – while the estimated size still exceeds
+   ``token_budget`` the row and string limits are halved; as a last resort
+   the serialised JSON is cut at the budget.
+
+Non-JSON bodies are whitespace-collapsed and cut at the budget instead of
+the old fixed 1000 characters.
+
+The cache always stores the *unshaped* response, so callers with different
+:class:`ShapeConfig` values share cache entries.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+_WS_RE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class ShapeConfig:
+    """Knobs for :func:`shape_result`; ``token_budget=0`` disables the budget."""
+
+    token_budget: int = 2000
+    max_rows: int = 25
+    float_digits: int = 2
+    max_string: int = 500
+    project: bool = True
+    chars_per_token: float = 4.0
+
+
+DEFAULT_SHAPE_CONFIG = ShapeConfig()
+
+# Lower bounds for the budget loop – below these the result stops being useful.
+_MIN_ROWS = 1
+_MIN_STRING = 40
+
+
+def estimate_tokens(value: Any, chars_per_token: float = 4.0) -> int:  # noqa: D401
+    """Cheap size estimate of *value* once serialised as compact JSON."""
+
+    text = value if isinstance(value, str) else _dumps(value)
+    return int(len(text) / chars_per_token) + 1
+
+
+def _dumps(value: Any) -> str:  # noqa: D401
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _more(n: int) -> str:  # noqa: D401
+    return f"… {n} more"
+
+
+def _shape(value: Any, schema: Optional[Dict[str, Any]], cfg: ShapeConfig, rows: int, max_string: int) -> Any:  # noqa: D401
+    if isinstance(value, dict):
+        props = schema.get("properties") if cfg.project and isinstance(schema, dict) else None
+        out: Dict[str, Any] = {}
+        for key, item in value.items():
+            if props and key not in props:
+                continue
+            out[key] = _shape(item, props.get(key) if props else None, cfg, rows, max_string)
+        if value and not out:
+            # Schema and payload disagree entirely – better unprojected than empty.
+            return _shape(value, None, cfg, rows, max_string)
+        return out
+    if isinstance(value, list):
+        items = schema.get("items") if isinstance(schema, dict) else None
+        shaped = [_shape(v, items, cfg, rows, max_string) for v in value[:rows]]
+        if len(value) > rows:
+            shaped.append(_more(len(value) - rows))
+        return shaped
+    if isinstance(value, float):
+        return round(value, cfg.float_digits)
+    if isinstance(value, str) and len(value) > max_string:
+        return value[:max_string] + "…"
+    return value
+
+
+def shape_body(body: Any, schema: Optional[Dict[str, Any]] = None, config: ShapeConfig = DEFAULT_SHAPE_CONFIG) -> Any:  # noqa: D401
+    """Return a compact version of *body* (JSON value or text)."""
+
+    budget_chars = int(config.token_budget * config.chars_per_token)
+
+    if isinstance(body, (bytes, str)):
+        text = body.decode("utf-8", "replace") if isinstance(body, bytes) else body
+        text = _WS_RE.sub(" ", text).strip()
+        if config.token_budget and len(text) > budget_chars:
+            return text[:budget_chars] + f" … [{len(text) - budget_chars} more chars]"
+        return text
+
+    rows, max_string = config.max_rows, config.max_string
+    shaped = _shape(body, schema, config, rows, max_string)
+    if not config.token_budget:
+        return shaped
+
+    while estimate_tokens(shaped, config.chars_per_token) > config.token_budget:
+        if rows > _MIN_ROWS:
+            rows = max(_MIN_ROWS, rows // 2)
+        elif max_string > _MIN_STRING:
+            max_string = max(_MIN_STRING, max_string // 2)
+        else:
+            # Wide single rows – give up on structure and cut the JSON text.
+            text = _dumps(shaped)
+            return text[:budget_chars] + f" … [{len(text) - budget_chars} more chars]"
+        shaped = _shape(body, schema, config, rows, max_string)
+    return shaped
+
+
+def response_schema(spec: Dict[str, Any]) -> Optional[Dict[str, Any]]:  # noqa: D401
+    response = spec.get("response") or {}
+    schema = response.get("json_schema") if isinstance(response, dict) else None
+    return schema if isinstance(schema, dict) else None
+
+
+def shape_result(
+    result: Dict[str, Any],
+    spec: Dict[str, Any],
+    config: Optional[ShapeConfig] = DEFAULT_SHAPE_CONFIG,
+) -> Dict[str, Any]:  # noqa: D401
+    """Return a copy of the executor *result* with its body shaped.
+
+    ``config=None`` returns *result* unchanged.  Error responses are only
+    budgeted, never projected – their bodies do not follow the success
+    schema.
+    """
+
+    if config is None:
+        return result
+    ok = 200 <= result.get("status_code", 200) < 300
+    schema = response_schema(spec) if ok else None
+    body = shape_body(result.get("body"), schema, config)
+    shaped = dict(result)
+    shaped["body"] = body
+    return shaped
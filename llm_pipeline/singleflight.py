@@ -0,0 +1,139 @@
+"""Coalesce identical in-flight upstream requests ("single flight").
+
+When several conversations ask for the same agency or fiscal year at the
+same moment, every tool call used to hit the upstream API.  A
+:class:`SingleFlight` group lets the first caller for a key (the
+*leader*) perform the request while concurrent callers with the same key
+block until it finishes and receive the same result – or the same
+exception.  Once the leader is done the key is forgotten; caching results
+beyond that is the job of :mod:`llm_pipeline.response_cache`.
+
+Keys are the canonical request keys from
+:func:`llm_pipeline.executor.request_key`.  The executors use the
+module-level groups :data:`DEFAULT_GROUP` and :data:`DEFAULT_ASYNC_GROUP`
+unless ``coalesce=None`` is passed.  A group only coalesces the *methods*
+it was built with – ``GET`` and ``HEAD`` by default; opt in to POST for
+APIs whose POST endpoints are read-only searches (such as USAspending)
+with ``SingleFlight(methods={"GET", "HEAD", "POST"})``.
+
+Shared results are handed out as shallow copies; treat nested values as
+read-only.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# Safe methods only: coalescing a POST with side effects would silently
+# drop all but one of the concurrent calls.
+DEFAULT_COALESCE_METHODS = frozenset({"GET", "HEAD"})
+
+
+@dataclass
+class FlightStats:
+    leaders: int = 0  # upstream calls actually made
+    shared: int = 0  # callers served by another caller's request
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:  # noqa: D401
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread-based single-flight group."""
+
+    def __init__(self, methods: Iterable[str] = DEFAULT_COALESCE_METHODS) -> None:  # noqa: D401
+        self.methods = frozenset(m.upper() for m in methods)
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = FlightStats()
+
+    def coalesces(self, method: str) -> bool:  # noqa: D401
+        return method.upper() in self.methods
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:  # noqa: D401
+        """Run *fn* once per concurrent *key*; return *(result, shared)*."""
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats.leaders += 1
+            else:
+                self.stats.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:  # noqa: BLE001 – re-raised for every waiter
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:  # noqa: D401
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Asyncio single-flight group (safe to share across event loops)."""
+
+    def __init__(self, methods: Iterable[str] = DEFAULT_COALESCE_METHODS) -> None:  # noqa: D401
+        self.methods = frozenset(m.upper() for m in methods)
+        self._calls: Dict[Tuple[int, Hashable], "asyncio.Future"] = {}
+        self.stats = FlightStats()
+
+    def coalesces(self, method: str) -> bool:  # noqa: D401
+        return method.upper() in self.methods
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:  # noqa: D401
+        """Await *fn()* once per concurrent *key*; return *(result, shared)*.
+
+        The upstream call runs in its own task, so a cancelled caller
+        (leader or follower) does not cancel it for the others.
+        """
+
+        import asyncio  # lazy – keeps the sync executor's import light
+
+        loop = asyncio.get_running_loop()
+        full_key = (id(loop), key)
+        task = self._calls.get(full_key)
+        shared = task is not None
+        if shared:
+            self.stats.shared += 1
+        else:
+            self.stats.leaders += 1
+            task = loop.create_task(fn())
+            self._calls[full_key] = task
+            task.add_done_callback(lambda t: self._forget(full_key, t))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, full_key: Tuple[int, Hashable], task: "asyncio.Future") -> None:  # noqa: D401
+        if self._calls.get(full_key) is task:
+            del self._calls[full_key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    def in_flight(self) -> int:  # noqa: D401
+        return len(self._calls)
+
+
+DEFAULT_GROUP = SingleFlight()
+DEFAULT_ASYNC_GROUP = AsyncSingleFlight()
@@ -2,20 +2,45 @@
 
 Usage::
 
-    python -m llm_pipeline.smoke_test <db_path> <base_url> [limit]
-
-If *limit* is provided only the first *N* endpoints are tested.
+    python -m llm_pipeline.smoke_test <db_path> [base_url] [limit]
+        [--concurrency N] [--repeat N] [--timeout S]
+        [--report report.json|report.csv] [--baseline old.json]
+        [--cassette c.db [--record]]
+
+If *limit* is provided only the first *N* endpoints are tested.  Every
+endpoint is called *repeat* times by a pool of *concurrency* workers. Each
+endpoint's p50/p90/p99 latency, payload size and status codes are
+collected and written to a machine-readable report.  The report is JSON, or
+CSV when the path ends in ``.csv``, with rows sorted by endpoint id so two
+runs diff cleanly.  With ``--baseline`` the run is compared against an
+earlier JSON report, and endpoints whose p90 regressed are listed.
+
+Point *base_url* at a local stub server (e.g. ``http://127.0.0.1:8000``)
+to benchmark the gateway without touching the public API.  Alternatively,
+``--cassette`` replays responses recorded earlier with ``--record`` (see
+:mod:`llm_pipeline.cassette`).
 """
 
 # Smoke-test helper that pings every endpoint stored in ``SectionStore`` and
-# records the result in a timestamped log file (``./logs/smoke_test_<ts>.log``
-# by default).
+# records the result in a log file (``<OUTPUT_ROOT>/smoke_test.log``) plus
+# an optional JSON/CSV report.
 
 from __future__ import annotations
 
+import argparse
+import csv
+import datetime
+import json
+import math
+import re
 import sys
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 # Centralised output directory helper
 from llm_pipeline.config import get_output_root  # type: ignore
@@ -29,26 +54,258 @@ from section_store import SectionStore
 
 try:
     from executor import call_endpoint  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover – package context
+except ImportError:  # pragma: no cover – package context
     from llm_pipeline.executor import call_endpoint  # type: ignore
 
-import datetime
+from llm_pipeline.converter import _parse_yaml  # type: ignore
+from llm_pipeline.http_session import PoolConfig, get_session  # type: ignore
+
+
+_PATH_VAR_RE = re.compile(r"{([^}]+)}")
+
+REPORT_FIELDS = (
+    "id",
+    "method",
+    "path",
+    "calls",
+    "ok",
+    "failed",
+    "statuses",
+    "p50_ms",
+    "p90_ms",
+    "p99_ms",
+    "mean_ms",
+    "max_ms",
+    "bytes",
+)
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class EndpointStats:
+    id: str
+    method: str
+    path: str
+    latencies: List[float] = field(default_factory=list)  # seconds
+    statuses: Counter = field(default_factory=Counter)  # "200", "EXC", …
+    sizes: List[int] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    # ``--repeat`` has several workers recording into the same instance.
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(
+        self,
+        latency: float,
+        status: str,
+        *,
+        size: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> None:  # noqa: D401
+        """Add one call's outcome; safe to call from several threads."""
+
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[status] += 1
+            if size is not None:
+                self.sizes.append(size)
+            if error is not None:
+                self.errors.append(error)
+
+    @property
+    def ok(self) -> int:  # noqa: D401
+        return sum(n for s, n in self.statuses.items() if s.isdigit() and int(s) < 500)
+
+    def row(self) -> Dict[str, Any]:  # noqa: D401
+        """Flat, diff-friendly summary (milliseconds, rounded)."""
+
+        lat = sorted(self.latencies)
+        calls = sum(self.statuses.values())
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "calls": calls,
+            "ok": self.ok,
+            "failed": calls - self.ok,
+            "statuses": " ".join(f"{s}x{n}" for s, n in sorted(self.statuses.items())),
+            "p50_ms": _ms(percentile(lat, 50)),
+            "p90_ms": _ms(percentile(lat, 90)),
+            "p99_ms": _ms(percentile(lat, 99)),
+            "mean_ms": _ms(sum(lat) / len(lat) if lat else None),
+            "max_ms": _ms(lat[-1] if lat else None),
+            "bytes": max(self.sizes) if self.sizes else 0,
+        }
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:  # noqa: D401
+    """Nearest-rank percentile of an already sorted list."""
+
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:  # noqa: D401
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def _payload_size(result: Dict[str, Any]) -> int:  # noqa: D401
+    headers = {k.lower(): v for k, v in (result.get("headers") or {}).items()}
+    if str(headers.get("content-length", "")).isdigit():
+        return int(headers["content-length"])
+    body = result.get("body")
+    text = body if isinstance(body, str) else json.dumps(body, separators=(",", ":"))
+    return len(text.encode("utf-8"))
+
+
+def _dummy_args(spec: Dict[str, Any]) -> Dict[str, str]:  # noqa: D401
+    # Gather placeholders from the path template and the explicitly declared
+    # *path_params* section so we supply every required argument.
+    placeholders = set(_PATH_VAR_RE.findall(spec.get("path", "/")))
+    declared = set((spec.get("path_params") or {}).keys())
+    return {name: f"test_{name}" for name in placeholders | declared}
+
+
+def run_smoke_test(
+    targets: List[Tuple[EndpointStats, Dict[str, Any]]],
+    *,
+    base_url: str,
+    concurrency: int = 8,
+    repeat: int = 1,
+    timeout: float = 10.0,
+    on_result=None,
+    session: Any = None,
+) -> float:  # noqa: D401
+    """Call every target *repeat* times with *concurrency* workers.
+
+    Results are accumulated into the :class:`EndpointStats` objects in
+    place; returns the wall-clock time of the run.  Caching, coalescing,
+    result shaping and retries are disabled so every sample is one real
+    round trip.  *session* overrides the pooled session, e.g. with a
+    :class:`~llm_pipeline.cassette.Cassette`.
+    """
+
+    if session is None:
+        session = get_session(base_url, PoolConfig(pool_maxsize=max(concurrency, 1), max_retries=0))
+
+    def _one(stats: EndpointStats, spec: Dict[str, Any]) -> None:  # noqa: D401
+        args = _dummy_args(spec)
+        t0 = time.perf_counter()
+        try:
+            rsp = call_endpoint(
+                spec,
+                base_url=base_url,
+                timeout=timeout,
+                session=session,
+                shape=None,
+                coalesce=None,
+                **args,
+            )
+        except Exception as exc:  # noqa: BLE001 – recorded per endpoint
+            stats.record(time.perf_counter() - t0, "EXC", error=str(exc))
+            status = f"EXC {exc}"
+        else:
+            status = str(rsp["status_code"])
+            stats.record(time.perf_counter() - t0, status, size=_payload_size(rsp))
+        if on_result is not None:
+            on_result(stats, status)
+
+    jobs = [t for _ in range(max(1, repeat)) for t in targets]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(jobs) or 1))) as pool:
+        for fut in [pool.submit(_one, stats, spec) for stats, spec in jobs]:
+            fut.result()
+    return time.perf_counter() - t0
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+
+def write_report(path: Path, rows: List[Dict[str, Any]], meta: Dict[str, Any]) -> None:  # noqa: D401
+    """Write *rows* as CSV (``.csv``) or JSON (anything else)."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".csv":
+        with path.open("w", encoding="utf-8", newline="") as fp:
+            writer = csv.DictWriter(fp, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+    payload = {"meta": meta, "endpoints": rows}
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def compare_reports(
+    rows: List[Dict[str, Any]],
+    baseline_path: Path,
+    *,
+    threshold: float = 0.25,
+    min_delta_ms: float = 5.0,
+) -> List[str]:  # noqa: D401
+    """Return human-readable lines for endpoints whose p90 regressed.
+
+    A regression is a p90 more than *threshold* (relative) **and**
+    *min_delta_ms* (absolute) above the baseline's; new failures are
+    reported as well.
+    """
+
+    old = {r["id"]: r for r in json.loads(baseline_path.read_text(encoding="utf-8"))["endpoints"]}
+    lines: List[str] = []
+    for row in rows:
+        before = old.get(row["id"])
+        if before is None:
+            continue
+        if row["failed"] > before.get("failed", 0):
+            lines.append(f"{row['id']}: failures {before.get('failed', 0)} -> {row['failed']}")
+        p_old, p_new = before.get("p90_ms"), row["p90_ms"]
+        if p_old and p_new and p_new - p_old > max(min_delta_ms, p_old * threshold):
+            lines.append(f"{row['id']}: p90 {p_old:.1f} ms -> {p_new:.1f} ms")
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _parse_args(argv) -> argparse.Namespace:  # noqa: D401
+    p = argparse.ArgumentParser(
+        prog="python -m llm_pipeline.smoke_test",
+        description="Ping (and benchmark) every endpoint stored in SectionStore.",
+    )
+    p.add_argument("db_path", type=Path)
+    p.add_argument("base_url", nargs="?", default="https://api.usaspending.gov")
+    p.add_argument("limit", nargs="?", type=int, default=None, help="Only test the first N endpoints")
+    p.add_argument("--concurrency", type=int, default=1, help="Parallel workers (default 1)")
+    p.add_argument("--repeat", type=int, default=1, help="Calls per endpoint (default 1)")
+    p.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    p.add_argument("--report", type=Path, default=None, help="Write a JSON (or .csv) report")
+    p.add_argument("--baseline", type=Path, default=None, help="JSON report to compare p90s against")
+    p.add_argument(
+        "--regress-pct",
+        type=float,
+        default=25.0,
+        help="p90 growth (in %%) counted as a regression (default 25)",
+    )
+    p.add_argument("--cassette", type=Path, default=None, help="Serve responses from this cassette")
+    p.add_argument(
+        "--record",
+        action="store_true",
+        help="With --cassette: call the real API and record (new) responses",
+    )
+    return p.parse_args(argv[1:])
 
 
 def _main(argv):  # noqa: D401 – simple CLI
-    if len(argv) < 2:
-        print(
-            "Usage: python -m llm_pipeline.smoke_test <db_path> [base_url] [limit]\n"
-            "Default base_url: https://api.usaspending.gov",
-            file=sys.stderr,
-        )
-        raise SystemExit(1)
-
-    db_path = Path(argv[1])
-    base_url = argv[2] if len(argv) > 2 else "https://api.usaspending.gov"
-    limit = int(argv[3]) if len(argv) > 3 else None
-
-    store = SectionStore(db_path)
+    args = _parse_args(argv)
+    store = SectionStore(args.db_path)
 
     # ------------------------------------------------------------------
     # Logging setup
@@ -61,60 +318,77 @@ def _main(argv):  # noqa: D401 – simple CLI
             print(msg)
             print(msg, file=_log_fp, flush=True)
 
-        tested = 0
-        ok = bad = 0
-
-        t0 = time.time()
-
-        for row_id in store.list_ids():
-            if limit and tested >= limit:
+        targets: List[Tuple[EndpointStats, Dict[str, Any]]] = []
+        skipped = 0
+        for row in store.iter_rows():
+            if args.limit and len(targets) >= args.limit:
                 break
-
-            row = store.get(row_id)
-            spec_yaml = row["content"]
-
             try:
-                import yaml  # type: ignore
-
-                spec = yaml.safe_load(spec_yaml) or {}
+                spec = _parse_yaml(row["content"]) or {}
             except Exception:
-                _log(f"{row_id}: YAML parse error – skipped")
-                bad += 1
+                _log(f"{row['id']}: YAML parse error – skipped")
+                skipped += 1
                 continue
+            stats = EndpointStats(row["id"], spec.get("method", "GET").upper(), spec.get("path", "/"))
+            targets.append((stats, spec))
+
+        def _on_result(stats: EndpointStats, status: str) -> None:  # noqa: D401
+            label = "OK" if status.isdigit() and int(status) < 500 else "FAIL"
+            _log(f"{stats.id}: {status}" if status.startswith("EXC") else f"{stats.id}: {label} {status}")
+
+        cassette = None
+        if args.cassette:
+            from llm_pipeline.cassette import Cassette  # type: ignore
+
+            cassette = Cassette(args.cassette, mode="auto" if args.record else "replay")
+
+        elapsed = run_smoke_test(
+            targets,
+            base_url=args.base_url,
+            concurrency=args.concurrency,
+            repeat=args.repeat,
+            timeout=args.timeout,
+            on_result=_on_result,
+            session=cassette,
+        )
+        if cassette is not None:
+            _log(f"Cassette {args.cassette}: {cassette.stats}")
+            cassette.close()
+
+        rows = sorted((stats.row() for stats, _ in targets), key=lambda r: r["id"])
+        calls = sum(r["calls"] for r in rows)
+        ok = sum(1 for r in rows if r["failed"] == 0)
+        all_lat = sorted(l for stats, _ in targets for l in stats.latencies)
+        _log(
+            f"Tested {len(rows)} endpoints – {ok} ok, {len(rows) - ok + skipped} bad – "
+            f"{calls} calls in {elapsed:.1f}s ({calls / elapsed if elapsed else 0:.1f} req/s, "
+            f"p50 {_ms(percentile(all_lat, 50))} ms, p90 {_ms(percentile(all_lat, 90))} ms, "
+            f"p99 {_ms(percentile(all_lat, 99))} ms)"
+        )
 
-            # Build dummy args – gather placeholders from path template and
-            # explicitly declared *path_params* section so we supply every
-            # required argument.
-
-            import re
-
-            path_tpl = spec.get("path", "/")
-            tpl_placeholders = set(re.findall(r"{([^}]+)}", path_tpl))
-            declared_params = set((spec.get("path_params") or {}).keys())
-
-            dummy_args = {name: f"test_{name}" for name in tpl_placeholders | declared_params}
-
-            try:
-                rsp = call_endpoint(spec, base_url=base_url, **dummy_args)
-                status = rsp["status_code"]
-                if status < 500:
-                    _log(f"{row_id}: OK {status}")
-                    ok += 1
-                else:
-                    _log(f"{row_id}: FAIL {status}")
-                    bad += 1
-            except Exception as exc:
-                _log(f"{row_id}: EXC {exc}")
-                bad += 1
-
-            tested += 1
-
-        elapsed = time.time() - t0
-        _log(f"Tested {tested} endpoints – {ok} ok, {bad} bad in {elapsed:.1f}s")
+        if args.report:
+            meta = {
+                "base_url": args.base_url,
+                "concurrency": args.concurrency,
+                "repeat": args.repeat,
+                "endpoints": len(rows),
+                "calls": calls,
+                "elapsed_s": round(elapsed, 3),
+                "started": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            }
+            write_report(args.report, rows, meta)
+            _log(f"Report written to {args.report}")
+
+        if args.baseline:
+            regressions = compare_reports(rows, args.baseline, threshold=args.regress_pct / 100)
+            for line in regressions:
+                _log(f"REGRESSION {line}")
+            if regressions:
+                raise SystemExit(2)
 
 
 def _create_log_file() -> Path:  # noqa: D401
-    """Return a (created) path ``logs/smoke_test_<timestamp>.log``."""
+    """Return a (created) path ``<OUTPUT_ROOT>/smoke_test.log``."""
 
     out_dir = get_output_root()
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,212 @@
+"""Start-up benchmark: import and CLI launch times, tracked over time.
+
+Serving processes and CLIs should come up in well under 100 ms.  This
+helper measures, in fresh interpreters,
+
+* ``import <module>`` for the runtime modules, and
+* ``python -m <cli> --help`` for the command-line entry points,
+
+It reports the median wall time over *runs* launches minus the bare
+interpreter start-up (``python -c pass``).  The slowest imports come from
+``python -X importtime``.  Every run is appended to a JSONL history
+(``<OUTPUT_ROOT>/startup_history.jsonl`` by default) and compared with
+the previous entry, so regressions show up as deltas::
+
+    python -m llm_pipeline.startup_bench                 # default targets
+    python -m llm_pipeline.startup_bench --budget-ms 100 # exit 1 if over
+    python -m llm_pipeline.startup_bench --top 10 llm_pipeline.converter
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_MODULES = (
+    "llm_pipeline",
+    "llm_pipeline.converter",
+    "llm_pipeline.executor",
+    "llm_pipeline.async_executor",
+    "llm_pipeline.mcp_server",
+    "llm_pipeline.tool_index",
+    "llm_pipeline.llm_extractor",
+    "llm_pipeline.blueprint_parser",
+)
+DEFAULT_CLIS = (
+    "llm_pipeline.batch_extract",
+    "llm_pipeline.mcp_server",
+    "llm_pipeline.smoke_test",
+    "llm_pipeline.cassette",
+)
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _launch(args: Sequence[str]) -> Tuple[float, str]:  # noqa: D401
+    """Run ``python <args>`` from the repo root; return *(seconds, stderr)*.
+
+    Any non-zero exit raises: a failed import or a broken ``--help`` would
+    otherwise be timed as if it had started up normally.
+    """
+
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *args],
+        cwd=_REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(f"python {' '.join(args)} failed:\n{proc.stderr[-2000:]}")
+    return elapsed, proc.stderr
+
+
+def _median_ms(args: Sequence[str], runs: int) -> float:  # noqa: D401
+    _launch(args)  # warm the OS file cache and the bytecode cache
+    return statistics.median(_launch(args)[0] for _ in range(runs)) * 1000
+
+
+def slowest_imports(args: Sequence[str], top: int) -> List[Tuple[str, float]]:  # noqa: D401
+    """Return the *top* imports by self time (ms) for ``python -X importtime <args>``."""
+
+    _, stderr = _launch(["-X", "importtime", *args])
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, _cumulative, name = (part.strip() for part in line.replace(":", "|", 1).split("|"))
+        rows.append((name, int(self_us) / 1000))
+    return sorted(rows, key=lambda r: -r[1])[:top]
+
+
+def run_bench(
+    modules: Sequence[str] = DEFAULT_MODULES,
+    clis: Sequence[str] = DEFAULT_CLIS,
+    *,
+    runs: int = 5,
+) -> Dict[str, float]:  # noqa: D401
+    """Return ``{target: ms above bare interpreter start-up}``."""
+
+    base = _median_ms(["-c", "pass"], runs)
+    results: Dict[str, float] = {}
+    for mod in modules:
+        results[f"import {mod}"] = round(_median_ms(["-c", f"import {mod}"], runs) - base, 1)
+    for cli in clis:
+        results[f"{cli} --help"] = round(_median_ms(["-m", cli, "--help"], runs) - base, 1)
+    results["(interpreter)"] = round(base, 1)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# History
+# ---------------------------------------------------------------------------
+
+
+def _git_rev() -> Optional[str]:  # noqa: D401
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=_REPO_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _last_entry(path: Path) -> Optional[Dict]:  # noqa: D401
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return None
+    for line in reversed(lines):
+        try:
+            return json.loads(line)
+        except ValueError:
+            continue
+    return None
+
+
+def _append(path: Path, entry: Dict) -> None:  # noqa: D401
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as fp:
+        fp.write(json.dumps(entry, sort_keys=True) + "\n")
+
+
+def default_history_path() -> Path:  # noqa: D401
+    from .config import get_output_root
+
+    return get_output_root() / "startup_history.jsonl"
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _main(argv) -> None:  # noqa: D401 – mini CLI
+    parser = argparse.ArgumentParser(
+        prog="python -m llm_pipeline.startup_bench",
+        description="Measure import / CLI start-up times and track them over time.",
+    )
+    parser.add_argument("modules", nargs="*", help="Modules to import (default: runtime modules)")
+    parser.add_argument("--runs", type=int, default=5, help="Launches per target (median is kept)")
+    parser.add_argument("--no-cli", action="store_true", help="Skip the `--help` launches")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Exit 1 if a target exceeds this")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports per module")
+    parser.add_argument("--history", type=Path, default=None, help="JSONL history file")
+    parser.add_argument("--no-history", action="store_true", help="Do not record this run")
+    args = parser.parse_args(argv[1:])
+
+    modules = args.modules or DEFAULT_MODULES
+    clis = () if (args.no_cli or args.modules) else DEFAULT_CLIS
+    results = run_bench(modules, clis, runs=max(1, args.runs))
+
+    history = args.history or default_history_path()
+    previous = _last_entry(history) if not args.no_history else None
+    prev_results = (previous or {}).get("results", {})
+
+    width = max(len(k) for k in results)
+    for target, ms in results.items():
+        delta = ""
+        if target in prev_results:
+            delta = f"  ({ms - prev_results[target]:+.1f} ms vs {previous.get('rev') or 'previous'})"
+        print(f"{target:<{width}}  {ms:7.1f} ms{delta}")
+        if args.top and target.startswith("import "):
+            for name, self_ms in slowest_imports(["-c", target], args.top):
+                print(f"    {self_ms:6.1f} ms  {name}")
+
+    if not args.no_history:
+        _append(
+            history,
+            {
+                "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "rev": _git_rev(),
+                "python": sys.version.split()[0],
+                "runs": args.runs,
+                "results": results,
+            },
+        )
+
+    if args.budget_ms is not None:
+        over = [t for t, ms in results.items() if t != "(interpreter)" and ms > args.budget_ms]
+        if over:
+            print(f"Over the {args.budget_ms:.0f} ms budget: {', '.join(over)}", file=sys.stderr)
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _main(sys.argv)
@@ -0,0 +1,114 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+:class:`FakeOpenAI` serves ``POST /v1/chat/completions`` on an ephemeral
+localhost port, so the real ``openai`` SDK can be pointed at it with
+``base_url=server.base_url``.  Each reply echoes the title of the Blueprint
+action found in the prompt as the spec ``summary`` and leaves ``method`` /
+``path`` empty for the extractor to fill from the section header.  Tests
+script failures (status, headers) and per-title response delays.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Mapping, Optional, Tuple
+
+_DOC_RE = re.compile(r"--- BEGIN DOC ---\n(?P<doc>.*)\n\s*--- END DOC ---", re.S)
+_TITLE_RE = re.compile(r"^#{2,4}\s+(?P<title>[^\[\n]*?)\s*\[", re.M)
+
+
+class FakeOpenAI:
+    """Threaded fake chat completions server; use as a context manager."""
+
+    def __init__(
+        self,
+        *,
+        failures: Optional[List[Tuple[int, Mapping[str, str]]]] = None,
+        delays: Optional[Mapping[str, float]] = None,
+    ) -> None:  # noqa: D401
+        self.failures = list(failures or [])
+        self.delays = dict(delays or {})
+        self.requests: List[Dict[str, object]] = []
+        self.completed: List[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:  # noqa: D401
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeOpenAI":  # noqa: D401
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:  # noqa: D401
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ------------------------------------------------------------------
+
+    def _reply(self, body: Dict[str, object]) -> Tuple[int, Dict[str, str], Dict[str, object]]:
+        messages = body.get("messages") or []
+        prompt = messages[-1]["content"] if messages else ""
+        m = _DOC_RE.search(prompt)
+        doc = m.group("doc") if m else prompt
+        t = _TITLE_RE.search(doc)
+        title = t.group("title") if t else ""
+
+        with self._lock:
+            self.requests.append({"model": body.get("model"), "title": title})
+            failure = self.failures.pop(0) if self.failures else None
+        if failure is not None:
+            status, headers = failure
+            return status, dict(headers), {"error": {"message": "scripted failure", "code": status}}
+
+        time.sleep(self.delays.get(title, 0))
+        with self._lock:
+            self.completed.append(title)
+        content = json.dumps({"method": "", "path": "", "summary": title})
+        return 200, {}, {
+            "id": f"chatcmpl-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+        }
+
+    def _handler(self):  # noqa: D401
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self):  # noqa: N802
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    status, headers, payload = 404, {}, {"error": {"message": "not found"}}
+                else:
+                    status, headers, payload = fake._reply(body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):  # noqa: D401 – keep test output quiet
+                pass
+
+        return _Handler
@@ -0,0 +1,245 @@
+"""Tests for :mod:`llm_pipeline.async_executor` against a local stub API."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm_pipeline import async_executor
+from llm_pipeline.async_executor import call_endpoint_async, get_async_client
+from llm_pipeline.response_cache import MemoryCache
+from llm_pipeline.singleflight import AsyncSingleFlight
+
+AGENCY = {
+    "method": "GET",
+    "path": "/api/v2/agency/{toptier_code}/",
+    "query_params": {"fiscal_year": {}},
+    "auth": "apiKey",
+}
+SEARCH = {"method": "POST", "path": "/api/v2/search/spending_by_award/", "request_body": {"required": True}}
+
+
+class _StubAPI:
+    """Keep-alive JSON API echoing each request; ``/slow/`` paths sleep ``delay`` seconds."""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.requests = []
+        self.open_connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._server.handle_error = lambda *args: None  # clients that timed out hang up early
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.open_connections += 1
+
+            def finish(self):
+                super().finish()
+                with stub._lock:
+                    stub.open_connections -= 1
+
+            def _reply(self, body=None):
+                with stub._lock:
+                    stub.requests.append((self.command, self.path))
+                if "/slow/" in self.path:
+                    time.sleep(stub.delay)
+                payload = {
+                    "method": self.command,
+                    "path": self.path,
+                    "authorization": self.headers.get("Authorization"),
+                    "body": body,
+                }
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(404 if "/missing/" in self.path else 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):  # noqa: N802
+                self._reply()
+
+            def do_POST(self):  # noqa: N802
+                length = int(self.headers.get("Content-Length") or 0)
+                self._reply(json.loads(self.rfile.read(length)))
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
+
+
+@pytest.fixture()
+def stub():
+    api = _StubAPI()
+    yield api
+    api.close()
+
+
+def _call(spec, stub, **kwargs):
+    kwargs.setdefault("shape", None)
+    return call_endpoint_async(spec, base_url=stub.url, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Requests
+# ---------------------------------------------------------------------------
+
+
+def test_get_routes_path_query_and_auth(stub):
+    async def _run():
+        try:
+            return await _call(AGENCY, stub, toptier_code="020", fiscal_year=2024, api_key="secret")
+        finally:
+            await async_executor.aclose()
+
+    result = asyncio.run(_run())
+    assert result["status_code"] == 200
+    assert result["headers"]["content-type"] == "application/json"
+    assert result["body"] == {
+        "method": "GET",
+        "path": "/api/v2/agency/020/?fiscal_year=2024",
+        "authorization": "secret",
+        "body": None,
+    }
+
+
+def test_post_body_and_error_status(stub):
+    async def _run():
+        try:
+            ok = await _call(SEARCH, stub, body={"filters": {"award_type_codes": ["A"]}})
+            missing = await _call({"method": "GET", "path": "/api/v2/missing/"}, stub)
+            return ok, missing
+        finally:
+            await async_executor.aclose()
+
+    ok, missing = asyncio.run(_run())
+    assert ok["body"]["body"] == {"filters": {"award_type_codes": ["A"]}}
+    assert missing["status_code"] == 404
+
+
+def test_cache_and_coalescing(stub):
+    stub.delay = 0.2
+    spec = {"method": "GET", "path": "/api/v2/slow/"}
+
+    async def _run():
+        group, cache = AsyncSingleFlight(), MemoryCache()
+        try:
+            first = await asyncio.gather(*(_call(spec, stub, coalesce=group) for _ in range(5)))
+            await _call(spec, stub, cache=cache)
+            await _call(spec, stub, cache=cache)
+            return first, group
+        finally:
+            await async_executor.aclose()
+
+    first, group = asyncio.run(_run())
+    assert [r["body"] for r in first] == [first[0]["body"]] * 5
+    assert (group.stats.leaders, group.stats.shared) == (1, 4)
+    assert len(stub.requests) == 2  # one coalesced flight + one cache miss
+
+
+def test_timeout_raises(stub):
+    import httpx
+
+    stub.delay = 0.5
+
+    async def _run():
+        try:
+            await _call({"method": "GET", "path": "/api/v2/slow/"}, stub, timeout=0.05, coalesce=None)
+        finally:
+            await async_executor.aclose()
+
+    with pytest.raises(httpx.TimeoutException):
+        asyncio.run(_run())
+
+
+# ---------------------------------------------------------------------------
+# Shared client lifecycle
+# ---------------------------------------------------------------------------
+
+
+def test_one_client_per_loop_and_stale_loops_are_dropped(stub):
+    async def _run():
+        client = get_async_client()
+        assert get_async_client() is client
+        await _call(AGENCY, stub, toptier_code="020")
+        return client
+
+    first = asyncio.run(_run())
+    second = asyncio.run(_run())
+
+    assert first is not second
+    # The first loop's client was dropped when the second loop asked for
+    # one; the second stays registered until the next lookup or aclose().
+    assert first not in async_executor._clients.values()
+    assert len(async_executor._clients) == 1
+
+    async def _close():
+        await async_executor.aclose()
+
+    asyncio.run(_close())
+    assert not async_executor._clients
+
+
+def test_loops_in_other_threads_keep_their_own_client(stub):
+    ready, release = threading.Barrier(2), threading.Event()
+    clients = {}
+
+    def _worker(name):
+        async def _run():
+            clients[name] = get_async_client()
+            ready.wait(5)
+            release.wait(5)
+            result = await _call(AGENCY, stub, toptier_code=name)
+            await async_executor.aclose()
+            return result
+
+        clients[f"{name}-result"] = asyncio.run(_run())
+
+    threads = [threading.Thread(target=_worker, args=(name,)) for name in ("a", "b")]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert clients["a"] is not clients["b"]
+    assert clients["a"].is_closed and clients["b"].is_closed
+    assert clients["a-result"]["status_code"] == clients["b-result"]["status_code"] == 200
+
+
+def test_aclose_releases_connections(stub):
+    async def _run():
+        await _call(AGENCY, stub, toptier_code="020")
+        assert stub.open_connections == 1  # kept alive for reuse
+        await async_executor.aclose()
+
+    asyncio.run(_run())
+    for _ in range(50):
+        if stub.open_connections == 0:
+            break
+        time.sleep(0.02)
+    assert stub.open_connections == 0
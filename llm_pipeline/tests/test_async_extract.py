@@ -0,0 +1,259 @@
+"""Tests for :mod:`llm_pipeline.async_extract` against a local fake server."""
+
+import asyncio
+import json
+import shutil
+from pathlib import Path
+
+import openai
+import pytest
+
+from llm_pipeline import async_extract
+from llm_pipeline.async_extract import AsyncExtractor, RateBudget, retry_after_seconds
+from llm_pipeline.section_store import SectionStore
+
+from .fake_openai import FakeOpenAI
+
+AGENCY = Path(__file__).parent / "fixtures" / "batch" / "agency.md"
+
+
+# ---------------------------------------------------------------------------
+# retry_after_seconds()
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        (None, None),
+        ({}, None),
+        ({"Retry-After-Ms": "250"}, 0.25),
+        ({"retry-after": "20"}, 20.0),
+        ({"retry-after": "1.5s"}, 1.5),
+        ({"retry-after-ms": "soon", "retry-after": "2"}, 2.0),
+        ({"x-ratelimit-reset-requests": "6m0s"}, 360.0),
+        ({"x-ratelimit-reset-requests": "250ms", "x-ratelimit-reset-tokens": "1h2m3s"}, 3723.0),
+        ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT", "x-ratelimit-reset-tokens": "3s"}, 3.0),
+        ({"x-ratelimit-reset-tokens": "later"}, None),
+    ],
+)
+def test_retry_after_seconds(headers, expected):
+    assert retry_after_seconds(headers) == expected
+
+
+# ---------------------------------------------------------------------------
+# RateBudget
+# ---------------------------------------------------------------------------
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    """Fake monotonic clock that :func:`asyncio.sleep` advances instantly."""
+
+    clock = _Clock()
+    real_sleep = asyncio.sleep
+
+    async def _sleep(delay, *args, **kwargs):
+        clock.now += delay
+        await real_sleep(0)
+
+    monkeypatch.setattr(async_extract.asyncio, "sleep", _sleep)
+    return clock
+
+
+def test_budget_admits_burst_then_waits_for_refill(clock):
+    budget = RateBudget(rpm=60, tpm=1_000_000, clock=clock)
+
+    async def _acquire(n):
+        for _ in range(n):
+            await budget.acquire(1)
+
+    asyncio.run(_acquire(60))
+    assert clock.now == 0.0  # a minute's worth is available up front
+    asyncio.run(_acquire(1))
+    assert clock.now == pytest.approx(1.0)  # 60 rpm -> one request per second
+
+
+def test_budget_waits_for_tokens(clock):
+    budget = RateBudget(rpm=1000, tpm=600, clock=clock)
+    asyncio.run(budget.acquire(600))
+    asyncio.run(budget.acquire(300))
+    assert clock.now == pytest.approx(30.0)
+
+
+def test_budget_clamps_oversized_requests(clock):
+    budget = RateBudget(rpm=1000, tpm=600, clock=clock)
+    asyncio.run(budget.acquire(10_000))
+    assert clock.now == 0.0
+
+
+def test_budget_settle_refunds_overestimate(clock):
+    budget = RateBudget(rpm=1000, tpm=600, clock=clock)
+    asyncio.run(budget.acquire(600))
+    budget.settle(600, 100)
+    asyncio.run(budget.acquire(500))
+    assert clock.now == 0.0
+
+
+def test_budget_backs_off_and_recovers(clock):
+    budget = RateBudget(rpm=60, tpm=1_000_000, decrease=0.5, increase=0.1, min_scale=0.2, clock=clock)
+
+    budget.on_rate_limited(5.0)
+    assert budget.scale == 0.5
+    asyncio.run(budget.acquire(1))
+    assert clock.now == pytest.approx(5.0)  # everyone waits for retry-after
+
+    budget.on_rate_limited(None)
+    budget.on_rate_limited(None)
+    assert budget.scale == 0.2  # never below min_scale
+
+    for _ in range(3):
+        budget.on_success()
+    assert budget.scale == pytest.approx(0.5)
+    for _ in range(10):
+        budget.on_success()
+    assert budget.scale == 1.0
+
+
+def test_budget_refill_follows_scale(clock):
+    budget = RateBudget(rpm=60, tpm=1_000_000, clock=clock)
+    budget.scale = 0.5
+
+    async def _drain_and_wait():
+        for _ in range(61):
+            await budget.acquire(1)
+
+    asyncio.run(_drain_and_wait())
+    assert clock.now == pytest.approx(2.0)  # half the rate -> twice the wait
+
+
+# ---------------------------------------------------------------------------
+# AsyncExtractor
+# ---------------------------------------------------------------------------
+
+
+def _extract(server, paths, db_path, **kwargs):
+    async def _main():
+        client = openai.AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        try:
+            extractor = AsyncExtractor(db_path, client=client, **kwargs)
+            return extractor, await extractor.run(paths)
+        finally:
+            await client.close()
+
+    return asyncio.run(_main())
+
+
+def _summaries(db_path):
+    with SectionStore(db_path) as store:
+        return {row["id"]: json.loads(row["content"])["summary"] for row in store.iter_rows()}
+
+
+@pytest.fixture()
+def doc(tmp_path):
+    path = tmp_path / "agency.md"
+    shutil.copy(AGENCY, path)
+    return path
+
+
+def test_sections_keep_their_order_when_answers_arrive_out_of_order(doc, tmp_path):
+    db = tmp_path / "sections.db"
+    with FakeOpenAI(delays={"Agency Overview": 0.3}) as server:
+        _, results = _extract(server, [doc], db)
+
+    assert results == {doc: None}
+    assert server.completed == ["Budget Functions", "Agency Overview"]
+    assert _summaries(db) == {
+        f"{doc}#GET /api/v2/agency/{{toptier_code}}/": "Agency Overview",
+        f"{doc}#GET /api/v2/agency/{{toptier_code}}/budget_function/": "Budget Functions",
+    }
+
+
+def test_rate_limited_request_is_retried(doc, tmp_path):
+    db = tmp_path / "sections.db"
+    failures = [(429, {"retry-after-ms": "50", "x-ratelimit-reset-requests": "1s"})]
+    with FakeOpenAI(failures=failures) as server:
+        extractor, results = _extract(server, [doc], db)
+
+    assert results == {doc: None}
+    assert len(server.requests) == 3
+    assert sorted(_summaries(db).values()) == ["Agency Overview", "Budget Functions"]
+    # Halved on the 429, then nudged back up once per success.
+    assert extractor.budget.scale == pytest.approx(0.5 + 2 * extractor.budget.increase)
+
+
+def test_client_error_is_not_retried(tmp_path):
+    doc = tmp_path / "notes.txt"
+    doc.write_text("## Notes [GET /api/v2/notes/]\n", encoding="utf-8")
+    db = tmp_path / "sections.db"
+    with FakeOpenAI(failures=[(400, {})]) as server:
+        _, results = _extract(server, [doc], db)
+
+    assert isinstance(results[doc], openai.BadRequestError)
+    assert len(server.requests) == 1
+    assert _summaries(db) == {}
+
+
+def test_gives_up_after_max_attempts(doc, tmp_path):
+    db = tmp_path / "sections.db"
+    failures = [(429, {"retry-after-ms": "1"})] * 10
+    with FakeOpenAI(failures=failures) as server:
+        _, results = _extract(server, [doc], db, max_attempts=2)
+
+    assert isinstance(results[doc], openai.RateLimitError)
+    assert _summaries(db) == {}
+
+
+class _BadRequest(Exception):
+    status_code = 400
+
+
+class _ScriptedClient:
+    """``AsyncOpenAI`` stand-in: "Agency Overview" fails, other sections hang."""
+
+    def __init__(self):
+        self.cancelled = []
+        self.chat = self
+        self.completions = self
+
+    async def create(self, *, messages, **kwargs):
+        if "## Agency Overview" in messages[-1]["content"]:
+            await asyncio.sleep(0.05)
+            raise _BadRequest("Agency Overview")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled.append("Budget Functions")
+            raise
+
+
+def test_failed_section_cancels_its_siblings(doc, tmp_path):
+    client = _ScriptedClient()
+
+    async def _main():
+        results = await AsyncExtractor(tmp_path / "sections.db", client=client).run([doc])
+        return results, list(client.cancelled)  # before asyncio.run() tears down
+
+    results, cancelled = asyncio.run(_main())
+    assert isinstance(results[doc], _BadRequest)
+    assert cancelled == ["Budget Functions"]
+    assert _summaries(tmp_path / "sections.db") == {}
+
+
+def test_missing_api_key_fails_before_scheduling(doc, tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    db = tmp_path / "sections.db"
+    done = []
+
+    with pytest.raises(EnvironmentError, match="OPENAI_API_KEY"):
+        asyncio.run(AsyncExtractor(db).run([doc], on_done=lambda *args: done.append(args)))
+    assert done == []
+    assert not db.exists()
@@ -0,0 +1,105 @@
+"""Ingest side of :mod:`llm_pipeline.batch_api` against local JSONL fixtures."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from llm_pipeline.batch_api import ingest_results, load_manifest, manifest_path, write_batch_file
+from llm_pipeline.section_store import SectionStore, source_hash
+
+FIXTURES = Path(__file__).parent / "fixtures" / "batch"
+
+
+@pytest.fixture()
+def submitted(tmp_path):
+    """A copy of the fixture document, "submitted" as a batch; returns *(doc, manifest)*."""
+
+    doc = tmp_path / "agency.md"
+    shutil.copy(FIXTURES / "agency.md", doc)
+    batch_file = write_batch_file([doc], tmp_path / "requests.jsonl")
+    return doc, manifest_path(batch_file)
+
+
+def _results(name, doc, tmp_path):
+    """Materialise fixture *name* with its ``$DOC`` custom ids pointing at *doc*."""
+
+    text = (FIXTURES / name).read_text(encoding="utf-8").replace("$DOC", str(doc))
+    out = tmp_path / name
+    out.write_text(text, encoding="utf-8")
+    return out
+
+
+def _rows(db_path):
+    with SectionStore(db_path) as store:
+        return list(store.iter_rows())
+
+
+def test_write_batch_file_records_manifest(submitted, tmp_path):
+    doc, manifest = submitted
+    lines = (tmp_path / "requests.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["custom_id"] for line in lines] == [f"{doc}#0", f"{doc}#1"]
+    assert load_manifest(manifest) == {str(doc): {"source_hash": source_hash(doc), "sections": 2}}
+
+
+def test_ingest_complete_document(submitted, tmp_path):
+    doc, manifest = submitted
+    db = tmp_path / "sections.db"
+    report = ingest_results([_results("output_ok.jsonl", doc, tmp_path)], db, manifest)
+
+    assert report.failures == {}
+    assert report.written == 2
+    rows = _rows(db)
+    assert {r["source_hash"] for r in rows} == {source_hash(doc)}
+    assert sorted(r["id"] for r in rows) == [
+        f"{doc}#GET /api/v2/agency/{{toptier_code}}/",
+        f"{doc}#GET /api/v2/agency/{{toptier_code}}/budget_function/",
+    ]
+
+
+def test_ingest_rejects_source_edited_after_submission(submitted, tmp_path):
+    doc, manifest = submitted
+    # Same number of sections, different content.
+    doc.write_text(doc.read_text(encoding="utf-8").replace("`086`", "`012`"), encoding="utf-8")
+    db = tmp_path / "sections.db"
+    report = ingest_results([_results("output_ok.jsonl", doc, tmp_path)], db, manifest)
+
+    assert report.failures == {str(doc): "source changed since submission"}
+    assert report.written == 0
+    assert _rows(db) == []
+
+
+def test_ingest_rejects_missing_section(submitted, tmp_path):
+    doc, manifest = submitted
+    report = ingest_results([_results("output_partial.jsonl", doc, tmp_path)], tmp_path / "s.db", manifest)
+    assert report.failures == {str(doc): "missing section result(s): [1]"}
+
+
+def test_ingest_rejects_failed_section(submitted, tmp_path):
+    doc, manifest = submitted
+    report = ingest_results([_results("output_section_error.jsonl", doc, tmp_path)], tmp_path / "s.db", manifest)
+    assert report.failures[str(doc)].startswith("section 1: HTTP 500")
+    assert report.written == 0
+
+
+def test_ingest_reports_sources_without_any_result(submitted, tmp_path):
+    doc, _ = submitted
+    other = tmp_path / "other.md"
+    shutil.copy(FIXTURES / "agency.md", other)
+    batch_file = write_batch_file([doc, other], tmp_path / "both.jsonl")
+
+    report = ingest_results(
+        [_results("output_ok.jsonl", doc, tmp_path)], tmp_path / "s.db", manifest_path(batch_file)
+    )
+    assert report.failures == {str(other): "no results returned"}
+    assert report.written == 2
+
+
+def test_ingest_ignores_results_from_another_batch(submitted, tmp_path):
+    doc, _ = submitted
+    stranger = tmp_path / "stranger.md"
+    shutil.copy(FIXTURES / "agency.md", stranger)
+    manifest = {str(doc): {"source_hash": source_hash(doc), "sections": 2}}
+    report = ingest_results([_results("output_ok.jsonl", stranger, tmp_path)], tmp_path / "s.db", manifest)
+    assert report.failures == {str(stranger): "not part of this batch", str(doc): "no results returned"}
@@ -0,0 +1,145 @@
+"""Tests for :mod:`llm_pipeline.batch_extract` incremental runs."""
+
+import textwrap
+
+import pytest
+
+from llm_pipeline import blueprint_parser
+from llm_pipeline.batch_extract import _main, _plan_incremental
+from llm_pipeline.section_store import SectionStore, source_hash
+
+CONTRACT = textwrap.dedent(
+    """\
+    FORMAT: 1A
+    HOST: https://api.usaspending.gov
+
+    # {title} [/api/v2/{name}/]
+
+    ## GET
+
+    + Response 200 (application/json)
+        + Attributes (object)
+            + `name` (required, string)
+    """
+)
+
+
+def _write(root, name, title="Endpoint"):
+    path = root / f"{name}.md"
+    path.write_text(CONTRACT.format(name=name, title=title), encoding="utf-8")
+    return path
+
+
+@pytest.fixture()
+def contracts(tmp_path):
+    root = tmp_path / "contracts"
+    root.mkdir()
+    for name in ("agency", "awards", "states"):
+        _write(root, name)
+    return root
+
+
+# ---------------------------------------------------------------------------
+# Planning
+# ---------------------------------------------------------------------------
+
+
+def test_plan_skips_unchanged_and_reports_deleted_sources(tmp_path, contracts):
+    agency, awards, states = sorted(contracts.glob("*.md"))
+    outside = tmp_path / "elsewhere" / "gone.md"
+    index = {
+        str(agency): (source_hash(agency), "v1"),
+        str(awards): ("stale-hash", "v1"),
+        str(contracts / "deleted.md"): ("hash", "v1"),
+        str(outside): ("hash", "v1"),  # not under a scanned root: kept
+    }
+
+    todo, stale = _plan_incremental([agency, awards, states], [contracts], index, {"v1"})
+
+    assert todo == [awards, states]  # modified + new
+    assert stale == [str(contracts / "deleted.md")]
+
+
+def test_plan_reextracts_on_version_change_or_force(contracts):
+    files = sorted(contracts.glob("*.md"))
+    index = {str(p): (source_hash(p), "v1") for p in files}
+
+    assert _plan_incremental(files, [contracts], index, {"v1"}) == ([], [])
+    assert _plan_incremental(files, [contracts], index, {"v2"})[0] == files
+    assert _plan_incremental(files, [contracts], index, {"v1"}, force=True)[0] == files
+    # Rows written before provenance was tracked report (None, None).
+    assert _plan_incremental(files, [contracts], {str(files[0]): (None, None)}, {"v1"})[0] == files
+
+
+# ---------------------------------------------------------------------------
+# End to end (local parser only – no network)
+# ---------------------------------------------------------------------------
+
+
+def _run(db, root, *extra):
+    _main(["batch_extract", str(db), str(root), "--parser", "local", *extra])
+
+
+def _rows(db):
+    with SectionStore(db) as store:
+        return {row["source_path"]: row for row in store.iter_rows()}
+
+
+def test_rerun_only_touches_changed_files(tmp_path, contracts, capsys):
+    db = tmp_path / "sections.db"
+    _run(db, contracts)
+    first = _rows(db)
+    assert len(first) == 3
+    assert {r["extractor_version"] for r in first.values()} == {blueprint_parser.PARSER_VERSION}
+    capsys.readouterr()
+
+    _run(db, contracts)
+    assert "3 unchanged, 0 deleted source(s) pruned – 0 to extract" in capsys.readouterr().out
+    assert _rows(db) == first
+
+    _write(contracts, "awards", title="Awards, revised")
+    _run(db, contracts)
+    assert "2 unchanged" in capsys.readouterr().out
+    second = _rows(db)
+    changed = {src for src in first if second[src] != first[src]}
+    assert changed == {str(contracts / "awards.md")}
+    assert '"summary": "Awards, revised"' in second[str(contracts / "awards.md")]["content"]
+
+
+def test_parser_version_bump_reextracts_everything(tmp_path, contracts, monkeypatch, capsys):
+    db = tmp_path / "sections.db"
+    _run(db, contracts)
+    capsys.readouterr()
+
+    monkeypatch.setattr(blueprint_parser, "PARSER_VERSION", "blueprint:test")
+    _run(db, contracts)
+    assert "0 unchanged, 0 deleted source(s) pruned – 3 to extract" in capsys.readouterr().out
+    assert {r["extractor_version"] for r in _rows(db).values()} == {"blueprint:test"}
+
+
+def test_deleted_files_are_pruned(tmp_path, contracts, capsys):
+    db = tmp_path / "sections.db"
+    _run(db, contracts)
+    (contracts / "states.md").unlink()
+
+    _run(db, contracts, "--no-prune")
+    assert str(contracts / "states.md") in _rows(db)
+    capsys.readouterr()
+
+    _run(db, contracts)
+    assert "2 unchanged, 1 deleted source(s) pruned" in capsys.readouterr().out
+    assert set(_rows(db)) == {str(contracts / "agency.md"), str(contracts / "awards.md")}
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+
+def test_batch_api_and_async_are_mutually_exclusive(tmp_path, contracts, capsys):
+    with pytest.raises(SystemExit) as exc:
+        _run(tmp_path / "sections.db", contracts, "--batch-api", "--async")
+
+    assert exc.value.code == 2
+    assert "not allowed with argument" in capsys.readouterr().err
+    assert not (tmp_path / "sections.db").exists()
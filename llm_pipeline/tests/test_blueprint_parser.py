@@ -0,0 +1,67 @@
+"""Tests for :mod:`llm_pipeline.blueprint_parser`."""
+
+import textwrap
+from pathlib import Path
+
+from llm_pipeline.blueprint_parser import PARSER_VERSION, document_rows, parse_document
+
+AGENCY = textwrap.dedent(
+    """\
+    FORMAT: 1A
+    HOST: https://api.usaspending.gov
+
+    # Agency Overview [/api/v2/agency/{toptier_code}/{?fiscal_year}]
+
+    ## GET
+
+    + Parameters
+        + `toptier_code`: `086` (required, number)
+            The toptier code of an agency
+        + `fiscal_year` (optional, number)
+
+    + Response 200 (application/json)
+        + Attributes (object)
+            + `name` (required, string)
+    """
+)
+
+DUPLICATED = AGENCY + textwrap.dedent(
+    """\
+
+    # Agency Overview, filtered [/api/v2/agency/{toptier_code}/{?award_type}]
+
+    ## GET
+
+    + Parameters
+        + `toptier_code`: `086` (required, string)
+        + `award_type` (optional, string)
+
+    + Response 200 (application/json)
+    """
+)
+
+
+def test_path_params_are_strings():
+    (spec,) = parse_document(Path("agency.md"), AGENCY)
+
+    assert spec.path_params["toptier_code"].type == "string"
+    assert spec.path_params["toptier_code"].description == "The toptier code of an agency"
+    assert spec.query_params["fiscal_year"].type == "number"
+
+
+def test_duplicate_sections_are_merged():
+    specs = parse_document(Path("agency.md"), DUPLICATED)
+
+    assert [(s.method, s.path) for s in specs] == [("GET", "/api/v2/agency/{toptier_code}/")]
+    (spec,) = specs
+    assert set(spec.query_params) == {"fiscal_year", "award_type"}
+    assert spec.summary == "Agency Overview"
+    assert spec.response["json_schema"]["properties"]["name"]["type"] == "string"
+
+
+def test_document_rows_carry_parser_provenance():
+    (row,) = document_rows(Path("agency.md"), AGENCY.encode("utf-8"))
+
+    assert row["id"] == "agency.md"
+    assert row["extractor_version"] == PARSER_VERSION
+    assert document_rows(Path("notes.md"), b"# Just notes\n") is None
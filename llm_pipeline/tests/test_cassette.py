@@ -0,0 +1,214 @@
+"""Tests for :mod:`llm_pipeline.cassette` record/replay."""
+
+import asyncio
+import json
+import sqlite3
+import time
+import zlib
+
+import pytest
+
+from llm_pipeline.async_executor import call_endpoint_async
+from llm_pipeline.cassette import Cassette, CassetteMiss
+from llm_pipeline.executor import call_endpoint
+from llm_pipeline.response_cache import cache_key
+
+URL = "https://api.example.test/api/v2/agency/020/"
+SPEC = {"method": "GET", "path": "/api/v2/agency/{toptier_code}/", "path_params": {"toptier_code": {}}}
+
+
+class _Upstream:
+    """``requests.Session`` stand-in answering every request after *delay* seconds."""
+
+    def __init__(self, delay=0.0, status=200):
+        self.delay = delay
+        self.status = status
+        self.calls = []
+
+    def _response(self, method, url, params, json_body):
+        self.calls.append((method, url, params, json_body))
+        time.sleep(self.delay)
+        body = {"url": url, "params": params, "body": json_body}
+        return _Response(self.status, json.dumps(body).encode("utf-8"))
+
+    def request(self, method, url, *, params=None, json=None, headers=None, timeout=None):
+        return self._response(method, url, params, json)
+
+
+class _AsyncUpstream(_Upstream):
+    async def request(self, method, url, *, params=None, json=None, headers=None, timeout=None):
+        return self._response(method, url, params, json)
+
+
+class _Response:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(content)),
+            "Content-Encoding": "gzip",
+            "X-Request-Id": "abc",
+        }
+
+
+def _record(path, upstream, requests):
+    with Cassette(path, mode="record", inner=upstream) as cassette:
+        for method, url, params, body in requests:
+            cassette.request(method, url, params=params, json=body)
+        return cassette.stats
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+
+def test_record_writes_one_entry_per_request(tmp_path):
+    path = tmp_path / "c.db"
+    upstream = _Upstream(status=404)
+    stats = _record(
+        path,
+        upstream,
+        [
+            ("GET", URL, {"fy": 2024}, None),
+            ("post", URL, None, {"filters": {"a": 1}}),
+            ("GET", URL, {"fy": 2024}, None),  # re-recorded, not duplicated
+        ],
+    )
+
+    assert (stats.recorded, stats.hits, len(upstream.calls)) == (3, 0, 3)
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT key, method, url, status, headers, body FROM interactions ORDER BY method").fetchall()
+    conn.close()
+    assert [r[1:4] for r in rows] == [("GET", URL, 404), ("POST", URL, 404)]
+    assert rows[0][0] == cache_key("GET", URL, {"fy": 2024}, None)
+    # Transfer headers are dropped: the stored body is already decoded.
+    assert json.loads(rows[0][4]) == {"Content-Type": "application/json", "X-Request-Id": "abc"}
+    assert json.loads(zlib.decompress(rows[1][5])) == {"url": URL, "params": None, "body": {"filters": {"a": 1}}}
+
+
+def test_auto_mode_records_misses_only(tmp_path):
+    upstream = _Upstream()
+    with Cassette(tmp_path / "c.db", mode="auto", inner=upstream) as cassette:
+        cassette.request("GET", URL)
+        cassette.request("GET", URL)
+        assert (cassette.stats.recorded, cassette.stats.hits, cassette.stats.misses) == (1, 1, 1)
+    assert len(upstream.calls) == 1
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+
+def test_replay_returns_the_stored_response(tmp_path):
+    path = tmp_path / "c.db"
+    _record(path, _Upstream(status=201), [("GET", URL, {"fy": 2024}, None)])
+
+    with Cassette(path) as cassette:
+        rsp = cassette.request("GET", URL, params={"fy": 2024}, headers={"Authorization": "x"})
+        assert rsp.status_code == 201
+        assert rsp.json() == {"url": URL, "params": {"fy": 2024}, "body": None}
+        assert rsp.headers["x-request-id"] == rsp.headers.get("X-Request-ID") == "abc"
+        assert "content-length" not in rsp.headers
+        assert cassette.stats.hits == 1
+
+
+def test_replay_raises_on_unknown_request(tmp_path):
+    path = tmp_path / "c.db"
+    _record(path, _Upstream(), [("GET", URL, None, None)])
+
+    with Cassette(path) as cassette:
+        with pytest.raises(CassetteMiss, match="GET .*/agency/020/"):
+            cassette.request("GET", URL, params={"fy": 2023})
+        with pytest.raises(CassetteMiss):
+            cassette.request("POST", URL)
+        assert cassette.stats.misses == 2
+
+
+def test_replay_requires_an_existing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette(tmp_path / "missing.db")
+    with pytest.raises(ValueError):
+        Cassette(tmp_path / "c.db", mode="rewind")
+
+
+def test_replay_through_the_executors(tmp_path):
+    path = tmp_path / "c.db"
+    base_url = "https://api.example.test"
+    with Cassette(path, mode="record", inner=_Upstream()) as cassette:
+        call_endpoint(SPEC, base_url=base_url, session=cassette, shape=None, coalesce=None, toptier_code="020")
+
+    with Cassette(path) as cassette:
+        sync = call_endpoint(SPEC, base_url=base_url, session=cassette, shape=None, coalesce=None, toptier_code="020")
+        result = asyncio.run(
+            call_endpoint_async(
+                SPEC, base_url=base_url, client=cassette.aclient(), shape=None, coalesce=None, toptier_code="020"
+            )
+        )
+    assert sync["status_code"] == result["status_code"] == 200
+    assert sync["body"] == result["body"] == {"url": URL, "params": {}, "body": None}
+
+
+def test_async_client_records(tmp_path):
+    path = tmp_path / "c.db"
+    upstream = _AsyncUpstream()
+    with Cassette(path, mode="auto") as cassette:
+        client = cassette.aclient(upstream)
+        rsp = asyncio.run(client.request("GET", URL))
+        asyncio.run(client.request("GET", URL))
+        asyncio.run(client.aclose())
+        assert client.is_closed
+    assert rsp.status_code == 200 and len(upstream.calls) == 1
+
+
+# ---------------------------------------------------------------------------
+# Latency
+# ---------------------------------------------------------------------------
+
+
+def _timed(cassette):
+    t0 = time.perf_counter()
+    cassette.request("GET", URL)
+    return time.perf_counter() - t0
+
+
+def test_recorded_latency_is_reproduced(tmp_path):
+    path = tmp_path / "c.db"
+    _record(path, _Upstream(delay=0.1), [("GET", URL, None, None)])
+
+    with Cassette(path) as cassette:
+        assert _timed(cassette) < 0.05  # no latency by default
+    with Cassette(path, latency="recorded") as cassette:
+        assert _timed(cassette) >= 0.1
+    with Cassette(path, latency="recorded", latency_scale=0.5) as cassette:
+        assert 0.05 <= _timed(cassette) < 0.1
+    with Cassette(path, latency=0.03) as cassette:
+        assert 0.03 <= _timed(cassette) < 0.1
+
+
+def test_recorded_latency_async(tmp_path):
+    path = tmp_path / "c.db"
+    _record(path, _Upstream(delay=0.1), [("GET", URL, None, None)])
+
+    async def _run(client):
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client.request("GET", URL) for _ in range(5)))
+        return time.perf_counter() - t0
+
+    with Cassette(path, latency="recorded") as cassette:
+        elapsed = asyncio.run(_run(cassette.aclient()))
+    assert 0.1 <= elapsed < 0.3  # the five calls wait concurrently
+
+
+def test_jitter_is_seeded_and_bounded(tmp_path):
+    path = tmp_path / "c.db"
+    _record(path, _Upstream(), [("GET", URL, None, None)])
+
+    delays = []
+    for _ in range(2):
+        with Cassette(path, latency=1.0, jitter=0.2, seed=7) as cassette:
+            delays.append([cassette._delay(0.0) for _ in range(50)])
+    assert delays[0] == delays[1]
+    assert all(0.8 <= d <= 1.2 for d in delays[0]) and len(set(delays[0])) > 1
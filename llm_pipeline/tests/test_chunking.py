@@ -0,0 +1,182 @@
+"""Tests for :mod:`llm_pipeline.chunking` Blueprint splitting."""
+
+from llm_pipeline.chunking import Section, split_blueprint, split_document, strip_query_template
+
+BLUEPRINT = """FORMAT: 1A
+HOST: https://api.usaspending.gov
+
+# Federal Accounts
+
+Shared preamble describing the endpoints.
+
+## List Federal Accounts [/api/v2/federal_accounts/{?page,limit}]
+
+Resource description for the list.
+
+### List Federal Accounts [POST]
+
++ Request (application/json)
+    + Attributes (object)
+        + `filters` (required, FilterObject)
+
++ Response 200 (application/json)
+    + Attributes
+        + `results` (array[FederalAccount])
+
+### Federal Account Count [GET]
+
++ Response 200 (application/json)
+    + Attributes
+        + `count` (required, number)
+
+## Fiscal Year Snapshot [/api/v2/federal_accounts/{id}/fiscal_year_snapshot/]
+
+Snapshot resource header.
+
+## GET
+
++ Response 200 (application/json)
+    + Attributes
+        + `results` (SnapshotObject)
+
+## Search by Agency [GET /api/v2/federal_accounts/agency/{code}/]
+
++ Response 200 (application/json)
+
+# Data Structures
+
+## FilterObject (object)
++ `agency_identifier` (optional, string)
++ `time_period` (optional, array[TimePeriod])
+
+## TimePeriod (object)
++ `start_date` (required, string)
+
+## FederalAccount (object)
++ `account_name` (required, string)
+
+## SnapshotObject (object)
++ `obligated` (required, number)
+
+## Unused (object)
++ `ignored` (optional, string)
+"""
+
+
+def _by_title(sections):
+    return {s.title: s for s in sections}
+
+
+# ---------------------------------------------------------------------------
+# Boundaries
+# ---------------------------------------------------------------------------
+
+
+def test_one_section_per_action():
+    sections = split_blueprint(BLUEPRINT)
+    assert [(s.method, s.path, s.title) for s in sections] == [
+        ("POST", "/api/v2/federal_accounts/", "List Federal Accounts"),
+        ("GET", "/api/v2/federal_accounts/", "Federal Account Count"),
+        ("GET", "/api/v2/federal_accounts/{id}/fiscal_year_snapshot/", "GET"),
+        ("GET", "/api/v2/federal_accounts/agency/{code}/", "Search by Agency"),
+    ]
+
+
+def test_action_text_stops_at_the_next_action():
+    sections = _by_title(split_blueprint(BLUEPRINT))
+    listing = sections["List Federal Accounts"].text
+    count = sections["Federal Account Count"].text
+
+    assert "`filters`" in listing and "`count`" not in listing
+    assert "`count`" in count and "`filters`" not in count
+    # The next resource header belongs to the following sections only.
+    assert "Snapshot resource header" not in count
+    assert "Search by Agency" not in sections["GET"].text
+
+
+# ---------------------------------------------------------------------------
+# Shared context
+# ---------------------------------------------------------------------------
+
+
+def test_preamble_and_resource_header_carry_over():
+    sections = _by_title(split_blueprint(BLUEPRINT))
+
+    for section in sections.values():
+        assert section.text.startswith("FORMAT: 1A\n")
+        assert "Shared preamble describing the endpoints." in section.text
+    for title in ("List Federal Accounts", "Federal Account Count"):
+        assert "Resource description for the list." in sections[title].text
+        assert "Snapshot resource header." not in sections[title].text
+    assert "Snapshot resource header." in sections["GET"].text
+    assert "Resource description for the list." not in sections["GET"].text
+
+
+def test_only_referenced_structures_are_appended():
+    sections = _by_title(split_blueprint(BLUEPRINT))
+
+    def structures(title):
+        text = sections[title].text
+        if "# Data Structures" not in text:
+            return []
+        appendix = text.split("# Data Structures", 1)[1]
+        return [line.split()[1] for line in appendix.splitlines() if line.startswith("## ")]
+
+    # TimePeriod is only reachable through FilterObject.
+    assert structures("List Federal Accounts") == ["FilterObject", "TimePeriod", "FederalAccount"]
+    assert structures("Federal Account Count") == []
+    assert structures("GET") == ["SnapshotObject"]
+    assert all("Unused" not in s.text for s in sections.values())
+
+
+# ---------------------------------------------------------------------------
+# Size cap
+# ---------------------------------------------------------------------------
+
+
+def _listing(max_chars):
+    return _by_title(split_blueprint(BLUEPRINT, max_chars=max_chars))["List Federal Accounts"].text
+
+
+def test_structures_beyond_the_cap_are_named_not_inlined():
+    full = _listing(None)
+    capped = _listing(len(full) - 20)
+
+    assert len(capped) < len(full)
+    assert "## FilterObject (object)" in capped and "## TimePeriod (object)" in capped
+    assert "## FederalAccount (object)" not in capped
+    assert capped.rstrip().endswith("(omitted to fit the size limit: FederalAccount)")
+
+
+def test_action_block_is_never_truncated():
+    tiny = _listing(10)
+    assert "+ `results` (array[FederalAccount])" in tiny
+    assert "(omitted to fit the size limit: FilterObject, TimePeriod, FederalAccount)" in tiny
+    assert "## FilterObject (object)" not in tiny
+
+
+def test_default_cap_leaves_small_documents_alone():
+    assert split_blueprint(BLUEPRINT) == split_blueprint(BLUEPRINT, max_chars=None)
+    assert all("omitted" not in s.text for s in split_blueprint(BLUEPRINT))
+
+
+# ---------------------------------------------------------------------------
+# Non-Blueprint input
+# ---------------------------------------------------------------------------
+
+
+def test_split_document_only_splits_blueprint_markdown():
+    assert len(split_document("contract.md", BLUEPRINT)) == 4
+    assert split_document("contract.yaml", BLUEPRINT) == [Section(None, None, "", BLUEPRINT)]
+    plain = "# Notes\n\n## POST\n\nNot a blueprint.\n"
+    assert split_document("notes.md", plain) == [Section(None, None, "", plain)]
+
+
+def test_blueprint_without_actions_is_one_section():
+    text = "FORMAT: 1A\n\n# Overview\n\nNo endpoints here.\n"
+    assert split_blueprint(text) == [Section(None, None, "", text)]
+
+
+def test_strip_query_template():
+    assert strip_query_template("/api/v2/x/{id}/{?page,limit}") == "/api/v2/x/{id}/"
+    assert strip_query_template("/api/v2/x/") == "/api/v2/x/"
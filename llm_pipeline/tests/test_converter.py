@@ -0,0 +1,79 @@
+"""Tests for :mod:`llm_pipeline.converter`."""
+
+import json
+
+import pytest
+
+from llm_pipeline import http_session
+from llm_pipeline.converter import load_function_specs
+from llm_pipeline.section_store import SectionStore
+
+SPEC = {"method": "GET", "path": "/api/v2/references/toptier_agencies/", "summary": "List agencies"}
+
+
+class _Response:
+    status_code = 200
+    headers = {"content-type": "application/json"}
+    text = ""
+
+    def json(self):
+        return {"results": []}
+
+
+class _Session:
+    def __init__(self):
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        return _Response()
+
+
+@pytest.fixture()
+def db(tmp_path):
+    path = tmp_path / "sections.db"
+    with SectionStore(path) as store:
+        store.upsert(id="agencies", content=json.dumps(SPEC))
+    return path
+
+
+@pytest.fixture()
+def no_requests(monkeypatch):
+    monkeypatch.setattr(http_session, "_REQUESTS", False)
+
+
+def test_loads_without_requests(db, no_requests):
+    schemas, callables = load_function_specs(db)
+
+    assert [s["function"]["description"] for s in schemas] == ["List agencies"]
+    (call,) = callables.values()
+    with pytest.raises(RuntimeError, match="requests"):
+        call()
+
+
+def test_injected_session_needs_no_requests(db, no_requests):
+    session = _Session()
+    _, callables = load_function_specs(db, session=session, shape=None)
+
+    (call,) = callables.values()
+    assert call()["body"] == {"results": []}
+    assert session.urls == ["https://api.usaspending.gov/api/v2/references/toptier_agencies/"]
+
+
+def test_session_is_created_on_first_call(db, monkeypatch):
+    created = []
+    session = _Session()
+
+    def _get_session(base_url, config):
+        created.append(base_url)
+        return session
+
+    monkeypatch.setattr("llm_pipeline.converter.get_session", _get_session)
+    _, callables = load_function_specs(db, base_url="http://127.0.0.1:9", shape=None)
+    assert created == []
+
+    (call,) = callables.values()
+    call()
+    call()
+    assert set(created) == {"http://127.0.0.1:9"}
+    assert len(session.urls) == 2
@@ -0,0 +1,94 @@
+"""Tests for :mod:`llm_pipeline.executor` caching and request coalescing."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_pipeline.executor import call_endpoint
+from llm_pipeline.response_cache import MemoryCache
+from llm_pipeline.singleflight import SingleFlight
+
+GET_SPEC = {"method": "GET", "path": "/api/v2/references/toptier_agencies/", "auth": "apiKey"}
+POST_SPEC = {"method": "POST", "path": "/api/v2/search/spending_by_award/"}
+
+
+class _Response:
+    status_code = 200
+    headers = {"content-type": "application/json"}
+    text = ""
+
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class _Session:
+    """Counts upstream requests; each one waits *delay* seconds before answering."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, *, headers=None, **kwargs):
+        with self._lock:
+            self.calls.append(dict(headers or {}))
+            n = len(self.calls)
+        time.sleep(self.delay)
+        return _Response({"call": n})
+
+
+def _call(spec, session, **kwargs):
+    return call_endpoint(spec, session=session, shape=None, **kwargs)
+
+
+def test_cache_key_includes_credentials():
+    cache = MemoryCache()
+    session = _Session()
+
+    first = _call(GET_SPEC, session, cache=cache, api_key="alice")
+    assert _call(GET_SPEC, session, cache=cache, api_key="alice") == first
+    other = _call(GET_SPEC, session, cache=cache, api_key="bob")
+
+    assert other != first
+    assert [c.get("Authorization") for c in session.calls] == ["alice", "bob"]
+
+
+def _concurrently(fn, n=4):
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return [f.result() for f in [pool.submit(fn) for _ in range(n)]]
+
+
+def test_post_is_not_coalesced_by_default():
+    session = _Session(delay=0.2)
+    results = _concurrently(lambda: _call(POST_SPEC, session, body={"filters": {}}))
+
+    assert len(session.calls) == 4
+    assert sorted(r["body"]["call"] for r in results) == [1, 2, 3, 4]
+
+
+def test_post_coalescing_is_opt_in():
+    group = SingleFlight(methods={"GET", "HEAD", "POST"})
+    session = _Session(delay=0.2)
+    results = _concurrently(lambda: _call(POST_SPEC, session, body={"filters": {}}, coalesce=group))
+
+    assert len(session.calls) == 1
+    assert [r["body"] for r in results] == [{"call": 1}] * 4
+    assert (group.stats.leaders, group.stats.shared) == (1, 3)
+
+
+def test_get_is_coalesced_per_credential():
+    group = SingleFlight()
+    session = _Session(delay=0.2)
+    keys = iter(["alice", "alice", "bob", "bob"])
+    lock = threading.Lock()
+
+    def _one():
+        with lock:
+            key = next(keys)
+        return _call(GET_SPEC, session, coalesce=group, api_key=key)
+
+    _concurrently(_one)
+    assert sorted(c["Authorization"] for c in session.calls) == ["alice", "bob"]
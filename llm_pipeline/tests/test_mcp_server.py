@@ -0,0 +1,373 @@
+"""Tests for :mod:`llm_pipeline.mcp_server` framing, sessions and cancellation."""
+
+import asyncio
+import json
+
+import pytest
+
+from llm_pipeline.mcp_server import (
+    _CHUNK_SIZE,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    HttpTransport,
+    Session,
+    ToolServer,
+    _write_chunked,
+)
+from llm_pipeline.section_store import SectionStore
+
+SPECS = {
+    "fast": {"method": "GET", "path": "/api/v2/fast/", "summary": "Fast"},
+    "slow": {"method": "GET", "path": "/api/v2/slow/", "summary": "Slow"},
+    "agency": {
+        "method": "GET",
+        "path": "/api/v2/agency/{toptier_code}/",
+        "summary": "Agency",
+        "path_params": {"toptier_code": {"type": "string", "required": True}},
+        "query_params": {"fiscal_year": {"type": "integer"}},
+    },
+}
+
+
+class _Response:
+    status_code = 200
+    headers = {"content-type": "application/json"}
+    text = ""
+
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class _Upstream:
+    """``httpx.AsyncClient`` stand-in; ``/slow/`` waits until ``release`` is set."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.urls = []
+
+    async def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        if "/slow/" in url:
+            await self.release.wait()
+        return _Response({"url": url, "params": kwargs.get("params")})
+
+
+@pytest.fixture()
+def registry_db(tmp_path):
+    path = tmp_path / "sections.db"
+    with SectionStore(path) as store:
+        for row_id, spec in SPECS.items():
+            store.upsert(id=row_id, content=json.dumps(spec))
+    return path
+
+
+def _server(registry_db, upstream, **kwargs):
+    return ToolServer.from_db(registry_db, client=upstream, shape=None, **kwargs)
+
+
+def _tool(server, summary):
+    return next(t["name"] for t in server.tools if t["description"] == summary)
+
+
+def _call(msg_id, name, arguments=None):
+    params = {"name": name, "arguments": arguments or {}}
+    return {"jsonrpc": "2.0", "id": msg_id, "method": "tools/call", "params": params}
+
+
+# ---------------------------------------------------------------------------
+# JSON-RPC handling
+# ---------------------------------------------------------------------------
+
+
+def test_initialize_and_list(registry_db):
+    async def _main():
+        server = _server(registry_db, _Upstream())
+        session = Session(id="s")
+        init = await server.handle(
+            {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"protocolVersion": "2024-11-05"}},
+            session,
+        )
+        tools = await server.handle({"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, session)
+        return init, tools
+
+    init, tools = asyncio.run(_main())
+    assert init["result"]["protocolVersion"] == "2024-11-05"
+    assert sorted(t["description"] for t in tools["result"]["tools"]) == ["Agency", "Fast", "Slow"]
+
+
+def test_protocol_errors(registry_db):
+    async def _main():
+        server = _server(registry_db, _Upstream())
+        session = Session(id="s")
+        return [
+            await server.handle({"id": 1, "method": "ping"}, session),
+            await server.handle({"jsonrpc": "2.0", "id": 2, "method": "nope"}, session),
+            await server.handle({"jsonrpc": "2.0", "method": "notifications/initialized"}, session),
+            await server.handle({"jsonrpc": "2.0", "id": 3, "result": {}}, session),
+            await server.handle_payload([], session),
+            await server.handle(_call(4, "no_such_tool"), session),
+        ]
+
+    invalid, missing, notification, response, empty_batch, unknown_tool = asyncio.run(_main())
+    assert invalid["error"]["code"] == INVALID_REQUEST
+    assert (missing["id"], missing["error"]["code"]) == (2, METHOD_NOT_FOUND)
+    assert notification is None and response is None
+    assert empty_batch["error"]["code"] == INVALID_REQUEST
+    assert unknown_tool["error"]["code"] == INVALID_PARAMS
+
+
+def test_batch_replies_skip_notifications(registry_db):
+    async def _main():
+        server = _server(registry_db, _Upstream())
+        fast = _tool(server, "Fast")
+        batch = [
+            {"jsonrpc": "2.0", "id": "a", "method": "ping"},
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            _call("b", fast),
+        ]
+        return await server.handle_payload(batch, Session(id="s"))
+
+    replies = asyncio.run(_main())
+    assert [r["id"] for r in replies] == ["a", "b"]
+    body = json.loads(replies[1]["result"]["content"][0]["text"])
+    assert body["body"]["url"] == "https://api.usaspending.gov/api/v2/fast/"
+    assert replies[1]["result"]["isError"] is False
+
+
+def test_invalid_arguments_are_tool_errors(registry_db):
+    async def _main():
+        server = _server(registry_db, upstream := _Upstream())
+        agency = _tool(server, "Agency")
+        reply = await server.handle(_call(1, agency, {"fiscal_year": 2024}), Session(id="s"))
+        return reply, upstream
+
+    reply, upstream = asyncio.run(_main())
+    assert reply["result"]["isError"] is True
+    assert "toptier_code" in reply["result"]["content"][0]["text"]
+    assert upstream.urls == []
+
+
+def test_cancelled_request_gets_no_reply(registry_db):
+    async def _main():
+        upstream = _Upstream()
+        server = _server(registry_db, upstream)
+        session = Session(id="s")
+        slow = asyncio.create_task(server.handle(_call(7, _tool(server, "Slow")), session))
+        while 7 not in session.inflight or not upstream.urls:
+            await asyncio.sleep(0)
+        cancel = {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 7}}
+        assert await server.handle(cancel, session) is None
+        reply = await slow
+        pong = await server.handle({"jsonrpc": "2.0", "id": 8, "method": "ping"}, session)
+        return reply, pong, session
+
+    reply, pong, session = asyncio.run(_main())
+    assert reply is None
+    assert session.inflight == {}
+    assert pong == {"jsonrpc": "2.0", "id": 8, "result": {}}
+
+
+def test_call_timeout_is_a_tool_error(registry_db):
+    async def _main():
+        server = _server(registry_db, _Upstream(), call_timeout=0.05)
+        return await server.handle(_call(1, _tool(server, "Slow")), Session(id="s"))
+
+    reply = asyncio.run(_main())
+    assert reply["result"]["isError"] is True
+    assert "timed out" in reply["result"]["content"][0]["text"]
+
+
+# ---------------------------------------------------------------------------
+# HTTP framing
+# ---------------------------------------------------------------------------
+
+
+class _Writer:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(data)
+
+    async def drain(self):
+        pass
+
+
+def test_write_chunked_slices_large_payloads():
+    data = b"x" * (2 * _CHUNK_SIZE + 10)
+    writer = _Writer()
+    asyncio.run(_write_chunked(writer, data, http_chunks=True))
+
+    assert len(writer.writes) == 3
+    assert writer.writes[0] == b"%x\r\n" % _CHUNK_SIZE + b"x" * _CHUNK_SIZE + b"\r\n"
+    assert writer.writes[-1] == b"a\r\n" + b"x" * 10 + b"\r\n"
+
+
+async def _read_response(reader):
+    """Return *(status, headers, body)*, de-chunking the body."""
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        body = b""
+        while size := int((await reader.readline()).strip(), 16):
+            body += await reader.readexactly(size)
+            await reader.readline()
+        await reader.readline()
+    else:
+        body = await reader.readexactly(int(headers.get("content-length") or 0))
+    return status, headers, body
+
+
+async def _read_event(reader):
+    """Read one SSE event written as a single HTTP chunk."""
+
+    size = int((await reader.readline()).strip(), 16)
+    event = await reader.readexactly(size)
+    await reader.readline()
+    return event
+
+
+def _sse_messages(body):
+    events = [e for e in body.decode("utf-8").split("\n\n") if e]
+    assert all(e.startswith("event: message\ndata: ") for e in events)
+    return [json.loads(e.split("data: ", 1)[1]) for e in events]
+
+
+async def _request(port, method, target, payload=None, headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    head = {"Host": "test", "Content-Length": str(len(body)), "Connection": "close", **(headers or {})}
+    lines = [f"{method} {target} HTTP/1.1"] + [f"{k}: {v}" for k, v in head.items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    try:
+        return await _read_response(reader)
+    finally:
+        writer.close()
+
+
+@pytest.fixture()
+def http(registry_db):
+    """Run ``scenario(port, transport, upstream)`` against a live HTTP transport."""
+
+    def _run(scenario):
+        async def _main():
+            upstream = _Upstream()
+            transport = HttpTransport(_server(registry_db, upstream))
+            srv = await asyncio.start_server(transport._connection, "127.0.0.1", 0)
+            port = srv.sockets[0].getsockname()[1]
+            try:
+                return await scenario(port, transport, upstream)
+            finally:
+                srv.close()
+                await srv.wait_closed()
+
+        return asyncio.run(_main())
+
+    return _run
+
+
+def _init_payload(msg_id=1):
+    return {"jsonrpc": "2.0", "id": msg_id, "method": "initialize", "params": {}}
+
+
+def test_streamable_http_session_lifecycle(http):
+    async def _scenario(port, transport, upstream):
+        status, headers, body = await _request(port, "POST", "/mcp", _init_payload())
+        assert status == 200 and headers["content-type"] == "application/json"
+        assert json.loads(body)["result"]["serverInfo"]["name"]
+        sid = headers["mcp-session-id"]
+
+        ping = {"jsonrpc": "2.0", "id": 2, "method": "ping"}
+        assert (await _request(port, "POST", "/mcp", ping))[0] == 400  # no session header
+        assert (await _request(port, "POST", "/mcp", ping, {"Mcp-Session-Id": "nope"}))[0] == 404
+        status, _, body = await _request(port, "POST", "/mcp", ping, {"Mcp-Session-Id": sid})
+        assert (status, json.loads(body)) == (200, {"jsonrpc": "2.0", "id": 2, "result": {}})
+
+        note = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+        assert (await _request(port, "POST", "/mcp", note, {"Mcp-Session-Id": sid}))[0] == 202
+
+        assert (await _request(port, "DELETE", "/mcp", headers={"Mcp-Session-Id": sid}))[0] == 200
+        assert (await _request(port, "POST", "/mcp", ping, {"Mcp-Session-Id": sid}))[0] == 404
+        assert transport.sessions == {}
+
+    http(_scenario)
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3"])
+def test_malformed_content_length_is_a_400(http, length):
+    async def _scenario(port, transport, upstream):
+        status, headers, _ = await _request(port, "POST", "/mcp", _init_payload(), {"Content-Length": length})
+        assert (status, headers["connection"]) == (400, "close")
+        # The listener survives and keeps serving.
+        assert (await _request(port, "POST", "/mcp", _init_payload()))[0] == 200
+
+    http(_scenario)
+
+
+def test_oversized_body_is_a_413(http):
+    async def _scenario(port, transport, upstream):
+        status, _, _ = await _request(port, "POST", "/mcp", _init_payload(), {"Content-Length": str(1 << 40)})
+        assert status == 413
+
+    http(_scenario)
+
+
+def test_streamable_http_streams_replies_in_completion_order(http):
+    async def _scenario(port, transport, upstream):
+        _, headers, _ = await _request(port, "POST", "/mcp", _init_payload())
+        sid = headers["mcp-session-id"]
+        tools = {t["description"]: t["name"] for t in transport.server.tools}
+        batch = [_call(1, tools["Slow"]), _call(2, tools["Fast"]), {"jsonrpc": "2.0", "id": 3, "method": "ping"}]
+
+        async def _release_slow():
+            while len(upstream.urls) < 2:
+                await asyncio.sleep(0.01)
+            upstream.release.set()
+
+        release = asyncio.create_task(_release_slow())
+        status, headers, body = await _request(
+            port, "POST", "/mcp", batch, {"Mcp-Session-Id": sid, "Accept": "application/json, text/event-stream"}
+        )
+        await release
+        return status, headers, _sse_messages(body)
+
+    status, headers, messages = http(_scenario)
+    assert status == 200
+    assert headers["content-type"] == "text/event-stream"
+    assert headers["transfer-encoding"] == "chunked"
+    assert sorted(m["id"] for m in messages[:2]) == [2, 3]
+    assert messages[2]["id"] == 1
+
+
+def test_legacy_sse_transport(http):
+    async def _scenario(port, transport, upstream):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /sse HTTP/1.1\r\nHost: test\r\n\r\n")
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        endpoint = (await _read_event(reader)).decode()
+        assert endpoint.startswith("event: endpoint\ndata: /messages?session_id=")
+        target = endpoint.split("data: ", 1)[1].strip()
+
+        ping = {"jsonrpc": "2.0", "id": 5, "method": "ping"}
+        assert (await _request(port, "POST", target, ping))[0] == 202
+        message = _sse_messages(await _read_event(reader))
+        assert (await _request(port, "POST", "/messages?session_id=nope", ping))[0] == 404
+
+        writer.close()
+        return status, message
+
+    status, message = http(_scenario)
+    assert status == 200
+    assert message == [{"jsonrpc": "2.0", "id": 5, "result": {}}]
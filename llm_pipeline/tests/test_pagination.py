@@ -0,0 +1,213 @@
+"""Tests for :mod:`llm_pipeline.pagination` page planning, budgets and prefetch."""
+
+import asyncio
+import threading
+
+import pytest
+
+from llm_pipeline.pagination import PageBudget, aiter_pages, iter_pages, paginate, paginate_async
+from llm_pipeline.shaping import ShapeConfig
+
+ROWS = list(range(95))
+OFFSET_SPEC = {
+    "method": "POST",
+    "path": "/api/v2/search/spending_by_award/",
+    "request_body": {"required": False},
+    "pagination": {"style": "offset", "param_names": ["page", "limit"]},
+}
+CURSOR_SPEC = {
+    "method": "GET",
+    "path": "/api/v2/awards/",
+    "pagination": {"style": "cursor", "param_names": ["cursor", "limit"]},
+}
+LINK_SPEC = {"method": "GET", "path": "/api/v2/links/", "pagination": {"style": "link", "param_names": ["page"]}}
+
+
+class _API:
+    """Serves ``ROWS`` for every pagination style and records the arguments of each call."""
+
+    def __init__(self):
+        self.calls = []
+        self.started = []  # arguments of every call, recorded before the gate
+        self.gate = None  # threading.Event / asyncio.Event holding back pages after the first
+        self.waiting = threading.Event()
+
+    def _result(self, spec, args):
+        self.calls.append(args)
+        style = spec["pagination"]["style"]
+        if style == "offset":
+            page, limit = args["body"].get("page", 1), args["body"]["limit"]
+            rows = ROWS[(page - 1) * limit : page * limit]
+            body = {"results": rows, "page_metadata": {"page": page, "hasNext": page * limit < len(ROWS)}}
+            return {"status_code": 200, "headers": {}, "body": body}
+        if style == "cursor":
+            start, limit = int(args.get("cursor") or 0), args["limit"]
+            rows = ROWS[start : start + limit]
+            meta = {"next_cursor": str(start + limit) if start + limit < len(ROWS) else None}
+            return {"status_code": 200, "headers": {}, "body": {"results": rows, "page_metadata": meta}}
+        page = int(args.get("page") or 1)
+        headers = {"Link": f'</api/v2/links/?page={page + 1}>; rel="next"'} if page < 3 else {}
+        return {"status_code": 200, "headers": headers, "body": [page * 10, page * 10 + 1]}
+
+    def __call__(self, spec, *, routing=None, shape=None, **args):
+        self.started.append(args)
+        if self.gate is not None and len(self.started) > 1:
+            self.waiting.set()
+            assert self.gate.wait(5)
+        return self._result(spec, args)
+
+    async def acall(self, spec, *, routing=None, shape=None, **args):
+        self.started.append(args)
+        if self.gate is not None and len(self.started) > 1:
+            await self.gate.wait()
+        return self._result(spec, args)
+
+
+@pytest.fixture()
+def api():
+    return _API()
+
+
+def _pages(spec, api, **kwargs):
+    kwargs.setdefault("routing", {})
+    return list(iter_pages(spec, call=api, **kwargs))
+
+
+# ---------------------------------------------------------------------------
+# Styles
+# ---------------------------------------------------------------------------
+
+
+def test_offset_pages_until_has_next_is_false(api):
+    pages = _pages(OFFSET_SPEC, api, body={"limit": 20})
+
+    assert [p.number for p in pages] == [1, 2, 3, 4, 5]
+    assert [row for p in pages for row in p.rows] == ROWS
+    assert [c["body"].get("page") for c in api.calls] == [None, 2, 3, 4, 5]
+    assert [p.more for p in pages] == [True] * 4 + [False]
+
+
+def test_cursor_follows_next_cursor(api):
+    pages = _pages(CURSOR_SPEC, api, limit=40, prefetch=False)
+
+    assert [len(p.rows) for p in pages] == [40, 40, 15]
+    assert [c.get("cursor") for c in api.calls] == [None, "40", "80"]
+
+
+def test_link_header_query_is_applied(api):
+    pages = _pages(LINK_SPEC, api)
+
+    assert [p.rows for p in pages] == [[10, 11], [20, 21], [30, 31]]
+    assert [c.get("page") for c in api.calls] == [None, "2", "3"]
+
+
+def test_error_page_stops_iteration():
+    def _call(spec, **args):
+        return {"status_code": 500, "headers": {}, "body": {"results": [1, 2]}}
+
+    pages = list(iter_pages(OFFSET_SPEC, call=_call, routing={}, body={"limit": 2}))
+    assert len(pages) == 1 and not pages[0].more
+
+
+# ---------------------------------------------------------------------------
+# Budgets
+# ---------------------------------------------------------------------------
+
+
+def test_row_budget_cuts_the_last_page(api):
+    pages = _pages(OFFSET_SPEC, api, body={"limit": 20}, budget=PageBudget(max_rows=50))
+
+    assert [len(p.rows) for p in pages] == [20, 20, 10]
+    assert pages[-1].more
+    assert len(api.calls) == 3  # no page is requested past the budget
+
+
+def test_page_budget_does_not_prefetch_beyond_the_limit(api):
+    pages = _pages(OFFSET_SPEC, api, body={"limit": 10}, budget=PageBudget(max_pages=2))
+
+    assert len(pages) == 2 and pages[-1].more
+    assert len(api.calls) == 2
+
+
+def test_paginate_combines_rows(api):
+    result = paginate(OFFSET_SPEC, call=api, routing={}, body={"limit": 30}, shape=None)
+
+    assert result["body"]["results"] == ROWS
+    assert result["body"]["page_metadata"] == {"page": 4, "hasNext": False}
+    assert (result["pages"], result["has_more"]) == (4, False)
+
+
+def test_paginate_stops_at_the_shaped_row_limit(api):
+    result = paginate(OFFSET_SPEC, call=api, routing={}, body={"limit": 10}, shape=ShapeConfig(max_rows=25))
+
+    assert len(api.started) == 3  # 10 + 10 + 5 rows – not all ten pages
+    assert result["body"]["results"][:25] == ROWS[:25]
+    assert result["body"]["results"][25:] == []
+    assert result["has_more"]
+
+
+def test_paginate_async_stops_at_the_shaped_row_limit(api):
+    result = asyncio.run(
+        paginate_async(OFFSET_SPEC, call=api.acall, routing={}, body={"limit": 10}, shape=ShapeConfig(max_rows=15))
+    )
+    assert len(api.started) == 2
+    assert len(result["body"]["results"]) == 15 and result["has_more"]
+
+
+def test_smaller_page_budget_wins_over_shaping(api):
+    paginate(OFFSET_SPEC, call=api, routing={}, body={"limit": 10}, budget=PageBudget(max_rows=12))
+    assert len(api.started) == 2
+
+
+# ---------------------------------------------------------------------------
+# Prefetch
+# ---------------------------------------------------------------------------
+
+
+def test_next_page_is_requested_before_the_consumer_asks(api):
+    api.gate = threading.Event()
+    pages = iter_pages(OFFSET_SPEC, call=api, routing={}, body={"limit": 40})
+
+    first = next(pages)
+    assert first.number == 1
+    # Page 2 is already in flight (held at the gate) while page 1 is consumed.
+    assert api.waiting.wait(5)
+    assert api.started[1] == {"body": {"limit": 40, "page": 2}}
+    api.gate.set()
+    assert [p.number for p in pages] == [2, 3]
+    assert [c["body"].get("page") for c in api.calls] == [None, 2, 3]
+
+
+def test_without_prefetch_pages_are_requested_on_demand(api):
+    pages = iter_pages(OFFSET_SPEC, call=api, routing={}, prefetch=False, body={"limit": 40})
+
+    next(pages)
+    assert len(api.calls) == 1
+    next(pages)
+    assert len(api.calls) == 2
+    pages.close()
+    assert len(api.calls) == 2
+
+
+def test_async_prefetch_overlaps_and_is_cancelled_on_close(api):
+    async def _run():
+        api.gate = asyncio.Event()
+        pages = aiter_pages(OFFSET_SPEC, call=api.acall, routing={}, body={"limit": 40})
+
+        first = await pages.__anext__()
+        await asyncio.sleep(0)  # let the prefetch task start and block on the gate
+        assert first.number == 1
+        assert len(api.started) == 2 and len(api.calls) == 1
+        await pages.aclose()  # cancels the in-flight prefetch
+
+        api.gate.set()
+        await asyncio.sleep(0)
+        assert len(api.calls) == 1
+
+        api.gate = None
+        api.calls.clear()
+        collected = [p async for p in aiter_pages(OFFSET_SPEC, call=api.acall, routing={}, body={"limit": 40})]
+        return collected
+
+    pages = asyncio.run(_run())
+    assert [row for p in pages for row in p.rows] == ROWS
@@ -0,0 +1,183 @@
+"""Tests for :mod:`llm_pipeline.ratelimit` and :func:`executor.call_endpoints`."""
+
+import threading
+import time
+
+import pytest
+
+from llm_pipeline.executor import call_endpoints
+from llm_pipeline.ratelimit import HostLimiter, TokenBucket
+
+
+class _Clock:
+    """Fake monotonic clock; ``sleep`` advances it instead of blocking."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture()
+def clock():
+    return _Clock()
+
+
+# ---------------------------------------------------------------------------
+# TokenBucket
+# ---------------------------------------------------------------------------
+
+
+def test_bucket_allows_a_burst_then_waits(clock):
+    bucket = TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    clock.now += 0.25
+    assert bucket.try_acquire() == pytest.approx(0.25)
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate=4, burst=5, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        bucket.acquire()
+
+    clock.now += 0.75  # three tokens back
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() > 0
+
+    clock.now += 60  # idle for a long time: still only *burst* tokens
+    assert sum(bucket.try_acquire() == 0.0 for _ in range(10)) == 5
+
+
+def test_acquire_sleeps_for_the_deficit(clock):
+    bucket = TokenBucket(rate=4, burst=2, clock=clock, sleep=clock.sleep)
+    start = clock.now
+    for _ in range(10):
+        bucket.acquire()
+
+    assert clock.slept == pytest.approx([0.25] * 8)
+    assert clock.now - start == pytest.approx(2.0)  # (10 - burst) / rate
+
+
+def test_bucket_defaults_and_validation(clock):
+    assert TokenBucket(rate=0.5, clock=clock).capacity == 1.0
+    assert TokenBucket(rate=20, clock=clock).capacity == 20.0
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+# ---------------------------------------------------------------------------
+# HostLimiter
+# ---------------------------------------------------------------------------
+
+
+class _Gauge:
+    def __init__(self):
+        self.current = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+def test_host_limiter_caps_in_flight_per_host():
+    limiter = HostLimiter(per_host=2)
+    gauges = {"a": _Gauge(), "b": _Gauge()}
+
+    def _work(host):
+        with limiter.slot(host), gauges[host]:
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=_work, args=(host,)) for host in "ab" * 6]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert gauges["a"].peak == gauges["b"].peak == 2
+
+
+def test_host_limiter_releases_on_error():
+    limiter = HostLimiter(per_host=1)
+    with pytest.raises(RuntimeError):
+        with limiter.slot("a"):
+            raise RuntimeError
+    with limiter.slot("a"):  # would deadlock if the slot leaked
+        pass
+    with pytest.raises(ValueError):
+        HostLimiter(per_host=0)
+
+
+# ---------------------------------------------------------------------------
+# call_endpoints
+# ---------------------------------------------------------------------------
+
+
+class _Response:
+    status_code = 200
+    headers = {"content-type": "application/json"}
+    text = ""
+
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class _Session:
+    """Slow for low ids so completions arrive in reverse order; ``/boom/`` raises."""
+
+    def __init__(self):
+        self.gauge = _Gauge()
+
+    def request(self, method, url, *, params=None, **kwargs):
+        with self.gauge:
+            if "/boom/" in url:
+                raise ConnectionError(url)
+            n = int(params["n"])
+            time.sleep(0.01 * (10 - n))
+            return _Response({"n": n})
+
+
+SPEC = {"method": "GET", "path": "/api/v2/items/", "query_params": {"n": {}}}
+BOOM = {"method": "GET", "path": "/api/v2/boom/"}
+
+
+def test_call_endpoints_keeps_input_order_and_isolates_errors():
+    session = _Session()
+    calls = [(SPEC, {"n": n}) for n in range(10)]
+    calls.insert(3, (BOOM, {}))
+
+    results = call_endpoints(calls, session=session, shape=None, max_workers=8, per_host=3, rate=1000)
+
+    assert isinstance(results[3], ConnectionError)
+    assert [r["body"]["n"] for i, r in enumerate(results) if i != 3] == list(range(10))
+    assert session.gauge.peak <= 3
+
+
+def test_call_endpoints_uses_shared_limiters(clock):
+    session = _Session()
+    bucket = TokenBucket(rate=1, burst=2, clock=clock, sleep=clock.sleep)
+    limiter = HostLimiter(per_host=1)
+
+    results = call_endpoints(
+        [(SPEC, {"n": 9})] * 4, session=session, shape=None, limiter=limiter, bucket=bucket
+    )
+
+    assert [r["body"] for r in results] == [{"n": 9}] * 4
+    assert session.gauge.peak == 1
+    assert clock.slept == pytest.approx([1.0, 1.0])  # two calls beyond the burst
+    assert call_endpoints([], session=session) == []
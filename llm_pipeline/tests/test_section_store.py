@@ -0,0 +1,309 @@
+"""Tests for :mod:`llm_pipeline.section_store` change tracking and concurrent writes."""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from llm_pipeline.registry import load_registry
+from llm_pipeline.section_store import SectionStore, SectionWriter
+
+SPEC = "method: GET\npath: /api/v2/{name}/\nsummary: {summary}\n"
+
+
+def test_fingerprint_changes_on_same_second_same_length_upsert(tmp_path):
+    with SectionStore(tmp_path / "sections.db") as store:
+        store.upsert(id="a", content="aaaa")
+        before = store.fingerprint()
+        store.upsert(id="a", content="bbbb")
+        assert store.fingerprint() != before
+
+
+def test_fingerprint_changes_on_delete(tmp_path):
+    with SectionStore(tmp_path / "sections.db") as store:
+        store.upsert(id="a", content="x", source_path="a.md")
+        before = store.fingerprint()
+        store.delete_sources(["a.md"])
+        assert store.fingerprint() != before
+
+
+def test_fingerprint_differs_between_stores(tmp_path):
+    fingerprints = []
+    for name in ("one.db", "two.db"):
+        with SectionStore(tmp_path / name) as store:
+            store.upsert(id="a", content="x")
+            fingerprints.append(store.fingerprint())
+    assert fingerprints[0] != fingerprints[1]
+
+
+def test_identity_survives_reopening(tmp_path):
+    with SectionStore(tmp_path / "sections.db") as store:
+        identity = store.identity()
+    with SectionStore(tmp_path / "sections.db") as store:
+        assert store.identity() == identity
+    with SectionStore(tmp_path / "other.db") as store:
+        assert store.identity() != identity
+
+
+def test_revision_tracks_external_writes(tmp_path):
+    db = tmp_path / "sections.db"
+    with SectionStore(db) as store:
+        store.upsert(id="a", content="x")
+        store.upsert(id="b", content="y")
+        rev = store.revision()
+
+    # A writer that knows nothing about revisions still bumps them.
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.execute("UPDATE sections SET content = 'z' WHERE id = 'b'")
+    conn.close()
+
+    with SectionStore(db) as store:
+        assert store.revision() > rev
+        assert [row["id"] for row in store.iter_rows(after_rev=rev)] == ["b"]
+
+
+def test_schema_upgrade_keeps_existing_rows(tmp_path):
+    db = tmp_path / "sections.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE sections (id TEXT PRIMARY KEY, content TEXT NOT NULL, "
+        "meta JSON NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO sections VALUES "
+        "('a', 'x', '{}', '2024-01-01T00:00:00Z', '2024-01-01T00:00:00Z')"
+    )
+    conn.commit()
+    conn.close()
+
+    with SectionStore(db) as store:
+        before = store.fingerprint()
+        assert [row["id"] for row in store.iter_rows(after_rev=0)] == []
+        store.upsert(id="a", content="y")
+        assert store.fingerprint() != before
+        assert [row["id"] for row in store.iter_rows(after_rev=0)] == ["a"]
+
+
+def test_registry_rebuilds_after_same_second_same_length_upsert(tmp_path):
+    db = tmp_path / "sections.db"
+    with SectionStore(db) as store:
+        store.upsert(id="a", content=SPEC.format(name="agency", summary="old"))
+    assert load_registry(db).entries[0].spec["summary"] == "old"
+
+    with SectionStore(db) as store:
+        store.upsert(id="a", content=SPEC.format(name="agency", summary="new"))
+    assert load_registry(db).entries[0].spec["summary"] == "new"
+
+
+def _legacy_db(db):
+    """Database written before provenance and revisions were tracked."""
+
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE sections (id TEXT PRIMARY KEY, content TEXT NOT NULL, "
+        "meta JSON NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO sections VALUES (?, ?, '{}', '2024-01-01T00:00:00Z', '2024-01-01T00:00:00Z')",
+        ("a", SPEC.format(name="agency", summary="legacy")),
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_read_only_store_never_writes(tmp_path):
+    db = tmp_path / "sections.db"
+    _legacy_db(db)
+
+    with SectionStore(db, read_only=True) as store:
+        assert [row["id"] for row in store.iter_rows()] == ["a"]
+        assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        with pytest.raises(sqlite3.OperationalError):
+            store.revision()  # the schema was not upgraded
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            store.conn.execute("DELETE FROM sections")
+    assert not (tmp_path / "sections.db-wal").exists()
+
+
+def test_load_registry_reads_without_the_write_lock(tmp_path):
+    db = tmp_path / "sections.db"
+    with SectionStore(db) as store:
+        store.upsert(id="a", content=SPEC.format(name="agency", summary="cached"))
+    load_registry(db)  # writes the artefact
+
+    writer = sqlite3.connect(db, timeout=0)
+    writer.execute("BEGIN IMMEDIATE")  # another process mid-write
+    try:
+        t0 = time.perf_counter()
+        registry = load_registry(db)
+        assert time.perf_counter() - t0 < 1  # no busy_timeout wait on schema DDL
+    finally:
+        writer.rollback()
+        writer.close()
+    assert registry.entries[0].spec["summary"] == "cached"
+
+
+@pytest.mark.skipif(hasattr(os, "geteuid") and os.geteuid() == 0, reason="root ignores file modes")
+def test_load_registry_from_a_read_only_file(tmp_path):
+    db = tmp_path / "sections.db"
+    with SectionStore(db, pragmas={"journal_mode": "DELETE"}) as store:
+        store.upsert(id="a", content=SPEC.format(name="agency", summary="ro"))
+    db.chmod(0o444)
+    try:
+        assert load_registry(db, artifact_path=tmp_path / "r.json").entries[0].spec["summary"] == "ro"
+    finally:
+        db.chmod(0o644)
+
+
+def test_load_registry_upgrades_a_legacy_database(tmp_path):
+    db = tmp_path / "sections.db"
+    _legacy_db(db)
+    assert load_registry(db).entries[0].spec["summary"] == "legacy"
+    with SectionStore(db, read_only=True) as store:
+        assert store.revision() == 0
+
+
+# ---------------------------------------------------------------------------
+# Bulk writes and streaming reads
+# ---------------------------------------------------------------------------
+
+
+def test_bulk_upsert_writes_in_one_transaction(tmp_path):
+    with SectionStore(tmp_path / "sections.db") as store:
+        store.upsert(id="row-0000", content="old")
+        statements = []
+        store.conn.set_trace_callback(statements.append)
+
+        rows = [{"id": f"row-{i:04d}", "content": f"c{i}", "meta": {"i": i}} for i in range(1500)]
+        assert store.bulk_upsert(iter(rows)) == 1500
+        assert store.bulk_upsert([]) == 0
+        store.conn.set_trace_callback(None)
+
+        assert [s for s in statements if s in ("BEGIN ", "COMMIT")] == ["BEGIN ", "COMMIT"]
+        assert store.get("row-0000")["content"] == "c0"
+        assert store.get("row-1499")["meta"] == '{"i": 1499}'
+        assert len(store.list_ids()) == 1500
+
+
+def test_iter_rows_streams_in_id_order(tmp_path):
+    with SectionStore(tmp_path / "sections.db") as store:
+        store.bulk_upsert({"id": f"r{i:03d}", "content": "x"} for i in reversed(range(250)))
+        rev = store.revision()
+        store.bulk_upsert([{"id": "r007", "content": "y"}, {"id": "new", "content": "z"}])
+
+        rows = store.iter_rows(batch_size=16)
+        first = next(rows)
+        assert first["id"] == "new" and set(first) >= {"content", "updated_at", "rev"}
+        assert len(list(rows)) == 250
+        assert [r["id"] for r in store.iter_rows(after_rev=rev)] == ["new", "r007"]
+        assert list(store.iter_rows(after_rev=store.revision())) == []
+
+
+# ---------------------------------------------------------------------------
+# Concurrency
+# ---------------------------------------------------------------------------
+
+
+def _count_transactions(monkeypatch, store):
+    batches = []
+    apply = store._apply
+
+    def _apply(items):
+        batches.append(len(items))
+        return apply(items)
+
+    monkeypatch.setattr(store, "_apply", _apply)
+    return batches
+
+
+def test_writer_group_commits_concurrent_upserts(tmp_path, monkeypatch):
+    with SectionStore(tmp_path / "sections.db") as store:
+        batches = _count_transactions(monkeypatch, store)
+        with SectionWriter(store, max_batch=64, max_delay=0.05) as writer:
+
+            def _write(t):
+                for i in range(100):
+                    writer.upsert(id=f"{t}-{i}", content="x", source_path=f"{t}.md")
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(_write, range(8)))
+            writer.flush()
+            assert len(store.list_ids()) == 800
+
+        assert sum(batches) == 800
+        assert max(batches) <= 64
+        assert len(batches) < 800 // 4  # rows share transactions
+        assert store.get("3-7")["source_path"] == "3.md"
+
+
+def test_writer_close_drains_the_queue(tmp_path):
+    db = tmp_path / "sections.db"
+    writer = SectionWriter(db, max_batch=10, max_delay=0.01)
+    for i in range(250):
+        writer.upsert(id=str(i), content="x")
+    writer.replace_source("doc.md", [{"id": "doc.md#GET /a", "content": "a", "source_path": "doc.md"}])
+    writer.close()
+
+    with SectionStore(db) as store:
+        assert len(store.list_ids()) == 251
+        assert store.get("doc.md#GET /a")["content"] == "a"
+
+
+def test_writer_errors_surface_to_the_caller(tmp_path):
+    with SectionStore(tmp_path / "sections.db") as store:
+        writer = SectionWriter(store, max_delay=0.0)
+        writer.upsert(id="bad", content=None)  # NOT NULL violation in the writer thread
+        with pytest.raises(sqlite3.IntegrityError):
+            writer.flush()
+
+        # The error is reported once; the writer keeps working afterwards.
+        writer.upsert(id="good", content="x")
+        writer.flush()
+        assert store.list_ids() == ["good"]
+
+        writer.upsert(id="bad", content=None)
+        writer._queue.join()
+        with pytest.raises(sqlite3.IntegrityError):
+            writer.upsert(id="later", content="x")  # raised on the next call
+        writer.upsert(id="bad", content=None)
+        with pytest.raises(sqlite3.IntegrityError):
+            writer.close()
+
+
+def test_threads_get_their_own_wal_connections(tmp_path):
+    with SectionStore(tmp_path / "sections.db") as store:
+        assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        store.upsert(id="a", content="x")
+
+        seen = {}
+
+        def _read(name):
+            seen[name] = (store.conn, store.get("a"))
+
+        t = threading.Thread(target=_read, args=("other",))
+        t.start()
+        t.join()
+        assert seen["other"][0] is not store.conn
+        assert seen["other"][1]["content"] == "x"
+
+
+def test_readers_see_committed_rows_while_a_write_is_open(tmp_path):
+    with SectionStore(tmp_path / "sections.db") as store:
+        store.upsert(id="a", content="committed")
+        writer = sqlite3.connect(tmp_path / "sections.db", isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("UPDATE sections SET content = 'pending' WHERE id = 'a'")
+
+        def _read():
+            return store.get("a")["content"]
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # WAL: readers are neither blocked nor shown the open transaction.
+            assert pool.submit(_read).result(timeout=5) == "committed"
+            writer.execute("COMMIT")
+            assert [f.result(timeout=5) for f in [pool.submit(_read), pool.submit(_read)]] == ["pending"] * 2
+        writer.close()
@@ -0,0 +1,92 @@
+"""Tests for :mod:`llm_pipeline.shaping`."""
+
+from llm_pipeline.shaping import ShapeConfig, estimate_tokens, shape_body, shape_result
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {"type": "object", "properties": {"name": {}, "amount": {}}},
+        },
+        "page_metadata": {"type": "object"},
+    },
+}
+
+
+def _rows(n, name_len=20):
+    return [{"name": "n" * name_len, "amount": 1234.5678, "internal_id": i} for i in range(n)]
+
+
+def test_projection_rows_and_rounding():
+    body = {"results": _rows(30), "page_metadata": {"page": 1, "next": 2}, "messages": ["x"]}
+    shaped = shape_body(body, SCHEMA, ShapeConfig(token_budget=0, max_rows=5))
+
+    assert set(shaped) == {"results", "page_metadata"}
+    assert shaped["page_metadata"] == {"page": 1, "next": 2}  # no declared properties -> kept
+    assert shaped["results"][:5] == [{"name": "n" * 20, "amount": 1234.57}] * 5
+    assert shaped["results"][5] == "… 25 more"
+
+
+def test_unmatched_schema_keeps_payload():
+    shaped = shape_body({"other": 1.23456}, SCHEMA, ShapeConfig(token_budget=0))
+    assert shaped == {"other": 1.23}
+
+
+def test_budget_loop_halves_rows_until_it_fits():
+    body = {"results": _rows(100, name_len=100)}
+    cfg = ShapeConfig(token_budget=300)
+    shaped = shape_body(body, SCHEMA, cfg)
+
+    assert estimate_tokens(shaped) <= cfg.token_budget
+    *kept, marker = shaped["results"]
+    assert marker == f"… {100 - len(kept)} more"
+    # 25 -> 12 -> 6: the first row count that fits.
+    assert len(kept) == 6
+    assert all(len(row["name"]) == 100 for row in kept)
+
+
+def test_budget_loop_then_clips_strings():
+    body = {"results": [{"name": "n" * 5000, "amount": 1.0}]}
+    cfg = ShapeConfig(token_budget=100)
+    shaped = shape_body(body, SCHEMA, cfg)
+
+    assert estimate_tokens(shaped) <= cfg.token_budget
+    # Rows are already at the minimum, so max_string goes 500 -> 250.
+    assert shaped["results"][0]["name"] == "n" * 250 + "…"
+
+
+def test_budget_loop_falls_back_to_cutting_text():
+    body = {f"key_{i}": "v" * 30 for i in range(200)}
+    cfg = ShapeConfig(token_budget=50)
+    shaped = shape_body(body, None, cfg)
+
+    assert isinstance(shaped, str)
+    budget_chars = int(cfg.token_budget * cfg.chars_per_token)
+    assert shaped.startswith('{"key_0":"' + "v" * 30)
+    assert shaped.endswith(" more chars]")
+    assert len(shaped) < budget_chars + 40
+
+
+def test_text_bodies_are_collapsed_and_cut():
+    assert shape_body("  a\n\n  b\t c ") == "a b c"
+    shaped = shape_body("word " * 1000, config=ShapeConfig(token_budget=10))
+    assert shaped == "word " * 8 + " … [4959 more chars]"
+
+
+def test_budget_disabled():
+    body = {"results": _rows(10, name_len=1000)}
+    shaped = shape_body(body, SCHEMA, ShapeConfig(token_budget=0, max_string=2000))
+    assert len(shaped["results"]) == 10
+    assert len(shaped["results"][0]["name"]) == 1000
+
+
+def test_shape_result():
+    spec = {"response": {"json_schema": SCHEMA}}
+    error = {"status_code": 400, "headers": {}, "body": {"detail": "bad", "amount": 1.23456}}
+    ok = {"status_code": 200, "headers": {}, "body": {"results": [], "detail": "dropped"}}
+
+    assert shape_result(ok, spec, None) is ok
+    assert shape_result(ok, spec)["body"] == {"results": []}
+    assert shape_result(error, spec)["body"] == {"detail": "bad", "amount": 1.23}  # budgeted, not projected
+    assert ok["body"] == {"results": [], "detail": "dropped"}  # input untouched
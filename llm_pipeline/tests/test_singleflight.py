@@ -0,0 +1,214 @@
+"""Tests for :mod:`llm_pipeline.singleflight` leader/follower semantics."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from llm_pipeline.executor import call_endpoint
+from llm_pipeline.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def _followers(group, key, fn, n):
+    """Run *n* callers of ``group.do(key, fn)`` at once; return their outcomes."""
+
+    def _one():
+        try:
+            return group.do(key, fn)
+        except Exception as exc:  # noqa: BLE001
+            return exc
+
+    pool = ThreadPoolExecutor(max_workers=n)
+    futures = [pool.submit(_one) for _ in range(n)]
+    pool.shutdown(wait=False)
+    while group.stats.leaders + group.stats.shared < n:
+        threading.Event().wait(0.001)
+    return futures
+
+
+# ---------------------------------------------------------------------------
+# Threads
+# ---------------------------------------------------------------------------
+
+
+def test_followers_receive_the_leader_result():
+    group = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def _fn():
+        calls.append(1)
+        assert release.wait(5)
+        return {"rows": [1, 2]}
+
+    futures = _followers(group, "k", _fn, 5)
+    assert group.in_flight() == 1
+    release.set()
+    outcomes = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in outcomes) == [False, True, True, True, True]
+    assert all(result is outcomes[0][0] for result, _ in outcomes)
+    assert (group.stats.leaders, group.stats.shared) == (1, 4)
+    assert group.in_flight() == 0
+
+
+def test_followers_receive_the_leader_exception():
+    group = SingleFlight()
+    release = threading.Event()
+    error = ConnectionError("upstream down")
+
+    def _fn():
+        assert release.wait(5)
+        raise error
+
+    futures = _followers(group, "k", _fn, 3)
+    release.set()
+    assert [f.result() for f in futures] == [error] * 3
+    assert group.in_flight() == 0
+
+
+def test_key_is_forgotten_after_the_leader_finishes():
+    group = SingleFlight()
+    assert group.do("k", lambda: 1) == (1, False)
+    assert group.do("k", lambda: 2) == (2, False)
+    assert group.stats.leaders == 2
+
+
+def test_methods():
+    assert SingleFlight().coalesces("get") and SingleFlight().coalesces("HEAD")
+    assert not SingleFlight().coalesces("POST")
+    assert SingleFlight(methods=["get", "post"]).coalesces("POST")
+    assert not AsyncSingleFlight().coalesces("POST")
+    assert AsyncSingleFlight(methods={"POST"}).coalesces("post")
+
+
+class _Response:
+    status_code = 200
+    headers = {"content-type": "application/json"}
+    text = ""
+
+    def json(self):
+        return {"results": [1]}
+
+
+def test_shared_results_are_shallow_copies():
+    group = SingleFlight()
+    release = threading.Event()
+
+    class _Session:
+        def request(self, *args, **kwargs):
+            assert release.wait(5)
+            return _Response()
+
+    spec = {"method": "GET", "path": "/api/v2/references/toptier_agencies/"}
+
+    def _one():
+        return call_endpoint(spec, session=session, shape=None, coalesce=group)
+
+    session = _Session()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(_one) for _ in range(3)]
+        while group.stats.leaders + group.stats.shared < 3:
+            threading.Event().wait(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len({id(r) for r in results}) == 3  # followers may mutate their top-level dict
+    assert all(r["body"] is results[0]["body"] for r in results)  # nested values are shared
+    results[1]["status_code"] = 599
+    assert results[0]["status_code"] == results[2]["status_code"] == 200
+
+
+# ---------------------------------------------------------------------------
+# Asyncio
+# ---------------------------------------------------------------------------
+
+
+def test_async_followers_share_result_and_exception():
+    async def _run():
+        group = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def _ok():
+            calls.append("ok")
+            await release.wait()
+            return "value"
+
+        async def _fail():
+            calls.append("fail")
+            await release.wait()
+            raise ValueError("boom")
+
+        ok = [asyncio.ensure_future(group.do("a", _ok)) for _ in range(3)]
+        bad = [asyncio.ensure_future(group.do("b", _fail)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert group.in_flight() == 2
+        release.set()
+        results = await asyncio.gather(*ok)
+        errors = await asyncio.gather(*bad, return_exceptions=True)
+        return group, calls, results, errors
+
+    group, calls, results, errors = asyncio.run(_run())
+    assert sorted(calls) == ["fail", "ok"]
+    assert results == [("value", False), ("value", True), ("value", True)]
+    assert all(isinstance(e, ValueError) for e in errors) and errors[0] is errors[1]
+    assert group.in_flight() == 0
+
+
+def test_async_cancelled_leader_does_not_cancel_followers():
+    async def _run():
+        group = AsyncSingleFlight()
+        release = asyncio.Event()
+        finished = []
+
+        async def _fn():
+            await release.wait()
+            finished.append(True)
+            return "value"
+
+        leader = asyncio.ensure_future(group.do("k", _fn))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(group.do("k", _fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, finished, group
+
+    (result, shared), finished, group = asyncio.run(_run())
+    assert (result, shared) == ("value", True)
+    assert finished == [True]
+    assert group.in_flight() == 0
+
+
+def test_async_upstream_survives_when_every_caller_is_cancelled():
+    async def _run():
+        group = AsyncSingleFlight()
+        release = asyncio.Event()
+        finished = []
+
+        async def _fn():
+            await release.wait()
+            finished.append(True)
+            return "value"
+
+        caller = asyncio.ensure_future(group.do("k", _fn))
+        await asyncio.sleep(0)
+        caller.cancel()
+        release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        done, in_flight = list(finished), group.in_flight()
+        # A later caller starts a fresh flight instead of joining a finished one.
+        return done, in_flight, await group.do("k", _fn)
+
+    finished, in_flight, again = asyncio.run(_run())
+    assert finished == [True]
+    assert in_flight == 0
+    assert again == ("value", False)
@@ -0,0 +1,201 @@
+"""Tests for :mod:`llm_pipeline.smoke_test` against a local stub API."""
+
+import csv
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm_pipeline import smoke_test
+from llm_pipeline.section_store import SectionStore
+from llm_pipeline.smoke_test import EndpointStats, percentile, run_smoke_test, write_report
+
+ENDPOINTS = {
+    "agency": "/api/v2/agency/{toptier_code}/",
+    "broken": "/api/v2/broken/",
+    "slow": "/api/v2/slow/",
+}
+
+
+class _StubAPI:
+    """Threaded JSON API: ``/broken/`` answers 500, ``/slow/`` sleeps ``slow_delay`` seconds."""
+
+    def __init__(self):
+        self.slow_delay = 0.0
+        self.hits = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                with stub._lock:
+                    stub.hits.append(self.path)
+                if self.path.startswith("/api/v2/slow/"):
+                    time.sleep(stub.slow_delay)
+                status = 500 if self.path.startswith("/api/v2/broken/") else 200
+                data = json.dumps({"path": self.path}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
+
+
+@pytest.fixture()
+def stub():
+    api = _StubAPI()
+    yield api
+    api.close()
+
+
+@pytest.fixture()
+def db(tmp_path):
+    path = tmp_path / "sections.db"
+    with SectionStore(path) as store:
+        for name, endpoint in ENDPOINTS.items():
+            store.upsert(id=name, content=json.dumps({"method": "GET", "path": endpoint}))
+    return path
+
+
+def _targets():
+    return [(EndpointStats(name, "GET", path), {"method": "GET", "path": path}) for name, path in ENDPOINTS.items()]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 11)]
+    assert percentile([], 50) is None
+    assert percentile([7.0], 99) == 7.0
+    assert percentile(values, 50) == 5.0
+    assert percentile(values, 90) == 9.0
+    assert percentile(values, 99) == 10.0
+    assert percentile(values, 0) == 1.0
+
+
+def test_run_smoke_test_counts_every_call(stub):
+    targets = _targets()
+    run_smoke_test(targets, base_url=stub.url, concurrency=8, repeat=25)
+
+    rows = {stats.id: stats.row() for stats, _ in targets}
+    assert len(stub.hits) == 75
+    assert "/api/v2/agency/test_toptier_code/" in stub.hits
+    assert rows["agency"]["statuses"] == "200x25"
+    assert (rows["broken"]["ok"], rows["broken"]["failed"]) == (0, 25)
+    for stats, _ in targets:
+        assert len(stats.latencies) == sum(stats.statuses.values()) == 25
+        assert stats.row()["p50_ms"] <= stats.row()["p90_ms"] <= stats.row()["p99_ms"]
+
+
+def test_stats_record_is_thread_safe():
+    stats = EndpointStats("x", "GET", "/")
+
+    def _record():
+        for _ in range(2000):
+            stats.record(0.001, "200", size=10)
+
+    threads = [threading.Thread(target=_record) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stats.statuses["200"] == len(stats.latencies) == len(stats.sizes) == 16000
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+
+def test_write_report_json_and_csv(stub, tmp_path):
+    targets = _targets()
+    run_smoke_test(targets, base_url=stub.url, repeat=2)
+    rows = sorted((stats.row() for stats, _ in targets), key=lambda r: r["id"])
+
+    write_report(tmp_path / "out" / "report.json", rows, {"repeat": 2})
+    payload = json.loads((tmp_path / "out" / "report.json").read_text(encoding="utf-8"))
+    assert payload["meta"] == {"repeat": 2}
+    assert [r["id"] for r in payload["endpoints"]] == ["agency", "broken", "slow"]
+
+    write_report(tmp_path / "report.csv", rows, {"repeat": 2})
+    with (tmp_path / "report.csv").open(encoding="utf-8", newline="") as fp:
+        reader = csv.DictReader(fp)
+        assert tuple(reader.fieldnames) == smoke_test.REPORT_FIELDS
+        assert [r["calls"] for r in reader] == ["2", "2", "2"]
+
+
+def _cli(db, stub, *extra):
+    smoke_test._main(["smoke_test", str(db), stub.url, "--concurrency", "4", "--repeat", "5", *extra])
+
+
+def test_cli_baseline_regression_exits_2(stub, db, tmp_path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_ROOT", str(tmp_path / "outputs"))
+    baseline = tmp_path / "baseline.json"
+    _cli(db, stub, "--report", str(baseline))
+
+    stub.slow_delay = 0.05
+    with pytest.raises(SystemExit) as exc:
+        _cli(db, stub, "--baseline", str(baseline), "--report", str(tmp_path / "now.json"))
+    assert exc.value.code == 2
+    log = (tmp_path / "outputs" / "smoke_test.log").read_text(encoding="utf-8")
+    assert "REGRESSION slow: p90" in log
+
+
+def test_cli_new_failures_are_regressions(stub, db, tmp_path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_ROOT", str(tmp_path / "outputs"))
+    baseline = tmp_path / "baseline.json"
+    payload = {
+        "meta": {},
+        "endpoints": [{"id": "broken", "failed": 0, "p90_ms": None}, {"id": "agency", "failed": 0, "p90_ms": None}],
+    }
+    baseline.write_text(json.dumps(payload), encoding="utf-8")
+
+    with pytest.raises(SystemExit) as exc:
+        _cli(db, stub, "--baseline", str(baseline))
+    assert exc.value.code == 2
+    log = (tmp_path / "outputs" / "smoke_test.log").read_text(encoding="utf-8")
+    assert "REGRESSION broken: failures 0 -> 5" in log
+
+
+def test_cli_records_and_replays_a_cassette(stub, db, tmp_path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_ROOT", str(tmp_path / "outputs"))
+    cassette = tmp_path / "c.db"
+    _cli(db, stub, "--cassette", str(cassette), "--record", "--report", str(tmp_path / "live.json"))
+    live_hits = len(stub.hits)
+    # --record runs in "auto" mode: repeats of an already recorded call replay.
+    assert 3 <= live_hits <= 15
+
+    _cli(db, stub, "--cassette", str(cassette), "--report", str(tmp_path / "replay.json"))
+    assert len(stub.hits) == live_hits  # replay never reaches the API
+
+    def _statuses(name):
+        payload = json.loads((tmp_path / name).read_text(encoding="utf-8"))
+        return {r["id"]: r["statuses"] for r in payload["endpoints"]}
+
+    assert _statuses("replay.json") == _statuses("live.json") == {"agency": "200x5", "broken": "500x5", "slow": "200x5"}
+    log = (tmp_path / "outputs" / "smoke_test.log").read_text(encoding="utf-8")
+    assert "CassetteStats(hits=15, misses=0, recorded=0)" in log
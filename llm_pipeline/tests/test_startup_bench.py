@@ -0,0 +1,35 @@
+"""Tests for :mod:`llm_pipeline.startup_bench`."""
+
+import subprocess
+import sys
+
+import pytest
+
+from llm_pipeline.startup_bench import _REPO_ROOT, run_bench
+
+
+def test_run_bench_measures_imports_and_clis():
+    results = run_bench(["llm_pipeline"], ["llm_pipeline.cassette"], runs=1)
+    assert set(results) == {"import llm_pipeline", "llm_pipeline.cassette --help", "(interpreter)"}
+
+
+def test_run_bench_rejects_failed_import():
+    with pytest.raises(RuntimeError, match="llm_pipeline.does_not_exist"):
+        run_bench(["llm_pipeline.does_not_exist"], (), runs=1)
+
+
+def test_run_bench_rejects_failed_cli():
+    with pytest.raises(RuntimeError, match="does_not_exist"):
+        run_bench((), ["llm_pipeline.does_not_exist"], runs=1)
+
+
+@pytest.mark.parametrize("module", ["llm_pipeline.async_executor", "llm_pipeline.mcp_server"])
+def test_async_modules_defer_asyncio(module):
+    code = f"import sys, {module}; sys.exit('asyncio' in sys.modules or 'httpx' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=_REPO_ROOT).returncode == 0
+
+
+def test_async_modules_import_within_budget():
+    results = run_bench(["llm_pipeline.async_executor", "llm_pipeline.mcp_server"], (), runs=3)
+    assert results["import llm_pipeline.async_executor"] < 100
+    assert results["import llm_pipeline.mcp_server"] < 100
@@ -0,0 +1,121 @@
+"""Tests for :mod:`llm_pipeline.tool_index` incremental BM25 maintenance."""
+
+import pytest
+
+from llm_pipeline.section_store import SectionStore
+from llm_pipeline.tool_index import ToolIndex, load_index, tokenize
+
+SPECS = {
+    "agency": ("GET", "/api/v2/agency/{toptier_code}/", "Agency overview with budgetary resources"),
+    "awards": ("POST", "/api/v2/search/spending_by_award/", "Search awards by recipient and obligation"),
+    "states": ("GET", "/api/v2/recipient/state/", "State profiles with population and award totals"),
+}
+
+
+def _spec(method, path, summary):
+    return f"method: {method}\npath: {path}\nsummary: {summary}\n"
+
+
+@pytest.fixture()
+def store(tmp_path):
+    with SectionStore(tmp_path / "sections.db") as store:
+        for row_id, spec in SPECS.items():
+            store.upsert(id=row_id, content=_spec(*spec))
+        yield store
+
+
+def _names(index, query, k=8):
+    return [name for name, _ in index.search(query, k)]
+
+
+def test_tokenize():
+    assert tokenize("spendingByAward obligations_total for the API") == ["spending", "award", "obligation", "total"]
+
+
+def test_search_ranks_by_relevance(store):
+    index = ToolIndex()
+    assert index.update(store) == 3
+    assert _names(index, "budgetary resources of an agency")[0] == "get_api_v2_agency_toptier_code"
+    assert _names(index, "award obligations by recipient")[0] == "post_api_v2_search_spending_by_award"
+
+
+def test_unchanged_store_is_a_no_op(store):
+    index = ToolIndex()
+    index.update(store)
+    assert index.update(store) == 0
+
+
+def test_same_second_updates_are_picked_up(store):
+    index = ToolIndex()
+    index.update(store)
+    assert _names(index, "contracts") == []
+
+    # Several writes within the same second (and with unchanged length).
+    store.upsert(id="agency", content=_spec("GET", "/api/v2/agency/{toptier_code}/", "Agency contracts"))
+    assert index.update(store) == 1
+    store.upsert(id="agency", content=_spec("GET", "/api/v2/agency/{toptier_code}/", "Agency grantees"))
+    assert index.update(store) == 1
+
+    assert _names(index, "contracts") == []
+    assert _names(index, "grantees") == ["get_api_v2_agency_toptier_code"]
+
+
+def test_deleted_rows_are_dropped(store):
+    store.upsert(id="tmp", content=_spec("GET", "/api/v2/tmp/", "Temporary widgets"), source_path="tmp.md")
+    index = ToolIndex()
+    index.update(store)
+    assert _names(index, "widgets") == ["get_api_v2_tmp"]
+
+    store.delete_sources(["tmp.md"])
+    assert index.update(store) == 1
+    assert len(index) == 3
+    assert _names(index, "widgets") == []
+
+
+def test_duplicate_tool_names_do_not_add_up(store):
+    index = ToolIndex()
+    index.update(store)
+    single = dict(index.search("budgetary resources"))["get_api_v2_agency_toptier_code"]
+
+    # Another row for the same endpoint (e.g. a second contract mentioning it).
+    store.upsert(id="agency-copy", content=_spec(*SPECS["agency"]))
+    index.update(store)
+    hits = index.search("budgetary resources")
+
+    assert [name for name, _ in hits] == ["get_api_v2_agency_toptier_code"]
+    # The two rows share the term, so idf drops – but the scores are not summed.
+    assert hits[0][1] < single
+
+
+def test_rebuilt_store_triggers_a_full_reindex(tmp_path, store):
+    index = ToolIndex()
+    index.update(store)
+
+    with SectionStore(tmp_path / "other.db") as other:
+        other.upsert(id="agency", content=_spec(*SPECS["agency"]))
+        # Same low revision numbers, different database: nothing may be reused.
+        assert index.update(other) == 3 + 1
+    assert len(index) == 1
+    assert _names(index, "recipient") == []
+
+
+def test_load_index_persists_the_watermark(tmp_path, store):
+    db = tmp_path / "sections.db"
+    index_path = tmp_path / "index.json"
+
+    first = load_index(db, index_path=index_path)
+    assert (first.store_id, first.watermark) == (store.identity(), store.revision())
+
+    reloaded = ToolIndex.load(index_path)
+    assert reloaded.update(store) == 0
+    assert reloaded.search("agency") == first.search("agency")
+
+    store.upsert(id="states", content=_spec("GET", "/api/v2/recipient/state/", "State widgets"))
+    assert _names(load_index(db, index_path=index_path), "widgets") == ["get_api_v2_recipient_state"]
+
+
+def test_index_from_another_version_is_discarded(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text('{"version": 1, "watermark": "2024-01-01T00:00:00Z", "docs": {"a": {}}}', encoding="utf-8")
+    index = ToolIndex.load(path)
+    assert (index.watermark, len(index)) == (None, 0)
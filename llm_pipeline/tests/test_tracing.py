@@ -0,0 +1,265 @@
+"""Tests for :mod:`llm_pipeline.tracing` spans, exporters and metrics."""
+
+import asyncio
+import contextvars
+import json
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from llm_pipeline import tracing
+from llm_pipeline.tracing import InMemoryExporter, JsonlFileExporter, span
+
+
+@pytest.fixture(autouse=True)
+def _clean_state():
+    tracing.shutdown()
+    tracing.reset_metrics()
+    yield
+    tracing.shutdown()
+    tracing.reset_metrics()
+
+
+@pytest.fixture()
+def memory():
+    exporter = InMemoryExporter()
+    tracing.configure(exporter)
+    return exporter
+
+
+def _by_name(exporter):
+    return {s["name"]: s for s in exporter.spans}
+
+
+# ---------------------------------------------------------------------------
+# Disabled / unavailable
+# ---------------------------------------------------------------------------
+
+
+def test_disabled_tracing_is_a_no_op():
+    assert not tracing.enabled()
+    with span("tool.call", tool="x") as s:
+        s.set_attribute("ignored", 1)
+        assert s is tracing.NOOP_SPAN
+        assert tracing.current_span() is tracing.NOOP_SPAN
+    assert tracing.metrics() == {}
+
+
+def test_missing_otel_raises_and_stays_disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "_OTEL", False)
+    with pytest.raises(RuntimeError, match="opentelemetry"):
+        tracing.configure(otel=True)
+    assert not tracing.enabled()
+    assert span("tool.call") is tracing.NOOP_SPAN
+
+
+def test_env_configuration(monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_PIPELINE_TRACE", str(tmp_path / "env.jsonl"))
+    tracing._configure_from_env()
+    with span("tool.call"):
+        pass
+    tracing.shutdown()
+    assert json.loads((tmp_path / "env.jsonl").read_text(encoding="utf-8"))["name"] == "tool.call"
+
+    monkeypatch.setattr(tracing, "_OTEL", False)
+    monkeypatch.setenv("LLM_PIPELINE_TRACE", "otel")
+    with pytest.raises(RuntimeError):
+        tracing._configure_from_env()
+
+
+# ---------------------------------------------------------------------------
+# Nesting
+# ---------------------------------------------------------------------------
+
+
+def test_nested_spans_share_the_trace(memory):
+    with span("tool.call") as outer:
+        assert tracing.current_span() is outer
+        with span("executor.call"):
+            with span("executor.upstream"):
+                pass
+    assert tracing.current_span() is tracing.NOOP_SPAN
+
+    spans = _by_name(memory)
+    assert spans["tool.call"]["parent_span_id"] is None
+    assert spans["executor.call"]["parent_span_id"] == spans["tool.call"]["span_id"]
+    assert spans["executor.upstream"]["parent_span_id"] == spans["executor.call"]["span_id"]
+    assert len({s["trace_id"] for s in memory.spans}) == 1
+    assert [s["name"] for s in memory.spans] == ["executor.upstream", "executor.call", "tool.call"]
+
+
+def test_error_status_is_recorded(memory):
+    with pytest.raises(ValueError):
+        with span("executor.decode"):
+            raise ValueError("bad json")
+
+    (record,) = memory.spans
+    assert (record["status"], record["error"]) == ("ERROR", "ValueError: bad json")
+    assert tracing.metrics()["executor.decode"]["errors"] == 1
+
+
+def test_threads_link_only_with_a_copied_context(memory):
+    def _work(name):
+        with span(name):
+            pass
+
+    with span("tool.call"):
+        copied = threading.Thread(target=contextvars.copy_context().run, args=(_work, "copied"))
+        plain = threading.Thread(target=_work, args=("plain",))
+        for t in (copied, plain):
+            t.start()
+            t.join()
+
+    spans = _by_name(memory)
+    assert spans["copied"]["parent_span_id"] == spans["tool.call"]["span_id"]
+    assert spans["copied"]["trace_id"] == spans["tool.call"]["trace_id"]
+    # A bare thread starts with an empty context: a new root span.
+    assert spans["plain"]["parent_span_id"] is None
+    assert spans["plain"]["trace_id"] != spans["tool.call"]["trace_id"]
+
+
+def test_asyncio_tasks_inherit_the_creating_span(memory):
+    async def _child(name):
+        with span(name):
+            await asyncio.sleep(0)
+            with span(f"{name}.inner"):
+                await asyncio.sleep(0)
+
+    async def _run():
+        with span("tool.call"):
+            await asyncio.gather(_child("a"), _child("b"))
+
+    asyncio.run(_run())
+    spans = _by_name(memory)
+    root = spans["tool.call"]["span_id"]
+    # Interleaved tasks never see each other's spans.
+    assert spans["a"]["parent_span_id"] == spans["b"]["parent_span_id"] == root
+    assert spans["a.inner"]["parent_span_id"] == spans["a"]["span_id"]
+    assert spans["b.inner"]["parent_span_id"] == spans["b"]["span_id"]
+
+
+# ---------------------------------------------------------------------------
+# Exporters and metrics
+# ---------------------------------------------------------------------------
+
+
+def test_jsonl_export_round_trips(tmp_path, memory):
+    path = tmp_path / "traces" / "trace.jsonl"
+    tracing.configure(JsonlFileExporter(path), memory)
+    with span("executor.call", **{"http.request.method": "GET"}) as s:
+        s.set_attribute("cache.hit", False)
+    with pytest.raises(KeyError):
+        with span("executor.cache"):
+            raise KeyError("k")
+    tracing.shutdown()
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert records == list(memory.spans)
+    assert records[0]["attributes"] == {"http.request.method": "GET", "cache.hit": False}
+    assert records[1]["status"] == "ERROR"
+
+    summary = tracing.summarize_file(path)
+    assert summary["executor.call"]["count"] == 1
+    assert summary["executor.cache"]["errors"] == 1
+
+
+def test_jsonl_exporter_ignores_spans_after_shutdown(tmp_path):
+    exporter = JsonlFileExporter(tmp_path / "trace.jsonl")
+    tracing.configure(exporter)
+    tracing.shutdown()
+    tracing._state.enabled = True
+    tracing._state.exporters = [exporter]
+    with span("late"):
+        pass
+    assert (tmp_path / "trace.jsonl").read_text(encoding="utf-8") == ""
+
+
+def test_in_memory_exporter_is_bounded():
+    exporter = InMemoryExporter(maxlen=3)
+    tracing.configure(exporter)
+    for i in range(5):
+        with span(f"s{i}"):
+            pass
+    assert [s["name"] for s in exporter.spans] == ["s2", "s3", "s4"]
+
+
+def test_stage_metrics_percentiles():
+    stats = tracing.StageMetrics()
+    for ms in range(1, 101):
+        stats.record("executor.upstream", float(ms), error=ms > 98)
+    st = stats.snapshot()["executor.upstream"]
+    assert (st["count"], st["errors"], st["max_ms"]) == (100, 2, 100.0)
+    assert (st["p50_ms"], st["p90_ms"], st["p99_ms"]) == (51.0, 90.0, 99.0)
+    assert st["mean_ms"] == 50.5
+
+
+def test_metrics_only_mode_and_shutdown_keeps_metrics():
+    tracing.configure()
+    with span("tool.call"):
+        pass
+    tracing.shutdown()
+    assert tracing.metrics()["tool.call"]["count"] == 1
+
+
+def test_cli_summary(tmp_path, capsys):
+    path = tmp_path / "trace.jsonl"
+    lines = [{"name": "executor.upstream", "duration_ms": 12.5, "status": "OK"}] * 3
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\nnot json\n", encoding="utf-8")
+
+    tracing._main(["tracing", str(path)])
+    out = capsys.readouterr().out
+    assert "executor.upstream" in out and "12.50" in out
+
+    with pytest.raises(SystemExit):
+        tracing._main(["tracing"])
+
+
+# ---------------------------------------------------------------------------
+# OpenTelemetry adapter
+# ---------------------------------------------------------------------------
+
+
+class _FakeOtelSpan:
+    def __init__(self):
+        self.attributes = {}
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class _FakeTracer:
+    def __init__(self):
+        self.started = []
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        otel_span = _FakeOtelSpan()
+        otel_span.attributes.update(attributes or {})
+        self.started.append((name, otel_span))
+        yield otel_span
+
+
+class _FakeHistogram:
+    def __init__(self):
+        self.points = []
+
+    def record(self, value, attributes):
+        self.points.append((value, attributes))
+
+
+def test_otel_adapter_forwards_spans_and_durations(monkeypatch):
+    tracer, histogram = _FakeTracer(), _FakeHistogram()
+    monkeypatch.setattr(tracing._state, "otel_tracer", tracer)
+    monkeypatch.setattr(tracing._state, "otel_histogram", histogram)
+    monkeypatch.setattr(tracing._state, "enabled", True)
+
+    with span("executor.call", **{"url.full": "http://x/", "absent": None}) as s:
+        s.set_attribute("cache.hit", True)
+
+    ((name, otel_span),) = tracer.started
+    assert name == "executor.call"
+    assert otel_span.attributes == {"url.full": "http://x/", "cache.hit": True}
+    ((_, attrs),) = histogram.points
+    assert attrs == {"stage": "executor.call", "error": False}
+    assert tracing.metrics()["executor.call"]["count"] == 1
@@ -0,0 +1,48 @@
+"""Tests for :mod:`llm_pipeline.validation`."""
+
+import pytest
+
+from llm_pipeline.validation import ArgumentError, compile_validator
+
+AGENCY_SPEC = {
+    "method": "GET",
+    "path": "/api/v2/agency/{toptier_code}/budget_function/",
+    "path_params": {"toptier_code": {"type": "number", "required": True}},
+    "query_params": {
+        "fiscal_year": {"type": "integer"},
+        "order": {"type": "string", "enum": ["asc", "desc"]},
+        "limit": {"type": "number"},
+    },
+}
+
+
+def test_path_param_keeps_leading_zero():
+    validate = compile_validator(AGENCY_SPEC)
+    assert validate({"toptier_code": "012"})["toptier_code"] == "012"
+
+
+def test_path_param_stays_string_but_is_type_checked():
+    validate = compile_validator(AGENCY_SPEC)
+    assert validate({"toptier_code": "75"})["toptier_code"] == "75"
+    with pytest.raises(ArgumentError, match="toptier_code"):
+        validate({"toptier_code": "abc"})
+
+
+def test_leading_zero_digit_strings_are_not_converted():
+    validate = compile_validator(AGENCY_SPEC)
+    out = validate({"toptier_code": "012", "fiscal_year": "02020", "limit": "007"})
+    assert out["fiscal_year"] == "02020"
+    assert out["limit"] == "007"
+
+
+def test_plain_numeric_strings_are_coerced():
+    validate = compile_validator(AGENCY_SPEC)
+    out = validate({"toptier_code": "012", "fiscal_year": "2020", "limit": "10", "order": "DESC"})
+    assert out == {"toptier_code": "012", "fiscal_year": 2020, "limit": 10, "order": "desc"}
+
+
+def test_all_errors_reported_together():
+    validate = compile_validator(AGENCY_SPEC)
+    with pytest.raises(ArgumentError) as exc:
+        validate({"fiscal_year": "soon", "colour": "red"})
+    assert len(exc.value.errors) == 3  # unknown argument, bad integer, missing path param
@@ -0,0 +1,279 @@
+"""BM25 retrieval index for picking the relevant tools per user question.
+
+Sending every endpoint schema in ``tools=[…]`` costs prompt tokens and
+latency on every turn.  :class:`ToolIndex` is a small sparse (Okapi BM25)
+index over each catalog row's summary, description, path and parameter
+names/descriptions, so the orchestrator can send only the top-k tools::
+
+    index = load_index("sections.db")
+    schemas = select_tools("obligations by agency in FY2023", fn_schemas, index, k=8)
+
+The index is persisted next to the database (``sections.toolindex.json``)
+and refreshed **incrementally**: the watermark is the store's change
+counter (:meth:`SectionStore.revision`), so only rows written after it are
+re-tokenised – however many land within the same second – and rows that
+disappeared from the store are dropped.  An unchanged store costs a single
+row read.  BM25 weights are precomputed per posting, so a query is a
+handful of dict lookups (well under a millisecond for the USAspending
+catalog).
+
+Build or refresh offline with::
+
+    python -m llm_pipeline.tool_index sections.db ["sample question"]
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .section_store import SectionStore
+
+# Bump when tokenisation, document construction or the watermark changes.
+INDEX_VERSION = 2
+
+# BM25 parameters (the usual defaults).
+_K1 = 1.2
+_B = 0.75
+
+# Field weights – a term in the summary says more than one in a long
+# parameter description.
+_FIELD_WEIGHTS = {"summary": 3, "path": 2, "params": 1, "description": 1}
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+")
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this to "
+    "with api v2 v1 returns return list get post data endpoint".split()
+)
+
+
+def tokenize(text: str) -> List[str]:  # noqa: D401
+    """Lower-case word tokens; snake/camel case split, trivial plural folding."""
+
+    tokens: List[str] = []
+    for raw in _TOKEN_RE.findall(_CAMEL_RE.sub(" ", text or "")):
+        tok = raw.lower()
+        if tok in _STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+
+def _document(spec: Dict[str, Any]) -> Counter:  # noqa: D401
+    """Weighted term frequencies for one spec."""
+
+    params: List[str] = []
+    for key in ("path_params", "query_params"):
+        for name, pdata in (spec.get(key) or {}).items():
+            params.append(name)
+            if isinstance(pdata, dict):
+                params.append(pdata.get("description") or "")
+    body_schema = (spec.get("request_body") or {}).get("json_schema") or {}
+    params.extend((body_schema.get("properties") or {}).keys())
+
+    fields = {
+        "summary": spec.get("summary") or "",
+        "path": spec.get("path") or "",
+        "params": " ".join(params),
+        "description": spec.get("description") or "",
+    }
+    tf: Counter = Counter()
+    for field, text in fields.items():
+        for tok in tokenize(text):
+            tf[tok] += _FIELD_WEIGHTS[field]
+    return tf
+
+
+class ToolIndex:
+    """Incrementally maintained BM25 index keyed by SectionStore row id."""
+
+    def __init__(self) -> None:  # noqa: D401
+        self.store_id: Optional[str] = None  # SectionStore.identity() of the indexed store
+        self.watermark: Optional[int] = None  # SectionStore.revision() last synced
+        self.docs: Dict[str, Dict[str, Any]] = {}  # row_id -> {name, tf, length}
+        self._postings: Dict[str, List[Tuple[str, float]]] = {}  # term -> [(row_id, weight)]
+        self._dirty = True
+
+    # -- maintenance ---------------------------------------------------------
+
+    def update(self, store: SectionStore) -> int:  # noqa: D401
+        """Sync with *store*; return the number of added/changed/removed rows."""
+
+        from .converter import _parse_yaml, _safe_name
+
+        store_id = store.identity()
+        # Read the counter before the rows: anything written meanwhile has a
+        # higher revision and is picked up by the next update.
+        revision = store.revision()
+        if store_id == self.store_id and revision == self.watermark:
+            return 0
+
+        changed = 0
+        if store_id != self.store_id or self.watermark is None:
+            # Another (or a rebuilt) database – its revisions mean nothing here.
+            changed = len(self.docs)
+            self.docs = {}
+            rows = store.iter_rows()
+        else:
+            rows = store.iter_rows(after_rev=self.watermark)
+        for row in rows:
+            spec = _parse_yaml(row["content"])
+            tf = _document(spec)
+            name = _safe_name(f"{spec.get('method', 'GET').upper()}_{spec.get('path', '/')}")
+            self.docs[row["id"]] = {"name": name, "tf": dict(tf), "length": sum(tf.values())}
+            changed += 1
+        self.store_id, self.watermark = store_id, revision
+
+        live = set(store.list_ids())
+        for row_id in [r for r in self.docs if r not in live]:
+            del self.docs[row_id]
+            changed += 1
+
+        if changed:
+            self._dirty = True
+        return changed
+
+    def _finalize(self) -> None:  # noqa: D401
+        """Precompute BM25 weights per posting (after any change)."""
+
+        n = len(self.docs)
+        avgdl = (sum(d["length"] for d in self.docs.values()) / n) if n else 0.0
+        df: Counter = Counter()
+        for doc in self.docs.values():
+            df.update(doc["tf"].keys())
+
+        postings: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        for row_id, doc in self.docs.items():
+            norm = _K1 * (1 - _B + _B * doc["length"] / avgdl) if avgdl else _K1
+            for term, tf in doc["tf"].items():
+                idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+                postings[term].append((row_id, idf * tf * (_K1 + 1) / (tf + norm)))
+        self._postings = dict(postings)
+        self._dirty = False
+
+    # -- queries -------------------------------------------------------------
+
+    def search(self, query: str, k: int = 8) -> List[Tuple[str, float]]:  # noqa: D401
+        """Return up to *k* ``(tool_name, score)`` pairs, best first.
+
+        Scores are per row; when several rows map to the same tool name only
+        the best-scoring one counts.
+        """
+
+        if self._dirty:
+            self._finalize()
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            for row_id, weight in self._postings.get(term, ()):
+                scores[row_id] += weight
+        best: Dict[str, float] = {}
+        for row_id, score in scores.items():
+            name = self.docs[row_id]["name"]
+            if score > best.get(name, 0.0):
+                best[name] = score
+        return sorted(best.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+
+    def __len__(self) -> int:  # noqa: D401
+        return len(self.docs)
+
+    # -- persistence ---------------------------------------------------------
+
+    def save(self, path: str | Path) -> None:  # noqa: D401
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": INDEX_VERSION,
+            "store_id": self.store_id,
+            "watermark": self.watermark,
+            "docs": self.docs,
+        }
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ToolIndex":  # noqa: D401
+        """Load a saved index; an empty one if missing or from another version."""
+
+        index = cls()
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return index
+        if data.get("version") == INDEX_VERSION:
+            index.store_id = data.get("store_id")
+            index.watermark = data.get("watermark")
+            index.docs = data.get("docs") or {}
+        return index
+
+
+def default_index_path(db_path: str | Path) -> Path:  # noqa: D401
+    p = Path(str(db_path)[10:] if str(db_path).startswith("sqlite:///") else db_path)
+    return p.with_suffix(".toolindex.json")
+
+
+def load_index(
+    db_path: str | Path = "sections.db",
+    *,
+    index_path: str | Path | None = None,
+) -> ToolIndex:  # noqa: D401
+    """Load the persisted index, apply store changes and save it if needed."""
+
+    path = Path(index_path) if index_path else default_index_path(db_path)
+    index = ToolIndex.load(path)
+    with SectionStore(db_path) as store:
+        changed = index.update(store)
+    if changed:
+        try:
+            index.save(path)
+        except OSError:  # pragma: no cover – read-only deployments still work
+            pass
+    return index
+
+
+def select_tools(
+    query: str,
+    fn_schemas: Iterable[Dict[str, Any]],
+    index: ToolIndex,
+    k: int = 8,
+) -> List[Dict[str, Any]]:  # noqa: D401
+    """Return the top-*k* entries of *fn_schemas* for *query*, best first."""
+
+    by_name = {s["function"]["name"]: s for s in fn_schemas}
+    return [by_name[name] for name, _ in index.search(query, k) if name in by_name]
+
+
+def _main(argv):  # noqa: D401 – mini CLI
+    if len(argv) < 2:
+        print(
+            "Usage: python -m llm_pipeline.tool_index <db_path> [query …]",
+            file=sys.stderr,
+        )
+        raise SystemExit(1)
+
+    t0 = time.perf_counter()
+    index = load_index(argv[1])
+    print(f"Index over {len(index)} tools ready in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    if len(argv) > 2:
+        query = " ".join(argv[2:])
+        index.search(query)  # warm-up (finalises weights)
+        t0 = time.perf_counter()
+        hits = index.search(query)
+        elapsed = (time.perf_counter() - t0) * 1e6
+        for name, score in hits:
+            print(f"  {score:6.2f}  {name}")
+        print(f"query took {elapsed:.0f} µs")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _main(sys.argv)
@@ -0,0 +1,412 @@
+"""Optional tracing and per-stage timing for the tool-call path.
+
+The converter and executors wrap each stage of a tool call in a span, so
+a slow answer can be attributed to one of them:
+
+========================  ==============================================
+``registry.load``         loading / rebuilding the tool registry
+``tool.call``             one converter (or MCP) tool invocation
+``tool.validate``         argument validation and coercion
+``tool.encode``           serialising the result for an MCP client
+``executor.call``         one :func:`call_endpoint` (incl. cache/coalescing)
+``executor.prepare``      URL templating and argument routing
+``executor.cache``        response-cache lookup
+``executor.upstream``     the HTTP round trip (DNS, connect, TLS, server)
+``executor.decode``       JSON-decoding the response body
+``executor.shape``        result shaping
+========================  ==============================================
+
+Tracing is **off by default**.  While it is off, :func:`span` returns a
+shared no-op object, so instrumented code pays one global lookup per stage.
+Enable it in code::
+
+    from llm_pipeline import tracing
+    tracing.configure(tracing.JsonlFileExporter("trace.jsonl"))
+
+or for a whole process with ``LLM_PIPELINE_TRACE=trace.jsonl``.  Use
+``LLM_PIPELINE_TRACE=otel`` to hand spans to OpenTelemetry instead, via the
+globally configured tracer and meter providers (the same setup
+``usaspending_api.common.tracing`` relies on).  Span and attribute names
+follow OpenTelemetry conventions; file exports use OTLP-like field names.
+
+Every finished span also feeds an in-process duration histogram per stage.
+Read it with :func:`metrics`, or summarise an exported file with::
+
+    python -m llm_pipeline.tracing trace.jsonl
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+_OTEL = find_spec("opentelemetry") is not None
+
+# Samples kept per stage for percentile estimates.
+_RESERVOIR = 2048
+
+
+# ---------------------------------------------------------------------------
+# Spans
+# ---------------------------------------------------------------------------
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled; every method is a no-op."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":  # noqa: D401
+        return self
+
+    def __exit__(self, *exc) -> bool:  # noqa: D401
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:  # noqa: D401
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# IDs only need to be unique, not unpredictable – skip the urandom syscall.
+_rand = random.Random().getrandbits
+
+_current: ContextVar[Optional["Span"]] = ContextVar("llm_pipeline_span", default=None)
+
+
+class Span:
+    """Minimal span: timing, attributes, parent/child links, error status."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_ns",
+        "duration_ns",
+        "error",
+        "_t0",
+        "_token",
+    )
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:  # noqa: D401
+        self.name = name
+        self.attributes = attributes
+        self.span_id = f"{_rand(64):016x}"
+        self.error: Optional[str] = None
+        self.duration_ns = 0
+
+    def __enter__(self) -> "Span":  # noqa: D401
+        parent = _current.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else f"{_rand(128):032x}"
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        self._t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:  # noqa: D401
+        self.duration_ns = time.perf_counter_ns() - self._t0
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _finish(self)
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:  # noqa: D401
+        self.attributes[key] = value
+
+    def to_json(self) -> Dict[str, Any]:  # noqa: D401
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "duration_ms": round(self.duration_ns / 1e6, 3),
+            "status": "ERROR" if self.error else "OK",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _OtelSpan:
+    """Adapter running a span through the global OpenTelemetry tracer."""
+
+    __slots__ = ("name", "attributes", "_cm", "_span", "_t0")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:  # noqa: D401
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> "_OtelSpan":  # noqa: D401
+        self._cm = _state.otel_tracer.start_as_current_span(self.name, attributes=self.attributes)
+        self._span = self._cm.__enter__()
+        self._t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:  # noqa: D401
+        duration_ms = (time.perf_counter_ns() - self._t0) / 1e6
+        _state.metrics.record(self.name, duration_ms, exc_type is not None)
+        _state.otel_histogram.record(duration_ms, {"stage": self.name, "error": exc_type is not None})
+        self._cm.__exit__(exc_type, exc, tb)
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:  # noqa: D401
+        self._span.set_attribute(key, value)
+
+
+def span(name: str, **attributes: Any):  # noqa: D401
+    """Context manager timing *name*; the no-op singleton when disabled."""
+
+    if not _state.enabled:
+        return NOOP_SPAN
+    if _state.otel_tracer is not None:
+        return _OtelSpan(name, {k: v for k, v in attributes.items() if v is not None})
+    return Span(name, attributes)
+
+
+def current_span():  # noqa: D401
+    """The innermost active built-in span (``NOOP_SPAN`` if none)."""
+
+    return _current.get() or NOOP_SPAN
+
+
+def enabled() -> bool:  # noqa: D401
+    return _state.enabled
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+class StageMetrics:
+    """Per-stage duration statistics (thread-safe, bounded memory)."""
+
+    def __init__(self) -> None:  # noqa: D401
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, duration_ms: float, error: bool = False) -> None:  # noqa: D401
+        with self._lock:
+            st = self._stages.get(name)
+            if st is None:
+                st = self._stages[name] = {
+                    "count": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "samples": deque(maxlen=_RESERVOIR),
+                }
+            st["count"] += 1
+            st["errors"] += int(error)
+            st["total_ms"] += duration_ms
+            st["max_ms"] = max(st["max_ms"], duration_ms)
+            st["samples"].append(duration_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:  # noqa: D401
+        """``{stage: {count, errors, total_ms, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}}``."""
+
+        with self._lock:
+            stages = {name: (dict(st), sorted(st["samples"])) for name, st in self._stages.items()}
+        return {name: _summary(st, samples) for name, (st, samples) in sorted(stages.items())}
+
+    def reset(self) -> None:  # noqa: D401
+        with self._lock:
+            self._stages.clear()
+
+
+def _pct(samples: List[float], pct: float) -> float:  # noqa: D401
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))]
+
+
+def _summary(st: Dict[str, Any], samples: List[float]) -> Dict[str, float]:  # noqa: D401
+    count = st["count"]
+    return {
+        "count": count,
+        "errors": st["errors"],
+        "total_ms": round(st["total_ms"], 3),
+        "mean_ms": round(st["total_ms"] / count, 3) if count else 0.0,
+        "p50_ms": round(_pct(samples, 50), 3),
+        "p90_ms": round(_pct(samples, 90), 3),
+        "p99_ms": round(_pct(samples, 99), 3),
+        "max_ms": round(st["max_ms"], 3),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+
+class JsonlFileExporter:
+    """Append finished spans as JSON lines to a local file (no collector)."""
+
+    def __init__(self, path: str | Path) -> None:  # noqa: D401
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fp = self.path.open("a", encoding="utf-8", buffering=1 << 16)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:  # noqa: D401
+        line = json.dumps(span.to_json(), default=str, separators=(",", ":"))
+        with self._lock:
+            if not self._fp.closed:
+                self._fp.write(line + "\n")
+
+    def flush(self) -> None:  # noqa: D401
+        with self._lock:
+            if not self._fp.closed:
+                self._fp.flush()
+
+    def shutdown(self) -> None:  # noqa: D401
+        with self._lock:
+            if not self._fp.closed:
+                self._fp.close()
+
+
+class InMemoryExporter:
+    """Keeps the last *maxlen* spans in memory (debugging, notebooks)."""
+
+    def __init__(self, maxlen: int = 10000) -> None:  # noqa: D401
+        self.spans: Deque[Dict[str, Any]] = deque(maxlen=maxlen)
+
+    def export(self, span: Span) -> None:  # noqa: D401
+        self.spans.append(span.to_json())
+
+    def shutdown(self) -> None:  # noqa: D401
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+
+class _State:
+    def __init__(self) -> None:  # noqa: D401
+        self.enabled = False
+        self.exporters: List[Any] = []
+        self.metrics = StageMetrics()
+        self.otel_tracer = None
+        self.otel_histogram = None
+
+
+_state = _State()
+
+
+def _finish(span: Span) -> None:  # noqa: D401
+    _state.metrics.record(span.name, span.duration_ns / 1e6, span.error is not None)
+    for exporter in _state.exporters:
+        exporter.export(span)
+
+
+def configure(*exporters: Any, otel: bool = False) -> None:  # noqa: D401
+    """Enable tracing with the given exporters (replacing earlier ones).
+
+    With *otel* spans go to the globally configured OpenTelemetry tracer
+    provider instead and durations to an ``llm_pipeline.stage.duration``
+    histogram; *exporters* are ignored in that mode.  With neither,
+    tracing is enabled for the in-process :func:`metrics` only.
+    """
+
+    shutdown()
+    if otel:
+        if not _OTEL:
+            raise RuntimeError("`opentelemetry-api` package not available – cannot export to OTel.")
+        from opentelemetry import metrics as otel_metrics  # type: ignore
+        from opentelemetry import trace  # type: ignore
+
+        _state.otel_tracer = trace.get_tracer("llm_pipeline")
+        _state.otel_histogram = otel_metrics.get_meter("llm_pipeline").create_histogram(
+            "llm_pipeline.stage.duration", unit="ms", description="Duration of tool-call stages"
+        )
+    else:
+        _state.exporters = list(exporters)
+    _state.enabled = True
+
+
+def shutdown() -> None:  # noqa: D401
+    """Disable tracing and close exporters (metrics are kept)."""
+
+    _state.enabled = False
+    for exporter in _state.exporters:
+        exporter.shutdown()
+    _state.exporters = []
+    _state.otel_tracer = _state.otel_histogram = None
+
+
+def metrics() -> Dict[str, Dict[str, float]]:  # noqa: D401
+    """Per-stage duration summary of all spans finished so far."""
+
+    return _state.metrics.snapshot()
+
+
+def reset_metrics() -> None:  # noqa: D401
+    _state.metrics.reset()
+
+
+def _configure_from_env() -> None:  # noqa: D401
+    target = os.environ.get("LLM_PIPELINE_TRACE", "").strip()
+    if not target:
+        return
+    if target.lower() == "otel":
+        configure(otel=True)
+    else:
+        configure(JsonlFileExporter(target))
+
+
+_configure_from_env()
+atexit.register(shutdown)
+
+
+# ---------------------------------------------------------------------------
+# CLI – summarise an exported trace file
+# ---------------------------------------------------------------------------
+
+
+def summarize_file(path: str | Path) -> Dict[str, Dict[str, float]]:  # noqa: D401
+    """Per-stage summary of a :class:`JsonlFileExporter` file."""
+
+    stats = StageMetrics()
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            stats.record(rec["name"], float(rec["duration_ms"]), rec.get("status") == "ERROR")
+    return stats.snapshot()
+
+
+def _main(argv) -> None:  # noqa: D401 – mini CLI
+    if len(argv) != 2:
+        print("Usage: python -m llm_pipeline.tracing <trace.jsonl>", file=sys.stderr)
+        raise SystemExit(1)
+
+    summary = summarize_file(argv[1])
+    width = max((len(name) for name in summary), default=5)
+    print(f"{'stage':<{width}}  {'count':>7} {'err':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'total ms':>11}")
+    for name, st in sorted(summary.items(), key=lambda kv: -kv[1]["total_ms"]):
+        print(
+            f"{name:<{width}}  {st['count']:>7} {st['errors']:>5} {st['p50_ms']:>9.2f} "
+            f"{st['p90_ms']:>9.2f} {st['p99_ms']:>9.2f} {st['total_ms']:>11.1f}"
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _main(sys.argv)
@@ -0,0 +1,286 @@
+"""Pre-flight validation of tool arguments, compiled once per endpoint.
+
+Bad arguments from the model (an unknown enum member, a missing required
+parameter, a malformed body) used to surface only as an upstream HTTP 400
+after a full round trip.  :func:`compile_validator` turns an
+``ExtractedSpec`` dict into a closure that checks – and where unambiguous
+*coerces* – the arguments locally in microseconds:
+
+* path/query parameters from ``models.Param`` (``type``, ``enum``,
+  ``required``); path placeholders are always required;
+* ``body`` against ``request_body.json_schema`` (``type``, ``required``,
+  ``properties``, ``items``, ``enum``); undeclared body keys pass through
+  because extracted schemas are not always complete;
+* unknown top-level arguments are rejected so typos are caught early.
+
+Coercions are the ones models commonly need: ``"10"`` -> ``10`` for
+integers, ``"true"`` -> ``True``, a scalar -> ``[scalar]`` or ``"a,b"`` ->
+``["a", "b"]`` for arrays, a JSON string -> object for ``body`` and
+case-insensitive enum matches.  Digit strings with a leading zero
+(``"012"``) are codes, not numbers, and are kept verbatim; path
+parameters are checked against their type but always sent as given.
+
+All problems are reported together in one :class:`ArgumentError` so the
+model can fix them in a single retry.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_PATH_VAR_RE = re.compile(r"{([^}]+)}")
+_PASSTHROUGH_ARGS = frozenset({"api_key"})
+_TRUE = frozenset({"true", "1", "yes", "y", "on"})
+_FALSE = frozenset({"false", "0", "no", "n", "off"})
+_MAX_DEPTH = 8
+# "012", "-007": numeric-looking identifiers whose zeros would be lost by int().
+_LEADING_ZERO_RE = re.compile(r"\s*-?0\d+\s*")
+
+
+class ArgumentError(ValueError):
+    """Tool arguments rejected before any request was sent."""
+
+    def __init__(self, tool: str, errors: List[str]) -> None:  # noqa: D401
+        self.tool = tool
+        self.errors = errors
+        super().__init__(f"invalid arguments for {tool}: " + "; ".join(errors))
+
+
+class _Invalid(Exception):
+    pass
+
+
+Coercer = Callable[[Any], Any]
+
+
+# ---------------------------------------------------------------------------
+# Scalar coercers
+# ---------------------------------------------------------------------------
+
+
+def _to_integer(value: Any) -> int:  # noqa: D401
+    if isinstance(value, bool):
+        raise _Invalid("expected integer, got boolean")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and re.fullmatch(r"\s*-?\d+\s*", value):
+        return value if _LEADING_ZERO_RE.fullmatch(value) else int(value)
+    raise _Invalid(f"expected integer, got {value!r}")
+
+
+def _to_number(value: Any) -> Any:  # noqa: D401
+    if isinstance(value, bool):
+        raise _Invalid("expected number, got boolean")
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            num = float(value)
+        except ValueError:
+            pass
+        else:
+            if _LEADING_ZERO_RE.fullmatch(value):
+                return value
+            return int(num) if num.is_integer() and "." not in value else num
+    raise _Invalid(f"expected number, got {value!r}")
+
+
+def _to_boolean(value: Any) -> bool:  # noqa: D401
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, str)) and str(value).strip().lower() in _TRUE | _FALSE:
+        return str(value).strip().lower() in _TRUE
+    raise _Invalid(f"expected boolean, got {value!r}")
+
+
+def _to_string(value: Any) -> str:  # noqa: D401
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise _Invalid(f"expected string, got {type(value).__name__}")
+
+
+def _enum(members: List[Any], inner: Optional[Coercer] = None) -> Coercer:  # noqa: D401
+    allowed = list(members)
+    folded = {str(m).lower(): m for m in allowed}
+
+    def _check(value: Any) -> Any:  # noqa: D401
+        if inner is not None:
+            value = inner(value)
+        if value in allowed:
+            return value
+        match = folded.get(str(value).lower())
+        if match is not None:
+            return match
+        raise _Invalid(f"{value!r} is not one of {allowed}")
+
+    return _check
+
+
+def _array(items: Optional[Coercer]) -> Coercer:  # noqa: D401
+    def _check(value: Any) -> List[Any]:  # noqa: D401
+        if isinstance(value, str):
+            value = [v.strip() for v in value.split(",")] if "," in value else [value]
+        elif not isinstance(value, (list, tuple)):
+            value = [value]
+        if items is None:
+            return list(value)
+        out, errors = [], []
+        for i, item in enumerate(value):
+            try:
+                out.append(items(item))
+            except _Invalid as exc:
+                errors.append(f"[{i}] {exc}")
+        if errors:
+            raise _Invalid("; ".join(errors))
+        return out
+
+    return _check
+
+
+_SCALARS: Dict[str, Coercer] = {
+    "integer": _to_integer,
+    "number": _to_number,
+    "boolean": _to_boolean,
+    "string": _to_string,
+}
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+
+def _param_coercer(pdata: Dict[str, Any]) -> Coercer:  # noqa: D401
+    ptype = pdata.get("type", "string")
+    members = pdata.get("enum")
+    if ptype == "array":
+        return _array(_enum(members, _to_string) if members else None)
+    if members:
+        return _enum(members, _SCALARS.get(ptype))
+    return _SCALARS.get(ptype, lambda v: v)
+
+
+def _path_coercer(inner: Coercer) -> Coercer:  # noqa: D401
+    # Path values are interpolated as text: check them, but keep numbers as
+    # the string the caller gave ("012" must not become 12).  Enum matches
+    # still snap to the declared member.
+    def _check(value: Any) -> Any:  # noqa: D401
+        coerced = inner(value)
+        return coerced if isinstance(coerced, str) else value
+
+    return _check
+
+
+def _schema_coercer(schema: Any, depth: int = 0) -> Optional[Coercer]:  # noqa: D401
+    """Compile a JSON-schema subset; ``None`` means "accept anything"."""
+
+    if not isinstance(schema, dict) or depth > _MAX_DEPTH:
+        return None
+    stype = schema.get("type")
+    if isinstance(stype, list):  # ["string", "null"] – too loose to police
+        return None
+    members = schema.get("enum")
+
+    if stype == "object" or "properties" in schema:
+        props = {
+            name: _schema_coercer(sub, depth + 1)
+            for name, sub in (schema.get("properties") or {}).items()
+        }
+        required = [r for r in schema.get("required") or [] if isinstance(r, str)]
+
+        def _object(value: Any) -> Dict[str, Any]:  # noqa: D401
+            if not isinstance(value, dict):
+                raise _Invalid(f"expected object, got {type(value).__name__}")
+            errors = [f"missing required field '{r}'" for r in required if r not in value]
+            out = dict(value)
+            for key, coerce in props.items():
+                if coerce is None or key not in value or value[key] is None:
+                    continue
+                try:
+                    out[key] = coerce(value[key])
+                except _Invalid as exc:
+                    errors.append(f"{key}: {exc}")
+            if errors:
+                raise _Invalid("; ".join(errors))
+            return out
+
+        return _object
+
+    if stype == "array":
+        return _array(_schema_coercer(schema.get("items"), depth + 1))
+    if members:
+        return _enum(members, _SCALARS.get(stype))
+    return _SCALARS.get(stype)
+
+
+def compile_validator(spec: Dict[str, Any], name: str = "") -> Callable[[Dict[str, Any]], Dict[str, Any]]:  # noqa: D401
+    """Return ``validate(kwargs) -> coerced kwargs`` for *spec*.
+
+    Raises :class:`ArgumentError` listing every problem found.
+    """
+
+    tool = name or f"{spec.get('method', 'GET').upper()} {spec.get('path', '/')}"
+    params: Dict[str, Tuple[Coercer, bool]] = {}
+    for pname, pdata in (spec.get("query_params") or {}).items():
+        pdata = pdata if isinstance(pdata, dict) else {}
+        params[pname] = (_param_coercer(pdata), bool(pdata.get("required")))
+    declared_path = spec.get("path_params") or {}
+    for pname in set(_PATH_VAR_RE.findall(spec.get("path", "/"))) | set(declared_path):
+        pdata = declared_path.get(pname) if isinstance(declared_path.get(pname), dict) else {}
+        # Path values are interpolated as text, but type/enum still apply.
+        params[pname] = (_path_coercer(_param_coercer(pdata)), True)
+
+    request_body = spec.get("request_body") or None
+    body_schema = (request_body or {}).get("json_schema") if isinstance(request_body, dict) else None
+    body_coercer = _schema_coercer(body_schema) if body_schema else None
+    body_required = bool(body_schema and body_schema.get("required"))
+    allowed = set(params) | _PASSTHROUGH_ARGS | ({"body"} if request_body else set())
+
+    def validate(kwargs: Dict[str, Any]) -> Dict[str, Any]:  # noqa: D401
+        errors: List[str] = []
+        out: Dict[str, Any] = {}
+        for key, value in kwargs.items():
+            if key not in allowed:
+                errors.append(f"unknown argument '{key}' (expected one of {sorted(allowed - _PASSTHROUGH_ARGS)})")
+                continue
+            out[key] = value
+
+        for pname, (coerce, required) in params.items():
+            if out.get(pname) is None:
+                out.pop(pname, None)
+                if required:
+                    errors.append(f"missing required argument '{pname}'")
+                continue
+            try:
+                out[pname] = coerce(out[pname])
+            except _Invalid as exc:
+                errors.append(f"{pname}: {exc}")
+
+        if request_body:
+            body = out.get("body")
+            if isinstance(body, str):
+                try:
+                    body = out["body"] = json.loads(body)
+                except ValueError:
+                    errors.append("body: not valid JSON")
+                    body = None
+            if body is None:
+                if body_required:
+                    errors.append("missing required argument 'body'")
+            elif body_coercer is not None:
+                try:
+                    out["body"] = body_coercer(body)
+                except _Invalid as exc:
+                    errors.append(f"body: {exc}")
+
+        if errors:
+            raise ArgumentError(tool, errors)
+        return out
+
+    return validate
@@ -1,32 +1,88 @@
+import asyncio
+import weakref
+from typing import Awaitable, Dict, Iterable, List, Optional
+
 import asyncpg
 import sqlparse
+from django.conf import settings
 
 from usaspending_api.common.helpers.sql_helpers import get_database_dsn_string
 
+# asyncpg pools are bound to the event loop that created them, and the management commands using this module each
+# run (and then close) their own loop. So pools are cached per loop, then per DSN, and vanish with their loop.
+_POOLS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncpg.pool.Pool]]" = (
+    weakref.WeakKeyDictionary()
+)
+_POOL_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+async def get_pool(dsn: Optional[str] = None) -> asyncpg.pool.Pool:
+    """Return the connection pool for ``dsn`` (default database if omitted) on the running loop, creating it lazily.
+
+    Pool size and the per-connection prepared statement cache come from the ``ASYNCPG_POOL_MIN_SIZE``,
+    ``ASYNCPG_POOL_MAX_SIZE`` and ``ASYNCPG_STATEMENT_CACHE_SIZE`` settings.
+    """
+    dsn = dsn or get_database_dsn_string()
+    loop = asyncio.get_running_loop()
+    pools = _POOLS.setdefault(loop, {})
+    pool = pools.get(dsn)
+    if pool is not None:
+        return pool
+
+    # Tasks started together by gather() would otherwise each create a pool for the same DSN
+    async with _POOL_LOCKS.setdefault(loop, asyncio.Lock()):
+        pool = pools.get(dsn)
+        if pool is None:
+            pool = await asyncpg.create_pool(
+                dsn=dsn,
+                min_size=settings.ASYNCPG_POOL_MIN_SIZE,
+                max_size=settings.ASYNCPG_POOL_MAX_SIZE,
+                statement_cache_size=settings.ASYNCPG_STATEMENT_CACHE_SIZE,
+            )
+            pools[dsn] = pool
+    return pool
+
+
+async def close_pools() -> None:
+    """Close every pool opened on the running loop. Call before closing the loop to avoid dangling connections."""
+    pools = _POOLS.pop(asyncio.get_running_loop(), {})
+    await asyncio.gather(*(pool.close() for pool in pools.values()))
+
+
+async def gather_with_concurrency(aws: Iterable[Awaitable], concurrency: int) -> List:
+    """Like ``asyncio.gather``, but with at most ``concurrency`` of the awaitables running at any one time"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(_run(aw) for aw in aws))
+
 
-async def async_run_select(sql):
-    conn = await asyncpg.connect(dsn=get_database_dsn_string())
-    sql_result = await conn.fetch(sql)
-    await conn.close()
-    return sql_result
+async def async_run_select(sql, dsn=None):
+    pool = await get_pool(dsn)
+    async with pool.acquire() as conn:
+        return await conn.fetch(sql)
 
 
-async def async_run_create(sql, verify_text=None):
-    conn = await asyncpg.connect(dsn=get_database_dsn_string())
-    stmt = await conn.prepare(sql)
-    await stmt.fetch()
-    response_msg = stmt.get_statusmsg()
-    await conn.close()
+async def async_run_create(sql, verify_text=None, dsn=None):
+    pool = await get_pool(dsn)
+    async with pool.acquire() as conn:
+        stmt = await conn.prepare(sql)
+        await stmt.fetch()
+        response_msg = stmt.get_statusmsg()
 
     if verify_text:
         if response_msg != verify_text:
             raise RuntimeError("SQL did not return the correct response")
 
 
-async def async_run_creates(sql_statements, wrapper):
-    with wrapper:
-        conn = await asyncpg.connect(dsn=get_database_dsn_string())
-        for sql in sqlparse.split(sql_statements):
-            stmt = await conn.prepare(sql)
-            await stmt.fetch()
-        await conn.close()
+async def async_run_creates(sql_statements, wrapper, dsn=None):
+    pool = await get_pool(dsn)
+    # Acquire first so the timer covers the statements, not the wait for a free pooled connection
+    async with pool.acquire() as conn:
+        with wrapper:
+            for sql in sqlparse.split(sql_statements):
+                stmt = await conn.prepare(sql)
+                await stmt.fetch()
@@ -1,7 +1,9 @@
-from typing import Union, Optional
+from typing import Dict, Optional, Tuple, Union
 
 import certifi
 import logging
+import os
+import threading
 
 from django.conf import settings
 from elasticsearch import Elasticsearch
@@ -24,25 +26,86 @@ def instantiate_elasticsearch_client() -> Elasticsearch:
     return Elasticsearch(settings.ES_HOSTNAME, **es_kwargs)
 
 
-def create_es_client() -> Elasticsearch:
+# Process-wide registry of pooled clients, keyed by ``(pid, connection config)``. An ``Elasticsearch`` client owns a
+# urllib3 connection pool per node, so building one per ``Search`` object paid connection setup on every request.
+# The pid in the key (and the at-fork reset below) keeps forked workers from sharing sockets with their parent.
+_CLIENTS: Dict[Tuple, Elasticsearch] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _reset_clients() -> None:
+    global _CLIENTS_LOCK
+    _CLIENTS.clear()
+    _CLIENTS_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_clients)
+
+
+def _es_client_config() -> dict:
+    es_config = {
+        "hosts": [settings.ES_HOSTNAME],
+        "timeout": settings.ES_TIMEOUT,
+        # Connections kept alive per node; sized for the threads of one web worker
+        "maxsize": settings.ES_CONNECTIONS_PER_NODE,
+        "sniff_on_start": settings.ES_SNIFF_ON_START,
+        "sniff_on_connection_fail": settings.ES_SNIFF_ON_CONNECTION_FAIL,
+    }
+    if settings.ES_SNIFFER_TIMEOUT:
+        es_config["sniffer_timeout"] = settings.ES_SNIFFER_TIMEOUT
+
+    # If the connection string is using SSL with localhost, disable verifying
+    # the certificates to allow testing in a development environment
+    # Also allow host.docker.internal, when SSH-tunneling on localhost to a remote nonprod instance over HTTPS
+    if settings.ES_HOSTNAME.startswith(("https://localhost", "https://host.docker.internal")):
+        logger.warning("SSL cert verification is disabled. Safe only for local development")
+        import urllib3
+
+        urllib3.disable_warnings()
+        ssl_context = create_ssl_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = CERT_NONE
+        es_config["ssl_context"] = ssl_context
+
+    return es_config
+
+
+def get_es_client() -> Optional[Elasticsearch]:
+    """Return this process's pooled Elasticsearch client for the current settings, creating it on first use.
+
+    Clients are cached per process and per connection settings (so tests overriding ``ES_HOSTNAME`` get their own),
+    and are dropped in child processes after a fork.
+    """
     if settings.ES_HOSTNAME is None or settings.ES_HOSTNAME == "":
         logger.error("env var 'ES_HOSTNAME' needs to be set for Elasticsearch connection")
+        return None
+
+    key = (
+        os.getpid(),
+        settings.ES_HOSTNAME,
+        settings.ES_TIMEOUT,
+        settings.ES_CONNECTIONS_PER_NODE,
+        settings.ES_SNIFF_ON_START,
+        settings.ES_SNIFF_ON_CONNECTION_FAIL,
+        settings.ES_SNIFFER_TIMEOUT,
+    )
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            try:
+                client = Elasticsearch(**_es_client_config())
+            except Exception as e:
+                logger.error("Error creating the elasticsearch client: {}".format(e))
+                return None
+            _CLIENTS[key] = client
+    return client
+
+
+def create_es_client() -> Elasticsearch:
     global CLIENT
-    es_config = {"hosts": [settings.ES_HOSTNAME], "timeout": settings.ES_TIMEOUT}
-    try:
-        # If the connection string is using SSL with localhost, disable verifying
-        # the certificates to allow testing in a development environment
-        # Also allow host.docker.internal, when SSH-tunneling on localhost to a remote nonprod instance over HTTPS
-        if settings.ES_HOSTNAME.startswith(("https://localhost", "https://host.docker.internal")):
-            logger.warning("SSL cert verification is disabled. Safe only for local development")
-            import urllib3
-
-            urllib3.disable_warnings()
-            ssl_context = create_ssl_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = CERT_NONE
-            es_config["ssl_context"] = ssl_context
-
-        CLIENT = Elasticsearch(**es_config)
-    except Exception as e:
-        logger.error("Error creating the elasticsearch client: {}".format(e))
+    CLIENT = get_es_client()
@@ -1,13 +1,13 @@
 import logging
-from ssl import CERT_NONE
 from typing import Callable, Optional, Union
 
 from django.conf import settings
 from elasticsearch import ConnectionError, ConnectionTimeout, Elasticsearch, NotFoundError, TransportError
-from elasticsearch.connection import create_ssl_context
 from elasticsearch_dsl import Search as SearchBase
 from elasticsearch_dsl.response import Response
 
+from usaspending_api.common.elasticsearch.client import get_es_client
+
 logger = logging.getLogger("console")
 
 
@@ -21,26 +21,8 @@ class Search(SearchBase):
 
     @staticmethod
     def _create_es_client() -> Elasticsearch:
-        if settings.ES_HOSTNAME is None or settings.ES_HOSTNAME == "":
-            logger.error("env var 'ES_HOSTNAME' needs to be set for Elasticsearch connection")
-        es_config = {"hosts": [settings.ES_HOSTNAME], "timeout": settings.ES_TIMEOUT}
-        try:
-            # If the connection string is using SSL with localhost, disable verifying
-            # the certificates to allow testing in a development environment
-            # Also allow host.docker.internal, when SSH-tunneling on localhost to a remote nonprod instance over HTTPS
-            if settings.ES_HOSTNAME.startswith(("https://localhost", "https://host.docker.internal")):
-                logger.warning("SSL cert verification is disabled. Safe only for local development")
-                import urllib3
-
-                urllib3.disable_warnings()
-                ssl_context = create_ssl_context()
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = CERT_NONE
-                es_config["ssl_context"] = ssl_context
-
-            return Elasticsearch(**es_config)
-        except Exception as e:
-            logger.error("Error creating the elasticsearch client: {}".format(e))
+        # Shared per-process client; see usaspending_api.common.elasticsearch.client.get_es_client
+        return get_es_client()
 
     def _execute(self, timeout: str):
         return self.params(timeout=timeout).execute()
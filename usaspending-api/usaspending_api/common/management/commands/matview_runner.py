@@ -7,7 +7,7 @@ from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from pathlib import Path
 
-from usaspending_api.common.data_connectors.async_sql_query import async_run_creates
+from usaspending_api.common.data_connectors.async_sql_query import async_run_creates, close_pools
 from usaspending_api.common.helpers.timing_helpers import ConsoleTimer as Timer
 from usaspending_api.common.matview_manager import (
     CHUNKED_MATERIALIZED_VIEWS,
@@ -150,10 +150,12 @@ class Command(BaseCommand):
                         asyncio.ensure_future(async_run_creates(sql, wrapper=Timer(chunked_matview)), loop=loop)
                     )
 
-        if len(tasks) > 0:
-            loop.run_until_complete(asyncio.gather(*tasks))
-
-        loop.close()
+        try:
+            if len(tasks) > 0:
+                loop.run_until_complete(asyncio.gather(*tasks))
+        finally:
+            loop.run_until_complete(close_pools())
+            loop.close()
 
         if "transaction_search" in self.chunked_matviews and self.include_chunked_matviews:
             logger.info("Inserting data from transaction_search chunks into transaction_search table.")
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from usaspending_api.common.data_connectors import async_sql_query
+
+
+class _FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def fetch(self, sql):
+        self.pool.statements.append(sql)
+        return [{"sql": sql}]
+
+    async def prepare(self, sql):
+        conn = self
+
+        class _Statement:
+            async def fetch(self):
+                return await conn.fetch(sql)
+
+        return _Statement()
+
+
+class _FakePool:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.statements = []
+        self.in_use = 0
+        self.closed = False
+
+    def acquire(self):
+        pool = self
+
+        class _Acquire:
+            async def __aenter__(self):
+                pool.in_use += 1
+                return _FakeConnection(pool)
+
+            async def __aexit__(self, *exc):
+                pool.in_use -= 1
+
+        return _Acquire()
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture()
+def fake_pools(monkeypatch):
+    created = []
+
+    async def _create_pool(**kwargs):
+        await asyncio.sleep(0)  # let concurrent callers race for the pool
+        created.append(_FakePool(**kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(async_sql_query.asyncpg, "create_pool", _create_pool)
+    return created
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_one_pool_per_dsn(fake_pools):
+    async def _main():
+        results = await asyncio.gather(*(async_sql_query.async_run_select(f"SELECT {i}", dsn="a") for i in range(5)))
+        await async_sql_query.async_run_select("SELECT 1", dsn="b")
+        await async_sql_query.close_pools()
+        return results
+
+    results = _run(_main())
+    assert [r[0]["sql"] for r in results] == [f"SELECT {i}" for i in range(5)]
+    assert [p.kwargs["dsn"] for p in fake_pools] == ["a", "b"]
+    assert len(fake_pools[0].statements) == 5
+    assert all(p.closed for p in fake_pools)
+
+
+def test_pool_settings(fake_pools, settings):
+    settings.ASYNCPG_POOL_MIN_SIZE = 2
+    settings.ASYNCPG_POOL_MAX_SIZE = 7
+    settings.ASYNCPG_STATEMENT_CACHE_SIZE = 0
+
+    _run(async_sql_query.async_run_select("SELECT 1", dsn="a"))
+    assert fake_pools[0].kwargs == {"dsn": "a", "min_size": 2, "max_size": 7, "statement_cache_size": 0}
+
+
+def test_new_pool_per_event_loop(fake_pools):
+    _run(async_sql_query.async_run_select("SELECT 1", dsn="a"))
+    _run(async_sql_query.async_run_select("SELECT 1", dsn="a"))
+    assert len(fake_pools) == 2
+
+
+class _Timer:
+    def __init__(self, pool):
+        self.pool = pool
+        self.events = []
+
+    def __enter__(self):
+        self.events.append(("start", self.pool.in_use, len(self.pool.statements)))
+
+    def __exit__(self, *exc):
+        self.events.append(("stop", self.pool.in_use, len(self.pool.statements)))
+
+
+def test_run_creates_times_only_the_statements(fake_pools):
+    async def _main():
+        await async_sql_query.get_pool("a")
+        timer = _Timer(fake_pools[0])
+        await async_sql_query.async_run_creates("CREATE TABLE x (a int); CREATE INDEX ON x (a);", timer, dsn="a")
+        await async_sql_query.close_pools()
+        return timer
+
+    timer = _run(_main())
+    # The connection is already held when the timer starts, and still held when it stops
+    assert timer.events == [("start", 1, 0), ("stop", 1, 2)]
+    assert fake_pools[0].statements == ["CREATE TABLE x (a int);", "CREATE INDEX ON x (a);"]
+
+
+def test_gather_with_concurrency():
+    running = 0
+    peak = 0
+
+    async def _work(i):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return i
+
+    results = _run(async_sql_query.gather_with_concurrency([_work(i) for i in range(10)], 3))
+    assert results == list(range(10))
+    assert peak == 3
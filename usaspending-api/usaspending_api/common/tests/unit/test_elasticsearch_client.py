@@ -0,0 +1,50 @@
+import pytest
+
+from usaspending_api.common.elasticsearch import client
+from usaspending_api.common.elasticsearch.search_wrappers import AwardSearch, TransactionSearch
+
+
+class _FakeElasticsearch:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+@pytest.fixture()
+def fake_es(monkeypatch, settings):
+    settings.ES_HOSTNAME = "http://es.example.com:9200"
+    monkeypatch.setattr(client, "Elasticsearch", _FakeElasticsearch)
+    client._reset_clients()
+    yield
+    client._reset_clients()
+
+
+def test_client_is_shared_across_searches(fake_es):
+    es = client.get_es_client()
+    assert isinstance(es, _FakeElasticsearch)
+    assert es.kwargs["hosts"] == ["http://es.example.com:9200"]
+    assert es.kwargs["maxsize"] == client.settings.ES_CONNECTIONS_PER_NODE
+    assert "ssl_context" not in es.kwargs
+
+    assert AwardSearch()._using is es
+    assert TransactionSearch()._using is es
+    assert len(client._CLIENTS) == 1
+
+
+def test_new_client_when_settings_change(fake_es, settings):
+    first = client.get_es_client()
+    settings.ES_HOSTNAME = "https://localhost:9200"
+    second = client.get_es_client()
+    assert second is not first
+    assert second.kwargs["ssl_context"].check_hostname is False
+    assert client.get_es_client() is second
+
+
+def test_new_client_in_forked_process(fake_es, monkeypatch):
+    parent = client.get_es_client()
+    monkeypatch.setattr(client.os, "getpid", lambda: -1)
+    assert client.get_es_client() is not parent
+
+
+def test_missing_hostname(fake_es, settings):
+    settings.ES_HOSTNAME = ""
+    assert client.get_es_client() is None
@@ -19,6 +19,7 @@ from usaspending_api.etl.elasticsearch_loader_helpers.delete_data import (
 from usaspending_api.etl.elasticsearch_loader_helpers.extract_data import (
     count_of_records_to_process,
     count_of_records_to_process_in_delta,
+    extract_record_batches,
     extract_records,
     obtain_extract_all_partitions_sql,
     obtain_extract_partition_sql,
@@ -33,7 +34,7 @@ from usaspending_api.etl.elasticsearch_loader_helpers.index_config import (
     toggle_refresh_off,
     toggle_refresh_on,
 )
-from usaspending_api.etl.elasticsearch_loader_helpers.load_data import load_data
+from usaspending_api.etl.elasticsearch_loader_helpers.load_data import load_data, load_record_batches
 from usaspending_api.etl.elasticsearch_loader_helpers.transform_data import (
     transform_award_data,
     transform_location_data,
@@ -46,6 +47,7 @@ from usaspending_api.etl.elasticsearch_loader_helpers.utilities import (
     execute_sql_statement,
     format_log,
     gen_random_name,
+    stream_sql_statement,
 )
 
 __all__ = [
@@ -58,13 +60,16 @@ __all__ = [
     "delete_awards",
     "delete_transactions",
     "execute_sql_statement",
+    "extract_record_batches",
     "extract_records",
     "format_log",
     "gen_random_name",
     "load_data",
+    "load_record_batches",
     "obtain_extract_partition_sql",
     "obtain_extract_all_partitions_sql",
     "set_final_index_config",
+    "stream_sql_statement",
     "swap_aliases",
     "TaskSpec",
     "toggle_refresh_off",
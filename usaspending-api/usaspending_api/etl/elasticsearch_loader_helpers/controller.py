@@ -17,10 +17,12 @@ from usaspending_api.etl.elasticsearch_loader_helpers import (
     create_index,
     delete_awards,
     delete_transactions,
+    extract_record_batches,
     extract_records,
     format_log,
     gen_random_name,
     load_data,
+    load_record_batches,
     obtain_extract_partition_sql,
     set_final_index_config,
     swap_aliases,
@@ -122,6 +124,8 @@ class AbstractElasticsearchIndexerController(ABC):
             transform_func=self.config["data_transform_func"],
             view=self.config["sql_view"],
             slices=self.config["slices"],
+            stream_sql_func=self.config.get("stream_sql_func"),
+            stream_batch_size=self.config.get("stream_batch_size") or 0,
         )
 
     def set_slice_count(self) -> None:
@@ -277,6 +281,9 @@ def extract_transform_load(task: TaskSpec) -> None:
     logger.info(format_log(msg, name=task.name))
 
     client = instantiate_elasticsearch_client()
+    if task.stream_batch_size > 0:
+        return _stream_extract_transform_load(task, client, start)
+
     try:
         if task.transform_func is not None:
             records = task.transform_func(task, extract_records(task))
@@ -305,3 +312,34 @@ def extract_transform_load(task: TaskSpec) -> None:
     else:
         msg = f"Partition #{task.partition_number} was successfully processed in {perf_counter() - start:.2f}s"
         logger.info(format_log(msg, name=task.name))
+
+
+def _stream_extract_transform_load(task: TaskSpec, client, start: float) -> None:
+    """Streaming variant of ``extract_transform_load``: batches flow from a server-side cursor through the transform
+    into the bulk indexer, so the three phases overlap and memory stays bounded (see ``load_record_batches``)
+    """
+
+    def _transformed_batches():
+        for batch in extract_record_batches(task):
+            if abort.is_set():
+                msg = f"Prematurely ending partition #{task.partition_number} due to error in another process"
+                logger.warning(format_log(msg, name=task.name))
+                return
+            yield task.transform_func(task, batch) if task.transform_func is not None else batch
+
+    try:
+        success, fail = load_record_batches(task, _transformed_batches(), client)
+        with total_doc_success.get_lock():
+            total_doc_success.value += success
+        with total_doc_fail.get_lock():
+            total_doc_fail.value += fail
+    except Exception:
+        if abort.is_set():
+            msg = f"Partition #{task.partition_number} failed after an error was previously encountered"
+            logger.warning(format_log(msg, name=task.name))
+        else:
+            logger.exception(format_log(f"{task.name} failed!", name=task.name))
+            abort.set()
+    else:
+        msg = f"Partition #{task.partition_number} was successfully processed in {perf_counter() - start:.2f}s"
+        logger.info(format_log(msg, name=task.name))
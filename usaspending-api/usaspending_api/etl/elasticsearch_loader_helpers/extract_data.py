@@ -1,7 +1,7 @@
 import logging
 
 from time import perf_counter
-from typing import List, Tuple, Dict
+from typing import Dict, Generator, List, Tuple
 
 from usaspending_api.etl.elasticsearch_loader_helpers.utilities import TaskSpec, format_log, execute_sql_statement
 
@@ -111,3 +111,21 @@ def extract_records(task: TaskSpec) -> List[dict]:
     msg = f"{len(records):,} records extracted in {perf_counter() - start:.2f}s"
     logger.info(format_log(msg, name=task.name, action="Extract"))
     return records
+
+
+def extract_record_batches(task: TaskSpec) -> Generator[List[dict], None, None]:
+    """Like ``extract_records``, but yields the partition in batches of ``task.stream_batch_size`` rows"""
+    start = perf_counter()
+    logger.info(format_log(f"Streaming data from source", name=task.name, action="Extract"))
+
+    count = 0
+    try:
+        for batch in task.stream_sql_func(task.sql, task.stream_batch_size):
+            count += len(batch)
+            yield batch
+    except Exception as e:
+        logger.exception(f"Failed on partition {task.name} with '{task.sql}'")
+        raise e
+
+    msg = f"{count:,} records extracted in {perf_counter() - start:.2f}s"
+    logger.info(format_log(msg, name=task.name, action="Extract"))
@@ -1,8 +1,11 @@
 import logging
+import threading
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from elasticsearch import Elasticsearch, helpers
+from queue import Empty, Full, Queue
 from time import perf_counter
-from typing import List, Tuple, Union
+from typing import Iterable, List, Tuple, Union
 
 from usaspending_api.etl.elasticsearch_loader_helpers.delete_data import delete_docs_by_unique_key
 from usaspending_api.etl.elasticsearch_loader_helpers.utilities import TaskSpec, format_log
@@ -28,6 +31,18 @@ ES_MAX_BATCH_BYTES = 20 * 1024 * 1024
 # Ex: 3-data-node cluster of i3.large.elasticsearch = 2 vCPU * 3 nodes = 6 vCPU: 300*6 = 1800 doc batches
 # Ex: 5-data-node cluster of i3.xlarge.elasticsearch = 4 vCPU * 5 nodes = 20 vCPU: 300*20 = 6000 doc batches
 ES_BATCH_ENTRIES = 4000
+# When streaming a partition (see load_record_batches), the number of extracted + transformed batches allowed to wait
+# for indexing, and the number of threads posting bulk requests. Peak memory per worker is roughly
+# ES_STREAM_QUEUE_BATCHES + 1 batches of rows (queued, and being produced) plus, for each indexing thread, the batch it
+# is reading and the bulk request it is building: max(batch size, ES_BATCH_ENTRIES) docs per thread
+ES_STREAM_QUEUE_BATCHES = 2
+ES_BULK_THREAD_COUNT = 4
+# Docs rejected with a 429 (full write queue on a data node) are re-sent up to ES_BULK_MAX_RETRIES times, waiting
+# ES_BULK_INITIAL_BACKOFF seconds and then twice as long after each further rejection
+ES_BULK_MAX_RETRIES = 10
+ES_BULK_INITIAL_BACKOFF = 2
+
+_END_OF_STREAM = object()
 
 
 def load_data(worker: TaskSpec, records: List[dict], client: Elasticsearch) -> Tuple[int, int]:
@@ -40,6 +55,121 @@ def load_data(worker: TaskSpec, records: List[dict], client: Elasticsearch) -> T
     return success, failed
 
 
+def load_record_batches(worker: TaskSpec, batches: Iterable[List[dict]], client: Elasticsearch) -> Tuple[int, int]:
+    """Index a stream of record batches, overlapping their extraction/transformation with bulk posting.
+
+    A background thread pulls batches from ``batches`` (doing any extract and transform work lazily behind it) into a
+    queue bounded at ES_STREAM_QUEUE_BATCHES, while ES_BULK_THREAD_COUNT threads drain the queue, each through its own
+    ``helpers.streaming_bulk`` so that 429-rejected docs are retried with backoff. The DB and ES work at the same time
+    and memory stays bounded: ES_STREAM_QUEUE_BATCHES + 1 batches plus max(batch size, ES_BATCH_ENTRIES) docs per
+    indexing thread. For incremental loads each batch's docs are deleted before being queued (see
+    ``streaming_post_to_es``). Docs still failing after the retries are counted, not raised; an extract, transform or
+    index error is logged and re-raised as a RuntimeError naming the partition.
+    """
+    start = perf_counter()
+    logger.info(format_log(f"Starting streaming Index operation", name=worker.name, action="Index"))
+
+    queue = Queue(maxsize=ES_STREAM_QUEUE_BATCHES)
+    stop = threading.Event()
+    producer_errors = []
+
+    def _put(item) -> bool:
+        # Keep checking for a failed consumer so this thread can't stay blocked on a full queue
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for batch in batches:
+                if worker.is_incremental and batch:
+                    delete_docs_by_unique_key(
+                        client,
+                        "_id",
+                        [doc["_id"] for doc in batch],
+                        worker.name,
+                        worker.index,
+                        refresh_after=False,
+                        slices=worker.slices,
+                    )
+                if not _put(batch):
+                    break
+        except Exception as e:
+            producer_errors.append(e)
+        finally:
+            if hasattr(batches, "close"):
+                batches.close()
+            _put(_END_OF_STREAM)
+
+    def _actions():
+        while not stop.is_set():
+            try:
+                batch = queue.get(timeout=1)
+            except Empty:
+                continue
+            if batch is _END_OF_STREAM:
+                _put(_END_OF_STREAM)  # pass it on to the other indexing threads
+                return
+            yield from batch
+
+    def _index() -> Tuple[int, int]:
+        success, failed = 0, 0
+        for ok, item in helpers.streaming_bulk(
+            client,
+            actions=_actions(),
+            chunk_size=ES_BATCH_ENTRIES,
+            max_chunk_bytes=ES_MAX_BATCH_BYTES,
+            raise_on_error=False,
+            max_retries=ES_BULK_MAX_RETRIES,
+            initial_backoff=ES_BULK_INITIAL_BACKOFF,
+            index=worker.index,
+        ):
+            if ok:
+                success += 1
+            else:
+                if not failed:
+                    logger.warning(format_log(f"Failed to index: {item}", name=worker.name, action="Index"))
+                failed += 1
+        return success, failed
+
+    producer = threading.Thread(target=_produce, name=f"{worker.name}-extract", daemon=True)
+    producer.start()
+    success, failed = 0, 0
+    try:
+        with ThreadPoolExecutor(ES_BULK_THREAD_COUNT, thread_name_prefix=f"{worker.name}-index") as pool:
+            futures = [pool.submit(_index) for _ in range(ES_BULK_THREAD_COUNT)]
+            for future in as_completed(futures):
+                try:
+                    thread_success, thread_failed = future.result()
+                except Exception:
+                    stop.set()  # let the producer and the other indexing threads wind down
+                    raise
+                success += thread_success
+                failed += thread_failed
+    except Exception as e:
+        _log_partition_error(worker, e)
+        raise RuntimeError(f"{worker.name}")
+    finally:
+        stop.set()
+        producer.join()
+
+    if producer_errors:
+        _log_partition_error(worker, producer_errors[0])
+        raise RuntimeError(f"{worker.name}") from producer_errors[0]
+
+    logger.info(format_log(f"Success: {success:,} | Fail: {failed:,}", name=worker.name, action="Index"))
+    logger.info(format_log(f"Index operation took {perf_counter() - start:.2f}s", name=worker.name, action="Index"))
+    return success, failed
+
+
+def _log_partition_error(worker: TaskSpec, e: Exception) -> None:
+    logger.error(f"Error on partition {worker.name}:\n\n{str(e)[:2000]}\n...\n{str(e)[-2000:]}\n")
+
+
 def streaming_post_to_es(
     client: Elasticsearch,
     chunk: list,
@@ -33,6 +33,8 @@ class TaskSpec:
     slices: Union[str, int]
     execute_sql_func: callable = None
     transform_func: callable = None
+    stream_sql_func: callable = None
+    stream_batch_size: int = 0  # when > 0, the partition is streamed through the ETL in batches of this many rows
 
 
 def chunks(items: List[Any], size: int) -> List[Any]:
@@ -151,6 +153,34 @@ def execute_sql_statement(cmd: str | Composed, results: bool = False, verbose: b
     return rows
 
 
+def stream_sql_statement(
+    cmd: str | Composed, batch_size: int, verbose: bool = False
+) -> Generator[List[dict], None, None]:
+    """Yield the results of a query in batches of dicts, read through a server-side cursor.
+
+    Only ``batch_size`` rows are held in memory at a time, unlike ``execute_sql_statement`` which returns them all.
+    """
+    if verbose:
+        print(cmd)
+
+    connection = psycopg2.connect(dsn=get_database_dsn_string())
+    try:
+        # Named (server-side) cursors only exist inside a transaction, so no autocommit here
+        with connection, connection.cursor(name="es_etl_stream") as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(cmd)
+            columns = None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if columns is None:
+                    columns = [col[0] for col in cursor.description]
+                yield [dict(zip(columns, row, strict=False)) for row in rows]
+    finally:
+        connection.close()
+
+
 def db_rows_to_dict(cursor: psycopg2.extensions.cursor) -> List[dict]:
     """Return a dictionary of all row results from a database connection cursor"""
     columns = [col[0] for col in cursor.description]
@@ -5,7 +5,7 @@ from pathlib import Path
 from django.db import connection, transaction
 from django.core.management.base import BaseCommand
 
-from usaspending_api.common.data_connectors.async_sql_query import async_run_creates
+from usaspending_api.common.data_connectors.async_sql_query import async_run_creates, close_pools
 from usaspending_api.common.helpers.sql_helpers import execute_sql_simple
 from usaspending_api.common.helpers.timing_helpers import ConsoleTimer as Timer
 from usaspending_api.common.matview_manager import DEFAULT_CHUNKED_MATIVEW_DIR
@@ -134,8 +134,11 @@ class Command(BaseCommand):
                 )
             )
 
-        loop.run_until_complete(asyncio.gather(*tasks))
-        loop.close()
+        try:
+            loop.run_until_complete(asyncio.gather(*tasks))
+        finally:
+            loop.run_until_complete(close_pools())
+            loop.close()
 
     @transaction.atomic
     def swap_tables(self, rename_indexes):
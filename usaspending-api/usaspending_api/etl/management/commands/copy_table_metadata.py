@@ -5,7 +5,11 @@ from pprint import pformat
 from django.db import connection
 from django.core.management.base import BaseCommand
 
-from usaspending_api.common.data_connectors.async_sql_query import async_run_creates
+from usaspending_api.common.data_connectors.async_sql_query import (
+    async_run_creates,
+    close_pools,
+    gather_with_concurrency,
+)
 from usaspending_api.common.helpers.timing_helpers import ConsoleTimer as Timer
 from usaspending_api.etl.broker_etl_helpers import dictfetchall
 
@@ -34,26 +38,21 @@ def make_read_constraints(table_name):
 
 def create_indexes(index_definitions, index_concurrency):
     loop = asyncio.new_event_loop()
-    loop.run_until_complete(index_with_concurrency(index_definitions, index_concurrency))
-    loop.close()
+    try:
+        loop.run_until_complete(index_with_concurrency(index_definitions, index_concurrency))
+    finally:
+        loop.run_until_complete(close_pools())
+        loop.close()
 
 
 async def index_with_concurrency(index_definitions, index_concurrency):
-    semaphore = asyncio.Semaphore(index_concurrency)
     tasks = []
 
-    async def create_with_sem(sql, index):
-        async with semaphore:
-            return await async_run_creates(
-                sql,
-                wrapper=Timer(f"Creating Index {index}"),
-            )
-
     for i, sql in enumerate(index_definitions):
         logger.info(f"Creating future for index: {i} - SQL: {sql}")
-        tasks.append(create_with_sem(sql, i))
+        tasks.append(async_run_creates(sql, wrapper=Timer(f"Creating Index {i}")))
 
-    return await asyncio.gather(*tasks)
+    return await gather_with_concurrency(tasks, index_concurrency)
 
 
 def make_copy_constraints(
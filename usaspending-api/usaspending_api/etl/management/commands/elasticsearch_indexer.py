@@ -15,6 +15,7 @@ from usaspending_api.etl.elasticsearch_loader_helpers import (
     check_pipeline_dates,
     execute_sql_statement,
     format_log,
+    stream_sql_statement,
     toggle_refresh_off,
     transform_award_data,
     transform_location_data,
@@ -97,6 +98,15 @@ class AbstractElasticsearchIndexer(ABC, BaseCommand):
             default=10000,
             metavar="(default: 10,000)",
         )
+        parser.add_argument(
+            "--stream-batch-size",
+            type=int,
+            help="Stream each partition through a server-side DB cursor in batches of this many rows, so extract,"
+            " transform and index overlap and memory is bounded by a few batches instead of a whole partition."
+            " Worthwhile with large partitions. 0 loads each partition in one piece.",
+            default=0,
+            metavar="(default: 0)",
+        )
         parser.add_argument(
             "--drop-db-view",
             action="store_true",
@@ -194,6 +204,7 @@ def parse_cli_args(options: dict, es_client) -> dict:
         "skip_counts",
         "skip_delete_index",
         "skip_date_check",
+        "stream_batch_size",
     ]
     config = set_config(passthrough_values, options)
 
@@ -285,6 +296,11 @@ def set_config(passthrough_values: list, arg_parse_options: dict) -> dict:
             sql_view: Name of the SQL View that will be used to populate the Elasticsearch index.
                 Note: This should be defined in settings.py
 
+            stream_sql_func: Function that yields the results of the same SQL in batches (used with
+                --stream-batch-size) to stream data from the database to the Elasticsearch index.
+
+                Default value: stream_sql_statement
+
             stored_date_key: The `name` in the `external_data_type` table to use when referencing this Elasticsearch
                 index. This table, in combination with the `external_data_load_date` table, are used to keep track
                 of when data was last loaded into a destination (database table or Elasticsearch index).
@@ -314,6 +330,7 @@ def set_config(passthrough_values: list, arg_parse_options: dict) -> dict:
             "query_alias_prefix": settings.ES_AWARDS_QUERY_ALIAS_PREFIX,
             "required_index_name": settings.ES_AWARDS_NAME_SUFFIX,
             "sql_view": settings.ES_AWARDS_ETL_VIEW_NAME,
+            "stream_sql_func": stream_sql_statement,
             "stored_date_key": "es_awards",
             "unique_key_field": ES_AWARDS_UNIQUE_KEY_FIELD,
             "write_alias": settings.ES_AWARDS_WRITE_ALIAS,
@@ -335,6 +352,7 @@ def set_config(passthrough_values: list, arg_parse_options: dict) -> dict:
             "query_alias_prefix": settings.ES_SUBAWARD_QUERY_ALIAS_PREFIX,
             "required_index_name": settings.ES_SUBAWARD_NAME_SUFFIX,
             "sql_view": settings.ES_SUBAWARD_ETL_VIEW_NAME,
+            "stream_sql_func": stream_sql_statement,
             # "stored_date_key": "es_awards",
             "unique_key_field": ES_SUBAWARD_UNIQUE_KEY_FIELD,
             "write_alias": settings.ES_SUBAWARD_WRITE_ALIAS,
@@ -356,6 +374,7 @@ def set_config(passthrough_values: list, arg_parse_options: dict) -> dict:
             "query_alias_prefix": settings.ES_TRANSACTIONS_QUERY_ALIAS_PREFIX,
             "required_index_name": settings.ES_TRANSACTIONS_NAME_SUFFIX,
             "sql_view": settings.ES_TRANSACTIONS_ETL_VIEW_NAME,
+            "stream_sql_func": stream_sql_statement,
             "stored_date_key": "es_transactions",
             "unique_key_field": ES_TRANSACTIONS_UNIQUE_KEY_FIELD,
             "write_alias": settings.ES_TRANSACTIONS_WRITE_ALIAS,
@@ -377,6 +396,7 @@ def set_config(passthrough_values: list, arg_parse_options: dict) -> dict:
             "query_alias_prefix": settings.ES_RECIPIENTS_QUERY_ALIAS_PREFIX,
             "required_index_name": settings.ES_RECIPIENTS_NAME_SUFFIX,
             "sql_view": settings.ES_RECIPIENTS_ETL_VIEW_NAME,
+            "stream_sql_func": stream_sql_statement,
             "stored_date_key": None,
             "unique_key_field": ES_RECIPIENT_UNIQUE_KEY_FIELD,
             "write_alias": settings.ES_RECIPIENTS_WRITE_ALIAS,
@@ -398,6 +418,7 @@ def set_config(passthrough_values: list, arg_parse_options: dict) -> dict:
             "query_alias_prefix": settings.ES_LOCATIONS_QUERY_ALIAS_PREFIX,
             "required_index_name": settings.ES_LOCATIONS_NAME_SUFFIX,
             "sql_view": settings.ES_LOCATIONS_ETL_VIEW_NAME,
+            "stream_sql_func": stream_sql_statement,
             "stored_date_key": None,
             "unique_key_field": ES_LOCATION_UNIQUE_KEY_FIELD,
             "write_alias": settings.ES_LOCATIONS_WRITE_ALIAS,
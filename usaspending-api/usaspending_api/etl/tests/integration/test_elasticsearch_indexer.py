@@ -14,6 +14,7 @@ from usaspending_api.common.elasticsearch.elasticsearch_sql_helpers import ensur
 from usaspending_api.common.helpers.sql_helpers import execute_sql_to_ordered_dictionary
 from usaspending_api.conftest_helpers import TestElasticSearchIndex
 from usaspending_api.etl.elasticsearch_loader_helpers import (
+    chunks,
     delete_awards,
     delete_transactions,
     set_final_index_config,
@@ -282,6 +283,13 @@ def mock_execute_sql(sql, results, verbosity=None):
     return execute_sql_to_ordered_dictionary(sql)
 
 
+def mock_stream_sql(sql, batch_size, verbosity=None):
+    """Batched counterpart of ``mock_execute_sql``, standing in for the server-side cursor of
+    ``stream_sql_statement``
+    """
+    yield from chunks(mock_execute_sql(sql, True), batch_size)
+
+
 def test_create_and_load_new_award_index(award_data_fixture, elasticsearch_award_index, monkeypatch, caplog):
     """Test the ``elasticsearch_loader`` django management command to create a new awards index and load it
     with data from the DB
@@ -329,6 +337,32 @@ def test_create_and_load_new_award_index(award_data_fixture, elasticsearch_award
     assert es_award_docs == original_db_awards_count
 
 
+def test_stream_and_load_new_award_index(award_data_fixture, elasticsearch_award_index, monkeypatch):
+    """Test loading a new awards index with partitions streamed through the ETL in small batches"""
+    client = elasticsearch_award_index.client  # type: Elasticsearch
+    original_db_awards_count = Award.objects.count()
+
+    elasticsearch_award_index.etl_config["create_new_index"] = True
+    es_etl_config = _process_es_etl_test_config(
+        client, elasticsearch_award_index, options={"skip_date_check": True, "stream_batch_size": 1}
+    )
+
+    # Must use mock sql functions to share test DB conn+transaction in ETL code
+    monkeypatch.setattr(
+        "usaspending_api.etl.elasticsearch_loader_helpers.extract_data.execute_sql_statement", mock_execute_sql
+    )
+    es_etl_config["execute_sql_func"] = mock_execute_sql
+    es_etl_config["stream_sql_func"] = mock_stream_sql
+    loader = PostgresElasticsearchIndexerController(es_etl_config)
+    loader.prepare_for_etl()
+    assert all(task.stream_batch_size == 1 for task in loader.tasks.values())
+    loader.dispatch_tasks()
+    set_final_index_config(client, elasticsearch_award_index.index_name)
+
+    es_award_docs = client.count(index=elasticsearch_award_index.index_name)["count"]
+    assert es_award_docs == original_db_awards_count
+
+
 def test_create_and_load_new_recipient_index(recipient_data_fixture, elasticsearch_recipient_index, monkeypatch):
     """Test the `elasticsearch_indexer` Django management command to create and load a new recipients index."""
 
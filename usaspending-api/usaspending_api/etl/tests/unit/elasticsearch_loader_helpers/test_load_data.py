@@ -0,0 +1,172 @@
+import json
+import threading
+
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from elasticsearch.serializer import JSONSerializer
+
+from usaspending_api.etl.elasticsearch_loader_helpers import load_data as load_data_module
+from usaspending_api.etl.elasticsearch_loader_helpers.load_data import (
+    ES_BULK_THREAD_COUNT,
+    ES_STREAM_QUEUE_BATCHES,
+    load_record_batches,
+)
+from usaspending_api.etl.elasticsearch_loader_helpers.utilities import TaskSpec
+
+
+def _worker(is_incremental=False):
+    return TaskSpec(
+        base_table=None,
+        base_table_id=None,
+        field_for_es_id="award_id",
+        index="test-index",
+        is_incremental=is_incremental,
+        name="test worker",
+        partition_number=1,
+        primary_key="award_id",
+        sql=None,
+        view=None,
+        slices="auto",
+        stream_batch_size=10,
+    )
+
+
+def _batches(count, size=10):
+    for b in range(count):
+        yield [{"_id": b * size + i, "award_id": b * size + i} for i in range(size)]
+
+
+@pytest.fixture()
+def indexed(monkeypatch):
+    """Replace the bulk indexer with one that records the docs it is given"""
+    docs = []
+    lock = threading.Lock()
+
+    def _streaming_bulk(client, actions, **kwargs):
+        for doc in actions:
+            with lock:
+                docs.append(doc)
+            yield True, {"index": {"_id": doc["_id"]}}
+
+    monkeypatch.setattr(load_data_module.helpers, "streaming_bulk", _streaming_bulk)
+    return docs
+
+
+class _BulkClient:
+    """Stands in for the ES client's bulk API; docs listed in ``rejections`` get a 429 that many times"""
+
+    def __init__(self, rejections):
+        self.transport = SimpleNamespace(serializer=JSONSerializer())
+        self.rejections = Counter(rejections)
+        self.attempts = Counter()
+        self.lock = threading.Lock()
+
+    def bulk(self, body, *args, **kwargs):
+        items = []
+        with self.lock:
+            for action in body.splitlines()[::2]:
+                _id = json.loads(action)["index"]["_id"]
+                self.attempts[_id] += 1
+                status = 201
+                if self.rejections[_id]:
+                    self.rejections[_id] -= 1
+                    status = 429
+                items.append({"index": {"_id": _id, "status": status}})
+        return {"errors": any(item["index"]["status"] != 201 for item in items), "items": items}
+
+
+def test_load_record_batches(indexed):
+    success, fail = load_record_batches(_worker(), _batches(5), client=None)
+    assert (success, fail) == (50, 0)
+    assert sorted(doc["_id"] for doc in indexed) == list(range(50))
+
+
+def test_load_record_batches_retries_rejected_docs(monkeypatch):
+    monkeypatch.setattr(load_data_module, "ES_BULK_INITIAL_BACKOFF", 0)
+    client = _BulkClient({3: 2, 17: 1})
+
+    assert load_record_batches(_worker(), _batches(3), client=client) == (30, 0)
+    assert client.attempts[3] == 3
+    assert client.attempts[17] == 2
+    assert client.attempts[4] == 1
+
+
+def test_load_record_batches_counts_docs_rejected_too_often(monkeypatch):
+    monkeypatch.setattr(load_data_module, "ES_BULK_INITIAL_BACKOFF", 0)
+    monkeypatch.setattr(load_data_module, "ES_BULK_MAX_RETRIES", 2)
+    client = _BulkClient({3: 5, 17: 1})
+
+    assert load_record_batches(_worker(), _batches(3), client=client) == (29, 1)
+    assert client.attempts[3] == 3
+
+
+def test_load_record_batches_bounds_read_ahead(monkeypatch):
+    pulled = []
+
+    def _tracked_batches():
+        for batch in _batches(40):
+            pulled.append(batch)
+            yield batch
+
+    indexed = [0]
+    read_ahead = []
+    lock = threading.Lock()
+
+    def _streaming_bulk(client, actions, **kwargs):
+        for doc in actions:
+            with lock:
+                read_ahead.append(len(pulled) - indexed[0] // 10)
+                indexed[0] += 1
+            yield True, {}
+
+    monkeypatch.setattr(load_data_module.helpers, "streaming_bulk", _streaming_bulk)
+    assert load_record_batches(_worker(), _tracked_batches(), client=None) == (400, 0)
+    # The batches being indexed, the queued ones, and one blocked on the full queue
+    assert max(read_ahead) <= ES_STREAM_QUEUE_BATCHES + ES_BULK_THREAD_COUNT + 1
+
+
+def test_load_record_batches_deletes_before_incremental_index(indexed, monkeypatch):
+    deleted = []
+    monkeypatch.setattr(
+        load_data_module,
+        "delete_docs_by_unique_key",
+        lambda client, key, values, *args, **kwargs: deleted.append(values),
+    )
+    load_record_batches(_worker(is_incremental=True), _batches(3), client=None)
+    assert deleted == [list(range(0, 10)), list(range(10, 20)), list(range(20, 30))]
+    assert len(indexed) == 30
+
+
+def test_load_record_batches_extract_error(indexed):
+    def _failing_batches():
+        yield from _batches(2)
+        raise ValueError("lost the DB")
+
+    with pytest.raises(RuntimeError, match="test worker") as exc_info:
+        load_record_batches(_worker(), _failing_batches(), client=None)
+    assert isinstance(exc_info.value.__cause__, ValueError)
+    assert str(exc_info.value.__cause__) == "lost the DB"
+    assert len(indexed) == 20
+
+
+def test_load_record_batches_index_error(monkeypatch):
+    closed = []
+
+    def _endless_batches():
+        try:
+            while True:
+                yield from _batches(1)
+        finally:
+            closed.append(True)
+
+    def _streaming_bulk(client, actions, **kwargs):
+        next(actions)
+        raise ConnectionError("ES is down")
+
+    monkeypatch.setattr(load_data_module.helpers, "streaming_bulk", _streaming_bulk)
+    with pytest.raises(RuntimeError, match="test worker"):
+        load_record_batches(_worker(), _endless_batches(), client=None)
+    assert closed == [True]
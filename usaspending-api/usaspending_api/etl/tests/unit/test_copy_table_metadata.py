@@ -0,0 +1,20 @@
+import pytest
+
+from usaspending_api.etl.management.commands import copy_table_metadata
+
+
+def test_create_indexes_closes_pools_when_an_index_fails(monkeypatch):
+    closed = []
+
+    async def _fail(index_definitions, index_concurrency):
+        raise RuntimeError("index failed")
+
+    async def _close_pools():
+        closed.append(True)
+
+    monkeypatch.setattr(copy_table_metadata, "index_with_concurrency", _fail)
+    monkeypatch.setattr(copy_table_metadata, "close_pools", _close_pools)
+
+    with pytest.raises(RuntimeError, match="index failed"):
+        copy_table_metadata.create_indexes(["CREATE INDEX ..."], 2)
+    assert closed == [True]
@@ -31,6 +31,12 @@ DEFAULT_DB_TIMEOUT_IN_SECONDS = int(os.environ.get("DEFAULT_DB_TIMEOUT_IN_SECOND
 DOWNLOAD_DB_TIMEOUT_IN_HOURS = 6
 CONNECTION_MAX_SECONDS = 10
 
+# asyncpg pools used by usaspending_api.common.data_connectors.async_sql_query (one per DSN and event loop).
+# The max size bounds how many statements run at once, so keep it above the number of matviews refreshed together.
+ASYNCPG_POOL_MIN_SIZE = int(os.environ.get("ASYNCPG_POOL_MIN_SIZE", 1))
+ASYNCPG_POOL_MAX_SIZE = int(os.environ.get("ASYNCPG_POOL_MAX_SIZE", 32))
+ASYNCPG_STATEMENT_CACHE_SIZE = int(os.environ.get("ASYNCPG_STATEMENT_CACHE_SIZE", 100))
+
 # Default type for when a Primary Key is not specified
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 # Default text search config setting when dealing with tsvectors
@@ -182,6 +188,11 @@ ES_LOCATIONS_QUERY_ALIAS_PREFIX = "location-query"
 ES_LOCATIONS_WRITE_ALIAS = "location-load-alias"
 
 ES_TIMEOUT = 90
+# Connection pooling / sniffing for the shared per-process client (see common/elasticsearch/client.py)
+ES_CONNECTIONS_PER_NODE = int(os.environ.get("ES_CONNECTIONS_PER_NODE", 25))
+ES_SNIFF_ON_START = os.environ.get("ES_SNIFF_ON_START", "").lower() in ["true", "1", "yes"]
+ES_SNIFF_ON_CONNECTION_FAIL = os.environ.get("ES_SNIFF_ON_CONNECTION_FAIL", "").lower() in ["true", "1", "yes"]
+ES_SNIFFER_TIMEOUT = int(os.environ.get("ES_SNIFFER_TIMEOUT", 0)) or None
 ES_REPOSITORY = ""
 ES_ROUTING_FIELD = "recipient_agg_key"
 